@@ -1,9 +1,22 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse
 import pandas as pd
 import io
 from pathlib import Path
+from typing import Optional
+
+from etl.utils.instrumentacao import carregar_metricas, instrumentacao
+from app.services.busca_clientes import indice_clientes
+from app.services.listagens import LIMITE_MAXIMO, listagens
+
+# orjson é opcional: sem ele as listagens usam o json da biblioteca padrão
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as RespostaJSON
+except ImportError:
+    RespostaJSON = JSONResponse
 
 app = FastAPI(
     title="Sistema de Gestão de Óticas - Carne Fácil",
@@ -11,6 +24,13 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# A API nunca chama finalizar(): sem isso as etapas de cada pedido (upsert,
+# deduplicação) se acumulariam no coletor do processo
+instrumentacao.desativar()
+
+# Páginas de listagem grandes vão comprimidas quando o cliente aceita gzip
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # Servir arquivos estáticos
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
@@ -224,6 +244,50 @@ async def deduplicate_clients():
     # TODO: Implementar deduplicação inteligente
     return {"message": "Deduplicação em desenvolvimento"}
 
+@app.get("/api/clientes/search")
+def buscar_clientes(q: str = "", limite: int = 20, modo: str = "auto", cursor: Optional[str] = None):
+    """Busca por prefixo/aproximada de nome (sem acentos) ou exata por CPF/telefone, paginada por cursor"""
+    try:
+        return indice_clientes().buscar(q, limite=min(max(limite, 1), 100), modo=modo, cursor=cursor)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"Base de clientes não encontrada: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def listar(nome: str, limite: int, filtros: dict, campos: Optional[str], cursor: Optional[str]):
+    try:
+        pagina = listagens().listar(
+            nome, limite=min(max(limite, 1), LIMITE_MAXIMO), filtros=filtros, cursor=cursor,
+            campos=[campo.strip() for campo in campos.split(',') if campo.strip()] if campos else None)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"Base não encontrada: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Resposta pronta: valores já são tipos JSON, sem passar pelo jsonable_encoder
+    return RespostaJSON(pagina)
+
+@app.get("/api/clientes")
+def listar_clientes(loja: Optional[str] = None, uf: Optional[str] = None, cidade: Optional[str] = None,
+                    campos: Optional[str] = None, limite: int = 50, cursor: Optional[str] = None):
+    """Clientes da base master em páginas (keyset), filtro por loja/UF/cidade e campos=col1,col2"""
+    return listar('clientes', limite, {'loja': loja, 'uf': uf, 'cidade': cidade}, campos, cursor)
+
+@app.get("/api/os")
+def listar_os(loja: Optional[str] = None, status: Optional[str] = None, data_inicio: Optional[str] = None,
+              data_fim: Optional[str] = None, campos: Optional[str] = None, limite: int = 50,
+              cursor: Optional[str] = None):
+    """OS da mais recente para a mais antiga em páginas (keyset); status: com_cliente | sem_cliente"""
+    filtros = {'loja': loja, 'status': status, 'data_inicio': data_inicio, 'data_fim': data_fim}
+    return listar('os', limite, filtros, campos, cursor)
+
+@app.get("/api/metrics")
+def metricas_pipeline(execucao: Optional[str] = None, limite: int = 10):
+    """Tempo, CPU, linhas e memória por etapa das últimas execuções (logs_processamento)"""
+    try:
+        return {"execucoes": carregar_metricas(execucao=execucao, limite=min(max(limite, 1), 100))}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao ler métricas: {str(e)}")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -11,6 +11,8 @@ class Cliente(Base):
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String(255), nullable=False, index=True)
     cpf = Column(String(14), unique=True, index=True)
+    # Chave natural do upsert (CPF_/NOME_DATA_/NOME_/HASH_, ver etl/utils/ids_clientes.py)
+    chave_cliente = Column(String(100), unique=True, index=True)
     telefone = Column(String(20))
     email = Column(String(255))
     endereco = Column(Text)
@@ -93,14 +95,19 @@ class LogProcessamento(Base):
     __tablename__ = "logs_processamento"
     
     id = Column(Integer, primary_key=True, index=True)
+    execucao = Column(String(50), index=True)  # uma execução do pipeline agrupa várias etapas
+    etapa = Column(String(100), index=True)
     arquivo_nome = Column(String(255), nullable=False)
     arquivo_tamanho = Column(Integer)
     linhas_processadas = Column(Integer)
+    linhas_saida = Column(Integer)
     linhas_erro = Column(Integer)
     clientes_novos = Column(Integer)
     clientes_atualizados = Column(Integer)
     duplicatas_detectadas = Column(Integer)
-    tempo_processamento = Column(Float)
+    tempo_processamento = Column(Float)  # segundos (relógio)
+    tempo_cpu = Column(Float)
+    memoria_pico_mb = Column(Float)
     status = Column(String(50))  # sucesso, erro, parcial
     erro_detalhes = Column(Text)
     data_processamento = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
@@ -0,0 +1,329 @@
+"""
+Persistência em lote dos modelos SQLAlchemy
+
+Inserir um objeto ORM por linha é lento demais para dezenas de milhares de OS.
+Os repositórios recebem DataFrames, tabelas/lotes Arrow ou listas de dicts
+direto dos extratores e gravam com Core `insert()` em executemany, em
+transações de `tamanho_lote` linhas. `upsert()` usa ON CONFLICT (SQLite e
+PostgreSQL) na chave natural de cada modelo.
+
+    engine = criar_engine()
+    criar_tabelas(engine)
+    RepositorioClientes(engine).upsert(df_clientes)
+"""
+
+import math
+import os
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+from sqlalchemy import create_engine, event, func, insert, inspect, select, text
+from sqlalchemy.engine import Engine
+
+from app.models.database import Base, Cliente, ClienteDuplicado, Dioptria, LogProcessamento, OrdemServico
+
+# Mesmo padrão de app/core/config.py (importá-lo criaria as pastas de dados da app)
+URL_BANCO = os.getenv("DATABASE_URL", "sqlite:///./oticas.db")
+
+TAMANHO_LOTE = 5000
+
+# Colunas nunca sobrescritas por upsert
+COLUNAS_PRESERVADAS = {'id', 'data_criacao'}
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+def criar_engine(url: Optional[str] = None) -> Engine:
+    """Engine com pool, uma por URL (SQLite em WAL; PostgreSQL com pre-ping)"""
+    return _engine(url or URL_BANCO)
+
+
+@lru_cache(maxsize=None)
+def _engine(url: str) -> Engine:
+    if url.startswith('sqlite'):
+        engine = create_engine(url, connect_args={'check_same_thread': False})
+
+        @event.listens_for(engine, 'connect')
+        def configurar_sqlite(conexao, _):
+            cursor = conexao.cursor()
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+            cursor.execute('PRAGMA foreign_keys=ON')
+            cursor.close()
+
+        return engine
+
+    return create_engine(url, pool_size=5, max_overflow=10, pool_pre_ping=True)
+
+
+def completar_colunas(engine: Engine, modelo) -> List[str]:
+    """
+    ALTER TABLE ... ADD COLUMN das colunas do modelo que faltam na tabela já
+    existente (create_all não altera tabelas), com os índices delas
+    """
+    tabela = modelo.__table__
+    existentes = {coluna['name'] for coluna in inspect(engine).get_columns(tabela.name)}
+    faltando = [coluna for coluna in tabela.columns if coluna.name not in existentes]
+    if not faltando:
+        return []
+    with engine.begin() as conexao:
+        for coluna in faltando:
+            tipo = coluna.type.compile(dialect=engine.dialect)
+            conexao.execute(text(f"ALTER TABLE {tabela.name} ADD COLUMN {coluna.name} {tipo}"))
+    for indice in tabela.indexes:
+        if any(coluna in faltando for coluna in indice.columns):
+            indice.create(engine, checkfirst=True)
+    return [coluna.name for coluna in faltando]
+
+
+# Engines em que logs_processamento já foi criada/completada neste processo
+_logs_prontos = set()
+
+
+def criar_tabela_logs(engine: Engine):
+    """logs_processamento com as colunas de métricas (execucao, etapa, tempo_cpu...) em bancos antigos"""
+    if engine.url in _logs_prontos:
+        return
+    LogProcessamento.__table__.create(engine, checkfirst=True)
+    completar_colunas(engine, LogProcessamento)
+    _logs_prontos.add(engine.url)
+
+
+def criar_tabelas(engine: Optional[Engine] = None):
+    engine = engine or criar_engine()
+    Base.metadata.create_all(engine)
+    criar_tabela_logs(engine)
+    # Bancos criados antes de clientes.chave_cliente (create_all não altera tabelas existentes)
+    colunas = {coluna['name'] for coluna in inspect(engine).get_columns('clientes')}
+    if 'chave_cliente' not in colunas:
+        with engine.begin() as conexao:
+            conexao.execute(text("ALTER TABLE clientes ADD COLUMN chave_cliente VARCHAR(100)"))
+            conexao.execute(text("CREATE UNIQUE INDEX ix_clientes_chave_cliente ON clientes (chave_cliente)"))
+
+
+def _valor(valor):
+    """Valor pronto para o driver: ausentes (None/NaN/NaT/pd.NA) viram None e escalares numpy viram Python"""
+    if pd.api.types.is_scalar(valor) and pd.isna(valor):
+        return None
+    if isinstance(valor, pd.Timestamp):
+        return valor.to_pydatetime()
+    if hasattr(valor, 'item'):
+        return _valor(valor.item())
+    return valor
+
+
+def _registros_df(df: pd.DataFrame, colunas: List[str]) -> List[dict]:
+    df = df[[c for c in df.columns if c in colunas]]
+    registros = []
+    for linha in df.itertuples(index=False, name=None):
+        registros.append({coluna: _valor(valor) for coluna, valor in zip(df.columns, linha)})
+    return registros
+
+
+def lotes_de_registros(dados, colunas: List[str], tamanho_lote: int = TAMANHO_LOTE) -> Iterator[List[dict]]:
+    """Divide DataFrame, tabela/lote Arrow, lista de dicts ou iterável desses em lotes de dicts"""
+    if isinstance(dados, pd.DataFrame):
+        for inicio in range(0, len(dados), tamanho_lote):
+            yield _registros_df(dados.iloc[inicio:inicio + tamanho_lote], colunas)
+        return
+
+    if pa is not None and isinstance(dados, (pa.Table, pa.RecordBatch)):
+        if isinstance(dados, pa.RecordBatch):
+            dados = pa.Table.from_batches([dados])
+        nomes = [c for c in dados.schema.names if c in colunas]
+        for lote in dados.select(nomes).to_batches(max_chunksize=tamanho_lote):
+            yield lote.to_pylist()
+        return
+
+    if isinstance(dados, list) and (not dados or isinstance(dados[0], dict)):
+        for inicio in range(0, len(dados), tamanho_lote):
+            yield [{c: _valor(v) for c, v in r.items() if c in colunas} for r in dados[inicio:inicio + tamanho_lote]]
+        return
+
+    # Iterável de DataFrames/lotes Arrow (ex.: LeitorPlanilha.blocos())
+    for parte in dados:
+        yield from lotes_de_registros(parte, colunas, tamanho_lote)
+
+
+class Repositorio:
+    """Insert e upsert em lote de um modelo"""
+
+    modelo = None
+    chave: List[str] = ['id']
+    # Outras colunas únicas: no upsert, um registro por valor em cada lote
+    colunas_unicas: List[str] = []
+
+    def __init__(self, engine: Optional[Engine] = None, tamanho_lote: int = TAMANHO_LOTE):
+        self.engine = engine or criar_engine()
+        self.tamanho_lote = tamanho_lote
+        self.tabela = self.modelo.__table__
+        self.colunas = [c.name for c in self.tabela.columns]
+
+    def preparar_registros(self, registros: List[dict]) -> List[dict]:
+        """Ajuste do lote antes de gravar (colunas derivadas)"""
+        return registros
+
+    def conciliar(self, registros: List[dict], chave: List[str], conexao) -> List[dict]:
+        """Ajuste do lote de upsert com o que já está no banco (mesma transação)"""
+        return registros
+
+    def registros_unicos(self, registros: List[dict], chave: List[str]) -> List[dict]:
+        """
+        Último registro de cada chave (e de cada colunas_unicas) do lote: no
+        PostgreSQL o lote vai em um único INSERT ... VALUES (...), (...) e o ON
+        CONFLICT não atualiza a mesma linha duas vezes. Chave nula nunca conflita.
+        """
+        vistos = [set() for _ in range(1 + len(self.colunas_unicas))]
+        unicos = []
+        for registro in reversed(registros):
+            valores = [tuple(registro.get(c) for c in chave)] + [(registro.get(c),) for c in self.colunas_unicas]
+            valores = [valor if None not in valor else None for valor in valores]
+            if any(valor is not None and valor in visto for valor, visto in zip(valores, vistos)):
+                continue
+            for valor, visto in zip(valores, vistos):
+                if valor is not None:
+                    visto.add(valor)
+            unicos.append(registro)
+        unicos.reverse()
+        return unicos
+
+    def _gravar(self, dados, montar_comando, chave: Optional[List[str]] = None) -> int:
+        """
+        Grava lote a lote, cada um em sua transação; retorna linhas enviadas.
+        Com chave (upsert), o lote é conciliado com o banco e fica com um
+        registro por chave.
+        """
+        from etl.utils.instrumentacao import instrumentacao
+
+        total = 0
+        with instrumentacao.etapa(f"banco_{self.tabela.name}") as etapa:
+            for registros in lotes_de_registros(dados, self.colunas, self.tamanho_lote):
+                if not registros:
+                    continue
+                registros = self.preparar_registros(registros)
+                with self.engine.begin() as conexao:
+                    if chave:
+                        registros = self.registros_unicos(self.conciliar(registros, chave, conexao), chave)
+                    conexao.execute(montar_comando(registros), registros)
+                total += len(registros)
+            etapa.registrar(entrada=total, saida=total)
+        return total
+
+    def inserir(self, dados) -> int:
+        """INSERT em executemany (falha em chave duplicada)"""
+        return self._gravar(dados, lambda registros: insert(self.tabela))
+
+    def upsert(self, dados, chave: Optional[List[str]] = None) -> int:
+        """INSERT ... ON CONFLICT (chave) DO UPDATE das colunas recebidas"""
+        chave = chave or self.chave
+        dialeto = self.engine.dialect.name
+        if dialeto == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as insert_dialeto
+        elif dialeto == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as insert_dialeto
+        else:
+            raise ValueError(f"Upsert não suportado para o banco {dialeto}")
+
+        def montar(registros):
+            comando = insert_dialeto(self.tabela)
+            atualizar = [c for c in registros[0] if c not in chave and c not in COLUNAS_PRESERVADAS]
+            if not atualizar:
+                return comando.on_conflict_do_nothing(index_elements=chave)
+            valores = {c: comando.excluded[c] for c in atualizar}
+            if 'data_atualizacao' in self.colunas:
+                # onupdate do modelo não vale para ON CONFLICT
+                valores['data_atualizacao'] = datetime.utcnow()
+            return comando.on_conflict_do_update(index_elements=chave, set_=valores)
+
+        return self._gravar(dados, montar, chave)
+
+    def contar(self) -> int:
+        with self.engine.connect() as conexao:
+            return conexao.execute(select(func.count()).select_from(self.tabela)).scalar_one()
+
+
+class RepositorioClientes(Repositorio):
+    """
+    Upsert pela chave_cliente (CPF > Nome+Data > Nome > Hash, a mesma dos IDs
+    de cliente): NULL nunca conflita no índice único de cpf, então clientes
+    sem CPF eram inseridos de novo a cada execução
+
+    cpf também é único: um registro cujo cpf já está gravado com outra chave
+    (chave de outra regra, ou linha anterior à coluna chave_cliente) atualiza
+    essa linha. Sobra como erro (IntegrityError, o lote todo volta) só o caso
+    em que a chave do registro já é de uma linha com outro cpf.
+    """
+
+    modelo = Cliente
+    chave = ['chave_cliente']
+    colunas_unicas = ['cpf']
+
+    def preparar_registros(self, registros: List[dict]) -> List[dict]:
+        from etl.utils.ids_clientes import chaves_clientes
+
+        faltando = [r for r in registros if not r.get('chave_cliente')]
+        if faltando:
+            chaves = chaves_clientes([r.get('nome') for r in faltando], [r.get('cpf') for r in faltando],
+                                     [r.get('data_nascimento') for r in faltando])
+            for registro, chave in zip(faltando, chaves):
+                registro['chave_cliente'] = chave
+        return registros
+
+    def conciliar(self, registros: List[dict], chave: List[str], conexao) -> List[dict]:
+        """Chave da linha que já tem o cpf (linhas sem chave recebem a do registro)"""
+        if chave != ['chave_cliente']:
+            return registros
+        cpfs = list({r['cpf'] for r in registros if r.get('cpf')})
+        if not cpfs:
+            return registros
+        gravadas = dict(conexao.execute(
+            select(self.tabela.c.cpf, self.tabela.c.chave_cliente).where(self.tabela.c.cpf.in_(cpfs))
+        ).all())
+
+        sem_chave = {}
+        for registro in registros:
+            cpf = registro.get('cpf')
+            if cpf not in gravadas:
+                continue
+            if gravadas[cpf] is None:
+                sem_chave.setdefault(cpf, registro['chave_cliente'])
+            registro['chave_cliente'] = gravadas[cpf] or sem_chave[cpf]
+        if sem_chave:
+            # Linhas gravadas antes da coluna chave_cliente, se a chave ainda está livre
+            conexao.execute(
+                text("UPDATE clientes SET chave_cliente = :chave WHERE cpf = :cpf AND chave_cliente IS NULL "
+                     "AND NOT EXISTS (SELECT 1 FROM clientes outro WHERE outro.chave_cliente = :chave)"),
+                [{'cpf': cpf, 'chave': valor} for cpf, valor in sem_chave.items()]
+            )
+        return registros
+
+
+class RepositorioOrdensServico(Repositorio):
+    modelo = OrdemServico
+    chave = ['numero_os']
+
+
+class RepositorioDioptrias(Repositorio):
+    modelo = Dioptria
+
+
+class RepositorioClientesDuplicados(Repositorio):
+    modelo = ClienteDuplicado
+
+
+class RepositorioLogs(Repositorio):
+    modelo = LogProcessamento
+
+
+REPOSITORIOS: Dict[str, type] = {
+    'clientes': RepositorioClientes,
+    'ordens_servico': RepositorioOrdensServico,
+    'dioptrias': RepositorioDioptrias,
+    'clientes_duplicados': RepositorioClientesDuplicados,
+    'logs_processamento': RepositorioLogs,
+}
@@ -0,0 +1,237 @@
+"""
+Busca de clientes por nome, CPF ou telefone
+
+Os scripts procuravam clientes varrendo a base inteira com fuzzy, e o índice
+gin_trgm_ops de core.clientes só existe no Supabase. IndiceBuscaClientes
+carrega clientes_unificados.parquet uma vez e mantém em memória:
+
+- nome_busca (maiúsculas, sem acento e sem pontuação) em um array ordenado,
+  para busca por prefixo com searchsorted;
+- índice invertido de trigramas (como em etl/utils/similaridade.py): as listas
+  dos trigramas do termo são somadas com bincount, o que dá de uma vez quantos
+  trigramas cada nome compartilha com o termo (similaridade de Dice);
+- CPF (só dígitos) e os 8 últimos dígitos de cada telefone, para busca exata.
+
+O índice é refeito só quando o parquet muda (tamanho + mtime). A paginação é
+por keyset: o cursor guarda o modo, o termo e a última chave de ordenação.
+"""
+
+import base64
+import binascii
+import json
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from unidecode import unidecode
+
+from etl.utils import normalizar
+
+ARQUIVO_CLIENTES = Path("data/clientes/_consolidado/clientes_unificados.parquet")
+
+COLUNAS = ['id_cliente', 'origem', 'nome', 'cpf', 'telefone1', 'telefone2', 'email']
+DIGITOS_TELEFONE = 8
+SIMILARIDADE_MINIMA = 0.35
+
+
+def nome_busca(valores) -> pd.Series:
+    """Nome em maiúsculas, sem pontuação e sem acentos"""
+    return normalizar.normalizar_nome(valores).map(unidecode, na_action='ignore')
+
+
+def trigramas(nome: str) -> set:
+    """Trigramas de cada palavra (não atravessam espaços)"""
+    return {palavra[i:i + 3] for palavra in nome.split() for i in range(len(palavra) - 2)}
+
+
+def codificar_cursor(modo: str, termo: str, chave: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps([modo, termo, *chave]).encode()).decode()
+
+
+def decodificar_cursor(cursor: str) -> Tuple[str, str, list]:
+    """(modo, termo, chave) do cursor; ValueError se ele foi alterado ou truncado"""
+    try:
+        modo, termo, *chave = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError, TypeError, ValueError):
+        raise ValueError("Cursor inválido") from None
+    if not isinstance(modo, str) or not chave:
+        raise ValueError("Cursor inválido")
+    return modo, termo, chave
+
+
+def inteiro_valido(valor, limite: int) -> bool:
+    """Posição do cursor dentro do índice atual (bool não conta como inteiro)"""
+    return isinstance(valor, int) and not isinstance(valor, bool) and 0 <= valor < limite
+
+
+class IndiceBuscaClientes:
+    """Índices em memória (prefixo, trigramas e documentos) dos clientes unificados"""
+
+    def __init__(self, arquivo=ARQUIVO_CLIENTES):
+        self.arquivo = Path(arquivo)
+        self.assinatura = None
+        self.registros: List[dict] = []
+        self.trava = threading.Lock()
+
+    def assinatura_arquivo(self) -> str:
+        stat = self.arquivo.stat()
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def abrir(self) -> 'IndiceBuscaClientes':
+        """Carrega o índice, refazendo-o se o parquet mudou"""
+        assinatura = self.assinatura_arquivo()
+        if assinatura != self.assinatura:
+            # Pedidos simultâneos esperam uma única construção
+            with self.trava:
+                if assinatura != self.assinatura:
+                    self.construir()
+                    self.assinatura = assinatura
+        return self
+
+    def validar_cursor(self, modo: str, chave: list):
+        """Chave do cursor coerente com o modo e com o índice atual (cursor antigo ou alterado → ValueError)"""
+        total = len(self.registros)
+        if modo in ('prefixo', 'exato'):
+            valido = len(chave) == 1 and inteiro_valido(chave[0], total)
+        elif modo == 'fuzzy':
+            valido = (len(chave) == 2 and isinstance(chave[0], (int, float)) and not isinstance(chave[0], bool)
+                      and inteiro_valido(chave[1], total))
+        else:
+            valido = False
+        if not valido:
+            raise ValueError("Cursor inválido ou de um índice anterior; refaça a busca")
+
+    def construir(self):
+        df = pd.read_parquet(self.arquivo)
+        for coluna in COLUNAS:
+            if coluna not in df.columns:
+                df[coluna] = None
+        df = df[COLUNAS].reset_index(drop=True)
+        self.registros = df.astype(object).where(df.notna(), None).to_dict('records')
+        nomes = nome_busca(df['nome']).fillna('').to_numpy(dtype=str)
+
+        # Prefixo: posições em ordem alfabética (empate pela posição)
+        self.ordem = np.lexsort((np.arange(len(df)), nomes))
+        self.nomes_ordenados = nomes[self.ordem]
+        self.posicao_ordenada = np.empty(len(df), dtype=np.int64)
+        self.posicao_ordenada[self.ordem] = np.arange(len(df))
+
+        # Trigramas: cada nome distinto é quebrado uma vez
+        listas: Dict[str, List[int]] = defaultdict(list)
+        self.total_trigramas = np.zeros(len(df), dtype=np.int32)
+        for nome, posicoes in pd.Series(np.arange(len(df))).groupby(nomes).groups.items():
+            grams = trigramas(nome)
+            posicoes = list(posicoes)
+            self.total_trigramas[posicoes] = len(grams)
+            for gram in grams:
+                listas[gram].extend(posicoes)
+        self.por_trigrama = {gram: np.array(posicoes, dtype=np.int32) for gram, posicoes in listas.items()}
+
+        # Exatos: CPF e final do telefone
+        self.por_documento: Dict[str, List[int]] = defaultdict(list)
+        cpfs = normalizar.limpar_cpf(df['cpf'], formatar=False)
+        for posicao, cpf in cpfs.dropna().items():
+            self.por_documento[cpf].append(posicao)
+        for coluna in ['telefone1', 'telefone2']:
+            finais = normalizar.somente_digitos(df[coluna]).str[-DIGITOS_TELEFONE:].dropna()
+            for posicao, final in finais[finais.str.len() == DIGITOS_TELEFONE].items():
+                self.por_documento[final].append(posicao)
+
+        print(f"🔎 Índice de busca: {len(df):,} clientes, {len(self.por_trigrama):,} trigramas")
+
+    def buscar_prefixo(self, termo: str, limite: int, apos: Optional[list] = None):
+        """Nomes que começam com o termo, em ordem alfabética"""
+        inicio = np.searchsorted(self.nomes_ordenados, termo, side='left')
+        fim = np.searchsorted(self.nomes_ordenados, termo + '\uffff', side='left')
+        if apos:
+            inicio = max(inicio, self.posicao_ordenada[apos[0]] + 1)
+        posicoes = self.ordem[inicio:min(fim, inicio + limite + 1)]
+        return [(int(p), None, [int(p)]) for p in posicoes]
+
+    def buscar_fuzzy(self, termo: str, limite: int, apos: Optional[list] = None):
+        """Nomes com trigramas em comum, do mais ao menos similar (Dice)"""
+        grams = trigramas(termo)
+        listas = [self.por_trigrama[g] for g in grams if g in self.por_trigrama]
+        if not listas:
+            return []
+
+        comuns = np.bincount(np.concatenate(listas), minlength=len(self.registros))
+        candidatos = np.flatnonzero(comuns)
+        scores = np.round(2 * comuns[candidatos] / (len(grams) + self.total_trigramas[candidatos]), 4)
+        filtro = scores >= SIMILARIDADE_MINIMA
+        if apos:
+            # Depois de (score, posição) da última linha da página anterior
+            score_anterior, posicao_anterior = apos
+            filtro &= (scores < score_anterior) | ((scores == score_anterior) & (candidatos > posicao_anterior))
+        candidatos, scores = candidatos[filtro], scores[filtro]
+
+        if len(candidatos) > limite + 1:
+            # Só os limite + 1 melhores precisam ser ordenados
+            corte = np.partition(scores, len(scores) - limite - 1)[len(scores) - limite - 1]
+            manter = scores >= corte
+            candidatos, scores = candidatos[manter], scores[manter]
+        ordem = np.lexsort((candidatos, -scores))[:limite + 1]
+        return [(int(candidatos[i]), float(scores[i]), [float(scores[i]), int(candidatos[i])]) for i in ordem]
+
+    def buscar_exato(self, digitos: str, limite: int, apos: Optional[list] = None):
+        """CPF (11 dígitos) ou telefone (8 últimos dígitos), em ordem de cadastro"""
+        posicoes = set(self.por_documento.get(digitos, [])) | set(self.por_documento.get(digitos[-DIGITOS_TELEFONE:], []))
+        ultima = apos[0] if apos else -1
+        return [(p, None, [p]) for p in sorted(p for p in posicoes if p > ultima)[:limite + 1]]
+
+    def buscar(self, q: str = '', limite: int = 20, modo: str = 'auto', cursor: Optional[str] = None) -> dict:
+        """
+        modo: auto (dígitos → exato; nome → prefixo, ou fuzzy se nenhum nome começa
+        com o termo), prefixo, fuzzy ou exato. O cursor da resposta continua a busca.
+        """
+        apos = None
+        if cursor:
+            modo, q, apos = decodificar_cursor(cursor)
+            if not isinstance(q, str):
+                raise ValueError("Cursor inválido")
+            self.validar_cursor(modo, apos)
+
+        digitos = normalizar.escalar(normalizar.somente_digitos, q) or ''
+        termo = normalizar.escalar(nome_busca, q) or ''
+
+        if modo == 'auto':
+            if len(digitos) >= DIGITOS_TELEFONE and len(digitos) >= len(termo.replace(' ', '')):
+                modo = 'exato'
+            else:
+                modo = 'prefixo' if termo and self.buscar_prefixo(termo, 0) else 'fuzzy'
+
+        if modo == 'exato':
+            if len(digitos) < DIGITOS_TELEFONE:
+                raise ValueError("Busca exata precisa de CPF ou telefone com pelo menos 8 dígitos")
+            encontrados = self.buscar_exato(digitos, limite, apos)
+        elif modo == 'prefixo':
+            encontrados = self.buscar_prefixo(termo, limite, apos) if termo else []
+        elif modo == 'fuzzy':
+            encontrados = self.buscar_fuzzy(termo, limite, apos)
+        else:
+            raise ValueError(f"Modo de busca desconhecido: {modo}")
+
+        pagina = encontrados[:limite]
+        resultados = []
+        for posicao, score, _ in pagina:
+            resultado = dict(self.registros[posicao])
+            if score is not None:
+                resultado['similaridade'] = score
+            resultados.append(resultado)
+
+        proximo = codificar_cursor(modo, q, pagina[-1][2]) if len(encontrados) > limite else None
+        return {'modo': modo, 'resultados': resultados, 'proximo_cursor': proximo}
+
+
+_indice: Optional[IndiceBuscaClientes] = None
+
+
+def indice_clientes() -> IndiceBuscaClientes:
+    """Índice compartilhado da API (carregado na primeira busca)"""
+    global _indice
+    if _indice is None:
+        _indice = IndiceBuscaClientes()
+    return _indice.abrir()
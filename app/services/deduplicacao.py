@@ -5,11 +5,12 @@ Serviço de deduplicação inteligente de clientes
 from typing import List, Dict, Tuple, Optional
 import pandas as pd
 from fuzzywuzzy import fuzz, process
-from unidecode import unidecode
-import re
 import logging
 from dataclasses import dataclass
 
+from etl.utils import normalizar
+from etl.utils.instrumentacao import instrumentacao
+
 @dataclass
 class ClienteMatch:
     """Representa um match entre dois clientes"""
@@ -32,83 +33,42 @@ class DeduplicadorClientes:
         
     def normalizar_nome(self, nome: str) -> str:
         """Normaliza nome para comparação"""
-        if pd.isna(nome):
-            return ""
-        
-        nome = str(nome).strip().upper()
-        nome = unidecode(nome)
-        
-        # Remover títulos comuns
-        titulos = ['DR', 'DRA', 'SR', 'SRA', 'SRTA', 'PROF', 'ENG']
-        palavras = nome.split()
-        palavras = [p for p in palavras if p not in titulos]
-        
-        # Remover conectores
-        conectores = ['DE', 'DA', 'DO', 'DAS', 'DOS', 'E']
-        palavras = [p for p in palavras if p not in conectores or len(palavras) <= 2]
-        
-        return ' '.join(palavras)
+        return normalizar.escalar(normalizar.normalizar_nome_comparacao, nome) or ""
     
     def normalizar_cpf(self, cpf: str) -> str:
         """Normaliza CPF removendo formatação"""
-        if pd.isna(cpf):
-            return ""
-        
-        return re.sub(r'\D', '', str(cpf))
+        return normalizar.escalar(normalizar.somente_digitos, cpf) or ""
     
     def normalizar_telefone(self, telefone: str) -> str:
         """Normaliza telefone removendo formatação"""
-        if pd.isna(telefone):
-            return ""
-        
-        tel = re.sub(r'\D', '', str(telefone))
-        
-        # Remover código do país se presente
-        if len(tel) > 11 and tel.startswith('55'):
-            tel = tel[2:]
-        
-        # Remover dígito 9 adicional se presente
-        if len(tel) == 11 and tel[2] == '9':
-            return tel
-        elif len(tel) == 10:
-            return tel[:2] + '9' + tel[2:]
-        
-        return tel
+        return normalizar.escalar(normalizar.normalizar_telefone, telefone) or ""
     
     def normalizar_endereco(self, endereco: str) -> str:
         """Normaliza endereço para comparação"""
-        if pd.isna(endereco):
-            return ""
-        
-        endereco = str(endereco).strip().upper()
-        endereco = unidecode(endereco)
-        
-        # Padronizar abreviações
-        substituicoes = {
-            r'\bR\b\.?': 'RUA',
-            r'\bAV\b\.?': 'AVENIDA',
-            r'\bTRAV\b\.?': 'TRAVESSA',
-            r'\bAL\b\.?': 'ALAMEDA',
-            r'\bPCA\b\.?': 'PRACA',
-            r'\bEST\b\.?': 'ESTRADA',
-            r'\bROD\b\.?': 'RODOVIA',
-            r'\bAPT\b\.?': 'APARTAMENTO',
-            r'\bCONJ\b\.?': 'CONJUNTO',
-            r'\bBL\b\.?': 'BLOCO',
-            r'\bQD\b\.?': 'QUADRA',
-            r'\bLT\b\.?': 'LOTE'
+        return normalizar.escalar(normalizar.normalizar_endereco, endereco) or ""
+    
+    def normalizar_colunas(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Normaliza de uma vez as colunas usadas na comparação"""
+        normalizadores = {
+            'nome': normalizar.normalizar_nome_comparacao,
+            'cpf': normalizar.somente_digitos,
+            'telefone': normalizar.normalizar_telefone,
+            'endereco': normalizar.normalizar_endereco
         }
         
-        for padrao, substituto in substituicoes.items():
-            endereco = re.sub(padrao, substituto, endereco)
+        normalizado = pd.DataFrame(index=df.index)
+        for campo, funcao in normalizadores.items():
+            if campo in df.columns:
+                normalizado[campo] = funcao(df[campo]).fillna('').astype(object)
         
-        return endereco
+        return normalizado
     
     def calcular_score_nome(self, nome1: str, nome2: str) -> float:
         """Calcula score de similaridade entre nomes"""
-        nome1_norm = self.normalizar_nome(nome1)
-        nome2_norm = self.normalizar_nome(nome2)
-        
+        return self._score_nome(self.normalizar_nome(nome1), self.normalizar_nome(nome2))
+    
+    def _score_nome(self, nome1_norm: str, nome2_norm: str) -> float:
+        """Score de nomes já normalizados"""
         if not nome1_norm or not nome2_norm:
             return 0.0
         
@@ -125,9 +85,10 @@ class DeduplicadorClientes:
     
     def calcular_score_cpf(self, cpf1: str, cpf2: str) -> float:
         """Calcula score de similaridade entre CPFs"""
-        cpf1_norm = self.normalizar_cpf(cpf1)
-        cpf2_norm = self.normalizar_cpf(cpf2)
-        
+        return self._score_cpf(self.normalizar_cpf(cpf1), self.normalizar_cpf(cpf2))
+    
+    def _score_cpf(self, cpf1_norm: str, cpf2_norm: str) -> float:
+        """Score de CPFs já normalizados"""
         if not cpf1_norm or not cpf2_norm:
             return 0.0
         
@@ -135,9 +96,10 @@ class DeduplicadorClientes:
     
     def calcular_score_telefone(self, tel1: str, tel2: str) -> float:
         """Calcula score de similaridade entre telefones"""
-        tel1_norm = self.normalizar_telefone(tel1)
-        tel2_norm = self.normalizar_telefone(tel2)
-        
+        return self._score_telefone(self.normalizar_telefone(tel1), self.normalizar_telefone(tel2))
+    
+    def _score_telefone(self, tel1_norm: str, tel2_norm: str) -> float:
+        """Score de telefones já normalizados"""
         if not tel1_norm or not tel2_norm:
             return 0.0
         
@@ -155,9 +117,10 @@ class DeduplicadorClientes:
     
     def calcular_score_endereco(self, end1: str, end2: str) -> float:
         """Calcula score de similaridade entre endereços"""
-        end1_norm = self.normalizar_endereco(end1)
-        end2_norm = self.normalizar_endereco(end2)
-        
+        return self._score_endereco(self.normalizar_endereco(end1), self.normalizar_endereco(end2))
+    
+    def _score_endereco(self, end1_norm: str, end2_norm: str) -> float:
+        """Score de endereços já normalizados"""
         if not end1_norm or not end2_norm:
             return 0.0
         
@@ -210,6 +173,13 @@ class DeduplicadorClientes:
     
     def encontrar_duplicatas(self, df: pd.DataFrame) -> List[ClienteMatch]:
         """Encontra todas as duplicatas no DataFrame"""
+        with instrumentacao.etapa('deduplicacao_clientes') as etapa:
+            duplicatas = self._encontrar_duplicatas(df)
+            etapa.registrar(entrada=len(df), saida=len(duplicatas), duplicatas_detectadas=len(duplicatas))
+        return duplicatas
+    
+    def _encontrar_duplicatas(self, df: pd.DataFrame) -> List[ClienteMatch]:
+        """Comparação par a par (medida por encontrar_duplicatas)"""
         duplicatas = []
         
         # Campos necessários
@@ -228,6 +198,9 @@ class DeduplicadorClientes:
         # Remover registros sem nome
         df_limpo = df.dropna(subset=['nome']).copy()
         
+        # Normalizar colunas uma única vez (vetorizado) em vez de a cada par
+        normalizado = self.normalizar_colunas(df_limpo)
+        
         total_registros = len(df_limpo)
         processados = 0
         
@@ -240,7 +213,7 @@ class DeduplicadorClientes:
                 
                 # Calcular scores
                 scores = {
-                    'nome': self.calcular_score_nome(row1['nome'], row2['nome'])
+                    'nome': self._score_nome(normalizado.at[i, 'nome'], normalizado.at[j, 'nome'])
                 }
                 
                 # Só continuar se nome tem similaridade mínima
@@ -248,13 +221,13 @@ class DeduplicadorClientes:
                     continue
                 
                 if 'cpf' in df.columns:
-                    scores['cpf'] = self.calcular_score_cpf(row1.get('cpf'), row2.get('cpf'))
+                    scores['cpf'] = self._score_cpf(normalizado.at[i, 'cpf'], normalizado.at[j, 'cpf'])
                 
                 if 'telefone' in df.columns:
-                    scores['telefone'] = self.calcular_score_telefone(row1.get('telefone'), row2.get('telefone'))
+                    scores['telefone'] = self._score_telefone(normalizado.at[i, 'telefone'], normalizado.at[j, 'telefone'])
                 
                 if 'endereco' in df.columns:
-                    scores['endereco'] = self.calcular_score_endereco(row1.get('endereco'), row2.get('endereco'))
+                    scores['endereco'] = self._score_endereco(normalizado.at[i, 'endereco'], normalizado.at[j, 'endereco'])
                 
                 # Calcular score final
                 score_final, confianca = self.calcular_score_final(scores)
@@ -0,0 +1,284 @@
+"""
+Listagens paginadas de clientes e OS para a API
+
+O dashboard carregava BASE_CLIENTES_MASTER_*.xlsx e BASE_ORDENS_SERVICO_*.xlsx
+inteiros em memória e devolvia fatias do DataFrame a cada pedido. Aqui a
+planilha mais recente de cada base é copiada uma vez para um SQLite
+(data/processed/listagens.db) com índices nas colunas de filtro e de ordem;
+cada página é um SELECT por keyset (chave depois da última da página anterior,
+LIMIT n + 1), sem OFFSET, só com os campos pedidos. A cópia é refeita quando a
+planilha muda (nome + tamanho + mtime). O cursor segue o formato da busca de
+clientes: a listagem, os filtros e a última chave de ordenação.
+
+Colunas com vários valores ('SUZANO; MAUA' em origem_loja) ganham uma tabela
+de pertinência (valor, id), e o filtro vira um JOIN por ela. A cópia é
+gravada em tabelas com sufixo aleatório e trocada dentro de uma transação
+BEGIN IMMEDIATE, então dois processos que refazem a mesma listagem entram em
+fila e o segundo vê a assinatura nova e não refaz.
+
+    listagens().listar('os', limite=50, filtros={'loja': 'SUZANO', 'status': 'com_cliente'})
+"""
+
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import MetaData, Table, and_, inspect, select, text, tuple_
+
+from app.models.repositorio import TAMANHO_LOTE, criar_engine
+from app.services.busca_clientes import codificar_cursor, decodificar_cursor
+from etl.utils.datas import ConversorDatas
+
+PASTA_BASES = Path("data/processed")
+TABELA_ORIGENS = "origens_listagens"
+
+# ordem: colunas da chave de paginação; filtros: parâmetro → coluna (texto em maiúsculas)
+LISTAGENS: Dict[str, dict] = {
+    'clientes': {
+        'padrao': 'BASE_CLIENTES_MASTER_*.xlsx',
+        'aba': 'Base_Clientes_Master',
+        'data': None,
+        'ordem': ['id'],
+        'decrescente': False,
+        'filtros': {'loja': 'origem_loja', 'uf': 'uf', 'cidade': 'cidade'},
+        # Clientes de mais de uma loja: origem_loja = 'SUZANO; MAUA'
+        'multiplos': {'loja': ';'},
+    },
+    'os': {
+        'padrao': 'BASE_ORDENS_SERVICO_*.xlsx',
+        'aba': 'Base_OS_Completa',
+        'data': 'data_os',
+        # Mais recentes primeiro; OS sem data ('') no fim
+        'ordem': ['data_ref', 'id'],
+        'decrescente': True,
+        'filtros': {'loja': 'loja_os', 'status': 'status'},
+    },
+}
+
+LIMITE_MAXIMO = 500
+
+# Espera pela troca feita por outro processo (ms)
+ESPERA_TROCA_MS = 120_000
+
+
+def assinatura_arquivo(arquivo: Path) -> str:
+    stat = arquivo.stat()
+    return f"{arquivo.name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def pertinencia(df: pd.DataFrame, coluna: str, separador: str) -> pd.DataFrame:
+    """(valor, id) para cada valor de uma coluna com vários valores separados"""
+    membros = pd.DataFrame({'valor': df[coluna].str.split(separador), 'id': df['id']}).explode('valor')
+    membros['valor'] = membros['valor'].str.strip()
+    return membros[membros['valor'].notna() & (membros['valor'] != '')].drop_duplicates()
+
+
+def tabelas_membros(nome: str) -> List[str]:
+    return [f"{nome}_{filtro}" for filtro in LISTAGENS[nome].get('multiplos', {})]
+
+
+def preparar(df: pd.DataFrame, config: dict) -> pd.DataFrame:
+    """id na ordem da planilha, data_ref ISO, status da OS e colunas de filtro normalizadas"""
+    df = df.copy()
+    df.insert(0, 'id', np.arange(1, len(df) + 1))
+    if config['data']:
+        datas, _ = ConversorDatas().formatar(df.get(config['data'], pd.Series(None, index=df.index)), '%Y-%m-%d')
+        df['data_ref'] = datas.fillna('')
+    if 'status' in config['filtros'] and 'status' not in df.columns:
+        vinculada = df['cliente_id'].notna() if 'cliente_id' in df.columns else pd.Series(False, index=df.index)
+        df['status'] = np.where(vinculada, 'COM_CLIENTE', 'SEM_CLIENTE')
+    for coluna in config['filtros'].values():
+        if coluna not in df.columns:
+            df[coluna] = None
+        df[coluna] = df[coluna].astype(str).str.strip().str.upper().where(df[coluna].notna(), None)
+    # Datas como texto: a página vai para o JSON sem conversão por linha
+    for coluna in df.columns[[pd.api.types.is_datetime64_any_dtype(t) for t in df.dtypes]]:
+        df[coluna] = df[coluna].dt.strftime('%Y-%m-%d %H:%M:%S').where(df[coluna].notna(), None)
+    return df
+
+
+class Listagens:
+    """Cópia indexada das bases de clientes e OS, com páginas por keyset"""
+
+    def __init__(self, pasta=PASTA_BASES, url: Optional[str] = None):
+        self.pasta = Path(pasta)
+        self.engine = criar_engine(url or f"sqlite:///{self.pasta.resolve() / 'listagens.db'}")
+        self.tabelas: Dict[str, tuple] = {}
+        self.trava = threading.Lock()
+
+    def arquivo_mais_recente(self, padrao: str) -> Optional[Path]:
+        arquivos = list(self.pasta.glob(padrao))
+        return max(arquivos, key=lambda arquivo: arquivo.stat().st_mtime) if arquivos else None
+
+    def assinatura_gravada(self, nome: str) -> Optional[str]:
+        with self.engine.connect() as conexao:
+            return self._assinatura_gravada(conexao, nome)
+
+    @staticmethod
+    def _assinatura_gravada(conexao, nome: str) -> Optional[str]:
+        """Assinatura da cópia atual (None se falta alguma tabela dela)"""
+        inspetor = inspect(conexao)
+        if not all(inspetor.has_table(tabela) for tabela in [TABELA_ORIGENS, *tabelas_membros(nome)]):
+            return None
+        return conexao.execute(text(f"SELECT assinatura FROM {TABELA_ORIGENS} WHERE tabela = :tabela"),
+                               {'tabela': nome}).scalar()
+
+    def abrir(self, nome: str) -> Table:
+        """Tabela da listagem, copiando a planilha para o SQLite se ela mudou"""
+        config = LISTAGENS[nome]
+        arquivo = self.arquivo_mais_recente(config['padrao'])
+        if arquivo is None:
+            raise FileNotFoundError(str(self.pasta / config['padrao']))
+        assinatura = assinatura_arquivo(arquivo)
+
+        em_uso = self.tabelas.get(nome)
+        if em_uso and em_uso[0] == assinatura:
+            return em_uso[1]
+        with self.trava:
+            if self.assinatura_gravada(nome) != assinatura:
+                self.importar(nome, arquivo, assinatura)
+            metadata = MetaData()
+            tabela = Table(nome, metadata, autoload_with=self.engine)
+            membros = {filtro: Table(f"{nome}_{filtro}", metadata, autoload_with=self.engine)
+                       for filtro in config.get('multiplos', {})}
+            self.tabelas[nome] = (assinatura, tabela, membros)
+        return tabela
+
+    def membros(self, nome: str, filtro: str) -> Table:
+        """Tabela (valor, id) de um filtro com vários valores por linha"""
+        return self.tabelas[nome][2][filtro]
+
+    def importar(self, nome: str, arquivo: Path, assinatura: str):
+        """Copia a aba da planilha para o SQLite (lenta: ler o xlsx domina)"""
+        self.gravar(nome, pd.read_excel(arquivo, sheet_name=LISTAGENS[nome]['aba']), arquivo, assinatura)
+
+    def gravar(self, nome: str, df: pd.DataFrame, arquivo: Path, assinatura: Optional[str] = None):
+        """
+        Grava a cópia a partir do DataFrame da planilha e cria os índices (troca
+        em uma transação). Chamado pela etapa1/etapa2 logo depois de salvar o xlsx.
+        """
+        config = LISTAGENS[nome]
+        arquivo = Path(arquivo)
+        assinatura = assinatura or assinatura_arquivo(arquivo)
+        df = preparar(df, config)
+        ordem = ', '.join(config['ordem'])
+        tabelas = {nome: df}
+        for filtro, separador in config.get('multiplos', {}).items():
+            tabelas[f"{nome}_{filtro}"] = pertinencia(df, config['filtros'][filtro], separador)
+        sufixo = uuid.uuid4().hex[:12]
+
+        with self.engine.connect() as conexao:
+            if self.engine.dialect.name == 'sqlite':
+                # Trava de escrita já no início: outra troca em andamento espera aqui
+                conexao.exec_driver_sql(f"PRAGMA busy_timeout = {ESPERA_TROCA_MS}")
+                conexao.exec_driver_sql("BEGIN IMMEDIATE")
+            conexao.execute(text(f"CREATE TABLE IF NOT EXISTS {TABELA_ORIGENS} "
+                                 f"(tabela TEXT PRIMARY KEY, arquivo TEXT, assinatura TEXT)"))
+            if self._assinatura_gravada(conexao, nome) == assinatura:
+                # Outro processo acabou de gravar a mesma planilha
+                conexao.rollback()
+                return
+
+            for tabela, dados in tabelas.items():
+                dados.to_sql(f"{tabela}_novo_{sufixo}", conexao, index=False, chunksize=TAMANHO_LOTE)
+                conexao.execute(text(f"DROP TABLE IF EXISTS {tabela}"))
+                conexao.execute(text(f"ALTER TABLE {tabela}_novo_{sufixo} RENAME TO {tabela}"))
+            conexao.execute(text(f"CREATE UNIQUE INDEX ix_{nome}_id ON {nome} (id)"))
+            if config['ordem'] != ['id']:
+                conexao.execute(text(f"CREATE INDEX ix_{nome}_ordem ON {nome} ({ordem})"))
+            for filtro, coluna in config['filtros'].items():
+                if filtro in config.get('multiplos', {}):
+                    conexao.execute(text(f"CREATE INDEX ix_{nome}_{filtro} ON {nome}_{filtro} (valor, id)"))
+                else:
+                    conexao.execute(text(f"CREATE INDEX ix_{nome}_{coluna} ON {nome} ({coluna}, {ordem})"))
+            conexao.execute(text(f"INSERT OR REPLACE INTO {TABELA_ORIGENS} VALUES (:tabela, :arquivo, :assinatura)"),
+                            {'tabela': nome, 'arquivo': str(arquivo), 'assinatura': assinatura})
+            conexao.commit()
+        print(f"📋 Listagem {nome}: {len(df):,} linhas de {arquivo.name}")
+
+    def campos(self, nome: str) -> List[str]:
+        return [coluna.name for coluna in self.abrir(nome).columns]
+
+    def listar(self, nome: str, limite: int = 50, filtros: Optional[dict] = None,
+               campos: Optional[List[str]] = None, cursor: Optional[str] = None) -> dict:
+        """
+        Uma página da listagem. filtros: os de LISTAGENS (valor exato, sem
+        diferença de maiúsculas) e, nas OS, data_inicio/data_fim (AAAA-MM-DD).
+        campos: colunas devolvidas (padrão: todas). O cursor da resposta
+        continua a listagem com os mesmos filtros.
+        """
+        if nome not in LISTAGENS:
+            raise ValueError(f"Listagem desconhecida: {nome}")
+        config = LISTAGENS[nome]
+        apos = None
+        if cursor:
+            nome_cursor, filtros, apos = decodificar_cursor(cursor)
+            if nome_cursor != nome:
+                raise ValueError("Cursor de outra listagem")
+            if (not isinstance(filtros, dict) or len(apos) != len(config['ordem'])
+                    or any(isinstance(valor, (list, dict)) for valor in apos)):
+                raise ValueError("Cursor inválido")
+        filtros = {filtro: valor for filtro, valor in (filtros or {}).items() if valor not in (None, '')}
+
+        tabela = self.abrir(nome)
+        campos = campos or [coluna.name for coluna in tabela.columns]
+        desconhecidos = [campo for campo in campos if campo not in tabela.c]
+        if desconhecidos:
+            raise ValueError(f"Campos desconhecidos em {nome}: {', '.join(desconhecidos)}")
+
+        condicoes = []
+        origem = tabela
+        for filtro, valor in filtros.items():
+            if filtro in ('data_inicio', 'data_fim'):
+                if not config['data']:
+                    raise ValueError(f"A listagem {nome} não tem filtro de data")
+                data = pd.Timestamp(valor).strftime('%Y-%m-%d')
+                if filtro == 'data_inicio':
+                    condicoes.append(tabela.c.data_ref >= data)
+                else:
+                    condicoes.append(and_(tabela.c.data_ref <= data, tabela.c.data_ref != ''))
+            elif filtro in config.get('multiplos', {}):
+                # Cliente de várias lojas aparece no filtro de cada uma
+                membros = self.membros(nome, filtro).alias(f"membros_{filtro}")
+                origem = origem.join(membros, membros.c.id == tabela.c.id)
+                condicoes.append(membros.c.valor == str(valor).strip().upper())
+            elif filtro in config['filtros']:
+                condicoes.append(tabela.c[config['filtros'][filtro]] == str(valor).strip().upper())
+            else:
+                raise ValueError(f"Filtro desconhecido em {nome}: {filtro}")
+
+        ordem = [tabela.c[coluna] for coluna in config['ordem']]
+        if apos:
+            chave, anterior = tuple_(*ordem), tuple_(*apos)
+            condicoes.append(chave < anterior if config['decrescente'] else chave > anterior)
+
+        selecionadas = list(dict.fromkeys(campos + config['ordem']))
+        consulta = (select(*[tabela.c[coluna] for coluna in selecionadas])
+                    .select_from(origem)
+                    .where(and_(True, *condicoes))
+                    .order_by(*[coluna.desc() if config['decrescente'] else coluna for coluna in ordem])
+                    .limit(limite + 1))
+        with self.engine.connect() as conexao:
+            linhas = conexao.execute(consulta).mappings().all()
+
+        pagina = linhas[:limite]
+        proximo = (codificar_cursor(nome, filtros, [pagina[-1][coluna] for coluna in config['ordem']])
+                   if len(linhas) > limite else None)
+        return {
+            'resultados': [{campo: linha[campo] for campo in campos} for linha in pagina],
+            'proximo_cursor': proximo,
+        }
+
+
+_listagens: Optional[Listagens] = None
+
+
+def listagens() -> Listagens:
+    """Listagens compartilhadas da API (a cópia é feita no primeiro pedido)"""
+    global _listagens
+    if _listagens is None:
+        _listagens = Listagens()
+    return _listagens
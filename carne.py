@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+carne - CLI único do projeto Carne Fácil
+
+Cada subcomando roda um dos scripts do projeto, importado só na hora de
+executar: `carne --help` e comandos pequenos não carregam pandas/openpyxl.
+Os argumentos depois do comando vão direto para o script (inclusive --help).
+Com --worker (ou CARNE_WORKER=1) o comando roda no worker de longa duração,
+que mantém as bibliotecas e as bases compartilhadas em memória.
+
+    python carne.py --help
+    python carne.py benchmark 100000 --meses 1
+    python carne.py script scripts/analise/verificar_ids_clientes.py 50000
+    python carne.py worker iniciar                # em outro terminal
+    python carne.py --worker csv-vendas
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import typer
+
+RAIZ = Path(__file__).resolve().parent
+sys.path.insert(0, str(RAIZ))
+
+# comando: (script relativo à raiz, descrição)
+COMANDOS = {
+    'importar-caixas': ('etl/importador_caixas_completo.py', "Importa as tabelas das planilhas de caixa"),
+    'padronizar-vixen': ('etl/padronizar_clientes_vixen.py', "Padroniza a base de clientes Vixen"),
+    'recebiveis': ('etl/recebiveis_carne.py', "Consolida os recebíveis de carnê"),
+    'conciliacao': ('etl/conciliacao_vendas.py', "Concilia vendas do caixa com as OS"),
+    'normalizar-vendas-os': ('etl/normalizar_vendas_os.py', "Normaliza vendas por OS"),
+    'etapa1': ('scripts/etapa1_base_clientes_master.py', "Monta a base master de clientes"),
+    'etapa2': ('scripts/etapa2_base_ordens_servico.py', "Monta a base de ordens de serviço"),
+    'ids-clientes': ('scripts/criar_sistema_id_cliente.py', "Atribui os IDs de cliente (registro persistente)"),
+    'recalcular': ('scripts/relatorios/recalcular_tudo.py', "Recalcula o pipeline de relatórios"),
+    'sql-povoamento': ('scripts/gerar_sqls_povoamento.py', "Gera os SQLs de povoamento de clientes"),
+    'sql-vendas': ('scripts/gerar_sqls_vendas.py', "Gera os SQLs de vendas e itens"),
+    'csv-vendas': ('scripts/gerar_csvs_vendas.py', "Gera os CSVs de vendas e itens"),
+    'csv-marketing': ('povoamento/scripts/python/criar_csv_marketing_correto.py', "Gera o CSV de marketing"),
+    'dividir-csv-marketing': ('povoamento/scripts/python/dividir_csv_marketing_correto.py',
+                              "Divide o CSV de marketing em partes"),
+    'indice-cep': ('scripts/construir_indice_cep.py', "Gera os CEPs exatos do índice local de CEP"),
+    'compactar': ('scripts/compactar_parquets.py', "Regrava os Parquets consolidados nos tipos compactos"),
+    'dados-sinteticos': ('scripts/gerar_dados_sinteticos.py', "Gera dados sintéticos para testes"),
+    'benchmark': ('scripts/benchmark_pipeline.py', "Mede tempo e memória do pipeline"),
+    'dashboard': ('scripts/dashboard_sistema_completo.py', "Mostra o dashboard do sistema"),
+}
+
+REPASSAR = {'allow_extra_args': True, 'ignore_unknown_options': True}
+
+# Ajuda em texto simples e traceback normal: formatar com rich custa mais que o resto da inicialização
+OPCOES_APP = {'no_args_is_help': True, 'rich_markup_mode': None, 'pretty_exceptions_enable': False}
+
+app = typer.Typer(add_completion=False, help="CLI do Carne Fácil: os scripts do projeto com import sob demanda",
+                  **OPCOES_APP)
+worker_app = typer.Typer(help="Processo que mantém bibliotecas e bases em memória", **OPCOES_APP)
+app.add_typer(worker_app, name='worker')
+
+
+@app.callback()
+def principal(
+    ctx: typer.Context,
+    worker: bool = typer.Option(False, '--worker', '-w', envvar='CARNE_WORKER',
+                                help="Executa no worker (carne worker iniciar)"),
+):
+    ctx.obj = {'worker': worker}
+
+
+def executar(ctx: typer.Context, caminho: Path, argumentos):
+    from etl.utils import worker
+
+    if not caminho.exists():
+        typer.echo(f"❌ Script não encontrado: {caminho}", err=True)
+        raise typer.Exit(2)
+    if ctx.obj and ctx.obj.get('worker'):
+        codigo = worker.executar_no_worker(caminho, argumentos)
+        if codigo is not None:
+            raise typer.Exit(codigo)
+        typer.echo("⚠️  Worker não está rodando; executando neste processo", err=True)
+    raise typer.Exit(worker.executar_script(caminho, argumentos))
+
+
+def registrar(nome: str, script: str, descricao: str):
+    def comando(ctx: typer.Context):
+        executar(ctx, RAIZ / script, ctx.args)
+
+    comando.__doc__ = f"{descricao} ({script})"
+    app.command(nome, context_settings=REPASSAR, add_help_option=False)(comando)
+
+
+for _nome, (_script, _descricao) in COMANDOS.items():
+    registrar(_nome, _script, _descricao)
+
+
+@app.command('script', context_settings=REPASSAR)
+def script(ctx: typer.Context, caminho: Path = typer.Argument(..., help="Script .py do projeto")):
+    """Executa qualquer outro script do projeto (caminho relativo à pasta atual ou à raiz)"""
+    if not caminho.exists():
+        caminho = RAIZ / caminho
+    executar(ctx, caminho.resolve(), ctx.args)
+
+
+@app.command('comandos')
+def comandos():
+    """Lista os comandos e os scripts correspondentes"""
+    for nome, (script, _) in COMANDOS.items():
+        typer.echo(f"  {nome:<24} {script}")
+
+
+@app.command('api')
+def api(
+    host: str = typer.Option('127.0.0.1', help="Endereço"),
+    porta: int = typer.Option(8000, help="Porta"),
+    recarregar: bool = typer.Option(False, '--reload', help="Recarrega ao alterar o código"),
+):
+    """Sobe a API FastAPI (app.main:app)"""
+    import uvicorn
+
+    uvicorn.run('app.main:app', host=host, port=porta, reload=recarregar)
+
+
+@worker_app.command('iniciar')
+def worker_iniciar(
+    sem_dados: bool = typer.Option(False, '--sem-dados', help="Não pré-carrega as bases compartilhadas"),
+):
+    """Carrega as bibliotecas e as bases e atende comandos até 'carne worker parar'"""
+    from etl.utils import worker
+
+    os.chdir(RAIZ)
+    try:
+        worker.iniciar(preaquecer=not sem_dados)
+    except ValueError as e:
+        typer.echo(f"❌ Worker não iniciado: {e}", err=True)
+        raise typer.Exit(1)
+
+
+@worker_app.command('parar')
+def worker_parar():
+    """Encerra o worker"""
+    from etl.utils import worker
+
+    if worker.enviar({'acao': 'parar'}) is None:
+        typer.echo("⚠️  Worker não está rodando")
+        raise typer.Exit(1)
+    typer.echo("👋 Worker encerrado")
+
+
+@worker_app.command('status')
+def worker_status():
+    """Mostra as bases em memória no worker"""
+    from etl.utils import worker
+
+    if worker.enviar({'acao': 'status'}) is None:
+        typer.echo("⚠️  Worker não está rodando")
+        raise typer.Exit(1)
+
+
+if __name__ == '__main__':
+    app()
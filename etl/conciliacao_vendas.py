@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Conciliação das vendas do caixa (VEND) com as OS e os DAVs do Vixen
+
+Normaliza número da OS/venda e loja (nome ou código) das três fontes e faz
+hash joins em (loja, os_numero). O que não casar pela chave tenta uma janela
+de datas na mesma loja com o mesmo valor. Saídas:
+
+    conciliados   - venda do caixa ligada a uma OS ou DAV
+    conflitos     - mesma chave, mas valor ou data muito diferentes
+    caixa_sem_os  - vendas do caixa sem OS/DAV correspondente
+    os_sem_caixa  - OS/DAVs que não aparecem no caixa
+
+e um resumo por loja e mês com quantidades e totais de cada conjunto.
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils import esquemas, normalizar
+from etl.utils.datas import ConversorDatas
+from etl.utils.instrumentacao import instrumentacao
+
+PASTA_SAIDA = Path("data/processed/conciliacao")
+
+# Códigos das lojas no Vixen/povoamento (core.lojas.codigo)
+LOJAS_POR_CODIGO = {
+    '009': 'PERUS',
+    '010': 'RIO_PEQUENO',
+    '011': 'SAO_MATEUS',
+    '012': 'SUZANO2',
+    '042': 'MAUA',
+    '048': 'SUZANO',
+}
+
+# Grafias alternativas dos nomes (após normalizar.nome_loja)
+LOJAS_ALIASES = {
+    'SUZANO_2': 'SUZANO2',
+    'SUZANO_II': 'SUZANO2',
+}
+
+# Nomes de coluna aceitos por campo, em cada fonte
+ALIASES = {
+    'caixa': {
+        'loja': ['loja', 'Loja'],
+        'os_numero': ['numero_venda', 'Nº Venda', 'numero_os', 'os'],
+        'data': ['data_venda', 'data_completa', 'data'],
+        'valor': ['valor_venda', 'Valor Venda', 'valor_total', 'valor'],
+    },
+    'os': {
+        'loja': ['loja', 'loja_os', '_id_loja_codigo'],
+        'os_numero': ['os_n', 'numero_os', 'os'],
+        'data': ['data_de_compra', 'data_os', 'data'],
+        'valor': ['total', 'valor_os', 'valor'],
+    },
+    'dav': {
+        'loja': ['id_loja', 'loja'],
+        'os_numero': ['nro_dav', 'numero_os'],
+        'data': ['dh_dav', 'data'],
+        'valor': ['vl_liquido', 'valor'],
+    },
+}
+
+# Diferenças aceitas entre caixa e OS na mesma chave
+TOLERANCIA_VALOR = 1.0          # reais
+TOLERANCIA_VALOR_RELATIVA = 0.01
+JANELA_CONFLITO_DIAS = 60
+# Fallback por data: mesma loja, mesmo valor e até N dias de diferença
+JANELA_FALLBACK_DIAS = 3
+
+
+def normalizar_loja(valores) -> pd.Series:
+    """Loja pelo nome (MAUÁ → MAUA) ou pelo código (42 / '042' → MAUA)"""
+    loja = normalizar.nome_loja(valores).str.replace(r'^(\d+)\.0$', r'\1', regex=True)
+    codigo = loja.str.fullmatch(r'\d{1,3}').fillna(False).astype(bool)
+    loja = loja.mask(codigo, loja[codigo].str.zfill(3).map(LOJAS_POR_CODIGO))
+    return loja.replace(LOJAS_ALIASES)
+
+
+class ConciliadorVendas:
+    def __init__(self, janela_fallback_dias: int = JANELA_FALLBACK_DIAS):
+        self.janela_fallback = pd.Timedelta(days=janela_fallback_dias)
+        self.conversor_datas = ConversorDatas(remover_horario=True)
+
+    def preparar(self, df: pd.DataFrame, origem: str) -> pd.DataFrame:
+        """Colunas padronizadas (loja, os_numero, data, valor) + id da linha de origem"""
+        aliases = ALIASES[origem]
+        resultado = pd.DataFrame(index=df.index)
+        for campo, nomes in aliases.items():
+            coluna = next((c for c in nomes if c in df.columns), None)
+            resultado[campo] = df[coluna] if coluna is not None else np.nan
+
+        resultado['loja'] = normalizar_loja(resultado['loja'])
+        resultado['os_numero'] = normalizar.codigo_os(resultado['os_numero'])
+        datas, _ = self.conversor_datas.converter(resultado['data'])
+        resultado['data'] = datas.dt.normalize()
+        resultado['valor'] = normalizar.numero(resultado['valor'])
+        resultado['origem'] = origem
+        resultado['id_origem'] = np.arange(len(resultado))
+        return resultado.reset_index(drop=True)
+
+    def _casar_por_chave(self, caixa: pd.DataFrame, alvo: pd.DataFrame) -> pd.DataFrame:
+        """Hash join em (loja, os_numero); com repetidos, cada lado fica com o par de data mais próxima"""
+        pares = caixa.dropna(subset=['loja', 'os_numero']).merge(
+            alvo.dropna(subset=['loja', 'os_numero']), on=['loja', 'os_numero'], suffixes=('_caixa', '_alvo'))
+        if pares.empty:
+            return pares
+        pares['dias_diferenca'] = (pares['data_caixa'] - pares['data_alvo']).dt.days.abs()
+        pares = pares.sort_values('dias_diferenca', na_position='last', kind='stable')
+        pares = pares.drop_duplicates('id_origem_caixa').drop_duplicates('id_origem_alvo')
+        pares['metodo'] = 'CHAVE'
+        return pares
+
+    def _casar_por_janela(self, caixa: pd.DataFrame, alvo: pd.DataFrame) -> pd.DataFrame:
+        """Fallback: mesma loja e mesmo valor, data mais próxima dentro da janela"""
+        caixa = caixa.dropna(subset=['loja', 'data', 'valor']).copy()
+        alvo = alvo.dropna(subset=['loja', 'data', 'valor']).copy()
+        if caixa.empty or alvo.empty:
+            return pd.DataFrame()
+        for df in (caixa, alvo):
+            df['centavos'] = (df['valor'] * 100).round().astype('int64')
+
+        alvo = alvo.rename(columns={c: f'{c}_alvo' for c in alvo.columns if c not in ('loja', 'centavos')})
+        alvo['data'] = alvo['data_alvo']
+        caixa = caixa.rename(columns={c: f'{c}_caixa' for c in caixa.columns if c not in ('loja', 'centavos')})
+        caixa['data'] = caixa['data_caixa']
+
+        pares = pd.merge_asof(
+            caixa.sort_values('data'), alvo.sort_values('data'), on='data', by=['loja', 'centavos'],
+            tolerance=self.janela_fallback, direction='nearest',
+        ).dropna(subset=['id_origem_alvo'])
+        if pares.empty:
+            return pares
+        pares['id_origem_alvo'] = pares['id_origem_alvo'].astype('int64')
+        pares['dias_diferenca'] = (pares['data_caixa'] - pares['data_alvo']).dt.days.abs()
+        pares = pares.sort_values('dias_diferenca', kind='stable').drop_duplicates('id_origem_alvo')
+        pares['os_numero'] = pares['os_numero_alvo']
+        pares['metodo'] = 'JANELA_DATA'
+        return pares.drop(columns=['data', 'centavos'])
+
+    def _marcar_conflitos(self, pares: pd.DataFrame) -> pd.Series:
+        diferenca = (pares['valor_caixa'] - pares['valor_alvo']).abs()
+        limite = np.maximum(TOLERANCIA_VALOR, pares['valor_alvo'].abs() * TOLERANCIA_VALOR_RELATIVA)
+        valor_diferente = (diferenca > limite).fillna(False)
+        data_distante = (pares['dias_diferenca'] > JANELA_CONFLITO_DIAS).fillna(False)
+        motivo = np.select([valor_diferente & data_distante, valor_diferente, data_distante],
+                           ['VALOR E DATA', 'VALOR', 'DATA'], default='')
+        return pd.Series(motivo, index=pares.index)
+
+    def conciliar(self, caixa: pd.DataFrame, os_registros: pd.DataFrame,
+                  davs: Optional[pd.DataFrame] = None) -> Dict[str, pd.DataFrame]:
+        caixa = self.preparar(caixa, 'caixa')
+        alvos = [self.preparar(os_registros, 'os')]
+        if davs is not None:
+            alvos.append(self.preparar(davs, 'dav'))
+
+        conciliados = []
+        pendentes = caixa
+        sem_par = []
+        for alvo in alvos:
+            # Chave primeiro; o que sobrar do caixa tenta a janela de datas
+            por_chave = self._casar_por_chave(pendentes, alvo)
+            resto_caixa = pendentes[~pendentes['id_origem'].isin(por_chave.get('id_origem_caixa', []))]
+            resto_alvo = alvo[~alvo['id_origem'].isin(por_chave.get('id_origem_alvo', []))]
+            por_janela = self._casar_por_janela(resto_caixa, resto_alvo)
+
+            casados = pd.concat([por_chave, por_janela], ignore_index=True)
+            conciliados.append(casados)
+            usados_caixa = casados.get('id_origem_caixa', pd.Series(dtype='int64'))
+            usados_alvo = casados.get('id_origem_alvo', pd.Series(dtype='int64'))
+            pendentes = pendentes[~pendentes['id_origem'].isin(usados_caixa)]
+            sem_par.append(alvo[~alvo['id_origem'].isin(usados_alvo)])
+
+        pares = pd.concat(conciliados, ignore_index=True)
+        if not pares.empty:
+            pares['conflito'] = self._marcar_conflitos(pares)
+
+        colunas = ['loja', 'os_numero', 'metodo', 'origem_alvo', 'data_caixa', 'data_alvo',
+                   'valor_caixa', 'valor_alvo', 'dias_diferenca', 'id_origem_caixa', 'id_origem_alvo']
+        if pares.empty:
+            pares = pd.DataFrame(columns=colunas + ['conflito'])
+        resultado = {
+            'conciliados': pares.loc[pares['conflito'] == '', colunas].reset_index(drop=True),
+            'conflitos': pares.loc[pares['conflito'] != '', colunas + ['conflito']].reset_index(drop=True),
+            'caixa_sem_os': pendentes.reset_index(drop=True),
+            'os_sem_caixa': pd.concat(sem_par, ignore_index=True),
+        }
+        resultado['resumo'] = self.resumo(resultado)
+        return resultado
+
+    def resumo(self, conjuntos: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Quantidade e total (R$) de cada conjunto por loja e mês"""
+        partes = []
+        for nome, df in conjuntos.items():
+            if df.empty:
+                continue
+            data = df['data_caixa'] if 'data_caixa' in df.columns else df['data']
+            valor = df['valor_caixa'] if 'valor_caixa' in df.columns else df['valor']
+            partes.append(pd.DataFrame({
+                'loja': df['loja'].fillna('SEM LOJA'),
+                'mes': data.dt.to_period('M').astype(str).replace('NaT', 'SEM DATA'),
+                'conjunto': nome,
+                'valor': valor.fillna(0),
+            }))
+        if not partes:
+            return pd.DataFrame()
+        todos = pd.concat(partes, ignore_index=True)
+        return todos.pivot_table(index=['loja', 'mes'], columns='conjunto', values='valor',
+                                 aggfunc=['size', 'sum'], fill_value=0).rename(
+            columns={'size': 'quantidade', 'sum': 'total'}, level=0)
+
+    @staticmethod
+    def salvar(resultado: Dict[str, pd.DataFrame], pasta=PASTA_SAIDA):
+        pasta = Path(pasta)
+        pasta.mkdir(parents=True, exist_ok=True)
+        for nome, df in resultado.items():
+            if nome == 'resumo':
+                df.to_excel(pasta / "resumo_conciliacao.xlsx")
+            else:
+                df.to_parquet(pasta / f"{nome}.parquet", index=False)
+        print(f"💾 Resultados em {pasta}")
+
+
+def carregar(arquivo: Path) -> Optional[pd.DataFrame]:
+    if arquivo is None or not arquivo.exists():
+        return None
+    return esquemas.ler(arquivo)
+
+
+def main():
+    caixas = sorted(Path("data/caixas_processados").glob("VEND_COMPLETO_*.xlsx"))
+    arquivo_caixa = Path(sys.argv[1]) if len(sys.argv) > 1 else (caixas[-1] if caixas else None)
+    arquivo_os = Path("povoamento/dados/csv/vendas_os_completo.csv")
+    arquivo_dav = Path("data/vendas/_com_cliente/lista_dav_com_cliente.parquet")
+
+    print("🔗 CONCILIAÇÃO CAIXA (VEND) × OS × DAV")
+    print("=" * 60)
+
+    caixa = carregar(arquivo_caixa)
+    os_registros = carregar(arquivo_os)
+    if caixa is None or os_registros is None:
+        print("❌ Caixa VEND ou OS não encontrados")
+        return None
+    davs = carregar(arquivo_dav)
+
+    conciliador = ConciliadorVendas()
+    with instrumentacao.etapa('conciliacao_vendas') as etapa:
+        for arquivo in [arquivo_caixa, arquivo_os, arquivo_dav]:
+            if arquivo.exists():
+                etapa.ler(arquivo)
+        resultado = conciliador.conciliar(caixa, os_registros, davs)
+        etapa.registrar(entrada=len(caixa), saida=len(resultado['conciliados']))
+    for nome in ['conciliados', 'conflitos', 'caixa_sem_os', 'os_sem_caixa']:
+        print(f"   {nome:13}: {len(resultado[nome]):,}")
+    conciliador.salvar(resultado)
+    instrumentacao.finalizar()
+    return resultado
+
+
+if __name__ == "__main__":
+    main()
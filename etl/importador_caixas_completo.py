@@ -6,7 +6,12 @@ Processa as 5 abas do arquivo consolidado e gera arquivos separados
 
 import pandas as pd
 import os
+import sys
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils.instrumentacao import instrumentacao
 
 def processar_todos_os_caixas():
     """Processar todas as 5 abas do arquivo consolidado"""
@@ -113,4 +118,11 @@ def processar_todos_os_caixas():
         return None
 
 if __name__ == "__main__":
-    resultados = processar_todos_os_caixas()
\ No newline at end of file
+    with instrumentacao.etapa('importador_caixas', 'data/todos_os_caixas_original.xlsx') as etapa:
+        resultados = processar_todos_os_caixas()
+        if resultados:
+            total = sum(r['linhas'] for r in resultados.values())
+            etapa.registrar(entrada=total, saida=total)
+        else:
+            etapa.falhar('nenhuma aba importada')
+    instrumentacao.finalizar()
\ No newline at end of file
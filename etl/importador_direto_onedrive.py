@@ -4,11 +4,15 @@ IMPORTADOR DIRETO - ESTRUTURA ONEDRIVE ÓTICAS TATY MELLO
 Importa dados da estrutura real: D:\OneDrive - Óticas Taty Mello\LOJAS\[LOJA]\CAIXA
 """
 
-import shutil
+import sys
 from pathlib import Path
 import os
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils.indice_arquivos import IndiceArquivos
+from etl.utils.sincronizacao import SincronizadorArquivos
+
 class ImportadorDiretoOneDrive:
     def __init__(self):
         # Estrutura real do OneDrive
@@ -29,6 +33,16 @@ class ImportadorDiretoOneDrive:
         # Padrões de arquivos 2025
         self.meses_2025 = ['jan_25', 'fev_25', 'mar_25', 'abr_25', 'mai_25', 'jun_25',
                           'jul_25', 'ago_25', 'set_25', 'out_25', 'nov_25', 'dez_25']
+        
+        self._indice = None
+        self.sincronizador = SincronizadorArquivos()
+    
+    def indice_onedrive(self):
+        """Índice de arquivos da pasta LOJAS (atualizado uma vez por execução)"""
+        if self._indice is None:
+            self._indice = IndiceArquivos(self.pasta_base_onedrive).atualizar()
+            print(f"📁 Índice OneDrive: {self._indice.resumo()}")
+        return self._indice
     
     def verificar_estrutura_onedrive(self):
         """Verifica se a estrutura do OneDrive existe"""
@@ -74,29 +88,32 @@ class ImportadorDiretoOneDrive:
             'total_arquivos': 0
         }
         
-        # Analisar conteúdo da pasta CAIXA
-        for item in pasta_caixa.iterdir():
-            if item.is_file() and item.suffix.lower() == '.xlsx':
-                nome = item.name.lower()
+        # Analisar conteúdo da pasta CAIXA (pelo índice do OneDrive)
+        indice = self.indice_onedrive()
+        subpastas, arquivos = indice.conteudo(pasta_caixa)
+        
+        for arquivo in arquivos:
+            if arquivo['nome'].lower().endswith('.xlsx'):
+                nome = arquivo['nome'].lower()
                 
                 # Verificar se é arquivo 2025
                 if any(mes in nome for mes in self.meses_2025):
-                    analise['arquivos_2025_raiz'].append(item.name)
-                    print(f"   🎯 2025: {item.name}")
+                    analise['arquivos_2025_raiz'].append(arquivo['nome'])
+                    print(f"   🎯 2025: {arquivo['nome']}")
                 else:
-                    analise['arquivos_outros_raiz'].append(item.name)
-                    print(f"   📄 Outro: {item.name}")
+                    analise['arquivos_outros_raiz'].append(arquivo['nome'])
+                    print(f"   📄 Outro: {arquivo['nome']}")
                 
                 analise['total_arquivos'] += 1
-            
-            elif item.is_dir():
-                # Analisar pastas de anos
-                nome_pasta = item.name
-                if any(ano in nome_pasta for ano in ['2023', '2024', '2025']):
-                    arquivos_pasta = list(item.glob("*.xlsx"))
-                    analise['pastas_anos'][nome_pasta] = len(arquivos_pasta)
-                    analise['total_arquivos'] += len(arquivos_pasta)
-                    print(f"   📁 {nome_pasta}: {len(arquivos_pasta)} arquivos")
+        
+        for item in subpastas:
+            # Analisar pastas de anos
+            nome_pasta = item.name
+            if any(ano in nome_pasta for ano in ['2023', '2024', '2025']):
+                arquivos_pasta = [a for a in indice.conteudo(item)[1] if a['nome'].endswith('.xlsx')]
+                analise['pastas_anos'][nome_pasta] = len(arquivos_pasta)
+                analise['total_arquivos'] += len(arquivos_pasta)
+                print(f"   📁 {nome_pasta}: {len(arquivos_pasta)} arquivos")
         
         print(f"   📊 Total: {analise['total_arquivos']} arquivos")
         print(f"   🎯 Arquivos 2025: {len(analise['arquivos_2025_raiz'])}")
@@ -133,13 +150,13 @@ class ImportadorDiretoOneDrive:
                     try:
                         arquivo_destino = pasta_destino_loja / arquivo.name
                         
-                        if arquivo_destino.exists():
-                            print(f"   ⚠️ Já existe: {arquivo.name}")
+                        status = self.sincronizador.sincronizar(arquivo, arquivo_destino)
+                        if status == 'inalterado':
+                            print(f"   ⚠️ Inalterado: {arquivo.name}")
                             continue
                         
-                        shutil.copy2(arquivo, arquivo_destino)
                         importados += 1
-                        print(f"   ✅ {arquivo.name}")
+                        print(f"   ✅ {arquivo.name} ({status})")
                         
                     except Exception as e:
                         erros += 1
@@ -153,22 +170,21 @@ class ImportadorDiretoOneDrive:
                 if item.is_dir() and any(ano in item.name for ano in ['2023', '2024', '2025']):
                     pasta_destino_ano = pasta_destino_loja / item.name
                     
-                    if pasta_destino_ano.exists():
-                        print(f"   ⚠️ Pasta já existe: {item.name}")
-                        continue
-                    
                     try:
-                        shutil.copytree(item, pasta_destino_ano)
-                        arquivos_copiados = len(list(pasta_destino_ano.glob("*.xlsx")))
+                        resultado = self.sincronizador.sincronizar_pasta(item, pasta_destino_ano, padrao="*")
+                        arquivos_copiados = resultado['copiado'] + resultado['vinculado']
                         importados += arquivos_copiados
-                        print(f"   ✅ {item.name}: {arquivos_copiados} arquivos")
+                        print(f"   ✅ {item.name}: {arquivos_copiados} arquivos ({resultado['inalterado']} inalterados)")
                         
                     except Exception as e:
                         erros += 1
                         print(f"   ❌ Erro na pasta {item.name}: {e}")
         
+        self.sincronizador.salvar_manifesto()
+        
         print(f"\n📊 Resultado da importação:")
         print(f"   ✅ Importados: {importados} arquivos")
+        print(f"   💾 Armazenamento: {self.sincronizador.resumo()}")
         print(f"   ❌ Erros: {erros}")
         
         return importados > 0
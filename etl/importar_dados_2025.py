@@ -5,10 +5,14 @@ Importa dados 2025 que estão na raiz das pastas das lojas no OneDrive
 """
 
 import os
+import sys
 import shutil
 from pathlib import Path
 import glob
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils.indice_arquivos import IndiceArquivos
+
 class ImportadorDados2025:
     def __init__(self):
         self.pasta_caixa_local = Path("data/caixa_lojas")
@@ -68,8 +72,10 @@ class ImportadorDados2025:
         
         # Busca manual
         print(f"\n🔍 Busca manual por pastas com dados de lojas...")
-        for pasta in pasta_onedrive.rglob("*"):
-            if pasta.is_dir() and any(loja in pasta.name.upper() for loja in self.lojas):
+        indice = IndiceArquivos(pasta_onedrive).atualizar()
+        print(f"   📁 {indice.resumo()}")
+        for pasta in indice.pastas():
+            if any(loja in pasta.name.upper() for loja in self.lojas):
                 print(f"   🏪 Pasta suspeita: {pasta}")
         
         return None
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Normalizador do vendas_os_completo.csv (formato largo → tabelas longas)
+
+O export das OS traz 5 produtos (cod/descricao/valor), 4 conjuntos de receita
+(esf..altura) e 2 pagamentos (pagto/sinal) como colunas lado a lado. Aqui cada
+grupo de colunas é empilhado de uma vez (numpy), gerando tabelas longas com
+colunas numéricas tipadas e a chave da OS (_os_numero, _id_loja_codigo):
+
+    produtos_os.csv    → optica.produtos_os
+    receitas_os.csv    → receitas em formato longo (conjunto/olho/distância)
+    dioptrias_os.csv   → optica.dioptrias (OD/OE de longe + adição)
+    pagamentos_os.csv  → vendas.formas_pagamento_venda
+
+Linhas que quebrariam NOT NULL/CHECK das tabelas de destino (produto sem
+descrição, receita sem esférico, pagamento sem forma ou com valor <= 0) vão
+para <tabela>_rejeitados.csv com o motivo. A carga nas tabelas é feita por
+povoamento/13_importar_produtos_dioptrias_pagamentos_os.sql (COPY + lookup
+da OS por número e loja).
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils import normalizar
+
+ARQUIVO_ENTRADA = Path("povoamento/dados/csv/vendas_os_completo.csv")
+PASTA_SAIDA = Path("povoamento/dados/csv")
+
+# (cod, descricao, valor) de cada um dos 5 produtos
+SLOTS_PRODUTOS = [
+    ('cod_trello', 'descricao', 'valor'),
+    ('cod17', 'descricao18', 'valor19'),
+    ('cod20', 'descricao21', 'valor22'),
+    ('cod23', 'descricao24', 'valor25'),
+    ('cod26', 'descricao27', 'valor28'),
+]
+
+# Conjuntos de receita: 1-2 longe (OD/OE), 3-4 perto (OD/OE), como em extrair_dioptrias
+CAMPOS_RECEITA = ['esferico', 'cilindrico', 'eixo', 'dnp', 'altura']
+CONJUNTOS_RECEITA = [
+    (1, 'OD', 'LONGE', ('esf', 'cil', 'eixo', 'dnp', 'altura')),
+    (2, 'OE', 'LONGE', ('esf2', 'cil3', 'eixo4', 'dnp5', 'altura6')),
+    (3, 'OD', 'PERTO', ('esf7', 'cil8', 'eixo9', 'dnp10', 'altura11')),
+    (4, 'OE', 'PERTO', ('esf12', 'cil13', 'eixo14', 'dnp15', 'altura16')),
+]
+
+SLOTS_PAGAMENTO = [('pagto_1', 'sinal_1'), ('pagto_2', 'sinal_2')]
+
+# Códigos do caixa → forma_pagamento_type (GARANTIA/SS ficam sem forma)
+FORMAS_PAGAMENTO = {
+    'DN': 'DINHEIRO',
+    'DINHEIRO': 'DINHEIRO',
+    'CTC': 'CREDITO',
+    'CTD': 'DEBITO',
+    'PIX': 'PIX',
+    'CARNE': 'CARNE',
+    'CHEQUE': 'CHEQUE',
+}
+
+# Restrições das tabelas de destino: (motivo, linhas que a violam)
+REGRAS_DESTINO = {
+    'produtos_os': [
+        ('descricao vazia', lambda t: t['descricao'].isna()),
+    ],
+    'dioptrias_os': [
+        ('sem esférico OD/OE', lambda t: t['od_esferico'].isna() & t['oe_esferico'].isna()),
+    ],
+    'pagamentos_os': [
+        ('forma_pagamento sem equivalente', lambda t: t['forma_pagamento'].isna()),
+        ('valor vazio ou <= 0', lambda t: ~(t['valor'] > 0)),
+    ],
+}
+
+# Palavras da descrição → tipo_produto de optica.produtos_os (primeira que casar)
+TIPOS_PRODUTO = [
+    ('LENTE DE CONTATO', r'CONTATO|\bLC\b'),
+    ('ARMAÇÃO', r'ARMA[CÇ]|\bARO\b|SOLAR|[OÓ]CULOS|ACETATO|METAL|NYLON'),
+    ('ESTOJO', r'ESTOJO'),
+    ('CORDÃO', r'CORD[AÃ]O'),
+    ('FLANELA', r'FLANELA'),
+    ('SPRAY LIMPEZA', r'SPRAY|LIMPA'),
+    ('LENTE', r'LENTE|\bAR\b|BLUE|MULTI?\b|PROG|FOTO|TRANSIT|\bVS\b|\bCR\b|POLI|BIFOCAL|KODAK|VARILUX|ZEISS|HOYA'),
+]
+
+
+def empilhar(df: pd.DataFrame, chaves: Dict[str, np.ndarray], slots: Sequence[Tuple],
+             campos: List[str], rotulos: Dict[str, list] = None) -> pd.DataFrame:
+    """
+    Empilha grupos de colunas (um por slot) em linhas: N linhas x K slots → N·K linhas
+
+    slots[k][j] é a coluna de df com o campo campos[j] do slot k; rotulos traz
+    valores constantes por slot (ex.: número do item, olho).
+    """
+    n, k = len(df), len(slots)
+    dados = {nome: np.repeat(valores, k) for nome, valores in chaves.items()}
+    for nome, valores in (rotulos or {}).items():
+        dados[nome] = np.tile(np.asarray(valores, dtype=object), n)
+    for j, campo in enumerate(campos):
+        colunas = [df[slot[j]] if slot[j] in df.columns else pd.Series(np.nan, index=df.index) for slot in slots]
+        dados[campo] = np.column_stack([c.to_numpy() for c in colunas]).ravel()
+    return pd.DataFrame(dados)
+
+
+class NormalizadorVendasOS:
+    def __init__(self, arquivo=ARQUIVO_ENTRADA, pasta_saida=PASTA_SAIDA):
+        self.arquivo = Path(arquivo)
+        self.pasta_saida = Path(pasta_saida)
+
+    def carregar(self) -> pd.DataFrame:
+        return pd.read_csv(self.arquivo, dtype={'os_n': str, '_id_loja_codigo': str}, low_memory=False)
+
+    def chaves_os(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Chave da OS usada nos lookups do SQL (número + código da loja com 3 dígitos)"""
+        return {
+            '_os_numero': normalizar.texto_limpo(df['os_n']).to_numpy(),
+            '_id_loja_codigo': normalizar.texto_limpo(df['_id_loja_codigo']).str.zfill(3).to_numpy(),
+        }
+
+    def produtos(self, df: pd.DataFrame, chaves) -> pd.DataFrame:
+        tipados = pd.DataFrame(index=df.index)
+        for cod, descricao, valor in SLOTS_PRODUTOS:
+            tipados[cod] = normalizar.texto_limpo(df[cod]) if cod in df.columns else None
+            tipados[descricao] = normalizar.texto_limpo(df[descricao]) if descricao in df.columns else None
+            tipados[valor] = normalizar.numero(df[valor]) if valor in df.columns else np.nan
+
+        longo = empilhar(tipados, chaves, SLOTS_PRODUTOS, ['codigo_produto', 'descricao', 'valor_unitario'],
+                         rotulos={'item': list(range(1, len(SLOTS_PRODUTOS) + 1))})
+        preenchido = longo[['codigo_produto', 'descricao']].notna().any(axis=1) | longo['valor_unitario'].notna()
+        longo = longo[preenchido].reset_index(drop=True)
+
+        longo['item'] = longo['item'].astype('int8')
+        # Sem valor no slot: item sem preço próprio (cobrado no total da OS)
+        longo['valor_unitario'] = longo['valor_unitario'].astype(float).fillna(0.0)
+        longo['quantidade'] = np.int8(1)
+        longo['tipo_produto'] = self.classificar_produtos(longo['descricao'])
+        return longo[['_os_numero', '_id_loja_codigo', 'item', 'tipo_produto', 'descricao',
+                      'codigo_produto', 'quantidade', 'valor_unitario']]
+
+    def classificar_produtos(self, descricoes: pd.Series) -> pd.Series:
+        """tipo_produto pela descrição (vetorizado, uma vez por descrição distinta)"""
+        def classificar(unicos: pd.Series) -> pd.Series:
+            maiusculo = unicos.fillna('').astype(str).str.upper()
+            tipo = pd.Series('OUTROS', index=unicos.index, dtype=object)
+            definido = pd.Series(False, index=unicos.index)
+            for nome, padrao in TIPOS_PRODUTO:
+                casou = maiusculo.str.contains(padrao, regex=True) & ~definido
+                tipo[casou] = nome
+                definido |= casou
+            return tipo
+        return normalizar.em_valores_unicos(descricoes, classificar).fillna('OUTROS')
+
+    def receitas(self, df: pd.DataFrame, chaves) -> pd.DataFrame:
+        colunas = [cols for _, _, _, cols in CONJUNTOS_RECEITA]
+        tipados = pd.DataFrame({c: normalizar.numero(df[c]) if c in df.columns else np.nan
+                                for cols in colunas for c in cols}, index=df.index)
+        tipados['adicao'] = normalizar.numero(df['adicao']) if 'adicao' in df.columns else np.nan
+
+        longo = empilhar(tipados, {**chaves, 'adicao': tipados['adicao'].to_numpy()}, colunas, CAMPOS_RECEITA,
+                         rotulos={
+                             'conjunto': [c for c, _, _, _ in CONJUNTOS_RECEITA],
+                             'olho': [o for _, o, _, _ in CONJUNTOS_RECEITA],
+                             'distancia': [d for _, _, d, _ in CONJUNTOS_RECEITA],
+                         })
+        longo = longo[longo[CAMPOS_RECEITA].notna().any(axis=1)].reset_index(drop=True)
+
+        longo['conjunto'] = longo['conjunto'].astype('int8')
+        for campo in CAMPOS_RECEITA + ['adicao']:
+            longo[campo] = longo[campo].astype(float)
+        # Eixo fora de 0-180 não é válido em optica.dioptrias
+        longo['eixo'] = longo['eixo'].round().where(longo['eixo'].between(0, 180)).astype('Int16')
+        return longo[['_os_numero', '_id_loja_codigo', 'conjunto', 'olho', 'distancia']
+                     + CAMPOS_RECEITA + ['adicao']]
+
+    def dioptrias_optica(self, receitas: pd.DataFrame) -> pd.DataFrame:
+        """Receitas de longe (OD/OE) no formato de optica.dioptrias (uma linha por OS)"""
+        chave = ['_os_numero', '_id_loja_codigo']
+        longe = receitas[receitas['distancia'] == 'LONGE']
+        olhos = {}
+        for olho, prefixo in [('OD', 'od'), ('OE', 'oe')]:
+            parte = longe[longe['olho'] == olho].set_index(chave)
+            olhos[prefixo] = parte.rename(columns={
+                'esferico': f'{prefixo}_esferico', 'cilindrico': f'{prefixo}_cilindrico',
+                'eixo': f'{prefixo}_eixo', 'adicao': f'{prefixo}_adicao', 'dnp': f'{prefixo}_dnp',
+                'altura': f'{prefixo}_altura',
+            })[[f'{prefixo}_esferico', f'{prefixo}_cilindrico', f'{prefixo}_eixo',
+                f'{prefixo}_adicao', f'{prefixo}_dnp', f'{prefixo}_altura']]
+
+        dioptrias = olhos['od'].join(olhos['oe'], how='outer')
+        dioptrias['dp_total'] = dioptrias['od_dnp'] + dioptrias['oe_dnp']
+        dioptrias['altura_montagem'] = dioptrias['od_altura'].fillna(dioptrias['oe_altura'])
+        return dioptrias.drop(columns=['od_altura', 'oe_altura']).reset_index()
+
+    def pagamentos(self, df: pd.DataFrame, chaves) -> pd.DataFrame:
+        tipados = pd.DataFrame(index=df.index)
+        for forma, valor in SLOTS_PAGAMENTO:
+            tipados[forma] = normalizar.texto_limpo(df[forma]).str.upper() if forma in df.columns else None
+            tipados[valor] = normalizar.numero(df[valor]) if valor in df.columns else np.nan
+
+        longo = empilhar(tipados, chaves, SLOTS_PAGAMENTO, ['forma_original', 'valor'],
+                         rotulos={'pagamento': list(range(1, len(SLOTS_PAGAMENTO) + 1))})
+        longo = longo[longo['forma_original'].notna() | longo['valor'].notna()].reset_index(drop=True)
+
+        longo['pagamento'] = longo['pagamento'].astype('int8')
+        longo['valor'] = longo['valor'].astype(float)
+        longo['forma_pagamento'] = longo['forma_original'].map(FORMAS_PAGAMENTO)
+        longo['parcelas'] = np.int8(1)
+        return longo[['_os_numero', '_id_loja_codigo', 'pagamento', 'forma_pagamento',
+                      'forma_original', 'valor', 'parcelas']]
+
+    def normalizar(self, df: pd.DataFrame = None) -> Dict[str, pd.DataFrame]:
+        if df is None:
+            df = self.carregar()
+        chaves = self.chaves_os(df)
+        receitas = self.receitas(df, chaves)
+        return {
+            'produtos_os': self.produtos(df, chaves),
+            'receitas_os': receitas,
+            'dioptrias_os': self.dioptrias_optica(receitas),
+            'pagamentos_os': self.pagamentos(df, chaves),
+        }
+
+    def separar_rejeitados(self, tabelas: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """Tira de cada tabela as linhas que o destino recusaria; devolve {tabela_rejeitados: linhas + motivo}"""
+        rejeitados = {}
+        for nome, regras in REGRAS_DESTINO.items():
+            tabela = tabelas[nome]
+            motivo = pd.Series(None, index=tabela.index, dtype=object)
+            for descricao, regra in regras:
+                motivo[regra(tabela) & motivo.isna()] = descricao
+            rejeitar = motivo.notna()
+            tabelas[nome] = tabela[~rejeitar].reset_index(drop=True)
+            rejeitados[f"{nome}_rejeitados"] = tabela[rejeitar].assign(motivo=motivo[rejeitar]).reset_index(drop=True)
+            for descricao, total in motivo[rejeitar].value_counts().items():
+                print(f"⚠️  {nome}: {total:,} linhas rejeitadas ({descricao})")
+        return rejeitados
+
+    def salvar(self, tabelas: Dict[str, pd.DataFrame]):
+        self.pasta_saida.mkdir(parents=True, exist_ok=True)
+        for nome, tabela in tabelas.items():
+            arquivo = self.pasta_saida / f"{nome}.csv"
+            tabela.to_csv(arquivo, index=False, encoding='utf-8', na_rep='')
+            print(f"✅ {arquivo}: {len(tabela):,} linhas ({arquivo.stat().st_size / 1024:.0f} KB)")
+
+    def executar(self):
+        print("🔄 NORMALIZANDO VENDAS_OS_COMPLETO (LARGO → LONGO)")
+        print("=" * 60)
+        df = self.carregar()
+        print(f"📄 {self.arquivo}: {len(df):,} OS")
+        tabelas = self.normalizar(df)
+
+        pagamentos = tabelas['pagamentos_os']
+        sem_forma = pagamentos['forma_pagamento'].isna() & pagamentos['forma_original'].notna()
+        if sem_forma.any():
+            formas = ', '.join(sorted(pagamentos.loc[sem_forma, 'forma_original'].unique())[:10])
+            print(f"⚠️  {sem_forma.sum():,} pagamentos sem forma_pagamento equivalente ({formas})")
+
+        rejeitados = self.separar_rejeitados(tabelas)
+        self.salvar({**tabelas, **rejeitados})
+        print("💡 Carga: povoamento/13_importar_produtos_dioptrias_pagamentos_os.sql")
+        return tabelas
+
+
+def main():
+    arquivo = Path(sys.argv[1]) if len(sys.argv) > 1 else ARQUIVO_ENTRADA
+    NormalizadorVendasOS(arquivo).executar()
+
+
+if __name__ == "__main__":
+    main()
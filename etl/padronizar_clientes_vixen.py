@@ -8,82 +8,115 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime
-import re
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils import normalizar
+from etl.utils.canais import classificar_canais
+from etl.utils.datas import ConversorDatas
+from etl.utils.instrumentacao import instrumentacao
+
+# Colunas do BASE_CLIENTES_VIXEN_PADRONIZADO, na ordem do arquivo gerado
+COLUNAS_PADRONIZADAS = [
+    'ID_CLIENTE', 'CHAVE_CLIENTE', 'METODO_ID',
+    'nome_completo', 'cpf', 'rg', 'data_nascimento',
+    'celular', 'email', 'endereco', 'cep', 'bairro',
+    'origem_loja', 'origem_arquivo', 'total_registros_mesclados', 'data_extracao',
+    'id_vixen_original', 'cidade', 'uf', 'sexo', 'vendedor', 'conceito', 'como_conheceu',
+    'canal_codigo'
+]
 
 class PadronizadorClientesVixen:
     def __init__(self):
         self.arquivo_vixen = Path("data/analise_especial/clientes_completos_vixen.XLSX")
         # Usar ID original do Vixen em vez de gerar novo
+        # Vixen exporta aniversários como AAAA-MM-DD (com horário) ou DD/MM/AAAA
+        self.conversor_datas = ConversorDatas(formatos=['%Y-%m-%d', '%d/%m/%Y'], remover_horario=True)
         
     def limpar_cpf(self, cpf_str):
         """Limpa e valida CPF"""
-        if pd.isna(cpf_str):
-            return None
-        cpf_limpo = re.sub(r'[^\d]', '', str(cpf_str))
-        if len(cpf_limpo) == 11:
-            return f"{cpf_limpo[:3]}.{cpf_limpo[3:6]}.{cpf_limpo[6:9]}-{cpf_limpo[9:]}"
-        return None
+        return normalizar.escalar(normalizar.limpar_cpf, cpf_str)
     
     def limpar_telefone(self, fone_str):
         """Limpa e padroniza telefone"""
-        if pd.isna(fone_str):
-            return None
-        # Remove caracteres especiais e extrai números
-        fone_limpo = re.sub(r'[^\d]', '', str(fone_str))
-        if len(fone_limpo) >= 10:
-            # Formato (11) 94240-5279
-            if len(fone_limpo) == 11:  # Com DDD
-                return f"({fone_limpo[:2]}) {fone_limpo[2:7]}-{fone_limpo[7:]}"
-            elif len(fone_limpo) == 10:  # Sem 9 inicial
-                return f"({fone_limpo[:2]}) {fone_limpo[2:6]}-{fone_limpo[6:]}"
-        return str(fone_str)  # Retorna original se não conseguir formatar
+        # Formato (11) 94240-5279; retorna original se não conseguir formatar
+        return normalizar.escalar(normalizar.formatar_telefone, fone_str)
     
     def limpar_cep(self, cep_str):
         """Limpa e padroniza CEP"""
-        if pd.isna(cep_str):
-            return None
-        cep_limpo = re.sub(r'[^\d]', '', str(cep_str))
-        if len(cep_limpo) >= 5:
-            return cep_limpo[:8]  # Máximo 8 dígitos
-        return None
+        return normalizar.escalar(normalizar.limpar_cep, cep_str)
     
-    def processar_data_nascimento(self, data_str):
-        """Processa data de aniversário"""
-        if pd.isna(data_str):
-            return None
-        try:
-            # Tenta diferentes formatos
-            data_str = str(data_str)
-            if ' ' in data_str:
-                data_str = data_str.split(' ')[0]  # Remove horário se tiver
-            
-            # Tenta parsear
-            if '-' in data_str:
-                return pd.to_datetime(data_str, format='%Y-%m-%d').strftime('%d/%m/%Y')
-            elif '/' in data_str:
-                return pd.to_datetime(data_str, format='%d/%m/%Y').strftime('%d/%m/%Y')
-            else:
-                return None
-        except:
-            return None
+    def texto_bruto(self, df, coluna):
+        """str(valor).strip() da coluna inteira (ausentes viram 'nan', como no Vixen original)"""
+        if coluna not in df.columns:
+            return pd.Series('', index=df.index, dtype=object)
+        return df[coluna].astype(str).str.strip()
+    
+    def processar_datas_nascimento(self, datas):
+        """Converte a coluna de aniversários para DD/MM/YYYY (inválidas viram None)"""
+        datas_formatadas, invalidas = self.conversor_datas.formatar(datas)
+        if invalidas.any():
+            print(f"   ⚠️ {invalidas.sum():,} datas de aniversário não reconhecidas")
+        return datas_formatadas
     
-    def criar_chave_cliente(self, row):
-        """Cria chave única para o cliente"""
+    def criar_chaves_clientes(self, df):
+        """Cria chave única para cada cliente"""
         # Prioridade: CPF > Nome + Telefone > ID Vixen
-        nome = str(row.get('Nome Completo', '')).strip()
-        fone = str(row.get('Fone', '')).strip()
-        id_vixen = str(row.get('ID', ''))
-        
         # Se tivesse CPF, usaria CPF_xxxxx, mas não temos no Vixen
         # Usar nome + telefone ou ID como chave
-        if nome and fone and fone != 'nan':
-            chave = f"VIXEN_{nome[:20].replace(' ', '_')}_{re.sub(r'[^\d]', '', fone)[:8]}"
-        else:
-            chave = f"VIXEN_ID_{id_vixen}"
+        nome = self.texto_bruto(df, 'Nome Completo')
+        fone = self.texto_bruto(df, 'Fone')
+        id_vixen = self.texto_bruto(df, 'ID')
+        
+        chave_nome_fone = (
+            'VIXEN_' + nome.str[:20].str.replace(' ', '_', regex=False)
+            + '_' + fone.str.replace(r'[^\d]', '', regex=True).str[:8]
+        )
+        chave_id = 'VIXEN_ID_' + id_vixen
+        
+        tem_nome_fone = (nome != '') & (fone != '') & (fone != 'nan')
+        return chave_nome_fone.where(tem_nome_fone, chave_id).str.upper()
+    
+    def converter(self, df_vixen, timestamp=None):
+        """Converte o DataFrame Vixen para o padrão do sistema (operações por coluna)"""
+        timestamp = timestamp or datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        
+        # Usar ID original do Vixen (mantém relacionamentos): VXN_2001552
+        id_vixen_original = df_vixen['ID']
+        id_cliente = 'VXN_' + id_vixen_original.astype('int64').astype(str).str.zfill(7)
         
-        return chave.upper()
+        df_padronizado = pd.DataFrame({
+            'ID_CLIENTE': id_cliente,
+            'CHAVE_CLIENTE': self.criar_chaves_clientes(df_vixen),
+            'METODO_ID': 'VIXEN_ID_ORIGINAL',
+            'nome_completo': self.texto_bruto(df_vixen, 'Nome Completo'),
+            'cpf': None,  # Vixen não tem CPF
+            'rg': None,   # Vixen não tem RG
+            'data_nascimento': self.processar_datas_nascimento(df_vixen.get('Dt de aniversário', pd.Series(None, index=df_vixen.index))),
+            'celular': normalizar.formatar_telefone(df_vixen.get('Fone', pd.Series(None, index=df_vixen.index))),
+            'email': normalizar.texto_limpo(df_vixen.get('E-mail', pd.Series(None, index=df_vixen.index))),
+            'endereco': self.texto_bruto(df_vixen, 'Endereço'),
+            'cep': normalizar.limpar_cep(df_vixen.get('CEP', pd.Series(None, index=df_vixen.index))),
+            'bairro': self.texto_bruto(df_vixen, 'Bairro'),
+            'origem_loja': 'VIXEN',
+            'origem_arquivo': 'clientes_completos_vixen.XLSX',
+            'total_registros_mesclados': 1,
+            'data_extracao': timestamp,
+            # Campos extras do Vixen (mantém ID original para relacionamentos)
+            'id_vixen_original': id_vixen_original,
+            'cidade': self.texto_bruto(df_vixen, 'Cidade'),
+            'uf': self.texto_bruto(df_vixen, 'UF'),
+            'sexo': self.texto_bruto(df_vixen, 'Sexo'),
+            'vendedor': self.texto_bruto(df_vixen, 'Vendedor'),
+            'conceito': self.texto_bruto(df_vixen, 'Conceito'),
+            'como_conheceu': self.texto_bruto(df_vixen, 'Como nos conheceu'),
+            # Código de marketing.canais_aquisicao (um cálculo por valor distinto)
+            'canal_codigo': classificar_canais(df_vixen.get('Como nos conheceu', pd.Series(None, index=df_vixen.index)))
+        }, index=df_vixen.index)
+        
+        return df_padronizado[COLUNAS_PADRONIZADAS].reset_index(drop=True)
     
-    def padronizar_clientes(self):
+    def padronizar_clientes(self, formato='parquet'):
         """Converte clientes Vixen para o padrão do sistema"""
         print("=" * 80)
         print("PADRONIZADOR DE CLIENTES VIXEN")
@@ -96,67 +129,29 @@ class PadronizadorClientesVixen:
         try:
             # Carregar dados Vixen
             print(f"📄 Carregando: {self.arquivo_vixen.name}")
-            df_vixen = pd.read_excel(self.arquivo_vixen)
+            with instrumentacao.etapa('vixen_carregar', self.arquivo_vixen) as etapa:
+                df_vixen = pd.read_excel(self.arquivo_vixen)
+                etapa.registrar(entrada=len(df_vixen), saida=len(df_vixen))
             print(f"✅ {len(df_vixen):,} clientes Vixen carregados")
             print()
             
-            # Criar estrutura padronizada
-            clientes_padronizados = []
-            timestamp = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-            
             print("🔄 Convertendo para formato padrão...")
-            
-            for index, row in df_vixen.iterrows():
-                # Usar ID original do Vixen (mantém relacionamentos)
-                id_vixen_original = row.get('ID')
-                id_cliente = f"VXN_{id_vixen_original:07d}"  # VXN_2001552
-                
-                # Mapear campos
-                cliente_padrao = {
-                    'ID_CLIENTE': id_cliente,
-                    'CHAVE_CLIENTE': self.criar_chave_cliente(row),
-                    'METODO_ID': 'VIXEN_ID_ORIGINAL',
-                    'nome_completo': str(row.get('Nome Completo', '')).strip(),
-                    'cpf': None,  # Vixen não tem CPF
-                    'rg': None,   # Vixen não tem RG
-                    'data_nascimento': self.processar_data_nascimento(row.get('Dt de aniversário')),
-                    'celular': self.limpar_telefone(row.get('Fone')),
-                    'email': str(row.get('E-mail', '')).strip() if pd.notna(row.get('E-mail')) else None,
-                    'endereco': str(row.get('Endereço', '')).strip(),
-                    'cep': self.limpar_cep(row.get('CEP')),
-                    'bairro': str(row.get('Bairro', '')).strip(),
-                    'origem_loja': 'VIXEN',
-                    'origem_arquivo': 'clientes_completos_vixen.XLSX',
-                    'total_registros_mesclados': 1,
-                    'data_extracao': timestamp,
-                    # Campos extras do Vixen (mantém ID original para relacionamentos)
-                    'id_vixen_original': id_vixen_original,
-                    'cidade': str(row.get('Cidade', '')).strip(),
-                    'uf': str(row.get('UF', '')).strip(),
-                    'sexo': str(row.get('Sexo', '')).strip(),
-                    'vendedor': str(row.get('Vendedor', '')).strip(),
-                    'conceito': str(row.get('Conceito', '')).strip(),
-                    'como_conheceu': str(row.get('Como nos conheceu', '')).strip()
-                }
-                
-                clientes_padronizados.append(cliente_padrao)
-                
-                # Progress
-                if (index + 1) % 1000 == 0:
-                    print(f"   Processados: {index + 1:,} clientes")
-            
-            # Criar DataFrame final
-            df_padronizado = pd.DataFrame(clientes_padronizados)
+            with instrumentacao.etapa('vixen_converter') as etapa:
+                df_padronizado = self.converter(df_vixen)
+                etapa.registrar(entrada=len(df_vixen), saida=len(df_padronizado))
             
             print(f"✅ {len(df_padronizado):,} clientes convertidos")
             print()
             
-            # Salvar arquivo padronizado
+            # Salvar arquivo padronizado (Parquet por padrão, xlsx opcional)
             timestamp_arquivo = datetime.now().strftime("%Y%m%d_%H%M%S")
-            arquivo_saida = f"data/analise_especial/BASE_CLIENTES_VIXEN_PADRONIZADO_{timestamp_arquivo}.xlsx"
+            arquivo_saida = f"data/analise_especial/BASE_CLIENTES_VIXEN_PADRONIZADO_{timestamp_arquivo}.{formato}"
             
             print(f"💾 Salvando: {arquivo_saida}")
-            df_padronizado.to_excel(arquivo_saida, index=False)
+            if formato == 'xlsx':
+                df_padronizado.to_excel(arquivo_saida, index=False)
+            else:
+                df_padronizado.to_parquet(arquivo_saida, index=False)
             
             # Gerar relatório comparativo
             self.gerar_relatorio_comparativo(df_vixen, df_padronizado, arquivo_saida)
@@ -224,8 +219,10 @@ class PadronizadorClientesVixen:
         print(f"📋 Relatório salvo: {relatorio_path}")
 
 def main():
+    formato = 'xlsx' if '--xlsx' in sys.argv else 'parquet'
     padronizador = PadronizadorClientesVixen()
-    resultado = padronizador.padronizar_clientes()
+    resultado = padronizador.padronizar_clientes(formato=formato)
+    instrumentacao.finalizar()
     
     if resultado is not None:
         print()
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Motor de recebíveis de carnê
+
+Junta os eventos de carnê dos caixas (ENTR_CARN = carnê entregue, REC_CARN =
+parcela recebida, REST_ENTR = restante de entrada) e o 'resta' das OS num
+índice por (loja, OS). Em uma passada vetorizada calcula, para cada OS, o saldo
+em aberto, as parcelas vencidas e a faixa de atraso, sem depender das views
+SQL sobre as tabelas inteiras (vendas.v_saldo_a_receber).
+
+O índice guarda só os acumulados por OS; cada novo dia de REC_CARN é somado
+com adicionar_recebimentos() e dias já aplicados são ignorados.
+
+Cronograma assumido: parcelas iguais (valor_total / numero_parcelas), a
+primeira vencendo um mês depois da entrega do carnê. O 'resta' das OS sem
+carnê é pago de uma vez na retirada (previsão de entrega, ou a data da OS) e o
+restante de entrada (REST_ENTR) entra no saldo, vencido a partir da entrega.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils import normalizar
+from etl.utils.datas import ConversorDatas
+from etl.utils.instrumentacao import instrumentacao
+
+PASTA_ESTADO = Path("data/processed/recebiveis_carne")
+
+CHAVE = ['loja', 'numero_os']
+
+# Nomes de coluna aceitos para cada campo (extratores, caixas consolidados e exports de OS)
+ALIASES = {
+    'loja': ['loja', 'Loja', 'LOJA'],
+    'numero_os': ['numero_os', 'os', 'OS', 'Nº OS', 'os_n', 'numero_venda', 'Nº Venda'],
+    'data': ['data_recebimento', 'data_entrega', 'data_restante', 'data_completa', 'data', 'Data',
+             'data_de_compra'],
+    'valor_parcela': ['valor_parcela', 'Valor Parcela', 'valor'],
+    'valor_total': ['valor_total', 'Valor Total', 'valor'],
+    'numero_parcelas': ['numero_parcelas', 'Parcelas', 'parcelas'],
+    'valor_restante': ['valor_restante', 'Valor Restante', 'restante'],
+    'resta': ['resta', 'Resta', 'RESTA'],
+    'previsao_entrega': ['prev_de_entr', 'previsao_entrega', 'Prev. de Entr.'],
+}
+
+# Números de série do Excel aceitos como data (1982 a 2064)
+SERIAL_EXCEL = (30000, 60000)
+
+# Faixas de atraso (dias desde o vencimento da parcela mais antiga em aberto)
+FAIXAS_ATRASO = [(0, 'EM DIA'), (30, '1-30'), (60, '31-60'), (90, '61-90'), (np.inf, '90+')]
+
+COLUNAS_INDICE = {
+    'valor_financiado': float,
+    'origem_financiado': object,
+    'numero_parcelas': 'Int16',
+    'data_entrega': 'datetime64[ns]',
+    'total_recebido': float,
+    'qtd_recebimentos': 'Int32',
+    'ultimo_recebimento': 'datetime64[ns]',
+    'restante_entrada': float,
+}
+
+
+def resolver_colunas(df: pd.DataFrame, campos: List[str]) -> pd.DataFrame:
+    """Seleciona e renomeia as colunas pelos aliases (campos ausentes viram NaN)"""
+    resultado = pd.DataFrame(index=df.index)
+    for campo in campos:
+        coluna = next((c for c in ALIASES[campo] if c in df.columns), None)
+        resultado[campo] = df[coluna] if coluna is not None else np.nan
+    return resultado
+
+
+def somar_meses(datas: pd.Series, meses: np.ndarray) -> pd.Series:
+    """datas + N meses (dia limitado ao último dia do mês), vetorizado"""
+    periodo = datas.dt.year.to_numpy() * 12 + datas.dt.month.to_numpy() - 1 + meses
+    ano, mes = np.divmod(periodo, 12)
+    primeiro = pd.to_datetime({'year': ano, 'month': mes + 1, 'day': 1}, errors='coerce')
+    dia = np.minimum(datas.dt.day.to_numpy(), primeiro.dt.days_in_month.to_numpy())
+    return pd.Series(primeiro.to_numpy() + pd.to_timedelta(dia - 1, unit='D').to_numpy(), index=datas.index)
+
+
+def meses_completos(inicio: pd.Series, fim: pd.Timestamp) -> np.ndarray:
+    """Meses completos entre inicio e fim (quantas parcelas já venceram)"""
+    meses = (fim.year * 12 + fim.month) - (inicio.dt.year * 12 + inicio.dt.month)
+    meses = meses - (inicio.dt.day > fim.day).astype(int)
+    return meses.to_numpy(dtype=float)
+
+
+def meses_ate_primeira_parcela(origem: pd.Series) -> np.ndarray:
+    """Carnê: um mês depois da entrega; 'resta' da OS: na própria retirada"""
+    return np.where(origem.to_numpy() == 'OS_RESTA', 0, 1)
+
+
+class MotorRecebiveis:
+    def __init__(self, pasta_estado=PASTA_ESTADO):
+        self.pasta_estado = Path(pasta_estado)
+        # Caixas e exports gravam 'AAAA-MM-DD HH:MM:SS'
+        self.conversor_datas = ConversorDatas(remover_horario=True)
+        self.indice = pd.DataFrame(
+            {coluna: pd.Series(dtype=dtype) for coluna, dtype in COLUNAS_INDICE.items()},
+            index=pd.MultiIndex.from_tuples([], names=CHAVE),
+        )
+        # (loja, data) de REC_CARN já somados ao índice
+        self.dias_aplicados = set()
+
+    # ------------------------------------------------------------------
+    # Normalização dos eventos
+    # ------------------------------------------------------------------
+
+    def converter_datas(self, valores: pd.Series) -> pd.Series:
+        """Datas em texto e, no que sobrar, número de série do Excel (ex.: '45317')"""
+        datas, invalidas = self.conversor_datas.converter(valores)
+        serial = normalizar.numero(valores.where(invalidas))
+        serial = serial.where(serial.between(*SERIAL_EXCEL))
+        return datas.fillna(pd.to_datetime(serial, unit='D', origin='1899-12-30'))
+
+    def _eventos(self, df: pd.DataFrame, campos: List[str]) -> pd.DataFrame:
+        eventos = resolver_colunas(df, CHAVE + campos)
+        eventos['loja'] = normalizar.nome_loja(eventos['loja'])
+        eventos['numero_os'] = normalizar.codigo_os(eventos['numero_os'])
+        for campo in ('data', 'previsao_entrega'):
+            if campo in campos:
+                eventos[campo] = self.converter_datas(eventos[campo])
+        for campo in campos:
+            if campo not in ('data', 'previsao_entrega', 'numero_parcelas'):
+                eventos[campo] = normalizar.numero(eventos[campo])
+        return eventos.dropna(subset=CHAVE)
+
+    def _garantir_chaves(self, chaves: pd.MultiIndex):
+        novas = chaves.difference(self.indice.index)
+        if len(novas):
+            vazio = pd.DataFrame(
+                {coluna: pd.Series(dtype=dtype, index=novas) for coluna, dtype in COLUNAS_INDICE.items()},
+                index=novas,
+            )
+            vazio[['total_recebido', 'restante_entrada']] = 0.0
+            vazio['qtd_recebimentos'] = 0
+            self.indice = pd.concat([self.indice, vazio]) if len(self.indice) else vazio
+            self.indice.index.names = CHAVE
+
+    # ------------------------------------------------------------------
+    # Carga dos eventos
+    # ------------------------------------------------------------------
+
+    def carregar_entregas(self, entr_carn: pd.DataFrame):
+        """ENTR_CARN define o valor financiado, a quantidade de parcelas e a data de entrega"""
+        eventos = self._eventos(entr_carn, ['data', 'valor_total', 'numero_parcelas'])
+        eventos['numero_parcelas'] = normalizar.numero(
+            eventos['numero_parcelas'].astype(object).astype(str).str.extract(r'(\d+)', expand=False))
+        # Mais de uma entrega da mesma OS: vale a mais recente
+        eventos = eventos.sort_values('data').groupby(CHAVE).last()
+        self._garantir_chaves(eventos.index)
+
+        self.indice.loc[eventos.index, 'valor_financiado'] = eventos['valor_total']
+        self.indice.loc[eventos.index, 'origem_financiado'] = 'ENTR_CARN'
+        self.indice.loc[eventos.index, 'numero_parcelas'] = eventos['numero_parcelas'].round().astype('Int16')
+        self.indice.loc[eventos.index, 'data_entrega'] = eventos['data']
+
+    def carregar_resta_os(self, os_exports: pd.DataFrame):
+        """'resta' das OS preenche o valor financiado de quem não tem ENTR_CARN (pago na retirada)"""
+        eventos = self._eventos(os_exports, ['data', 'previsao_entrega', 'resta'])
+        eventos['data'] = eventos['previsao_entrega'].fillna(eventos['data'])
+        eventos = eventos[eventos['resta'] > 0].groupby(CHAVE).agg(resta=('resta', 'last'), data=('data', 'last'))
+        self._garantir_chaves(eventos.index)
+
+        sem_entrega = self.indice.loc[eventos.index, 'origem_financiado'].isna()
+        alvo = eventos.index[sem_entrega.to_numpy()]
+        self.indice.loc[alvo, 'valor_financiado'] = eventos.loc[alvo, 'resta']
+        self.indice.loc[alvo, 'origem_financiado'] = 'OS_RESTA'
+        self.indice.loc[alvo, 'numero_parcelas'] = 1
+        self.indice.loc[alvo, 'data_entrega'] = eventos.loc[alvo, 'data']
+
+    def carregar_restantes(self, rest_entr: pd.DataFrame):
+        """REST_ENTR: restante de entrada ainda a receber por OS"""
+        eventos = self._eventos(rest_entr, ['valor_restante'])
+        soma = eventos.groupby(CHAVE)['valor_restante'].sum()
+        self._garantir_chaves(soma.index)
+        self.indice.loc[soma.index, 'restante_entrada'] = soma
+
+    def adicionar_recebimentos(self, rec_carn: pd.DataFrame) -> int:
+        """
+        Soma parcelas recebidas (REC_CARN) ao índice
+
+        Pode ser chamado a cada novo dia; (loja, data) já aplicados são
+        ignorados. Retorna quantos recebimentos foram somados.
+        """
+        eventos = self._eventos(rec_carn, ['data', 'valor_parcela'])
+        dias = pd.Series(list(zip(eventos['loja'], eventos['data'])), index=eventos.index)
+        novos = ~dias.isin(self.dias_aplicados)
+        eventos = eventos[novos.to_numpy()]
+        if eventos.empty:
+            return 0
+
+        acumulado = eventos.groupby(CHAVE).agg(
+            total=('valor_parcela', 'sum'),
+            quantidade=('valor_parcela', 'size'),
+            ultimo=('data', 'max'),
+        )
+        self._garantir_chaves(acumulado.index)
+        atual = self.indice.loc[acumulado.index]
+        self.indice.loc[acumulado.index, 'total_recebido'] = atual['total_recebido'].fillna(0) + acumulado['total']
+        self.indice.loc[acumulado.index, 'qtd_recebimentos'] = atual['qtd_recebimentos'].fillna(0) + acumulado['quantidade']
+        self.indice.loc[acumulado.index, 'ultimo_recebimento'] = pd.concat(
+            [atual['ultimo_recebimento'], acumulado['ultimo']], axis=1).max(axis=1)
+
+        self.dias_aplicados.update(dias[novos.to_numpy()].unique())
+        return len(eventos)
+
+    # ------------------------------------------------------------------
+    # Saldos, atraso e parcelas vencidas
+    # ------------------------------------------------------------------
+
+    def saldos(self, data_referencia: Optional[datetime] = None) -> pd.DataFrame:
+        """Saldo, parcelas vencidas e faixa de atraso de cada OS (uma passada vetorizada)"""
+        referencia = pd.Timestamp(data_referencia or datetime.now()).normalize()
+        df = self.indice.copy()
+
+        financiado = df['valor_financiado'].fillna(0).to_numpy(dtype=float)
+        recebido = df['total_recebido'].fillna(0).to_numpy(dtype=float)
+        entrada = df['restante_entrada'].fillna(0).to_numpy(dtype=float)
+        parcelas = df['numero_parcelas'].astype(float).fillna(1).clip(lower=1).to_numpy()
+        valor_parcela = financiado / parcelas
+        deslocamento = meses_ate_primeira_parcela(df['origem_financiado'])
+
+        saldo_parcelas = np.clip(financiado - recebido, 0, None)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pagas = np.where(valor_parcela > 0, np.floor(recebido / valor_parcela + 1e-9), parcelas)
+        pagas = np.minimum(pagas, parcelas)
+
+        entrega = df['data_entrega']
+        # Parcela k (1..n) vence em entrega + (k - 1 + deslocamento) meses
+        vencidas_total = np.clip(np.nan_to_num(meses_completos(entrega, referencia)) + 1 - deslocamento, 0, parcelas)
+        vencidas = np.where(saldo_parcelas > 0.005, np.clip(vencidas_total - pagas, 0, None), 0)
+
+        # Vencimento da parcela mais antiga em aberto
+        vencimento = somar_meses(entrega.fillna(referencia), (pagas + deslocamento).astype(int))
+        dias_atraso = np.where(vencidas > 0, (referencia - vencimento).dt.days.to_numpy(), 0)
+
+        # Restante de entrada: devido na entrega do carnê/OS
+        entrada_vencida = np.where((entrega <= referencia).to_numpy(), entrada, 0)
+        dias_entrada = np.where(entrada_vencida > 0.005, (referencia - entrega).dt.days.fillna(0).to_numpy(), 0)
+
+        df['valor_parcela'] = valor_parcela.round(2)
+        df['saldo'] = (saldo_parcelas + entrada).round(2)
+        df['parcelas_pagas'] = pagas.astype(int)
+        df['parcelas_vencidas'] = vencidas.astype(int)
+        df['valor_vencido'] = (np.minimum(saldo_parcelas, vencidas * valor_parcela) + entrada_vencida).round(2)
+        df['proximo_vencimento'] = vencimento.where(saldo_parcelas > 0.005)
+        df['dias_atraso'] = np.maximum(dias_atraso, dias_entrada).astype(int)
+        df['faixa_atraso'] = pd.cut(
+            df['dias_atraso'], bins=[-np.inf] + [limite for limite, _ in FAIXAS_ATRASO],
+            labels=[nome for _, nome in FAIXAS_ATRASO],
+        )
+        return df.reset_index()
+
+    def parcelas_vencidas(self, data_referencia: Optional[datetime] = None) -> pd.DataFrame:
+        """Uma linha por parcela vencida e não paga (expande os contadores de saldos())"""
+        saldos = self.saldos(data_referencia)
+        saldos = saldos[saldos['parcelas_vencidas'] > 0]
+        quantidade = saldos['parcelas_vencidas'].to_numpy()
+
+        linhas = saldos.loc[saldos.index.repeat(quantidade),
+                            CHAVE + ['origem_financiado', 'data_entrega', 'valor_parcela', 'parcelas_pagas']]
+        ordem = np.arange(len(linhas)) - np.repeat(np.cumsum(quantidade) - quantidade, quantidade)
+        linhas = linhas.reset_index(drop=True)
+        linhas['parcela'] = linhas['parcelas_pagas'].to_numpy() + ordem + 1
+        deslocamento = meses_ate_primeira_parcela(linhas['origem_financiado'])
+        linhas['vencimento'] = somar_meses(linhas['data_entrega'], linhas['parcela'].to_numpy() - 1 + deslocamento)
+        referencia = pd.Timestamp(data_referencia or datetime.now()).normalize()
+        linhas['dias_atraso'] = (referencia - linhas['vencimento']).dt.days
+        return linhas[CHAVE + ['parcela', 'vencimento', 'valor_parcela', 'dias_atraso']]
+
+    def resumo_atraso(self, data_referencia: Optional[datetime] = None) -> pd.DataFrame:
+        """Saldo por loja e faixa de atraso (substitui vendas.v_saldo_a_receber)"""
+        saldos = self.saldos(data_referencia)
+        saldos = saldos[saldos['saldo'] > 0]
+        return saldos.pivot_table(index='loja', columns='faixa_atraso', values='saldo',
+                                  aggfunc='sum', fill_value=0, observed=False)
+
+    # ------------------------------------------------------------------
+    # Persistência do índice (atualização incremental entre execuções)
+    # ------------------------------------------------------------------
+
+    def salvar(self):
+        self.pasta_estado.mkdir(parents=True, exist_ok=True)
+        self.indice.reset_index().to_parquet(self.pasta_estado / "indice_os.parquet", index=False)
+        dias = pd.DataFrame(sorted(self.dias_aplicados), columns=['loja', 'data'])
+        dias.to_parquet(self.pasta_estado / "dias_aplicados.parquet", index=False)
+
+    @classmethod
+    def carregar(cls, pasta_estado=PASTA_ESTADO) -> 'MotorRecebiveis':
+        motor = cls(pasta_estado)
+        arquivo_indice = motor.pasta_estado / "indice_os.parquet"
+        if arquivo_indice.exists():
+            motor.indice = pd.read_parquet(arquivo_indice).set_index(CHAVE)
+            dias = pd.read_parquet(motor.pasta_estado / "dias_aplicados.parquet")
+            motor.dias_aplicados = set(zip(dias['loja'], dias['data']))
+        return motor
+
+
+def ultimo_arquivo(pasta: Path, padrao: str) -> Optional[Path]:
+    arquivos = sorted(pasta.glob(padrao))
+    return arquivos[-1] if arquivos else None
+
+
+def main():
+    """Monta o índice a partir de data/caixas_processados e das OS (ou soma um dia com --rec-carn)"""
+    pasta_caixas = Path("data/caixas_processados")
+
+    print("💳 MOTOR DE RECEBÍVEIS DE CARNÊ")
+    print("=" * 60)
+
+    if len(sys.argv) > 2 and sys.argv[1] == '--rec-carn':
+        # Atualização incremental: soma um novo arquivo de REC_CARN ao índice salvo
+        motor = MotorRecebiveis.carregar()
+        somados = motor.adicionar_recebimentos(pd.read_excel(sys.argv[2]))
+        print(f"➕ {somados:,} recebimentos novos somados de {Path(sys.argv[2]).name}")
+    else:
+        motor = MotorRecebiveis()
+        fontes = {
+            'ENTR_CARN': (ultimo_arquivo(pasta_caixas, "ENTR_CARN_COMPLETO_*.xlsx"), motor.carregar_entregas),
+            'OS (resta)': (Path("povoamento/dados/csv/vendas_os_completo.csv"), motor.carregar_resta_os),
+            'REST_ENTR': (ultimo_arquivo(pasta_caixas, "REST_ENTR_COMPLETO_*.xlsx"), motor.carregar_restantes),
+            'REC_CARN': (ultimo_arquivo(pasta_caixas, "REC_CARN_COMPLETO_*.xlsx"), motor.adicionar_recebimentos),
+        }
+        for nome, (arquivo, carregar) in fontes.items():
+            if arquivo is None or not arquivo.exists():
+                print(f"⚠️  {nome}: arquivo não encontrado")
+                continue
+            with instrumentacao.etapa(f"recebiveis_{nome.split()[0].lower()}", arquivo) as etapa:
+                df = pd.read_csv(arquivo, low_memory=False) if arquivo.suffix == '.csv' else pd.read_excel(arquivo)
+                carregar(df)
+                etapa.registrar(entrada=len(df))
+            print(f"✅ {nome}: {len(df):,} linhas ({arquivo.name})")
+
+    motor.salvar()
+    saldos = motor.saldos()
+    em_aberto = saldos[saldos['saldo'] > 0]
+    print(f"\n📊 OS no índice: {len(saldos):,} | com saldo: {len(em_aberto):,}")
+    print(f"💰 Saldo a receber: R$ {em_aberto['saldo'].sum():,.2f}")
+    print(f"⏰ Vencido: R$ {em_aberto['valor_vencido'].sum():,.2f}")
+    if not em_aberto.empty:
+        print("\n" + motor.resumo_atraso().to_string())
+
+    instrumentacao.finalizar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Classificação do "como nos conheceu" em canais de aquisição
+
+marketing.normalizar_como_conheceu (povoamento/64_NORMALIZAR_COMO_CONHECEU.sql)
+roda um CASE com dezenas de LIKE para cada linha do staging, mas a coluna tem
+poucas centenas de valores distintos. ClassificadorCanais traz as mesmas regras,
+na mesma ordem, compiladas em uma única regex (a primeira regra que casa
+vence, como no CASE), classifica cada valor distinto uma vez e devolve a
+coluna como Categorical com o código de marketing.canais_aquisicao.
+
+    canal = ClassificadorCanais().classificar(df['como_conheceu_raw'])
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# (código, padrões LIKE) na ordem do CASE da função SQL
+REGRAS_CANAIS: List[Tuple[str, List[str]]] = [
+    ('CLIENTES_EXISTENTES', ['%CLIENTE%']),
+    ('ORCAMENTO', ['%ORCAMENTO%', '%ORÇAMENTO%']),
+    ('INDICACAO', ['%INDICAC%', '%INDIC%']),
+    ('AMIGO_INDICACAO', ['%AMIGO%']),
+    ('SAUDE_OLHOS', ['%SAUDE%OLHO%']),
+    ('ABORDAGEM', ['%ABORDAGEM%']),
+    ('TELEMARKETING', ['%TELEMARKETING%', '%TELE%MARKETING%']),
+    ('DIVULGADOR', ['%DIVULGADOR%']),
+    ('REDES_SOCIAIS', ['%REDE%SOCIAL%', '%REDES%SOCIA%']),
+    ('REDES_SOCIAIS', ['%FACEBOOK%', '%INSTAGRAM%']),
+    ('WHATSAPP', ['%WHATSAPP%', '%WHATS%', '%ZAP%']),
+    ('CARTAO', ['%CARTAO%', '%CARTÃO%']),
+    ('GOOGLE', ['%GOOGLE%', '%INTERNET%', '%BUSCA%']),
+    ('NAO_INFORMADO', ['NAO', 'NÃO', 'SIM']),
+]
+CANAL_VAZIO = 'NAO_INFORMADO'
+CANAL_OUTROS = 'OUTROS'
+
+# Todos os códigos possíveis (categorias da coluna classificada)
+CANAIS = list(dict.fromkeys([codigo for codigo, _ in REGRAS_CANAIS] + [CANAL_OUTROS]))
+
+PREFIXO_NUMERICO = re.compile(r'^[0-9]+\s*-?\s*')
+
+
+def like_para_regex(padrao: str) -> str:
+    """Padrão LIKE (% e _) como regex que precisa casar o texto inteiro"""
+    partes = [re.escape(parte) for parte in re.split(r'([%_])', padrao)]
+    regex = ''.join({'%': '.*', '_': '.'}.get(parte, parte) for parte in partes)
+    return rf'{regex}\Z'
+
+
+class ClassificadorCanais:
+    """Regras do CASE de normalizar_como_conheceu em uma regex só"""
+
+    def __init__(self, regras: List[Tuple[str, List[str]]] = REGRAS_CANAIS):
+        self.codigos = [codigo for codigo, _ in regras]
+        # Um lookahead por regra: a alternativa que casa primeiro é a do CASE
+        alternativas = [
+            f"(?P<r{i}>(?={'|'.join(like_para_regex(p) for p in padroes)}))"
+            for i, (_, padroes) in enumerate(regras)
+        ]
+        self.regex = re.compile('|'.join(alternativas), re.DOTALL)
+
+    def classificar_valor(self, texto) -> str:
+        """Código do canal de um valor bruto (igual à função SQL)"""
+        if texto is None or (isinstance(texto, float) and np.isnan(texto)):
+            return CANAL_VAZIO
+        texto = str(texto).strip(' ')
+        if texto == '':
+            return CANAL_VAZIO
+
+        texto = PREFIXO_NUMERICO.sub('', texto.upper())
+        encontrado = self.regex.match(texto)
+        if encontrado is None:
+            return CANAL_OUTROS
+        return self.codigos[int(encontrado.lastgroup[1:])]
+
+    def classificar(self, valores) -> pd.Series:
+        """Classifica cada valor distinto uma vez e devolve Categorical alinhada a valores"""
+        serie = pd.Series(valores)
+        codigos, unicos = pd.factorize(serie)
+        categorias = pd.Index(CANAIS)
+        # Última posição do mapa: nulos (código -1 do factorize)
+        mapa = np.append(
+            categorias.get_indexer([self.classificar_valor(v) for v in unicos]),
+            categorias.get_loc(CANAL_VAZIO)
+        )
+        return pd.Series(
+            pd.Categorical.from_codes(mapa[codigos], categories=categorias),
+            index=serie.index, name='canal_codigo'
+        )
+
+
+_classificador: Optional[ClassificadorCanais] = None
+
+
+def classificar_canais(valores) -> pd.Series:
+    """Atalho com um classificador compartilhado"""
+    global _classificador
+    if _classificador is None:
+        _classificador = ClassificadorCanais()
+    return _classificador.classificar(valores)
@@ -0,0 +1,162 @@
+"""
+Índice local de CEPs: bairro, cidade e UF sem consulta externa
+
+O enriquecimento por CEP dependia de uma consulta web por CEP (ViaCEP), que
+não existe no projeto e não roda offline nem em volume. IndiceCEP carrega
+faixas de CEP de arquivos locais para arrays ordenados e resolve a coluna
+inteira com busca binária (np.searchsorted), uma vez por CEP distinto.
+
+Arquivos (CSV com cep_inicio, cep_fim, uf, cidade, bairro; CEPs com 8 dígitos):
+
+    data/referencias/faixas_cep.csv   faixas por UF e cidades da região das
+                                      lojas (vem com o projeto)
+    data/referencias/ceps_locais.csv  CEPs exatos com bairro/cidade, gerado por
+                                      scripts/construir_indice_cep.py a partir de
+                                      uma base completa (DNE, CEP aberto) e dos
+                                      endereços já cadastrados (opcional)
+
+Cada linha entra em um nível conforme o que informa: CEP exato, faixa de
+bairro, de cidade ou de UF. Na consulta vale o nível mais específico que
+tiver o campo preenchido. CEP incompleto (5 dígitos) só casa com faixas de
+cidade/UF.
+
+    indice = IndiceCEP.carregar()
+    enderecos = indice.consultar(df['cep'])          # cep, bairro, cidade, uf
+    df, estatisticas = indice.enriquecer(df)         # preenche só o que falta
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import normalizar
+
+PASTA_REFERENCIAS = Path(__file__).resolve().parents[2] / "data" / "referencias"
+ARQUIVOS_CEP = [PASTA_REFERENCIAS / "faixas_cep.csv", PASTA_REFERENCIAS / "ceps_locais.csv"]
+
+COLUNAS = ['cep_inicio', 'cep_fim', 'uf', 'cidade', 'bairro']
+CAMPOS = ['bairro', 'cidade', 'uf']
+# Do mais específico para o mais geral
+NIVEIS = ['cep', 'bairro', 'cidade', 'uf']
+
+
+def cep_numeros(valores) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    CEP como inteiro de 8 dígitos (-1 se inválido) e máscara dos completos
+
+    Aceita '09371-000', 9371000 (zero à esquerda perdido no Excel, 7 dígitos)
+    e 9371000.0; 5 dígitos é o prefixo antigo e vira NNNNN000 incompleto.
+    """
+    digitos = (normalizar.texto(valores)
+               .str.replace(r'\.0+$', '', regex=True)
+               .str.replace(r'[^0-9]', '', regex=True))
+    tamanho = digitos.str.len().fillna(0).to_numpy(dtype=np.int64)
+    completo = (tamanho == 7) | (tamanho == 8)
+    prefixo = tamanho == 5
+    numeros = pd.to_numeric(digitos.where(completo | prefixo), errors='coerce').to_numpy(
+        dtype=np.float64, na_value=-1).astype(np.int64)
+    numeros = np.where(prefixo, numeros * 1000, numeros)
+    numeros[~(completo | prefixo)] = -1
+    return numeros, completo
+
+
+def formatar_cep(numeros) -> pd.Series:
+    """12345678 → 12345-678"""
+    cep = pd.Series(numeros, dtype=np.int64).astype(str).str.zfill(8)
+    return cep.str[:5] + '-' + cep.str[5:]
+
+
+class IndiceCEP:
+    """Faixas de CEP por nível em arrays ordenados (início, fim, campos)"""
+
+    def __init__(self, faixas: pd.DataFrame):
+        faixas = faixas.reindex(columns=COLUNAS)
+        for campo in CAMPOS:
+            faixas[campo] = normalizar.texto_limpo(faixas[campo]).str.upper()
+        inicio, _ = cep_numeros(faixas['cep_inicio'])
+        fim, _ = cep_numeros(faixas['cep_fim'].fillna(faixas['cep_inicio']))
+        faixas = faixas.assign(inicio=inicio, fim=fim)
+        faixas = faixas[(faixas['inicio'] >= 0) & (faixas['fim'] >= 0) & faixas['uf'].notna()]
+
+        nivel = np.select(
+            [faixas['inicio'] == faixas['fim'], faixas['bairro'].notna(), faixas['cidade'].notna()],
+            ['cep', 'bairro', 'cidade'], default='uf')
+        self.niveis: Dict[str, dict] = {}
+        for nome in NIVEIS:
+            parte = (faixas[nivel == nome].sort_values('inicio', kind='stable')
+                     .drop_duplicates('inicio', keep='first'))
+            sobrepostas = parte['inicio'].to_numpy()[1:] <= parte['fim'].to_numpy()[:-1]
+            if sobrepostas.any():
+                linha = parte.iloc[int(np.argmax(sobrepostas)) + 1]
+                raise ValueError(f"Faixas de CEP sobrepostas no nível {nome}: "
+                                 f"{linha['inicio']:08d}-{linha['fim']:08d}")
+            self.niveis[nome] = {
+                'inicio': parte['inicio'].to_numpy(),
+                'fim': parte['fim'].to_numpy(),
+                **{campo: parte[campo].to_numpy(dtype=object) for campo in CAMPOS},
+            }
+
+    @classmethod
+    def carregar(cls, arquivos: Optional[List[Path]] = None) -> 'IndiceCEP':
+        """Lê os arquivos existentes (o primeiro tem prioridade em CEPs repetidos)"""
+        partes = [pd.read_csv(arquivo, dtype=str, keep_default_na=False, na_values=[''])
+                  for arquivo in (arquivos or ARQUIVOS_CEP) if Path(arquivo).exists()]
+        return cls(pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=COLUNAS))
+
+    def __len__(self) -> int:
+        return sum(len(nivel['inicio']) for nivel in self.niveis.values())
+
+    def consultar(self, ceps) -> pd.DataFrame:
+        """cep (NNNNN-NNN), bairro, cidade e uf de cada valor, alinhados à entrada"""
+        serie = normalizar.como_serie(ceps)
+        numeros, completo = cep_numeros(serie)
+        valido = numeros >= 0
+
+        # Uma busca por CEP distinto; prefixo de 5 dígitos fica separado do CEP completo igual
+        unicos, inverso = np.unique(numeros[valido] * 2 + ~completo[valido], return_inverse=True)
+        valores = unicos // 2
+        unico_completo = unicos % 2 == 0
+        encontrados = {campo: np.full(len(unicos), None, dtype=object) for campo in CAMPOS}
+        for nome in NIVEIS:
+            nivel = self.niveis[nome]
+            if not len(nivel['inicio']):
+                continue
+            posicao = np.maximum(np.searchsorted(nivel['inicio'], valores, side='right') - 1, 0)
+            dentro = (nivel['inicio'][posicao] <= valores) & (valores <= nivel['fim'][posicao])
+            if nome in ('cep', 'bairro'):
+                dentro &= unico_completo
+            for campo in CAMPOS:
+                valor = nivel[campo][posicao]
+                preencher = dentro & pd.isna(encontrados[campo]) & pd.notna(valor)
+                encontrados[campo][preencher] = valor[preencher]
+
+        formatados = formatar_cep(valores).to_numpy(dtype=object)
+        formatados[~unico_completo] = None
+        resultado = pd.DataFrame(index=serie.index)
+        for campo, por_unico in [('cep', formatados)] + [(campo, encontrados[campo]) for campo in CAMPOS]:
+            coluna = np.full(len(serie), None, dtype=object)
+            coluna[valido] = por_unico[inverso]
+            resultado[campo] = coluna
+        return resultado
+
+    def enriquecer(self, df: pd.DataFrame, cep: str = 'cep', bairro: str = 'bairro',
+                   cidade: str = 'cidade', uf: str = 'uf') -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """Preenche bairro/cidade/UF vazios pelo CEP (valores informados não são trocados)"""
+        df = df.copy()
+        estatisticas = {'ceps_validos': 0, 'bairro': 0, 'cidade': 0, 'uf': 0}
+        if cep not in df.columns:
+            return df, estatisticas
+        encontrados = self.consultar(df[cep])
+        estatisticas['ceps_validos'] = int(encontrados['cep'].notna().sum())
+        for campo, coluna in [('bairro', bairro), ('cidade', cidade), ('uf', uf)]:
+            if coluna not in df.columns:
+                df[coluna] = None
+            atual = normalizar.texto_limpo(df[coluna])
+            vazio = atual.isna() | atual.str.upper().isin(['NAN', 'NONE']).fillna(False)
+            preencher = (vazio & encontrados[campo].notna()).to_numpy()
+            df[coluna] = df[coluna].astype(object)
+            df.loc[preencher, coluna] = encontrados[campo].to_numpy()[preencher]
+            estatisticas[campo] = int(preencher.sum())
+        return df, estatisticas
@@ -0,0 +1,63 @@
+"""
+Bases compartilhadas mantidas em memória pelo worker do CLI
+
+Vários scripts (gerar_csvs_vendas, gerar_sqls_vendas, gerar_sqls_povoamento)
+releem os mesmos parquets a cada execução. ler_parquet é um pd.read_parquet
+comum quando o script roda sozinho; dentro do worker (`carne worker iniciar`)
+o DataFrame fica guardado entre comandos e só é relido quando o arquivo muda
+(tamanho ou mtime). Cada chamada recebe uma cópia, então o script pode alterar
+o DataFrame à vontade. As colunas chegam nos tipos compactos de
+esquemas.py (categorias, texto Arrow), como em esquemas.ler.
+
+    df = ler_parquet(CLIENTES_UNIFICADOS)
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+import pandas as pd
+
+from .esquemas import aplicar, dataset_do_arquivo
+
+CLIENTES_UNIFICADOS = Path('data/clientes/_consolidado/clientes_unificados.parquet')
+VENDAS_VIXEN = Path('data/vendas/_com_cliente/lista_dav_com_cliente.parquet')
+OS_PARA_CLIENTE = Path('data/vendas/_com_cliente/os_para_cliente_map.parquet')
+ITENS_DAV = Path('data/originais/vendas/conf_dav/_consolidado/conf_dav_itens.parquet')
+
+# Pré-carregadas pelo worker quando existem
+BASES_COMPARTILHADAS = [CLIENTES_UNIFICADOS, VENDAS_VIXEN, OS_PARA_CLIENTE, ITENS_DAV]
+
+# Ligado por `carne worker iniciar`; fora do worker nada fica em memória
+manter_em_memoria = False
+
+_cache: Dict[Tuple[str, str], Tuple[Tuple[int, int], pd.DataFrame]] = {}
+_trava = threading.Lock()
+estatisticas = {'leituras': 0, 'acertos': 0}
+
+
+def ler_parquet(caminho, **opcoes) -> pd.DataFrame:
+    """pd.read_parquet com o esquema compacto; no worker, cópia da versão em memória enquanto o arquivo não mudar"""
+    if not manter_em_memoria:
+        return aplicar(pd.read_parquet(caminho, **opcoes), dataset_do_arquivo(caminho))
+
+    caminho = Path(caminho).resolve()
+    info = os.stat(caminho)
+    versao = (info.st_size, info.st_mtime_ns)
+    chave = (str(caminho), repr(sorted(opcoes.items())))
+    with _trava:
+        guardado = _cache.get(chave)
+        if guardado is None or guardado[0] != versao:
+            estatisticas['leituras'] += 1
+            guardado = (versao, aplicar(pd.read_parquet(caminho, **opcoes), dataset_do_arquivo(caminho)))
+            _cache[chave] = guardado
+        else:
+            estatisticas['acertos'] += 1
+    return guardado[1].copy()
+
+
+def em_memoria() -> Dict[str, int]:
+    """Bases guardadas e quantas linhas cada uma tem"""
+    with _trava:
+        return {caminho: len(df) for (caminho, _), (_, df) in _cache.items()}
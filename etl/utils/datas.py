@@ -0,0 +1,139 @@
+"""
+Conversão de colunas de datas com formatos misturados
+
+Datas de nascimento e de compra se repetem muito entre as linhas, então cada
+valor distinto é convertido uma única vez (com cache entre chamadas) e os
+formatos são testados de forma vetorizada sobre os valores ainda pendentes,
+começando pelo formato predominante da coluna. Valores que não puderam ser
+convertidos são devolvidos como máscara, sem exceções.
+"""
+
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from etl.utils.normalizar import como_serie
+
+# Formatos usados nas planilhas das lojas, na ordem em que eram testados
+FORMATOS_DATA = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y']
+
+# Quantidade de valores distintos usada para detectar o formato da coluna
+TAMANHO_AMOSTRA = 500
+
+_AUSENTE = object()
+
+
+def detectar_formato(textos: pd.Series, formatos: List[str] = FORMATOS_DATA) -> Optional[str]:
+    """Retorna o formato que converte mais valores de uma amostra da coluna"""
+    amostra = pd.Series(textos, dtype=object).dropna().head(TAMANHO_AMOSTRA)
+    if amostra.empty:
+        return None
+
+    acertos = {
+        fmt: pd.to_datetime(amostra, format=fmt, errors='coerce').notna().sum()
+        for fmt in formatos
+    }
+    melhor = max(formatos, key=lambda fmt: acertos[fmt])
+    return melhor if acertos[melhor] else None
+
+
+class ConversorDatas:
+    """
+    Converte colunas de datas guardando em cache cada valor distinto
+
+    somente_texto=True ignora valores que não são texto, como células já
+    lidas como data (comportamento antigo de etapa1/consolidacao_por_loja):
+    ficam NaT mas não contam como inválidas. remover_horario=True descarta o
+    que vem depois do primeiro espaço (ex.: '1985-02-03 00:00:00') em vez de strip.
+    """
+
+    def __init__(self, formatos: List[str] = FORMATOS_DATA, somente_texto: bool = False,
+                 remover_horario: bool = False):
+        self.formatos = list(formatos)
+        self.somente_texto = somente_texto
+        self.remover_horario = remover_horario
+        self.cache: Dict[object, pd.Timestamp] = {}
+
+    def _ignorado(self, valor) -> bool:
+        """Valor que somente_texto deixa de fora (nem convertido, nem inválido)"""
+        return self.somente_texto and not self.remover_horario and not isinstance(valor, str)
+
+    def _preparar(self, valor) -> Optional[str]:
+        """Texto a ser convertido, ou None se o valor não for texto de data"""
+        if self.remover_horario:
+            return str(valor).split(' ')[0]
+        if isinstance(valor, str):
+            return valor.strip()
+        return None
+
+    def _converter_unicos(self, unicos: list) -> List[pd.Timestamp]:
+        """Converte valores distintos ainda não vistos"""
+        resultado = [pd.NaT] * len(unicos)
+        pendentes = {}
+
+        for pos, valor in enumerate(unicos):
+            if isinstance(valor, (datetime, date, np.datetime64)) and not self.somente_texto:
+                try:
+                    data = pd.Timestamp(valor)
+                    resultado[pos] = data.tz_localize(None) if data.tzinfo else data
+                except (ValueError, OverflowError):
+                    pass
+            elif isinstance(valor, str) or self.remover_horario:
+                texto = self._preparar(valor)
+                if texto:
+                    pendentes[pos] = texto
+
+        if not pendentes:
+            return resultado
+
+        textos = pd.Series(pendentes, dtype=object)
+        # Formato predominante primeiro; os demais só para o que sobrar
+        predominante = detectar_formato(textos, self.formatos)
+        ordem = [predominante] + [fmt for fmt in self.formatos if fmt != predominante] if predominante else self.formatos
+
+        for fmt in ordem:
+            if textos.empty:
+                break
+            convertidas = pd.to_datetime(textos, format=fmt, errors='coerce')
+            ok = convertidas.notna()
+            for pos, data in convertidas[ok].items():
+                resultado[pos] = data
+            textos = textos[~ok]
+
+        return resultado
+
+    def converter(self, valores) -> Tuple[pd.Series, pd.Series]:
+        """
+        Converte a coluna para datetime64
+
+        Retorna (datas, invalidas): invalidas marca valores preenchidos que
+        não puderam ser convertidos.
+        """
+        serie = como_serie(valores)
+        codigos, unicos = pd.factorize(serie.astype(object), use_na_sentinel=True)
+
+        convertidos = [self.cache.get(valor, _AUSENTE) for valor in unicos]
+        novos = [pos for pos, data in enumerate(convertidos) if data is _AUSENTE]
+        if novos:
+            for pos, data in zip(novos, self._converter_unicos([unicos[pos] for pos in novos])):
+                self.cache[unicos[pos]] = data
+                convertidos[pos] = data
+
+        # Código -1 (ausente) aponta para o NaT acrescentado no final
+        tabela = pd.DatetimeIndex(convertidos + [pd.NaT]).to_numpy()
+        datas = pd.Series(tabela[codigos], index=serie.index)
+
+        preenchido = serie.notna().to_numpy() & (serie.astype(str).str.strip() != '').to_numpy()
+        if self.somente_texto:
+            ignorados = np.array([self._ignorado(valor) for valor in unicos] + [True])
+            preenchido &= ~ignorados[codigos]
+        invalidas = pd.Series(preenchido & datas.isna().to_numpy(), index=serie.index)
+        return datas, invalidas
+
+    def formatar(self, valores, formato: str = '%d/%m/%Y') -> Tuple[pd.Series, pd.Series]:
+        """Converte e devolve as datas como texto (None onde não converteu)"""
+        datas, invalidas = self.converter(valores)
+        texto = datas.dt.strftime(formato).astype(object).where(datas.notna(), None)
+        return texto, invalidas
@@ -0,0 +1,246 @@
+"""
+Registro de tipos compactos por dataset
+
+Os consolidados (clientes, DAVs, itens, OS, caixa) chegam como colunas
+object: cada loja, status ou forma de pagamento é uma str Python por linha.
+ESQUEMAS declara, por dataset, o tipo compacto de cada coluna (categoria para
+colunas com poucos valores, texto em Arrow, inteiros anuláveis pequenos,
+float32 para dioptrias, datas). aplicar() só converte quando não perde
+informação (inteiro cabe no tipo, float32 devolve o mesmo valor, toda data
+é reconhecida); o resto fica como está e aparece no relatório.
+
+Categorias e números pequenos ficam gravados no Parquet (salvar_parquet);
+o texto Arrow volta como string comum do Parquet, então ler() aplica o
+esquema de novo ao carregar.
+
+    df = ler('data/clientes/_consolidado/clientes_unificados.parquet')
+    salvar_parquet(df, destino, 'clientes')
+    imprimir_relatorio(relatorio(df_original, df))
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .normalizar import USAR_ARROW
+
+CATEGORIA = 'category'
+# NaN como ausente e máscaras numpy (mesmo comportamento das colunas object nos filtros)
+TEXTO = 'string[pyarrow_numpy]' if USAR_ARROW else object
+DIOPTRIA = 'float32'
+DATA = 'datetime64[ns]'
+
+_DIOPTRIAS_OS = {coluna: DIOPTRIA for coluna in [
+    'esf', 'cil', 'dnp', 'altura', 'esf2', 'cil3', 'dnp5', 'altura6', 'esf7', 'cil8', 'dnp10', 'altura11',
+    'esf12', 'cil13', 'dnp15', 'altura16', 'adicao',
+]}
+
+ESQUEMAS: Dict[str, Dict[str, object]] = {
+    'clientes': {
+        'id_cliente': 'Int32', 'nome': TEXTO, 'cpf': TEXTO, 'telefone1': TEXTO, 'telefone2': TEXTO,
+        'email': TEXTO, 'origem': CATEGORIA,
+    },
+    'vendas_dav': {
+        'id_dav': 'Int32', 'nro_dav': TEXTO, 'id_loja': CATEGORIA, 'origem': CATEGORIA, 'status': CATEGORIA,
+        'descricao': TEXTO, 'dh_dav': DATA, 'dt_prev_entrega': DATA, 'dt_entrega': DATA,
+        'id_vendedor': CATEGORIA, 'vendedor': CATEGORIA, 'id_operador': CATEGORIA, 'operador': CATEGORIA,
+        'id_caixa': CATEGORIA, 'meios_contato': TEXTO, 'mes_ref': CATEGORIA, 'arquivo': CATEGORIA,
+        'id_cliente': TEXTO,
+    },
+    'itens_dav': {
+        'id_loja': CATEGORIA, 'nro_dav': TEXTO, 'item': 'Int16', 'produto': CATEGORIA, 'modelo': CATEGORIA,
+        'grupo': CATEGORIA, 'detalhe': TEXTO, 'qtd': 'float32', 'mes_ref': CATEGORIA, 'arquivo': CATEGORIA,
+    },
+    'os_para_cliente': {'nro_dav': TEXTO, 'id_loja': CATEGORIA, 'id_cliente': 'Int32'},
+    'vendas_os': {
+        'loja': CATEGORIA, 'data_de_compra': DATA, 'consultor': CATEGORIA, 'venda': CATEGORIA,
+        'nome': TEXTO, 'cpf': TEXTO, 'bairro': CATEGORIA, 'prev_de_entr': DATA, 'vta': CATEGORIA,
+        'como_conheceu': CATEGORIA, 'eixo': 'Int16', 'eixo4': 'Int16', 'eixo9': 'Int16', 'eixo14': 'Int16',
+        **_DIOPTRIAS_OS,
+        'pagto_1': CATEGORIA, 'pagto_2': CATEGORIA, 'armacao_com_garantia': CATEGORIA,
+        '_id_loja_codigo': CATEGORIA, 'origem': CATEGORIA,
+    },
+    'receitas_os': {
+        'conjunto': 'Int8', 'olho': CATEGORIA, 'distancia': CATEGORIA, 'esferico': DIOPTRIA,
+        'cilindrico': DIOPTRIA, 'eixo': 'Int16', 'dnp': DIOPTRIA, 'altura': DIOPTRIA, 'adicao': DIOPTRIA,
+    },
+    'dioptrias_os': {
+        **{f'{olho}_{campo}': DIOPTRIA for olho in ['od', 'oe']
+           for campo in ['esferico', 'cilindrico', 'adicao', 'dnp']},
+        'od_eixo': 'Int16', 'oe_eixo': 'Int16', 'dp_total': DIOPTRIA, 'altura_montagem': DIOPTRIA,
+    },
+    'pagamentos_os': {'pagamento': 'Int8', 'forma_pagamento': CATEGORIA, 'forma_original': CATEGORIA,
+                      'parcelas': 'Int8'},
+    'produtos_os': {'tipo_produto': CATEGORIA, 'item': 'Int8'},
+    'caixa_vend': {
+        'loja': CATEGORIA, 'Loja': CATEGORIA, 'data_venda': DATA, 'data_completa': DATA, 'dia': CATEGORIA,
+        'mes_ano': CATEGORIA, 'cliente': TEXTO, 'forma_pagamento': CATEGORIA, 'vendedor': CATEGORIA,
+        'observacoes': TEXTO, 'linha_bruta': TEXTO,
+    },
+    'caixa_rec_carn': {
+        'loja': CATEGORIA, 'Loja': CATEGORIA, 'data_recebimento': DATA, 'data_completa': DATA,
+        'dia': CATEGORIA, 'mes_ano': CATEGORIA, 'cliente': TEXTO, 'forma_pagamento': CATEGORIA,
+        'numero_parcela': CATEGORIA, 'descricao_parcela': CATEGORIA, 'observacoes': TEXTO, 'linha_bruta': TEXTO,
+    },
+}
+
+# Nome do arquivo (sem extensão) → dataset; prefixos para os arquivos com timestamp
+ARQUIVOS = {
+    'clientes_unificados': 'clientes',
+    'clientes_lookup': 'clientes',
+    'clientes_os_com_ids': 'clientes',
+    'clientes_vixen_normalizado': 'clientes',
+    'lista_dav_com_cliente': 'vendas_dav',
+    'conf_dav_itens': 'itens_dav',
+    'os_para_cliente_map': 'os_para_cliente',
+    'vendas_os_completo': 'vendas_os',
+    'receitas_os': 'receitas_os',
+    'dioptrias_os': 'dioptrias_os',
+    'pagamentos_os': 'pagamentos_os',
+    'produtos_os': 'produtos_os',
+    'dioptrias_os_rejeitados': 'dioptrias_os',
+    'pagamentos_os_rejeitados': 'pagamentos_os',
+    'produtos_os_rejeitados': 'produtos_os',
+}
+PREFIXOS = {
+    'VEND_COMPLETO_': 'caixa_vend',
+    'TABELA_VEND_EXTRAIDA_': 'caixa_vend',
+    'REC_CARN_COMPLETO_': 'caixa_rec_carn',
+    'TABELA_REC_CARN_EXTRAIDA_': 'caixa_rec_carn',
+}
+
+
+def dataset_do_arquivo(caminho) -> Optional[str]:
+    nome = Path(caminho).name.split('.')[0]
+    if nome in ARQUIVOS:
+        return ARQUIVOS[nome]
+    return next((dataset for prefixo, dataset in PREFIXOS.items() if nome.startswith(prefixo)), None)
+
+
+def _inteiro(serie: pd.Series, tipo: str) -> Optional[pd.Series]:
+    if not (pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie)):
+        return None
+    valores = serie.dropna()
+    limites = np.iinfo(tipo.lower())
+    if len(valores) and ((valores % 1 != 0).any() or valores.min() < limites.min or valores.max() > limites.max):
+        return None
+    return serie.astype(tipo)
+
+
+def _float32(serie: pd.Series) -> Optional[pd.Series]:
+    if not pd.api.types.is_float_dtype(serie):
+        return None
+    convertido = serie.astype('float32')
+    # Só quando float32 guarda exatamente o mesmo valor (passos de 0,25 nas dioptrias)
+    iguais = (convertido.astype('float64') == serie) | serie.isna()
+    return convertido if iguais.all() else None
+
+
+def _data(serie: pd.Series) -> Optional[pd.Series]:
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return None
+    if serie.dtype != object and not isinstance(serie.dtype, pd.StringDtype):
+        return None
+    convertido = pd.to_datetime(serie, errors='coerce', format='ISO8601')
+    return convertido if convertido.notna().sum() == serie.notna().sum() else None
+
+
+def _texto(serie: pd.Series) -> Optional[pd.Series]:
+    if TEXTO is object or serie.dtype == TEXTO:
+        return None
+    if serie.dtype != object and not isinstance(serie.dtype, pd.StringDtype):
+        return None
+    if pd.api.types.infer_dtype(serie, skipna=True) not in ('string', 'empty'):
+        return None
+    return serie.astype(TEXTO)
+
+
+def converter(serie: pd.Series, tipo) -> Optional[pd.Series]:
+    """Coluna no tipo compacto, ou None se a conversão perderia informação (ou não se aplica)"""
+    if tipo == CATEGORIA:
+        return None if isinstance(serie.dtype, pd.CategoricalDtype) else serie.astype(CATEGORIA)
+    if tipo == TEXTO:
+        return _texto(serie)
+    if tipo == DATA:
+        return _data(serie)
+    if tipo in ('float32', DIOPTRIA):
+        return _float32(serie)
+    if isinstance(tipo, str) and tipo.startswith('Int'):
+        return None if serie.dtype == tipo else _inteiro(serie, tipo)
+    return None
+
+
+def aplicar(df: pd.DataFrame, dataset: Optional[str]) -> pd.DataFrame:
+    """Novo DataFrame com as colunas do esquema convertidas (colunas ausentes são ignoradas)"""
+    esquema = ESQUEMAS.get(dataset, {})
+    convertidas = {}
+    for coluna, tipo in esquema.items():
+        if coluna in df.columns:
+            convertido = converter(df[coluna], tipo)
+            if convertido is not None:
+                convertidas[coluna] = convertido
+    return df.assign(**convertidas) if convertidas else df
+
+
+def memoria(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+def relatorio(antes: pd.DataFrame, depois: pd.DataFrame, dataset: Optional[str] = None) -> dict:
+    """Memória antes/depois por coluna e colunas do esquema que ficaram sem converter"""
+    esquema = ESQUEMAS.get(dataset, {})
+    colunas = {
+        coluna: {'antes': int(antes[coluna].memory_usage(deep=True, index=False)),
+                 'depois': int(depois[coluna].memory_usage(deep=True, index=False)),
+                 'tipo': str(depois[coluna].dtype)}
+        for coluna in depois.columns
+    }
+    bytes_antes, bytes_depois = memoria(antes), memoria(depois)
+    return {
+        'dataset': dataset,
+        'linhas': len(depois),
+        'antes': bytes_antes,
+        'depois': bytes_depois,
+        'economia': 1 - bytes_depois / bytes_antes if bytes_antes else 0.0,
+        'colunas': colunas,
+        'mantidas': [c for c in esquema if c in depois.columns and depois[c].dtype != esquema[c]],
+    }
+
+
+def imprimir_relatorio(resultado: dict):
+    mb = 1024 * 1024
+    print(f"   📦 {resultado['dataset'] or '-'}: {resultado['linhas']:,} linhas, "
+          f"{resultado['antes'] / mb:.1f} MB → {resultado['depois'] / mb:.1f} MB "
+          f"({resultado['economia']:.0%} a menos)")
+    maiores = sorted(resultado['colunas'].items(), key=lambda item: item[1]['depois'] - item[1]['antes'])
+    for coluna, info in maiores[:5]:
+        if info['depois'] < info['antes']:
+            print(f"      {coluna:<24} {info['antes'] / mb:7.2f} → {info['depois'] / mb:7.2f} MB  {info['tipo']}")
+    if resultado['mantidas']:
+        print(f"      ⚠️  Sem conversão (valores fora do tipo): {', '.join(resultado['mantidas'])}")
+
+
+def ler(caminho, dataset: Optional[str] = None, **opcoes) -> pd.DataFrame:
+    """Parquet, CSV ou Excel com o esquema do dataset (deduzido pelo nome do arquivo)"""
+    caminho = Path(caminho)
+    if caminho.suffix == '.parquet':
+        df = pd.read_parquet(caminho, **opcoes)
+    elif caminho.suffix == '.csv':
+        df = pd.read_csv(caminho, **{'low_memory': False, **opcoes})
+    else:
+        df = pd.read_excel(caminho, **opcoes)
+    return aplicar(df, dataset or dataset_do_arquivo(caminho))
+
+
+def salvar_parquet(df: pd.DataFrame, caminho, dataset: Optional[str] = None) -> pd.DataFrame:
+    """Grava o DataFrame já compacto (categorias e inteiros pequenos ficam no Parquet)"""
+    caminho = Path(caminho)
+    compacto = aplicar(df, dataset or dataset_do_arquivo(caminho))
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_suffix('.tmp')
+    compacto.to_parquet(temporario, index=False)
+    os.replace(temporario, caminho)
+    return compacto
@@ -0,0 +1,184 @@
+"""
+Exportação de CSV em blocos, dividida por tamanho
+
+dividir_csv_marketing_correto.py lia o CSV inteiro no pandas e cortava as
+partes por uma estimativa de linhas por MB (partes podiam passar do limite do
+Supabase), e os geradores montavam o DataFrame completo antes do to_csv.
+DivisorCSV recebe registros já codificados (ou blocos de DataFrame), conta os
+bytes de cada um e abre uma nova parte quando o próximo registro passaria do
+limite, sempre no fim de um registro e com o cabeçalho repetido em cada parte.
+Campos entre aspas com quebra de linha continuam no mesmo registro. Com
+comprimir=True as partes saem em .csv.gz gravadas na hora; o limite vale para
+o conteúdo CSV (a parte comprimida fica menor). A memória usada é a de um bloco.
+
+    with DivisorCSV('dados/csv/marketing_partes', limite_bytes=10 * MB) as divisor:
+        for bloco in pd.read_csv(arquivo, chunksize=TAMANHO_BLOCO):
+            divisor.escrever_df(bloco)
+    partes = divisor.partes  # [{'arquivo', 'linhas', 'bytes', 'tamanho'}]
+
+    partes = dividir_csv(arquivo, pasta, limite_bytes=10 * MB)  # sem pandas
+"""
+
+import gzip
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+MB = 1024 * 1024
+LIMITE_PADRAO = 10 * MB
+TAMANHO_BLOCO = 50_000
+MODELO_PARTES = 'parte_{numero:02d}_de_{total:02d}.csv'
+
+
+def registros_csv(linhas: Iterable[bytes]) -> Iterator[bytes]:
+    """Junta linhas físicas em registros CSV: com aspas abertas o registro continua na linha seguinte"""
+    pendente = []
+    aspas = 0
+    for linha in linhas:
+        pendente.append(linha)
+        aspas += linha.count(b'"')
+        if aspas % 2 == 0:
+            yield b''.join(pendente)
+            pendente = []
+            aspas = 0
+    if pendente:
+        yield b''.join(pendente)
+
+
+class DivisorCSV:
+    """
+    Grava registros CSV em partes de até limite_bytes (None: arquivo único).
+    Os nomes saem de modelo com {numero} e {total}, renomeados no fechar()
+    quando o total de partes é conhecido.
+    """
+
+    def __init__(self, pasta, limite_bytes: Optional[int] = LIMITE_PADRAO, modelo: str = MODELO_PARTES,
+                 comprimir: bool = False, encoding: str = 'utf-8'):
+        self.pasta = Path(pasta)
+        self.limite_bytes = limite_bytes
+        self.modelo = modelo
+        self.comprimir = comprimir
+        self.encoding = encoding
+
+        self.cabecalho: Optional[bytes] = None
+        self.partes: List[Dict] = []
+        self.arquivo_atual = None
+        self.bytes_parte = 0
+
+    def __enter__(self) -> 'DivisorCSV':
+        return self
+
+    def __exit__(self, tipo, erro, traceback):
+        if tipo is None:
+            self.fechar()
+        else:
+            self.descartar()
+
+    def definir_cabecalho(self, linha: bytes):
+        self.cabecalho = linha if linha.endswith(b'\n') else linha + b'\n'
+
+    def abrir_parte(self):
+        self.fechar_parte()
+        self.pasta.mkdir(parents=True, exist_ok=True)
+        temporario = self.pasta / f".parte_{os.getpid()}_{len(self.partes) + 1:04d}.tmp"
+        self.arquivo_atual = gzip.open(temporario, 'wb', compresslevel=6) if self.comprimir else open(temporario, 'wb')
+        self.partes.append({'temporario': temporario, 'linhas': 0, 'bytes': 0})
+        self.bytes_parte = 0
+        if self.cabecalho:
+            self.arquivo_atual.write(self.cabecalho)
+            self.bytes_parte = len(self.cabecalho)
+
+    def fechar_parte(self):
+        if self.arquivo_atual is not None:
+            self.arquivo_atual.close()
+            self.partes[-1]['bytes'] = self.bytes_parte
+            self.arquivo_atual = None
+
+    def escrever(self, registro: bytes):
+        """Um registro completo (terminado em \\n); abre nova parte se ele passaria do limite"""
+        if self.arquivo_atual is None or (
+            self.limite_bytes and self.partes[-1]['linhas']
+            and self.bytes_parte + len(registro) > self.limite_bytes
+        ):
+            self.abrir_parte()
+        self.arquivo_atual.write(registro)
+        self.bytes_parte += len(registro)
+        self.partes[-1]['linhas'] += 1
+
+    def escrever_registros(self, registros: Iterable[bytes]) -> int:
+        quantidade = 0
+        for registro in registros:
+            self.escrever(registro)
+            quantidade += 1
+        return quantidade
+
+    def escrever_df(self, df: pd.DataFrame, **opcoes) -> int:
+        """Bloco de DataFrame via to_csv; o primeiro bloco define o cabeçalho. opcoes vão para o to_csv"""
+        opcoes = {'index': False, 'lineterminator': '\n', **opcoes}
+        if self.cabecalho is None:
+            self.definir_cabecalho(df.iloc[:0].to_csv(**opcoes).encode(self.encoding))
+        if df.empty:
+            return 0
+        dados = df.to_csv(header=False, **opcoes).encode(self.encoding)
+        return self.escrever_registros(registros_csv(dados.splitlines(keepends=True)))
+
+    def fechar(self) -> List[Dict]:
+        """Fecha a última parte e dá os nomes finais; devolve [{'arquivo', 'linhas', 'bytes', 'tamanho'}]"""
+        if not self.partes:
+            self.abrir_parte()  # Exportação vazia: só o cabeçalho, como o to_csv
+        self.fechar_parte()
+
+        total = len(self.partes)
+        for numero, parte in enumerate(self.partes, 1):
+            if 'temporario' not in parte:
+                continue
+            nome = self.modelo.format(numero=numero, total=total)
+            if self.comprimir:
+                nome += '.gz'
+            destino = self.pasta / nome
+            os.replace(parte.pop('temporario'), destino)
+            parte['arquivo'] = destino
+            parte['tamanho'] = destino.stat().st_size
+        return self.partes
+
+    def descartar(self):
+        """Remove as partes temporárias (erro no meio da exportação)"""
+        if self.arquivo_atual is not None:
+            self.arquivo_atual.close()
+            self.arquivo_atual = None
+        for parte in self.partes:
+            if 'temporario' in parte:
+                parte.pop('temporario').unlink(missing_ok=True)
+        self.partes = []
+
+
+def exportar_csv(blocos: Iterable[pd.DataFrame], arquivo, comprimir: bool = False, **opcoes) -> Dict:
+    """Arquivo único gravado bloco a bloco (no lugar de df.to_csv(arquivo))"""
+    arquivo = Path(arquivo)
+    with DivisorCSV(arquivo.parent, limite_bytes=None, modelo=arquivo.name, comprimir=comprimir) as divisor:
+        for bloco in blocos:
+            divisor.escrever_df(bloco, **opcoes)
+    return divisor.partes[0]
+
+
+def blocos_df(df: pd.DataFrame, tamanho: int = TAMANHO_BLOCO) -> Iterator[pd.DataFrame]:
+    """Fatias de até tamanho linhas (uma fatia vazia se df for vazio, para o cabeçalho)"""
+    for inicio in range(0, max(len(df), 1), tamanho):
+        yield df.iloc[inicio:inicio + tamanho]
+
+
+def dividir_csv(arquivo, pasta, limite_bytes: int = LIMITE_PADRAO, modelo: str = MODELO_PARTES,
+                comprimir: bool = False) -> List[Dict]:
+    """Divide um CSV existente lendo linha a linha; os bytes de cada registro são copiados sem reinterpretar"""
+    arquivo = Path(arquivo)
+    abrir = gzip.open if arquivo.suffix == '.gz' else open
+    with abrir(arquivo, 'rb') as entrada:
+        registros = registros_csv(entrada)
+        with DivisorCSV(pasta, limite_bytes=limite_bytes, modelo=modelo, comprimir=comprimir) as divisor:
+            cabecalho = next(registros, None)
+            if cabecalho is not None:
+                divisor.definir_cabecalho(cabecalho)
+            divisor.escrever_registros(registros)
+    return divisor.partes
@@ -0,0 +1,157 @@
+"""
+Registro persistente de IDs de cliente (CLI_000001, ...)
+
+criar_sistema_id_cliente.py montava a chave de cada cliente linha a linha
+(iterrows + gerar_chave_cliente) e numerava os IDs pela ordem de chegada, então
+o mesmo cliente mudava de ID sempre que a base vinha em outra ordem.
+chaves_clientes calcula as chaves coluna a coluna (CPF > Nome+Data > Nome >
+Hash, mesmas regras) e RegistroIDs guarda o mapa chave → número em
+data/processed/REGISTRO_IDS_CLIENTES.parquet: chaves já vistas recebem o ID
+gravado e só as novas ganham números, depois do maior já usado. Na primeira
+execução a numeração é a mesma da ordem de chegada.
+
+    chaves = chaves_clientes(df['nome_completo'], df['cpf'], df['data_nascimento'])
+    registro = RegistroIDs()
+    df['ID_CLIENTE'] = registro.atribuir(chaves)
+    registro.salvar()
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .normalizar import em_valores_unicos, somente_digitos, texto
+
+ARQUIVO_REGISTRO = Path("data/processed/REGISTRO_IDS_CLIENTES.parquet")
+
+PREFIXO_ID = 'CLI_'
+DIGITOS_ID = 6
+
+
+def _nome_chave(nome: pd.Series) -> pd.Series:
+    """Maiúsculas, sem pontuação e com espaços simples (strip antes da limpeza, como na versão por linha)"""
+    limpo = (nome.str.upper().str.strip()
+             .str.replace(r'[^\w\s]', '', regex=True)
+             .str.replace(r'\s+', ' ', regex=True))
+    return limpo.where(limpo != '', None)
+
+
+def _hash_chave(nome, cpf, data_nascimento) -> str:
+    dados_hash = str(nome or '') + str(cpf or '') + str(data_nascimento or '')
+    return f"HASH_{hashlib.md5(dados_hash.encode()).hexdigest()[:8]}"
+
+
+def chaves_clientes(nome, cpf, data_nascimento=None) -> pd.Series:
+    """
+    Chave de cada cliente, igual a SistemaIDCliente.gerar_chave_cliente:
+    CPF_<11 dígitos>, NOME_DATA_<nome>_<data>, NOME_<nome> ou HASH_<md5>
+    """
+    indice = nome.index if isinstance(nome, pd.Series) else None
+    nome = pd.Series(nome).reset_index(drop=True)
+    cpf = pd.Series(cpf).reset_index(drop=True)
+    if data_nascimento is None:
+        data_nascimento = pd.Series([None] * len(nome), dtype=object)
+    data_nascimento = pd.Series(data_nascimento).reset_index(drop=True)
+
+    cpf_limpo = somente_digitos(cpf)
+    cpf_limpo = cpf_limpo.where(cpf_limpo.str.len() == 11)
+
+    # \w Unicode (acentos) precisa do re do Python; uma vez por nome distinto
+    nome_limpo = em_valores_unicos(texto(nome, arrow=False), _nome_chave)
+
+    data_str = em_valores_unicos(
+        texto(data_nascimento, arrow=False),
+        lambda datas: datas.str.replace('/', '', regex=False).str.replace('-', '', regex=False).str[:8]
+    )
+
+    chaves = pd.Series(None, index=nome.index, dtype=object)
+    com_nome = nome_limpo.notna()
+    com_data = com_nome & data_nascimento.notna()
+    chaves[com_nome] = 'NOME_' + nome_limpo[com_nome]
+    chaves[com_data] = 'NOME_DATA_' + nome_limpo[com_data] + '_' + data_str[com_data]
+    com_cpf = cpf_limpo.notna()
+    chaves[com_cpf] = 'CPF_' + cpf_limpo[com_cpf]
+
+    # Último recurso, sem nome nem CPF: poucas linhas, hash calculado por linha
+    sem_chave = chaves.isna().to_numpy()
+    if sem_chave.any():
+        chaves[sem_chave] = [
+            _hash_chave(n, c, d) for n, c, d in zip(
+                nome[sem_chave].tolist(), cpf[sem_chave].tolist(), data_nascimento[sem_chave].tolist()
+            )
+        ]
+    if indice is not None:
+        chaves.index = indice
+    return chaves
+
+
+def formatar_id(numeros, prefixo: str = PREFIXO_ID, digitos: int = DIGITOS_ID) -> pd.Series:
+    return prefixo + pd.Series(numeros).astype(str).str.zfill(digitos)
+
+
+class RegistroIDs:
+    """Mapa chave → número persistido em parquet; números nunca são reaproveitados"""
+
+    def __init__(self, arquivo=ARQUIVO_REGISTRO, prefixo: str = PREFIXO_ID, digitos: int = DIGITOS_ID):
+        self.arquivo = Path(arquivo)
+        self.prefixo = prefixo
+        self.digitos = digitos
+        self.estatisticas = {'existentes': 0, 'novos': 0}
+        self.alterado = False
+        self.carregar()
+
+    def carregar(self):
+        if self.arquivo.exists():
+            registro = pd.read_parquet(self.arquivo, columns=['chave', 'numero'])
+        else:
+            registro = pd.DataFrame({'chave': pd.Series(dtype=object), 'numero': pd.Series(dtype='int64')})
+        self.chaves = registro['chave'].to_numpy(dtype=object)
+        self.numeros = registro['numero'].to_numpy(dtype='int64')
+        self.indice = pd.Index(self.chaves)
+
+    @property
+    def proximo_numero(self) -> int:
+        return int(self.numeros.max()) + 1 if len(self.numeros) else 1
+
+    def atribuir(self, chaves) -> pd.Series:
+        """ID de cada chave (alinhado à entrada); chaves novas numeradas na ordem em que aparecem"""
+        chaves = pd.Series(chaves)
+        codigos, unicas = pd.factorize(chaves)
+        if (codigos == -1).any():
+            raise ValueError("Chaves nulas não recebem ID")
+        posicoes = self.indice.get_indexer(unicas)
+
+        novas = posicoes == -1
+        self.estatisticas['existentes'] += int((~novas).sum())
+        self.estatisticas['novos'] += int(novas.sum())
+        if novas.any():
+            inicio = self.proximo_numero
+            numeros_novos = np.arange(inicio, inicio + int(novas.sum()), dtype='int64')
+            posicoes[novas] = len(self.chaves) + np.arange(int(novas.sum()))
+            self.chaves = np.concatenate([self.chaves, np.asarray(unicas[novas], dtype=object)])
+            self.numeros = np.concatenate([self.numeros, numeros_novos])
+            self.indice = pd.Index(self.chaves)
+            self.alterado = True
+
+        numeros = self.numeros[posicoes][codigos]
+        return pd.Series(
+            formatar_id(numeros, self.prefixo, self.digitos).to_numpy(), index=chaves.index, name='ID_CLIENTE'
+        )
+
+    def mapeamento(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            'Chave_Cliente': self.chaves,
+            'ID_Cliente': formatar_id(self.numeros, self.prefixo, self.digitos).to_numpy(),
+        })
+
+    def salvar(self):
+        if not self.alterado and self.arquivo.exists():
+            return
+        self.arquivo.parent.mkdir(parents=True, exist_ok=True)
+        temporario = self.arquivo.with_suffix('.tmp')
+        pd.DataFrame({'chave': self.chaves, 'numero': self.numeros}).to_parquet(temporario, index=False)
+        os.replace(temporario, self.arquivo)
+        self.alterado = False
@@ -0,0 +1,181 @@
+"""
+Índice de arquivos das pastas das lojas (OneDrive)
+
+Varrer a árvore de LOJAS com os.walk/rglob a cada execução leva minutos numa
+pasta sincronizada. IndiceArquivos lista os diretórios em paralelo com
+os.scandir e grava em JSON, para cada diretório, o mtime, as subpastas e os
+arquivos (caminho, tamanho, mtime e tipo detectado). Na próxima varredura só
+os diretórios cujo mtime mudou são listados de novo; os demais custam um stat.
+
+O mtime de um diretório muda quando arquivos são criados, removidos ou
+renomeados dentro dele (o OneDrive grava por substituição). Edições no lugar
+que não passam por rename só aparecem com atualizar(completo=True).
+"""
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PASTA_CACHE = Path("data/cache")
+
+EXTENSOES_EXCEL = ('.xlsx', '.xlsm', '.xls')
+
+MESES = ['jan', 'fev', 'mar', 'abr', 'mai', 'jun', 'jul', 'ago', 'set', 'out', 'nov', 'dez']
+PADRAO_CAIXA_MES = re.compile(rf"^({'|'.join(MESES)})_\d{{2}}\.xlsx$", re.IGNORECASE)
+
+VERSAO_INDICE = 1
+
+
+def classificar_arquivo(nome: str) -> Optional[str]:
+    """Tipo do arquivo pelo nome: OS_NOVA, CAIXA_MES, VIXEN ou None"""
+    if nome.startswith('~$'):
+        return None
+    maiusculo = nome.upper()
+    minusculo = nome.lower()
+    if ('OS_NOVA' in maiusculo or 'OS NOVA' in maiusculo) and minusculo.endswith(('.xlsm', '.xlsx')):
+        return 'OS_NOVA'
+    if PADRAO_CAIXA_MES.match(nome):
+        return 'CAIXA_MES'
+    if 'vixen' in minusculo and minusculo.endswith(EXTENSOES_EXCEL + ('.csv',)):
+        return 'VIXEN'
+    return None
+
+
+def listar_diretorio(caminho: str) -> Tuple[List[str], List[dict]]:
+    """Subpastas e arquivos de um diretório (um os.scandir, sem seguir links)"""
+    subpastas, arquivos = [], []
+    with os.scandir(caminho) as entradas:
+        for entrada in entradas:
+            try:
+                if entrada.is_dir(follow_symlinks=False):
+                    subpastas.append(entrada.name)
+                elif entrada.is_file(follow_symlinks=False):
+                    info = entrada.stat(follow_symlinks=False)
+                    arquivos.append({
+                        'nome': entrada.name,
+                        'tamanho': info.st_size,
+                        'mtime': info.st_mtime,
+                        'tipo': classificar_arquivo(entrada.name),
+                    })
+            except OSError:
+                # Arquivo removido durante a varredura ou sem permissão
+                continue
+    return sorted(subpastas), sorted(arquivos, key=lambda a: a['nome'])
+
+
+class IndiceArquivos:
+    """
+    Índice persistente de uma árvore de diretórios
+
+    Uso:
+        indice = IndiceArquivos(pasta_lojas)
+        indice.atualizar()
+        for arquivo in indice.arquivos('OS_NOVA'):
+            print(arquivo['caminho'], arquivo['tamanho'])
+    """
+
+    def __init__(self, raiz, arquivo_cache=None, workers: int = 8):
+        self.raiz = Path(raiz)
+        if arquivo_cache is None:
+            chave = hashlib.sha1(str(self.raiz.resolve()).encode('utf-8')).hexdigest()[:12]
+            arquivo_cache = PASTA_CACHE / f"indice_arquivos_{chave}.json"
+        self.arquivo_cache = Path(arquivo_cache)
+        self.workers = workers
+        self.diretorios: Dict[str, dict] = {}
+        self.estatisticas = {'diretorios_lidos': 0, 'diretorios_reaproveitados': 0, 'diretorios_com_erro': 0}
+        self.carregar()
+
+    def carregar(self):
+        """Lê o índice salvo (se existir e for da mesma raiz)"""
+        if not self.arquivo_cache.exists():
+            return
+        try:
+            with open(self.arquivo_cache, encoding='utf-8') as f:
+                dados = json.load(f)
+        except (OSError, ValueError):
+            return
+        if dados.get('versao') == VERSAO_INDICE and dados.get('raiz') == str(self.raiz):
+            self.diretorios = dados.get('diretorios', {})
+
+    def salvar(self):
+        self.arquivo_cache.parent.mkdir(parents=True, exist_ok=True)
+        temporario = self.arquivo_cache.with_suffix('.tmp')
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({'versao': VERSAO_INDICE, 'raiz': str(self.raiz), 'diretorios': self.diretorios},
+                      f, ensure_ascii=False)
+        os.replace(temporario, self.arquivo_cache)
+
+    def _visitar(self, relativo: str, completo: bool):
+        """Entrada do diretório: reaproveitada do cache se o mtime não mudou"""
+        caminho = self.raiz / relativo if relativo else self.raiz
+        try:
+            mtime_ns = os.stat(caminho).st_mtime_ns
+            anterior = self.diretorios.get(relativo)
+            if not completo and anterior and anterior['mtime_ns'] == mtime_ns:
+                return relativo, anterior, False
+            subpastas, arquivos = listar_diretorio(str(caminho))
+            return relativo, {'mtime_ns': mtime_ns, 'subpastas': subpastas, 'arquivos': arquivos}, True
+        except OSError:
+            return relativo, None, True
+
+    def atualizar(self, completo: bool = False, salvar: bool = True) -> 'IndiceArquivos':
+        """Varre a árvore nível a nível, listando em paralelo os diretórios alterados"""
+        self.estatisticas = {'diretorios_lidos': 0, 'diretorios_reaproveitados': 0, 'diretorios_com_erro': 0}
+        novos: Dict[str, dict] = {}
+        nivel = ['']
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while nivel:
+                proximo = []
+                for relativo, entrada, lido in executor.map(lambda r: self._visitar(r, completo), nivel):
+                    if entrada is None:
+                        self.estatisticas['diretorios_com_erro'] += 1
+                        continue
+                    self.estatisticas['diretorios_lidos' if lido else 'diretorios_reaproveitados'] += 1
+                    novos[relativo] = entrada
+                    proximo.extend(os.path.join(relativo, nome) if relativo else nome
+                                   for nome in entrada['subpastas'])
+                nivel = proximo
+
+        # Diretórios que sumiram ficam de fora
+        self.diretorios = novos
+        if salvar:
+            self.salvar()
+        return self
+
+    def arquivos(self, tipo: Optional[str] = None, sufixos: Optional[Tuple[str, ...]] = None) -> List[dict]:
+        """Arquivos indexados (com 'caminho' completo), filtrados por tipo e/ou extensão"""
+        resultado = []
+        for relativo, entrada in self.diretorios.items():
+            pasta = self.raiz / relativo if relativo else self.raiz
+            for arquivo in entrada['arquivos']:
+                if tipo is not None and arquivo['tipo'] != tipo:
+                    continue
+                if sufixos is not None and not arquivo['nome'].lower().endswith(sufixos):
+                    continue
+                resultado.append({**arquivo, 'caminho': pasta / arquivo['nome']})
+        return sorted(resultado, key=lambda a: str(a['caminho']))
+
+    def conteudo(self, pasta) -> Tuple[List[Path], List[dict]]:
+        """Subpastas e arquivos de uma pasta dentro da raiz (vazio se não indexada)"""
+        relativo = os.path.relpath(Path(pasta), self.raiz)
+        entrada = self.diretorios.get('' if relativo == '.' else relativo)
+        if entrada is None:
+            return [], []
+        pasta = Path(pasta)
+        subpastas = [pasta / nome for nome in entrada['subpastas']]
+        arquivos = [{**arquivo, 'caminho': pasta / arquivo['nome']} for arquivo in entrada['arquivos']]
+        return subpastas, arquivos
+
+    def pastas(self) -> List[Path]:
+        """Todos os diretórios indexados (exceto a raiz)"""
+        return sorted(self.raiz / relativo for relativo in self.diretorios if relativo)
+
+    def resumo(self) -> str:
+        e = self.estatisticas
+        return (f"{len(self.diretorios):,} pastas ({e['diretorios_lidos']:,} lidas, "
+                f"{e['diretorios_reaproveitados']:,} do cache)")
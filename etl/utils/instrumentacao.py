@@ -0,0 +1,350 @@
+"""
+Instrumentação das etapas do pipeline
+
+Os scripts só imprimiam linhas de progresso, então não havia como saber onde
+cada execução noturna gastava tempo. Cada etapa aberta com
+`instrumentacao.etapa(nome)` (ou decorada com `instrumentacao.medir()`) guarda
+linhas de entrada/saída, bytes lidos, tempo de relógio e de CPU e o pico de
+memória (RSS) durante a etapa; `persistir()` grava tudo em `logs_processamento`
+(LogProcessamento), que a API expõe em /api/metrics.
+
+- tempo_cpu: CPU da thread que executou a etapa (time.thread_time), correto
+  com etapas em paralelo no orquestrador; trabalho que a etapa repassa a
+  outras threads ou processos não entra.
+- memoria_pico_mb: pico de RSS do processo enquanto a etapa esteve aberta. No
+  Linux o pico do kernel (VmHWM) é zerado no início de cada etapa
+  (/proc/self/clear_refs), então não é o máximo desde o início do processo;
+  etapas simultâneas compartilham o mesmo processo e entram no pico umas das
+  outras. Sem /proc (Windows, macOS) fica vazio.
+
+    with instrumentacao.etapa('etapa1_arquivo', arquivo) as etapa:
+        etapa.registrar(entrada=len(bloco), saida=len(clientes))
+
+Processos longos que nunca chamam finalizar() (a API) desligam a coleta com
+`instrumentacao.desativar()`: as etapas dos serviços continuam funcionando,
+mas nada é guardado.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Contadores extras aceitos por registrar() que têm coluna em LogProcessamento
+CONTADORES = ('clientes_novos', 'clientes_atualizados', 'duplicatas_detectadas')
+
+
+STATUS_PROCESSO = Path('/proc/self/status')
+CLEAR_REFS = Path('/proc/self/clear_refs')
+
+
+def memoria_processo_mb() -> Tuple[Optional[float], Optional[float]]:
+    """(RSS atual, pico de RSS desde o último reinício) do processo, em MB"""
+    try:
+        linhas = STATUS_PROCESSO.read_text().splitlines()
+    except OSError:
+        return None, None
+    valores = {}
+    for linha in linhas:
+        if linha.startswith(('VmRSS:', 'VmHWM:')):
+            chave, valor = linha.split(':', 1)
+            valores[chave] = int(valor.split()[0]) / 1024
+    return valores.get('VmRSS'), valores.get('VmHWM')
+
+
+def reiniciar_pico_memoria() -> bool:
+    """Zera o pico de RSS do kernel (VmHWM) para o RSS atual"""
+    try:
+        CLEAR_REFS.write_text('5')
+        return True
+    except OSError:
+        return False
+
+
+@dataclass
+class Etapa:
+    """Medidas de uma etapa (span) do pipeline"""
+    nome: str
+    arquivo: Optional[str] = None
+    linhas_entrada: int = 0
+    linhas_saida: int = 0
+    linhas_erro: int = 0
+    bytes_lidos: int = 0
+    contadores: Dict[str, int] = field(default_factory=dict)
+    tempo: float = 0.0
+    tempo_cpu: float = 0.0
+    memoria_pico_mb: Optional[float] = None
+    memoria_inicio_mb: Optional[float] = None
+    status: str = 'sucesso'
+    erro: Optional[str] = None
+    inicio: datetime = field(default_factory=datetime.now)
+
+    def registrar(self, entrada: int = 0, saida: int = 0, erro: int = 0, **contadores):
+        """Soma linhas lidas/geradas/com erro e contadores (ex.: duplicatas_detectadas)"""
+        self.linhas_entrada += int(entrada)
+        self.linhas_saida += int(saida)
+        self.linhas_erro += int(erro)
+        for nome, valor in contadores.items():
+            self.contadores[nome] = self.contadores.get(nome, 0) + int(valor)
+
+    def ler(self, caminho):
+        """Conta o tamanho do arquivo em bytes_lidos (e o usa como nome, se não houver)"""
+        caminho = Path(caminho)
+        if self.arquivo is None:
+            self.arquivo = caminho.name
+        try:
+            self.bytes_lidos += caminho.stat().st_size
+        except OSError:
+            pass
+
+    def falhar(self, erro):
+        """Marca a etapa como erro sem interromper o script (erros já tratados)"""
+        self.status = 'erro'
+        self.erro = str(erro)
+
+    def como_dict(self) -> dict:
+        return {
+            'etapa': self.nome,
+            'arquivo': self.arquivo,
+            'linhas_entrada': self.linhas_entrada,
+            'linhas_saida': self.linhas_saida,
+            'linhas_erro': self.linhas_erro,
+            'bytes_lidos': self.bytes_lidos,
+            'tempo': round(self.tempo, 4),
+            'tempo_cpu': round(self.tempo_cpu, 4),
+            'memoria_pico_mb': round(self.memoria_pico_mb, 1) if self.memoria_pico_mb is not None else None,
+            'memoria_inicio_mb': round(self.memoria_inicio_mb, 1) if self.memoria_inicio_mb is not None else None,
+            'status': self.status,
+            'erro': self.erro,
+            'inicio': self.inicio.isoformat(timespec='seconds'),
+            **self.contadores
+        }
+
+
+class Instrumentacao:
+    """Coleta as etapas de uma execução e grava em LogProcessamento"""
+
+    def __init__(self, execucao: Optional[str] = None, coletar: bool = True):
+        self.execucao = execucao or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        self.coletar = coletar
+        self.etapas: List[Etapa] = []
+        # Etapas abertas (de qualquer thread): o pico do kernel é um só por processo
+        self.abertas: List[Etapa] = []
+        self.trava = threading.Lock()
+
+    def desativar(self):
+        """Para de guardar etapas (processo sem finalizar(), como a API)"""
+        with self.trava:
+            self.coletar = False
+            self.etapas = []
+
+    def _acumular_pico(self):
+        """Leva o pico de RSS atual para todas as etapas abertas (antes de zerá-lo ou ao fechar uma)"""
+        _, pico = memoria_processo_mb()
+        if pico is None:
+            return
+        for aberta in self.abertas:
+            if aberta.memoria_pico_mb is not None:
+                aberta.memoria_pico_mb = max(aberta.memoria_pico_mb, pico)
+
+    def _abrir(self, atual: Etapa):
+        with self.trava:
+            self._acumular_pico()
+            if reiniciar_pico_memoria():
+                atual.memoria_inicio_mb, atual.memoria_pico_mb = memoria_processo_mb()
+            self.abertas.append(atual)
+
+    def _fechar(self, atual: Etapa):
+        with self.trava:
+            self._acumular_pico()
+            self.abertas.remove(atual)
+            self.etapas.append(atual)
+
+    @contextmanager
+    def etapa(self, nome: str, arquivo=None):
+        """Mede o bloco; exceções marcam a etapa como erro e são repassadas"""
+        atual = Etapa(nome)
+        if not self.coletar:
+            yield atual
+            return
+        if arquivo is not None:
+            atual.ler(arquivo)
+
+        self._abrir(atual)
+        inicio_relogio = time.perf_counter()
+        inicio_cpu = time.thread_time()
+        try:
+            yield atual
+        except Exception as e:
+            atual.falhar(e)
+            raise
+        finally:
+            atual.tempo = time.perf_counter() - inicio_relogio
+            atual.tempo_cpu = time.thread_time() - inicio_cpu
+            if atual.status == 'sucesso' and atual.linhas_erro:
+                atual.status = 'parcial'
+            self._fechar(atual)
+
+    def medir(self, nome: Optional[str] = None):
+        """Decorador: mede a função; len() do retorno vira linhas_saida"""
+        def decorador(funcao):
+            @wraps(funcao)
+            def medida(*args, **kwargs):
+                with self.etapa(nome or funcao.__qualname__) as atual:
+                    resultado = funcao(*args, **kwargs)
+                    if hasattr(resultado, '__len__') and not isinstance(resultado, (str, bytes)):
+                        atual.registrar(saida=len(resultado))
+                    return resultado
+            return medida
+        return decorador
+
+    def tabela(self) -> pd.DataFrame:
+        return pd.DataFrame([e.como_dict() for e in self.etapas])
+
+    def resumo(self):
+        """Imprime tempo, CPU, linhas e memória por etapa"""
+        if not self.etapas:
+            return
+
+        df = self.tabela()
+        agrupado = df.groupby('etapa', sort=False).agg(
+            chamadas=('etapa', 'size'),
+            tempo=('tempo', 'sum'),
+            tempo_cpu=('tempo_cpu', 'sum'),
+            linhas_entrada=('linhas_entrada', 'sum'),
+            linhas_saida=('linhas_saida', 'sum'),
+            memoria_pico_mb=('memoria_pico_mb', 'max')
+        )
+
+        print(f"\n⏱️ TEMPO POR ETAPA (execução {self.execucao}):")
+        print("=" * 80)
+        for nome, linha in agrupado.iterrows():
+            memoria = f"{linha['memoria_pico_mb']:,.0f} MB" if pd.notna(linha['memoria_pico_mb']) else "-"
+            print(f"   • {nome}: {linha['tempo']:.2f}s (CPU {linha['tempo_cpu']:.2f}s) | "
+                  f"{int(linha['linhas_entrada']):,} → {int(linha['linhas_saida']):,} linhas | "
+                  f"{int(linha['chamadas'])}x | pico {memoria}")
+
+    def registros_log(self) -> list:
+        """Etapas como linhas de LogProcessamento"""
+        from app.models.database import LogProcessamento
+
+        registros = []
+        for e in self.etapas:
+            registros.append(LogProcessamento(
+                execucao=self.execucao,
+                etapa=e.nome,
+                arquivo_nome=e.arquivo or e.nome,
+                arquivo_tamanho=e.bytes_lidos or None,
+                linhas_processadas=e.linhas_entrada,
+                linhas_saida=e.linhas_saida,
+                linhas_erro=e.linhas_erro,
+                tempo_processamento=e.tempo,
+                tempo_cpu=e.tempo_cpu,
+                memoria_pico_mb=e.memoria_pico_mb,
+                status=e.status,
+                erro_detalhes=e.erro,
+                data_processamento=e.inicio,
+                **{nome: e.contadores[nome] for nome in CONTADORES if nome in e.contadores}
+            ))
+        return registros
+
+    def persistir(self, url: Optional[str] = None) -> int:
+        """Grava as etapas ainda não gravadas; falhas do banco não param o script"""
+        if not self.etapas:
+            return 0
+
+        try:
+            from sqlalchemy.orm import Session
+            from app.models.repositorio import criar_engine, criar_tabela_logs
+
+            engine = criar_engine(url)
+            criar_tabela_logs(engine)
+            with Session(engine) as sessao:
+                sessao.add_all(self.registros_log())
+                sessao.commit()
+        except Exception as e:
+            logger.warning(f"Métricas não gravadas em logs_processamento: {e}")
+            return 0
+
+        gravadas = len(self.etapas)
+        self.etapas = []
+        print(f"📈 {gravadas} etapas gravadas em logs_processamento (execução {self.execucao})")
+        return gravadas
+
+    def finalizar(self, url: Optional[str] = None) -> int:
+        """Resumo no console + gravação no banco (fim do main dos scripts)"""
+        self.resumo()
+        return self.persistir(url)
+
+
+def carregar_metricas(url: Optional[str] = None, execucao: Optional[str] = None, limite: int = 10) -> list:
+    """Execuções gravadas (mais recentes primeiro) com os totais de cada etapa, agregados no banco"""
+    from sqlalchemy import case, func, inspect, select
+    from app.models.database import LogProcessamento
+    from app.models.repositorio import criar_engine, criar_tabela_logs
+
+    engine = criar_engine(url)
+    if not inspect(engine).has_table('logs_processamento'):
+        return []
+    # Banco anterior às colunas de métricas: acrescenta antes de consultar
+    criar_tabela_logs(engine)
+
+    log = LogProcessamento.__table__
+    inicio = func.min(log.c.data_processamento).label('inicio')
+    consulta_execucoes = select(log.c.execucao, inicio, func.sum(log.c.tempo_processamento).label('tempo_total'))
+    consulta_execucoes = consulta_execucoes.where(log.c.execucao.isnot(None))
+    if execucao:
+        consulta_execucoes = consulta_execucoes.where(log.c.execucao == execucao)
+    consulta_execucoes = consulta_execucoes.group_by(log.c.execucao).order_by(inicio.desc()).limit(limite)
+
+    with engine.connect() as conexao:
+        execucoes = conexao.execute(consulta_execucoes).mappings().all()
+        if not execucoes:
+            return []
+        etapas = pd.DataFrame(conexao.execute(
+            select(
+                log.c.execucao, log.c.etapa,
+                func.count().label('chamadas'),
+                func.sum(log.c.tempo_processamento).label('tempo'),
+                func.sum(log.c.tempo_cpu).label('tempo_cpu'),
+                func.sum(log.c.linhas_processadas).label('linhas_entrada'),
+                func.sum(log.c.linhas_saida).label('linhas_saida'),
+                func.sum(log.c.linhas_erro).label('linhas_erro'),
+                func.sum(log.c.arquivo_tamanho).label('bytes_lidos'),
+                func.max(log.c.memoria_pico_mb).label('memoria_pico_mb'),
+                func.sum(case((log.c.status == 'erro', 1), else_=0)).label('erros'),
+            )
+            .where(log.c.execucao.in_([linha['execucao'] for linha in execucoes]))
+            .group_by(log.c.execucao, log.c.etapa)
+        ).mappings().all())
+
+    inteiras = ['chamadas', 'linhas_entrada', 'linhas_saida', 'linhas_erro', 'bytes_lidos', 'erros']
+    etapas[inteiras] = etapas[inteiras].fillna(0).astype(int)
+    por_execucao = {nome: grupo for nome, grupo in etapas.groupby('execucao', sort=False)}
+
+    resultado = []
+    for linha in execucoes:
+        grupo = por_execucao[linha['execucao']].drop(columns='execucao').sort_values('tempo', ascending=False)
+        grupo = grupo.round(4).astype(object).where(grupo.notna(), None)
+        data_inicio = pd.Timestamp(linha['inicio'])
+        resultado.append({
+            'execucao': linha['execucao'],
+            'inicio': data_inicio.isoformat() if pd.notna(data_inicio) else None,
+            'tempo_total': round(float(linha['tempo_total'] or 0), 4),
+            'etapas': grupo.to_dict('records'),
+        })
+    return resultado
+
+
+# Coletor do processo: scripts e serviços compartilham a mesma execução
+instrumentacao = Instrumentacao()
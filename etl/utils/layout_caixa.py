@@ -0,0 +1,151 @@
+"""
+Cache de layout das seções das planilhas de caixa
+
+Os extratores de caixa (scripts/processamento/extrator_tabela_*.py e
+extrair_5_tabelas_padrao.py) procuravam o cabeçalho de cada seção juntando o
+texto de todas as linhas da aba e depois adivinhavam cada campo olhando os
+valores da linha. As abas de uma loja seguem sempre o mesmo modelo, então
+CacheLayoutCaixa aprende, na primeira aba, a linha de cabeçalho de cada seção
+(células de texto e suas colunas) e grava em data/cache/layout_caixa.json, por
+loja e hash do cabeçalho. Nas abas seguintes basta procurar o texto da âncora
+em uma coluna e conferir o hash da linha; as colunas dos campos saem dos
+rótulos do cabeçalho. Se nenhum layout conhecido confere, o extrator volta à
+detecção completa e aprende o novo modelo.
+
+    encontrado = cache.localizar(df, 'MAUA', 'VEND')
+    if encontrado is None:
+        inicio = ...  # detecção completa
+        layout = cache.aprender(df, 'MAUA', 'VEND', inicio)
+    else:
+        inicio, layout = encontrado
+    colunas = layout.colunas({'Nº Venda': 'numero_venda', 'Cliente': 'cliente'})
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+PASTA_CACHE = Path("data/cache")
+ARQUIVO_CACHE = PASTA_CACHE / "layout_caixa.json"
+
+VERSAO_CACHE = 1
+
+
+def celulas_texto(linha) -> List[Tuple[int, str]]:
+    """(coluna, texto em maiúsculas) das células de texto da linha; números (totais do dia) ficam de fora"""
+    celulas = []
+    for coluna, valor in enumerate(linha):
+        if isinstance(valor, str) and valor.strip():
+            celulas.append((coluna, valor.strip().upper()))
+    return celulas
+
+
+def hash_cabecalho(celulas: List[Tuple[int, str]]) -> str:
+    return hashlib.sha1(json.dumps(celulas, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+@dataclass
+class LayoutSecao:
+    """Linha de cabeçalho de uma seção em um modelo de planilha"""
+    tipo: str
+    cabecalho: List[Tuple[int, str]]
+    hash: str
+
+    @property
+    def coluna_ancora(self) -> int:
+        return self.cabecalho[0][0]
+
+    @property
+    def ancora(self) -> str:
+        return self.cabecalho[0][1]
+
+    def colunas(self, campos: Dict[str, str], opcionais: Dict[str, str] = None) -> Optional[Dict[str, int]]:
+        """
+        Coluna de cada campo pelo rótulo do cabeçalho ({rótulo: campo}); None se
+        faltar algum dos campos obrigatórios (os opcionais ausentes ficam de fora)
+        """
+        por_rotulo = {texto: coluna for coluna, texto in self.cabecalho}
+        colunas = {campo: por_rotulo.get(rotulo.upper()) for rotulo, campo in campos.items()}
+        if any(coluna is None for coluna in colunas.values()):
+            return None
+        for rotulo, campo in (opcionais or {}).items():
+            if rotulo.upper() in por_rotulo:
+                colunas[campo] = por_rotulo[rotulo.upper()]
+        return colunas
+
+
+class CacheLayoutCaixa:
+    """Layouts das seções por loja, persistidos em JSON"""
+
+    def __init__(self, arquivo_cache=ARQUIVO_CACHE):
+        self.arquivo_cache = Path(arquivo_cache)
+        self.layouts: Dict[str, Dict[str, dict]] = {}
+        self.estatisticas = {'acertos': 0, 'falhas': 0, 'aprendidos': 0}
+        self.carregar()
+
+    def carregar(self):
+        if not self.arquivo_cache.exists():
+            return
+        try:
+            with open(self.arquivo_cache, encoding='utf-8') as f:
+                dados = json.load(f)
+        except (OSError, ValueError):
+            return
+        if dados.get('versao') == VERSAO_CACHE:
+            self.layouts = dados.get('lojas', {})
+
+    def salvar(self):
+        self.arquivo_cache.parent.mkdir(parents=True, exist_ok=True)
+        temporario = self.arquivo_cache.with_suffix('.tmp')
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({'versao': VERSAO_CACHE, 'lojas': self.layouts}, f, ensure_ascii=False, indent=1)
+        os.replace(temporario, self.arquivo_cache)
+
+    def conhecidos(self, loja: str, tipo: str) -> List[LayoutSecao]:
+        return [
+            LayoutSecao(tipo, [tuple(c) for c in info['cabecalho']], hash_)
+            for hash_, info in self.layouts.get(loja, {}).items() if info['tipo'] == tipo
+        ]
+
+    def localizar(self, df: pd.DataFrame, loja: str, tipo: str) -> Optional[Tuple[int, LayoutSecao]]:
+        """(posição da linha do cabeçalho, layout) se algum layout conhecido da loja confere com a aba"""
+        colunas_texto = {}
+        for layout in self.conhecidos(loja, tipo):
+            coluna = layout.coluna_ancora
+            if coluna >= df.shape[1]:
+                continue
+            if coluna not in colunas_texto:
+                colunas_texto[coluna] = [
+                    valor.strip().upper() if isinstance(valor, str) else None
+                    for valor in df.iloc[:, coluna].tolist()
+                ]
+            for posicao, texto in enumerate(colunas_texto[coluna]):
+                if texto == layout.ancora and hash_cabecalho(celulas_texto(df.iloc[posicao].tolist())) == layout.hash:
+                    self.estatisticas['acertos'] += 1
+                    return posicao, layout
+
+        self.estatisticas['falhas'] += 1
+        return None
+
+    def aprender(self, df: pd.DataFrame, loja: str, tipo: str, inicio: int) -> Optional[LayoutSecao]:
+        """Guarda a linha de cabeçalho (posição) encontrada pela detecção completa"""
+        celulas = celulas_texto(df.iloc[inicio].tolist())
+        if not celulas:
+            return None
+        layout = LayoutSecao(tipo, celulas, hash_cabecalho(celulas))
+        lojas = self.layouts.setdefault(loja, {})
+        if layout.hash not in lojas:
+            lojas[layout.hash] = {'tipo': tipo, 'cabecalho': [list(c) for c in celulas]}
+            self.estatisticas['aprendidos'] += 1
+            self.salvar()
+        return layout
+
+
+def loja_do_arquivo(arquivo) -> str:
+    """Loja pela pasta: data/caixa_lojas/<LOJA>/<ano_prefixo>/<mes>.xlsx"""
+    return Path(arquivo).parent.parent.name
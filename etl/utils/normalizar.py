@@ -0,0 +1,582 @@
+"""
+Normalização vetorizada de CPF, telefone, CEP, email e nomes
+
+Todas as funções recebem uma coluna inteira (pd.Series, lista ou array Arrow)
+e devolvem uma pd.Series com o mesmo índice, usando None onde o valor está
+ausente ou é inválido. As regras reproduzem as versões linha a linha que
+existiam nos scripts (etapa1, consolidacao_por_loja, DeduplicadorClientes,
+PadronizadorClientesVixen e gerar_sqls_povoamento).
+"""
+
+import importlib.util
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from unidecode import unidecode
+
+# Com pyarrow instalado as regras de dígitos/email rodam nos kernels Arrow
+# (RE2); nomes e endereços usam o re do Python por causa de \w Unicode
+USAR_ARROW = importlib.util.find_spec('pyarrow') is not None
+
+TITULOS = ['DR', 'DRA', 'SR', 'SRA', 'SRTA', 'PROF', 'ENG']
+CONECTORES = ['DE', 'DA', 'DO', 'DAS', 'DOS', 'E']
+
+ABREVIACOES_ENDERECO = {
+    r'\bR\b\.?': 'RUA',
+    r'\bAV\b\.?': 'AVENIDA',
+    r'\bTRAV\b\.?': 'TRAVESSA',
+    r'\bAL\b\.?': 'ALAMEDA',
+    r'\bPCA\b\.?': 'PRACA',
+    r'\bEST\b\.?': 'ESTRADA',
+    r'\bROD\b\.?': 'RODOVIA',
+    r'\bAPT\b\.?': 'APARTAMENTO',
+    r'\bCONJ\b\.?': 'CONJUNTO',
+    r'\bBL\b\.?': 'BLOCO',
+    r'\bQD\b\.?': 'QUADRA',
+    r'\bLT\b\.?': 'LOTE'
+}
+
+_PESOS_DV1 = np.arange(10, 1, -1)
+_PESOS_DV2 = np.arange(11, 1, -1)
+
+
+def como_serie(valores) -> pd.Series:
+    """Aceita pd.Series, arrays Arrow ou sequências e devolve pd.Series"""
+    if isinstance(valores, pd.Series):
+        return valores
+    if hasattr(valores, 'to_pandas'):
+        # pyarrow.Array / pyarrow.ChunkedArray
+        return valores.to_pandas()
+    return pd.Series(valores, dtype=object)
+
+
+def texto(valores, arrow: bool = USAR_ARROW) -> pd.Series:
+    """
+    Converte para texto (str) mantendo ausentes como nulos
+
+    arrow=True devolve string[pyarrow]; use arrow=False quando a regra
+    depender de regex Unicode do Python.
+    """
+    serie = como_serie(valores)
+    if arrow and isinstance(serie.dtype, pd.StringDtype) and serie.dtype.storage == 'pyarrow':
+        return serie
+    serie = serie.astype(object)
+    convertido = serie.astype(str).where(serie.notna())
+    return convertido.astype('string[pyarrow]') if arrow else convertido
+
+
+def _mascara(condicao: pd.Series) -> np.ndarray:
+    """Converte condição (possivelmente com nulos) em array booleano"""
+    return condicao.fillna(False).to_numpy(dtype=bool)
+
+
+def _finalizar(serie: pd.Series, valido) -> pd.Series:
+    """Devolve a série em dtype object com None onde não é válido"""
+    if isinstance(valido, pd.Series):
+        valido = _mascara(valido)
+    return serie.astype(object).where(valido, None)
+
+
+# Conteúdos em que valores iguais pelo factorize também têm o mesmo texto
+_TIPOS_HOMOGENEOS = {'string', 'integer', 'floating', 'boolean', 'bytes', 'empty'}
+
+
+def _fatorar(serie: pd.Series):
+    """
+    pd.factorize que não junta valores de tipos diferentes
+
+    Em colunas object o factorize trata 12345678909 e 12345678909.0 (ou 1 e
+    True) como o mesmo valor, e a linha com o int receberia o resultado
+    calculado para o float. Com tipos misturados o código passa a ser
+    (valor, tipo) e o representante de cada código é a primeira linha dele.
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    if serie.dtype != object or pd.api.types.infer_dtype(serie, skipna=True) in _TIPOS_HOMOGENEOS:
+        return codigos, unicos
+    dados = serie.to_numpy()
+    presentes = codigos >= 0
+    codigos_tipo, tipos = pd.factorize(np.array([type(valor) for valor in dados], dtype=object))
+    novos, _ = pd.factorize(codigos[presentes].astype(np.int64) * len(tipos) + codigos_tipo[presentes])
+    # Códigos do factorize seguem a ordem de primeira ocorrência
+    _, primeiras = np.unique(novos, return_index=True)
+    codigos = np.full(len(dados), -1, dtype=np.intp)
+    codigos[presentes] = novos
+    return codigos, dados[presentes][primeiras]
+
+
+def por_valor_unico(valores, funcao: Callable) -> pd.Series:
+    """
+    Aplica uma função escalar apenas uma vez por valor distinto
+
+    Útil para regras que não têm equivalente vetorizado (ex.: unidecode),
+    já que nomes, datas e cidades se repetem muito entre as linhas.
+    """
+    serie = como_serie(valores)
+    codigos, unicos = _fatorar(serie)
+    convertidos = np.array([funcao(valor) for valor in unicos] + [None], dtype=object)
+    # Código -1 (ausente) aponta para o None acrescentado no final
+    return pd.Series(convertidos[codigos], index=serie.index, dtype=object)
+
+
+def em_valores_unicos(valores, funcao_serie: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """
+    Aplica uma transformação vetorizada só sobre os valores distintos
+
+    A transformação recebe e devolve uma pd.Series; o resultado é expandido
+    de volta para todas as linhas pelos códigos do factorize.
+    """
+    serie = como_serie(valores)
+    codigos, unicos = _fatorar(serie)
+    convertidos = funcao_serie(pd.Series(unicos, dtype=object)).to_numpy(dtype=object)
+    convertidos = np.append(convertidos, None)
+    return pd.Series(convertidos[codigos], index=serie.index, dtype=object)
+
+
+def _digitos(valores) -> pd.Series:
+    return texto(valores).str.replace(r'[^0-9]', '', regex=True)
+
+
+def somente_digitos(valores) -> pd.Series:
+    """Remove tudo que não é dígito"""
+    digitos = _digitos(valores)
+    return _finalizar(digitos, digitos.notna())
+
+
+def texto_limpo(valores) -> pd.Series:
+    """str(valor).strip() para preenchidos e None para ausentes"""
+    limpo = texto(valores).str.strip()
+    return _finalizar(limpo, limpo.notna())
+
+
+def numero(valores) -> pd.Series:
+    """Converte para float aceitando vírgula decimal; texto não numérico vira NaN"""
+    serie = como_serie(valores)
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        return serie.astype(float)
+    limpo = texto(serie).str.strip().str.replace(',', '.', regex=False)
+    return pd.to_numeric(limpo, errors='coerce').astype(float)
+
+
+# ---------------------------------------------------------------------------
+# CPF
+# ---------------------------------------------------------------------------
+
+def cpf_valido(valores) -> pd.Series:
+    """Valida os dígitos verificadores do CPF (máscara booleana)"""
+    digitos = _digitos(valores)
+    tamanho_ok = _mascara(digitos.str.len() == 11)
+    resultado = np.zeros(len(digitos), dtype=bool)
+
+    if tamanho_ok.any():
+        candidatos = digitos[tamanho_ok].to_numpy(dtype=object).astype('S11')
+        matriz = np.frombuffer(candidatos.tobytes(), dtype=np.uint8).reshape(-1, 11).astype(np.int64) - 48
+
+        dv1 = (matriz[:, :9] @ _PESOS_DV1) * 10 % 11 % 10
+        dv2 = (matriz[:, :10] @ _PESOS_DV2) * 10 % 11 % 10
+        repetido = (matriz == matriz[:, :1]).all(axis=1)
+
+        resultado[tamanho_ok] = (dv1 == matriz[:, 9]) & (dv2 == matriz[:, 10]) & ~repetido
+
+    return pd.Series(resultado, index=digitos.index)
+
+
+def limpar_cpf(valores, formatar: bool = True, validar_digitos: bool = False) -> pd.Series:
+    """
+    Limpa CPF mantendo apenas os com 11 dígitos
+
+    formatar=True devolve 000.000.000-00, senão apenas os dígitos.
+    validar_digitos=True descarta também os CPFs com dígito verificador errado.
+    """
+    digitos = _digitos(valores)
+    valido = _mascara(digitos.str.len() == 11)
+    if validar_digitos:
+        valido &= cpf_valido(digitos).to_numpy()
+
+    if formatar:
+        digitos = digitos.str.replace(r'^(\d{3})(\d{3})(\d{3})(\d{2})$', r'\1.\2.\3-\4', regex=True)
+
+    return _finalizar(digitos, valido)
+
+
+# ---------------------------------------------------------------------------
+# Telefones
+# ---------------------------------------------------------------------------
+
+def _substituir(serie: pd.Series, mascara: np.ndarray, transformar: Callable) -> pd.Series:
+    """Aplica a transformação apenas nas linhas da máscara"""
+    if not mascara.any():
+        return serie
+    serie = serie.copy()
+    serie[mascara] = transformar(serie[mascara])
+    return serie
+
+
+def _inserir_nove(digitos: pd.Series, mascara: np.ndarray, posicao: int) -> pd.Series:
+    """Insere o dígito 9 na posição indicada nas linhas da máscara"""
+    return _substituir(digitos, mascara, lambda d: d.str[:posicao] + '9' + d.str[posicao:])
+
+
+def reparar_nono_digito(digitos: pd.Series) -> pd.Series:
+    """Insere o 9º dígito em celulares antigos (8 dígitos iniciados em 6-9)"""
+    n = digitos.str.len()
+    com_ddd = _mascara((n == 10) & digitos.str.match(r'\d{2}[6-9]'))
+    digitos = _inserir_nove(digitos, com_ddd, 2)
+    sem_ddd = _mascara((n == 8) & digitos.str.match(r'[6-9]'))
+    return _inserir_nove(digitos, sem_ddd, 0)
+
+
+def normalizar_telefone(valores) -> pd.Series:
+    """
+    Normaliza telefone para comparação (apenas dígitos)
+
+    Remove o código do país e insere o 9 em números de 10 dígitos,
+    como no DeduplicadorClientes.
+    """
+    tel = _digitos(valores)
+    com_pais = _mascara((tel.str.len() > 11) & tel.str.startswith('55'))
+    tel = _substituir(tel, com_pais, lambda t: t.str[2:])
+    tel = _inserir_nove(tel, _mascara(tel.str.len() == 10), 2)
+    return _finalizar(tel, tel.notna())
+
+
+def limpar_celular_sp(valores, reparar_nono: bool = False) -> pd.Series:
+    """
+    Limpa e padroniza celular para o formato SP: (11) 9xxxx-xxxx
+
+    reparar_nono=True recupera celulares gravados antes do 9º dígito
+    em vez de descartá-los.
+    """
+    cel = _digitos(valores)
+    if reparar_nono:
+        cel = reparar_nono_digito(cel)
+
+    # Mesma ordem de prioridade do if/elif original: cada linha usa a primeira regra que casar
+    n = cel.str.len()
+    regras = [
+        (n == 9, lambda c: '11' + c),
+        (n == 10, lambda c: '11' + c),
+        ((n == 11) & cel.str.startswith('1'), None),
+        (n == 11, lambda c: '11' + c.str[2:]),
+        ((n == 13) & cel.str.startswith('55'), lambda c: '11' + c.str[4:]),
+        (n > 11, lambda c: '11' + c.str[-9:]),
+    ]
+    pendente = np.ones(len(cel), dtype=bool)
+    for condicao, transformar in regras:
+        casou = _mascara(condicao) & pendente
+        pendente &= ~casou
+        if transformar is not None:
+            cel = _substituir(cel, casou, transformar)
+
+    valido = cel.str.fullmatch(r'119\d{8}')
+    formatado = cel.str.replace(r'^11(\d{5})(\d{4})$', r'(11) \1-\2', regex=True)
+    return _finalizar(formatado, valido)
+
+
+def formatar_telefone(valores) -> pd.Series:
+    """
+    Formata telefone como (11) 94240-5279 ou (11) 4240-5279
+
+    Valores que não têm 10 ou 11 dígitos são devolvidos como texto original.
+    """
+    original = texto(valores)
+    digitos = original.str.replace(r'[^0-9]', '', regex=True)
+    formatado = (
+        digitos
+        .str.replace(r'^(\d{2})(\d{5})(\d{4})$', r'(\1) \2-\3', regex=True)
+        .str.replace(r'^(\d{2})(\d{4})(\d{4})$', r'(\1) \2-\3', regex=True)
+    )
+    resultado = original.mask(_mascara(digitos.str.len().isin([10, 11])), formatado)
+    return _finalizar(resultado, resultado.notna())
+
+
+# ---------------------------------------------------------------------------
+# CEP
+# ---------------------------------------------------------------------------
+
+def limpar_cep(valores) -> pd.Series:
+    """Mantém apenas os dígitos do CEP (no máximo 8), exige pelo menos 5"""
+    digitos = _digitos(valores)
+    return _finalizar(digitos.str[:8], digitos.str.len() >= 5)
+
+
+# ---------------------------------------------------------------------------
+# Email
+# ---------------------------------------------------------------------------
+
+def normalizar_email(valores) -> pd.Series:
+    """Minúsculas, sem espaços e com validação básica (@ e .)"""
+    email = texto(valores).str.lower().str.strip()
+    valido = email.str.contains('@', regex=False) & email.str.contains('.', regex=False)
+    return _finalizar(email, valido)
+
+
+def limpar_email(valores, tamanho_maximo: int = 100) -> pd.Series:
+    """
+    Limpa email para carga no banco
+
+    Remove acentos e caracteres inválidos e exige um único @ seguido de domínio com ponto.
+    """
+    email = texto(valores).str.strip()
+    # Só valores com caracteres não ASCII precisam da decomposição NFD
+    acentuado = _mascara(email.str.contains(r'[^\x00-\x7f]', regex=True))
+    if acentuado.any():
+        email = email.mask(acentuado, texto(email[acentuado]).str.normalize('NFD'))
+    email = email.str.replace(r'[^a-zA-Z0-9@._\-+%]', '', regex=True)
+
+    valido = email.str.fullmatch(r'[^@]*@[^@]*\.[^@]*') & (email.str.len() <= tamanho_maximo)
+    return _finalizar(email, valido)
+
+
+# ---------------------------------------------------------------------------
+# Nomes e endereços (regex Unicode do Python, aplicadas por valor distinto)
+# ---------------------------------------------------------------------------
+
+def _normalizar_nome_unicos(nome: pd.Series) -> pd.Series:
+    return (
+        texto(nome, arrow=False)
+        .str.upper()
+        .str.strip()
+        .str.replace(r'[^\w\s]', '', regex=True)
+        .str.replace(r'\s+', ' ', regex=True)
+    )
+
+
+def normalizar_nome(valores) -> pd.Series:
+    """Maiúsculas, sem pontuação e com espaços simples"""
+    nome = em_valores_unicos(valores, _normalizar_nome_unicos)
+    return _finalizar(nome, nome.str.len() > 0)
+
+
+def _remover_palavras(serie: pd.Series, palavras) -> pd.Series:
+    padrao = r'(?<!\S)(?:' + '|'.join(palavras) + r')(?!\S)'
+    return serie.str.replace(padrao, ' ', regex=True).str.split().str.join(' ')
+
+
+def _normalizar_nome_comparacao_unicos(nome: pd.Series) -> pd.Series:
+    nome = texto(nome, arrow=False).str.strip().str.upper()
+    nome = nome.map(unidecode, na_action='ignore')
+    nome = _remover_palavras(nome, TITULOS)
+
+    # Conectores só saem de nomes com mais de duas palavras
+    longo = _mascara(nome.str.count(' ') >= 2)
+    return nome.mask(longo, _remover_palavras(nome, CONECTORES))
+
+
+def normalizar_nome_comparacao(valores) -> pd.Series:
+    """
+    Normaliza nome para comparação fuzzy
+
+    Sem acentos, sem títulos (DR, SRA...) e sem conectores (DE, DA...)
+    quando o nome tem mais de duas palavras.
+    """
+    nome = em_valores_unicos(valores, _normalizar_nome_comparacao_unicos)
+    return _finalizar(nome, nome.notna())
+
+
+def _normalizar_endereco_unicos(endereco: pd.Series) -> pd.Series:
+    endereco = texto(endereco, arrow=False).str.strip().str.upper()
+    endereco = endereco.map(unidecode, na_action='ignore')
+    for padrao, substituto in ABREVIACOES_ENDERECO.items():
+        endereco = endereco.str.replace(padrao, substituto, regex=True)
+    return endereco
+
+
+def normalizar_endereco(valores) -> pd.Series:
+    """Normaliza endereço sem acentos e com abreviações por extenso"""
+    endereco = em_valores_unicos(valores, _normalizar_endereco_unicos)
+    return _finalizar(endereco, endereco.notna())
+
+
+
+# ---------------------------------------------------------------------------
+# Chaves de OS e loja (caixa, planilhas de OS e exports)
+# ---------------------------------------------------------------------------
+
+def _codigo_os_unicos(valores: pd.Series) -> pd.Series:
+    # 8434.0 (lido como float) e ' 08434' viram '8434'
+    codigo = texto(valores, arrow=False).str.strip().str.replace(r'\.0+$', '', regex=True)
+    return codigo.str.replace(r'[^0-9]', '', regex=True).str.lstrip('0')
+
+
+def codigo_os(valores) -> pd.Series:
+    """Número da OS só com dígitos e sem zeros à esquerda (None se não houver dígitos)"""
+    codigo = em_valores_unicos(valores, _codigo_os_unicos)
+    return _finalizar(codigo, codigo.str.len() > 0)
+
+
+def _nome_loja_unicos(valores: pd.Series) -> pd.Series:
+    loja = texto(valores, arrow=False).str.strip().str.upper().map(unidecode, na_action='ignore')
+    return loja.str.replace(r'[\s\-]+', '_', regex=True)
+
+
+def nome_loja(valores) -> pd.Series:
+    """Nome da loja sem acentos, em maiúsculas e com _ no lugar de espaços (RIO PEQUENO → RIO_PEQUENO)"""
+    loja = em_valores_unicos(valores, _nome_loja_unicos)
+    return _finalizar(loja, loja.str.len() > 0)
+
+
+# ---------------------------------------------------------------------------
+# Um único valor (validações por linha, busca, comparação de pares)
+# ---------------------------------------------------------------------------
+# Montar uma pd.Series por valor custa centenas de vezes mais que a regra em
+# si; cada função vetorizada usada por linha tem aqui a versão em Python puro
+# com o mesmo resultado. As demais passam por um cache de valores distintos.
+
+_RE_NAO_DIGITO = re.compile(r'[^0-9]')
+_RE_PONTUACAO = re.compile(r'[^\w\s]')
+_RE_ESPACOS = re.compile(r'\s+')
+_RE_CELULAR_ANTIGO = re.compile(r'\d{2}[6-9]')
+_RE_CELULAR_SP = re.compile(r'119\d{8}')
+_ABREVIACOES_COMPILADAS = [(re.compile(padrao), substituto) for padrao, substituto in ABREVIACOES_ENDERECO.items()]
+
+
+def _texto_valor(valor) -> Optional[str]:
+    if valor is None or (pd.api.types.is_scalar(valor) and pd.isna(valor)):
+        return None
+    return str(valor)
+
+
+def _digitos_valor(valor) -> Optional[str]:
+    texto_valor = _texto_valor(valor)
+    return None if texto_valor is None else _RE_NAO_DIGITO.sub('', texto_valor)
+
+
+def _cpf_valido_valor(digitos: str) -> bool:
+    numeros = [int(d) for d in digitos]
+    dv1 = sum(n * p for n, p in zip(numeros[:9], range(10, 1, -1))) * 10 % 11 % 10
+    dv2 = sum(n * p for n, p in zip(numeros[:10], range(11, 1, -1))) * 10 % 11 % 10
+    return dv1 == numeros[9] and dv2 == numeros[10] and len(set(numeros)) > 1
+
+
+def _limpar_cpf_valor(valor, formatar: bool = True, validar_digitos: bool = False):
+    digitos = _digitos_valor(valor)
+    if digitos is None or len(digitos) != 11 or (validar_digitos and not _cpf_valido_valor(digitos)):
+        return None
+    return f"{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}" if formatar else digitos
+
+
+def _normalizar_telefone_valor(valor):
+    tel = _digitos_valor(valor)
+    if tel is None:
+        return None
+    if len(tel) > 11 and tel.startswith('55'):
+        tel = tel[2:]
+    return tel[:2] + '9' + tel[2:] if len(tel) == 10 else tel
+
+
+def _limpar_celular_sp_valor(valor, reparar_nono: bool = False):
+    cel = _digitos_valor(valor)
+    if cel is None:
+        return None
+    if reparar_nono:
+        if len(cel) == 10 and _RE_CELULAR_ANTIGO.match(cel):
+            cel = cel[:2] + '9' + cel[2:]
+        elif len(cel) == 8 and cel[0] in '6789':
+            cel = '9' + cel
+
+    n = len(cel)
+    if n in (9, 10):
+        cel = '11' + cel
+    elif n == 11 and cel.startswith('1'):
+        pass
+    elif n == 11:
+        cel = '11' + cel[2:]
+    elif n == 13 and cel.startswith('55'):
+        cel = '11' + cel[4:]
+    elif n > 11:
+        cel = '11' + cel[-9:]
+
+    if not _RE_CELULAR_SP.fullmatch(cel):
+        return None
+    return f"(11) {cel[2:7]}-{cel[7:]}"
+
+
+def _formatar_telefone_valor(valor):
+    original = _texto_valor(valor)
+    if original is None:
+        return None
+    digitos = _RE_NAO_DIGITO.sub('', original)
+    if len(digitos) == 11:
+        return f"({digitos[:2]}) {digitos[2:7]}-{digitos[7:]}"
+    if len(digitos) == 10:
+        return f"({digitos[:2]}) {digitos[2:6]}-{digitos[6:]}"
+    return original
+
+
+def _limpar_cep_valor(valor):
+    digitos = _digitos_valor(valor)
+    return digitos[:8] if digitos is not None and len(digitos) >= 5 else None
+
+
+def _normalizar_email_valor(valor):
+    email = _texto_valor(valor)
+    if email is None:
+        return None
+    email = email.lower().strip()
+    return email if '@' in email and '.' in email else None
+
+
+def _normalizar_nome_valor(valor):
+    nome = _texto_valor(valor)
+    if nome is None:
+        return None
+    nome = _RE_ESPACOS.sub(' ', _RE_PONTUACAO.sub('', nome.upper().strip()))
+    return nome or None
+
+
+def _normalizar_nome_comparacao_valor(valor):
+    nome = _texto_valor(valor)
+    if nome is None:
+        return None
+    palavras = [p for p in unidecode(nome.strip().upper()).split() if p not in TITULOS]
+    if len(palavras) > 2:
+        palavras = [p for p in palavras if p not in CONECTORES]
+    return ' '.join(palavras)
+
+
+def _normalizar_endereco_valor(valor):
+    endereco = _texto_valor(valor)
+    if endereco is None:
+        return None
+    endereco = unidecode(endereco.strip().upper())
+    for padrao, substituto in _ABREVIACOES_COMPILADAS:
+        endereco = padrao.sub(substituto, endereco)
+    return endereco
+
+
+_ESCALARES: Dict[Callable, Callable] = {
+    somente_digitos: _digitos_valor,
+    limpar_cpf: _limpar_cpf_valor,
+    normalizar_telefone: _normalizar_telefone_valor,
+    limpar_celular_sp: _limpar_celular_sp_valor,
+    formatar_telefone: _formatar_telefone_valor,
+    limpar_cep: _limpar_cep_valor,
+    normalizar_email: _normalizar_email_valor,
+    normalizar_nome: _normalizar_nome_valor,
+    normalizar_nome_comparacao: _normalizar_nome_comparacao_valor,
+    normalizar_endereco: _normalizar_endereco_valor,
+}
+
+
+@lru_cache(maxsize=65536)
+def _escalar_em_cache(funcao: Callable, valor, kwargs: tuple):
+    return funcao(pd.Series([valor], dtype=object), **dict(kwargs)).iat[0]
+
+
+def escalar(funcao: Callable, valor, **kwargs):
+    """
+    Aplica uma das funções vetorizadas a um único valor
+
+    Para colunas, chame a função vetorizada sobre a coluna inteira.
+    """
+    versao_escalar = _ESCALARES.get(funcao)
+    if versao_escalar is not None:
+        return versao_escalar(valor, **kwargs)
+    try:
+        return _escalar_em_cache(funcao, valor, tuple(sorted(kwargs.items())))
+    except TypeError:
+        # Valor não hashable
+        return funcao(pd.Series([valor], dtype=object), **kwargs).iat[0]
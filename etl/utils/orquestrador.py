@@ -0,0 +1,285 @@
+"""
+Orquestrador do pipeline em processo, com etapas em paralelo
+
+recalcular_tudo.py chamava cada script com subprocess.run, um depois do
+outro: cada etapa reimportava pandas/openpyxl e o resultado era adivinhado
+pelas linhas com emoji do stdout. Aqui cada etapa declara o que lê e o que
+grava (padrões glob); as dependências saem desses arquivos (uma etapa depende
+de quem grava algum padrão que ela lê), etapas independentes rodam ao mesmo
+tempo em threads do mesmo processo e uma etapa cujas entradas e saídas não
+mudaram desde a última execução bem-sucedida é pulada. O estado fica em
+data/cache/orquestrador.json e cada execução grava um relatório JSON com o
+status e o tempo de cada etapa em data/execucoes/.
+
+    etapas = [
+        EtapaPipeline('clientes', 'scripts.criar_sistema_id_cliente:main',
+                      entradas=['data/processed/BASE_CLIENTES_MASTER_*.xlsx'],
+                      saidas=['data/processed/BASE_CLIENTES_COM_ID_*.xlsx']),
+        ...
+    ]
+    relatorio = Orquestrador(etapas, paralelo=3).executar()
+"""
+
+import hashlib
+import importlib
+import importlib.util
+import io
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from glob import glob
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from .instrumentacao import instrumentacao
+
+ARQUIVO_ESTADO = Path("data/cache/orquestrador.json")
+PASTA_RELATORIOS = Path("data/execucoes")
+
+VERSAO_ESTADO = 1
+
+# Status de cada etapa no relatório
+EXECUTADA = 'executada'
+PULADA = 'pulada'
+SEM_SAIDA = 'sem_saida'
+ERRO = 'erro'
+CANCELADA = 'cancelada'
+
+
+@dataclass
+class EtapaPipeline:
+    """Etapa com a função a chamar ('modulo:funcao' importado só na hora) e os arquivos que lê/grava"""
+    nome: str
+    funcao: Union[str, Callable[[], object]]
+    entradas: List[str] = field(default_factory=list)
+    saidas: List[str] = field(default_factory=list)
+    descricao: str = ''
+
+    def resolver(self) -> Callable[[], object]:
+        if callable(self.funcao):
+            return self.funcao
+        modulo, nome = self.funcao.split(':')
+        return getattr(importlib.import_module(modulo), nome)
+
+    def arquivo_codigo(self) -> Optional[str]:
+        """Arquivo do módulo da etapa sem importá-lo (mudança de código também refaz a etapa)"""
+        if callable(self.funcao):
+            return None
+        especificacao = importlib.util.find_spec(self.funcao.split(':')[0])
+        return especificacao.origin if especificacao else None
+
+
+def arquivos(padroes: List[str]) -> List[str]:
+    return sorted({arquivo for padrao in padroes for arquivo in glob(padrao)})
+
+
+def impressao_digital(padroes: List[str], extras: Optional[List[str]] = None) -> str:
+    """Hash de (caminho, tamanho, mtime) dos arquivos que casam com os padrões"""
+    itens = []
+    for arquivo in arquivos(padroes) + [e for e in (extras or []) if e]:
+        try:
+            info = os.stat(arquivo)
+        except OSError:
+            continue
+        itens.append((arquivo, info.st_size, info.st_mtime_ns))
+    return hashlib.sha1(json.dumps(itens).encode('utf-8')).hexdigest()
+
+
+class SaidaPorThread(io.TextIOBase):
+    """sys.stdout que manda o print de cada etapa para o buffer da thread que a executa"""
+
+    def __init__(self, original):
+        self.original = original
+        self.local = threading.local()
+
+    def capturar(self, buffer: Optional[io.StringIO]):
+        self.local.buffer = buffer
+
+    def write(self, texto):
+        buffer = getattr(self.local, 'buffer', None)
+        return (buffer or self.original).write(texto)
+
+    def flush(self):
+        self.original.flush()
+
+
+class Orquestrador:
+    """Executa as etapas respeitando as dependências, em até `paralelo` threads"""
+
+    def __init__(self, etapas: List[EtapaPipeline], paralelo: int = 3, forcar: bool = False,
+                 arquivo_estado=ARQUIVO_ESTADO, pasta_relatorios=PASTA_RELATORIOS):
+        self.etapas = {etapa.nome: etapa for etapa in etapas}
+        self.paralelo = max(1, paralelo)
+        self.forcar = forcar
+        self.arquivo_estado = Path(arquivo_estado)
+        self.pasta_relatorios = Path(pasta_relatorios)
+        self.dependencias = self.calcular_dependencias(etapas)
+        self.estado = self.carregar_estado()
+        self.resultados: Dict[str, dict] = {}
+
+    @staticmethod
+    def calcular_dependencias(etapas: List[EtapaPipeline]) -> Dict[str, List[str]]:
+        """B depende de A quando B lê um padrão que A grava; ciclos são erro"""
+        dependencias = {}
+        for etapa in etapas:
+            dependencias[etapa.nome] = [
+                outra.nome for outra in etapas
+                if outra is not etapa and set(etapa.entradas) & set(outra.saidas)
+            ]
+
+        visitando, prontas = set(), set()
+
+        def visitar(nome, caminho):
+            if nome in prontas:
+                return
+            if nome in visitando:
+                raise ValueError(f"Ciclo entre etapas: {' → '.join(caminho + [nome])}")
+            visitando.add(nome)
+            for dependencia in dependencias[nome]:
+                visitar(dependencia, caminho + [nome])
+            visitando.discard(nome)
+            prontas.add(nome)
+
+        for nome in dependencias:
+            visitar(nome, [])
+        return dependencias
+
+    def carregar_estado(self) -> Dict[str, dict]:
+        if not self.arquivo_estado.exists():
+            return {}
+        try:
+            with open(self.arquivo_estado, encoding='utf-8') as f:
+                dados = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return dados.get('etapas', {}) if dados.get('versao') == VERSAO_ESTADO else {}
+
+    def salvar_estado(self):
+        self.arquivo_estado.parent.mkdir(parents=True, exist_ok=True)
+        temporario = self.arquivo_estado.with_suffix('.tmp')
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({'versao': VERSAO_ESTADO, 'etapas': self.estado}, f, ensure_ascii=False, indent=1)
+        os.replace(temporario, self.arquivo_estado)
+
+    def digitais(self, etapa: EtapaPipeline) -> Dict[str, str]:
+        return {
+            'entradas': impressao_digital(etapa.entradas, [etapa.arquivo_codigo()]),
+            'saidas': impressao_digital(etapa.saidas),
+        }
+
+    def atualizada(self, etapa: EtapaPipeline) -> bool:
+        """Mesmas entradas (e código) e saídas intactas desde a última execução bem-sucedida"""
+        anterior = self.estado.get(etapa.nome)
+        return (not self.forcar and anterior is not None and bool(arquivos(etapa.saidas))
+                and anterior == self.digitais(etapa))
+
+    def rodar_etapa(self, etapa: EtapaPipeline, saida: SaidaPorThread) -> dict:
+        resultado = {'nome': etapa.nome, 'descricao': etapa.descricao, 'depende': self.dependencias[etapa.nome],
+                     'inicio': datetime.now().isoformat(timespec='seconds')}
+        antes = set(arquivos(etapa.saidas))
+        digital_saidas = impressao_digital(etapa.saidas)
+        buffer = io.StringIO()
+        saida.capturar(buffer)
+        inicio = time.perf_counter()
+        try:
+            with instrumentacao.etapa(f"pipeline_{etapa.nome}"):
+                retorno = etapa.resolver()()
+                if isinstance(retorno, int) and retorno != 0:
+                    raise RuntimeError(f"{etapa.funcao} retornou {retorno}")
+            status, erro = EXECUTADA, None
+        except SystemExit as e:
+            status, erro = (EXECUTADA, None) if e.code in (None, 0) else (ERRO, f"SystemExit({e.code})")
+        except Exception:
+            status, erro = ERRO, traceback.format_exc()
+        finally:
+            saida.capturar(None)
+        tempo = time.perf_counter() - inicio
+
+        novas = sorted(set(arquivos(etapa.saidas)) - antes)
+        if status == EXECUTADA and etapa.saidas and impressao_digital(etapa.saidas) == digital_saidas:
+            status = SEM_SAIDA  # Terminou sem gravar nada (ex.: entrada não encontrada)
+        return {**resultado, 'status': status, 'tempo': round(tempo, 3), 'saidas_novas': novas,
+                'erro': erro, 'log': buffer.getvalue(),
+                'digitais': self.digitais(etapa) if status == EXECUTADA else None}
+
+    def mostrar(self, resultado: dict):
+        simbolos = {EXECUTADA: '✅', PULADA: '⏭️ ', SEM_SAIDA: '⚠️ ', ERRO: '❌', CANCELADA: '🚫'}
+        descricao = resultado['descricao'] or resultado['nome']
+        print(f"{simbolos[resultado['status']]} {descricao} - {resultado['status'].upper()} ({resultado['tempo']:.1f}s)")
+        for arquivo in resultado.get('saidas_novas', []):
+            print(f"   📄 {arquivo}")
+        if resultado['status'] in (SEM_SAIDA, ERRO):
+            linhas = [linha for linha in (resultado.get('log') or '').splitlines() if linha.strip()]
+            for linha in linhas[-5:]:
+                print(f"   {linha}")
+        if resultado.get('erro'):
+            print(f"   {resultado['erro'].strip().splitlines()[-1]}")
+
+    def executar(self) -> dict:
+        """Roda o DAG; dependentes de uma etapa com erro são cancelados, as demais seguem"""
+        execucao = datetime.now().strftime('%Y%m%d_%H%M%S')
+        inicio = time.perf_counter()
+        pendentes = dict(self.dependencias)
+        saida = SaidaPorThread(sys.stdout)
+        sys.stdout = saida
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.paralelo) as executor:
+                rodando = {}
+                while pendentes or rodando:
+                    for nome, dependencias in list(pendentes.items()):
+                        estados = [self.resultados.get(d, {}).get('status') for d in dependencias]
+                        if any(s in (ERRO, CANCELADA) for s in estados):
+                            del pendentes[nome]
+                            self.resultados[nome] = {
+                                'nome': nome, 'descricao': self.etapas[nome].descricao, 'depende': dependencias,
+                                'status': CANCELADA, 'tempo': 0.0, 'saidas_novas': [],
+                            }
+                            self.mostrar(self.resultados[nome])
+                        elif all(s is not None for s in estados):
+                            del pendentes[nome]
+                            if self.atualizada(self.etapas[nome]):
+                                self.resultados[nome] = {
+                                    'nome': nome, 'descricao': self.etapas[nome].descricao, 'depende': dependencias,
+                                    'status': PULADA, 'tempo': 0.0, 'saidas_novas': [],
+                                }
+                                self.mostrar(self.resultados[nome])
+                                continue
+                            print(f"🔄 {self.etapas[nome].descricao or nome}")
+                            rodando[executor.submit(self.rodar_etapa, self.etapas[nome], saida)] = nome
+                    if not rodando:
+                        continue
+                    concluidas, _ = wait(rodando, return_when=FIRST_COMPLETED)
+                    for futuro in concluidas:
+                        nome = rodando.pop(futuro)
+                        resultado = futuro.result()
+                        # Estado só é alterado nesta thread; pulada mantém o registro anterior
+                        digitais = resultado.pop('digitais', None)
+                        if digitais:
+                            self.estado[nome] = digitais
+                        elif resultado['status'] != PULADA:
+                            self.estado.pop(nome, None)
+                        self.resultados[nome] = resultado
+                        self.mostrar(resultado)
+                        self.salvar_estado()
+        finally:
+            sys.stdout = saida.original
+
+        relatorio = {
+            'execucao': execucao,
+            'tempo_total': round(time.perf_counter() - inicio, 3),
+            'paralelo': self.paralelo,
+            'sucesso': all(r['status'] in (EXECUTADA, PULADA) for r in self.resultados.values()),
+            'etapas': [self.resultados[nome] for nome in self.etapas],
+        }
+        self.pasta_relatorios.mkdir(parents=True, exist_ok=True)
+        relatorio['arquivo'] = str(self.pasta_relatorios / f"pipeline_{execucao}.json")
+        with open(relatorio['arquivo'], 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        return relatorio
@@ -0,0 +1,160 @@
+"""
+Leitura em streaming das planilhas de OS das lojas
+
+As planilhas OS*.xlsm crescem a cada ano e pd.read_excel carrega o sheet
+inteiro na memória. LeitorPlanilha abre o workbook em modo read_only e
+devolve blocos (pd.DataFrame) de N linhas, com os mesmos nomes de coluna e o
+mesmo índice que pd.read_excel geraria, para que os extratores processem
+arquivos de qualquer tamanho com memória constante.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Sheets procurados, em ordem, nas planilhas de OS
+SHEETS_PRINCIPAIS = ['base_clientes_OS', 'base', 'dados']
+
+TAMANHO_BLOCO = 5000
+
+EXTENSOES_STREAMING = ['.xlsx', '.xlsm']
+
+
+def escolher_sheet(nomes: List[str], preferidos: List[str] = SHEETS_PRINCIPAIS) -> Optional[str]:
+    """Primeiro sheet preferido que existir; senão o primeiro sheet do arquivo"""
+    for nome in preferidos:
+        if nome in nomes:
+            return nome
+    return nomes[0] if nomes else None
+
+
+def nomes_colunas(cabecalho) -> List[str]:
+    """Nomes de coluna como o pd.read_excel: 'Unnamed: i' para vazios e sufixo .N para repetidos"""
+    colunas = []
+    vistos: Dict[str, int] = {}
+    for i, valor in enumerate(cabecalho):
+        nome = f'Unnamed: {i}' if valor is None or str(valor).strip() == '' else valor
+        chave = str(nome)
+        if chave in vistos:
+            vistos[chave] += 1
+            nome = f'{chave}.{vistos[chave]}'
+        else:
+            vistos[chave] = 0
+        colunas.append(nome)
+    return colunas
+
+
+class LeitorPlanilha:
+    """
+    Lê um sheet em blocos de tamanho_bloco linhas
+
+    Uso:
+        with LeitorPlanilha(arquivo) as leitor:
+            for bloco in leitor.blocos():
+                ...
+
+    sheet=None escolhe o sheet principal (SHEETS_PRINCIPAIS), ou o sheet ativo
+    com usar_sheet_ativo=True; dtypes permite fixar o tipo de colunas que
+    poderiam variar de um bloco para outro.
+    """
+
+    def __init__(self, arquivo, sheet: Optional[str] = None, tamanho_bloco: int = TAMANHO_BLOCO,
+                 dtypes: Optional[Dict[str, str]] = None, usar_sheet_ativo: bool = False):
+        self.arquivo = Path(arquivo)
+        self.tamanho_bloco = tamanho_bloco
+        self.dtypes = dtypes or {}
+        self.streaming = self.arquivo.suffix.lower() in EXTENSOES_STREAMING
+        self._workbook = None
+
+        if self.streaming:
+            import openpyxl
+            self._workbook = openpyxl.load_workbook(self.arquivo, read_only=True, data_only=True)
+            self.sheets = self._workbook.sheetnames
+            ativo = self._workbook.active.title if self._workbook.active is not None else None
+        else:
+            # .xls (xlrd) não tem leitura em streaming
+            self.sheets = pd.ExcelFile(self.arquivo).sheet_names
+            ativo = self.sheets[0] if self.sheets else None
+
+        if sheet is not None:
+            self.sheet = sheet
+        elif usar_sheet_ativo:
+            self.sheet = ativo
+        else:
+            self.sheet = escolher_sheet(self.sheets)
+        self._colunas = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+    def fechar(self):
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+
+    @property
+    def colunas(self) -> List[str]:
+        """Colunas do sheet (lê apenas o cabeçalho)"""
+        if self._colunas is None:
+            if self.streaming:
+                linhas = self._workbook[self.sheet].iter_rows(max_row=1, values_only=True)
+                self._colunas = nomes_colunas(next(linhas, ()))
+            else:
+                self._colunas = list(pd.read_excel(self.arquivo, sheet_name=self.sheet, nrows=0).columns)
+        return self._colunas
+
+    def _montar_bloco(self, linhas: list, inicio: int) -> pd.DataFrame:
+        bloco = pd.DataFrame.from_records(
+            linhas, columns=self.colunas, index=pd.RangeIndex(inicio, inicio + len(linhas))
+        ).infer_objects()
+        # Vazios como NaN (colunas totalmente vazias viram float), igual ao read_excel
+        for coluna in bloco.columns[bloco.dtypes == object]:
+            serie = bloco[coluna]
+            bloco[coluna] = serie.astype(float) if serie.isna().all() else serie.where(serie.notna(), np.nan)
+        for coluna, dtype in self.dtypes.items():
+            if coluna in bloco.columns:
+                bloco[coluna] = bloco[coluna].astype(dtype)
+        return bloco
+
+    def blocos(self) -> Iterator[pd.DataFrame]:
+        """Gera DataFrames de até tamanho_bloco linhas (índice contínuo a partir de 0)"""
+        if not self.streaming:
+            df = pd.read_excel(self.arquivo, sheet_name=self.sheet)
+            for inicio in range(0, len(df), self.tamanho_bloco):
+                yield df.iloc[inicio:inicio + self.tamanho_bloco]
+            return
+
+        largura = len(self.colunas)
+        linha_vazia = (None,) * largura
+        linhas = []
+        vazias = 0  # linhas em branco só entram se houver dados depois (como no read_excel)
+        inicio = 0
+
+        for valores in self._workbook[self.sheet].iter_rows(min_row=2, values_only=True):
+            linha = tuple(valores[:largura]) + (None,) * (largura - len(valores))
+            if linha == linha_vazia:
+                vazias += 1
+                continue
+            linhas.extend([linha_vazia] * vazias)
+            vazias = 0
+            linhas.append(linha)
+
+            while len(linhas) >= self.tamanho_bloco:
+                yield self._montar_bloco(linhas[:self.tamanho_bloco], inicio)
+                inicio += self.tamanho_bloco
+                linhas = linhas[self.tamanho_bloco:]
+
+        if linhas:
+            yield self._montar_bloco(linhas, inicio)
+
+
+def ler_em_blocos(arquivo, sheet: Optional[str] = None, tamanho_bloco: int = TAMANHO_BLOCO,
+                  dtypes: Optional[Dict[str, str]] = None) -> Iterator[pd.DataFrame]:
+    """Atalho: gera os blocos de um sheet e fecha o workbook no final"""
+    with LeitorPlanilha(arquivo, sheet, tamanho_bloco, dtypes) as leitor:
+        yield from leitor.blocos()
@@ -0,0 +1,144 @@
+"""
+Relatórios Excel gravados em streaming
+
+Os relatórios eram gravados com pd.ExcelWriter(engine='openpyxl'), que monta
+o workbook inteiro em memória, e a formatação (aplicar_formatacao_excel)
+reabria o arquivo para percorrer célula por célula calculando larguras.
+EscritorRelatorio usa o workbook write_only do openpyxl: cada linha vai para
+o disco ao ser escrita, em blocos de TAMANHO_BLOCO linhas do DataFrame, e a
+memória não cresce com o tamanho da aba. Larguras das colunas saem do
+DataFrame (tamanho do maior texto por coluna, vetorizado), antes das linhas;
+título, cabeçalho e formatos numéricos são aplicados na mesma passada.
+
+    with EscritorRelatorio(arquivo) as relatorio:
+        relatorio.escrever(df_clientes, 'Base_Clientes_Master')
+        relatorio.escrever(stats_loja, 'Estatisticas_Por_Loja', index=True)
+        relatorio.escrever(df_dashboard, 'Dashboard', titulo="DASHBOARD EXECUTIVO")
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
+
+TAMANHO_BLOCO = 10_000
+
+# Mesmos limites e cores de aplicar_formatacao_excel (sistema_final_integrado.py)
+LARGURA_MINIMA = 10
+LARGURA_MAXIMA = 50
+COR_TITULO = "366092"
+COR_CABECALHO = "4472C4"
+
+FORMATO_DECIMAL = '#,##0.00'
+FORMATO_DATA = 'DD/MM/YYYY'
+FORMATO_DATA_HORA = 'DD/MM/YYYY HH:MM:SS'
+
+
+def larguras_colunas(df: pd.DataFrame) -> List[int]:
+    """Largura de cada coluna: maior texto (cabeçalho ou valor) + 2, entre 10 e 50"""
+    larguras = []
+    for posicao, coluna in enumerate(df.columns):
+        serie = df.iloc[:, posicao]
+        tamanhos = serie[serie.notna()].astype(str).str.len()
+        maior = max(len(str(coluna)), int(tamanhos.max()) if len(tamanhos) else 0)
+        larguras.append(min(max(maior + 2, LARGURA_MINIMA), LARGURA_MAXIMA))
+    return larguras
+
+
+def formatos_padrao(df: pd.DataFrame) -> Dict[str, str]:
+    """Decimais com separador de milhar e datas dd/mm/aaaa (com hora se houver)"""
+    formatos = {}
+    for posicao, coluna in enumerate(df.columns):
+        serie = df.iloc[:, posicao]
+        if pd.api.types.is_float_dtype(serie):
+            formatos[coluna] = FORMATO_DECIMAL
+        elif pd.api.types.is_datetime64_any_dtype(serie):
+            datas = serie.dropna()
+            formatos[coluna] = FORMATO_DATA if (datas == datas.dt.normalize()).all() else FORMATO_DATA_HORA
+    return formatos
+
+
+class EscritorRelatorio:
+    """Workbook de várias abas gravado linha a linha (openpyxl write_only)"""
+
+    def __init__(self, arquivo):
+        self.arquivo = Path(arquivo)
+        self.wb = Workbook(write_only=True)
+        self.linhas: Dict[str, int] = {}
+
+        self.fonte_titulo = Font(bold=True, size=14, color="FFFFFF")
+        self.fundo_titulo = PatternFill(start_color=COR_TITULO, end_color=COR_TITULO, fill_type="solid")
+        self.fonte_cabecalho = Font(bold=True, color="FFFFFF")
+        self.fundo_cabecalho = PatternFill(start_color=COR_CABECALHO, end_color=COR_CABECALHO, fill_type="solid")
+        self.centro = Alignment(horizontal="center")
+
+    def __enter__(self) -> 'EscritorRelatorio':
+        return self
+
+    def __exit__(self, tipo, erro, traceback):
+        if tipo is None:
+            self.salvar()
+
+    def celula(self, ws, valor, fonte=None, fundo=None, alinhamento=None, formato=None) -> WriteOnlyCell:
+        celula = WriteOnlyCell(ws, value=valor)
+        if fonte is not None:
+            celula.font = fonte
+        if fundo is not None:
+            celula.fill = fundo
+        if alinhamento is not None:
+            celula.alignment = alinhamento
+        if formato is not None:
+            celula.number_format = formato
+        return celula
+
+    def escrever(self, df: pd.DataFrame, aba: str, index: bool = False, titulo: Optional[str] = None,
+                 formatos: Optional[Dict[str, Optional[str]]] = None) -> int:
+        """
+        Grava o DataFrame em uma nova aba. formatos ({coluna: formato Excel})
+        completa/substitui formatos_padrao(); None desliga o formato da coluna.
+        """
+        if index:
+            df = df.reset_index()
+        ws = self.wb.create_sheet(aba[:31])
+        colunas = [str(c) for c in df.columns]
+
+        # Larguras e painel congelado precisam estar definidos antes da primeira linha
+        for posicao, largura in enumerate(larguras_colunas(df), 1):
+            ws.column_dimensions[get_column_letter(posicao)].width = largura
+        ws.freeze_panes = "A3" if titulo else "A2"
+
+        if titulo:
+            ws.append([self.celula(ws, titulo, self.fonte_titulo, self.fundo_titulo, self.centro)])
+            if len(colunas) > 1:
+                ws.merged_cells.add(CellRange(f"A1:{get_column_letter(len(colunas))}1"))
+
+        ws.append([self.celula(ws, c, self.fonte_cabecalho, self.fundo_cabecalho, self.centro) for c in colunas])
+
+        formatos = {**formatos_padrao(df), **(formatos or {})}
+        formatadas = [
+            (posicao, formatos[coluna]) for posicao, coluna in enumerate(df.columns)
+            if formatos.get(coluna)
+        ]
+
+        for inicio in range(0, len(df), TAMANHO_BLOCO):
+            bloco = df.iloc[inicio:inicio + TAMANHO_BLOCO]
+            bloco = bloco.astype(object).where(bloco.notna(), None)
+            for valores in bloco.itertuples(index=False, name=None):
+                linha = list(valores)
+                for posicao, formato in formatadas:
+                    if linha[posicao] is not None:
+                        linha[posicao] = self.celula(ws, linha[posicao], formato=formato)
+                ws.append(linha)
+
+        self.linhas[ws.title] = len(df)
+        return len(df)
+
+    def salvar(self) -> Path:
+        self.arquivo.parent.mkdir(parents=True, exist_ok=True)
+        self.wb.save(self.arquivo)
+        return self.arquivo
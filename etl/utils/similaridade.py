@@ -0,0 +1,125 @@
+"""
+Índice de nomes para agrupamento por similaridade (fuzz.ratio)
+
+Comparar cada nome novo com todos os nomes já agrupados é O(n × grupos).
+IndiceNomes devolve exatamente o mesmo resultado (o primeiro nome inserido
+com fuzz.ratio > limiar) olhando só para poucos candidatos:
+
+- poda por tamanho: ratio = 2·M / (len(a) + len(b)) e M <= min(len), então
+  nomes com tamanhos muito diferentes nunca passam do limiar;
+- índice invertido de trigramas posicionais: com no máximo d inserções/remoções
+  de diferença, dois nomes compartilham pelo menos len - 2 - 3·d trigramas
+  (filtro de contagem); basta consultar as listas dos 3·d + 1 trigramas mais
+  raros do nome para encontrar todos os candidatos (filtro de prefixo), e só
+  os que passam do filtro de contagem chegam ao fuzz.ratio.
+
+Nomes curtos demais para o filtro de trigramas são comparados com todos os
+nomes da faixa de tamanho compatível, o que mantém o resultado exato.
+"""
+
+import math
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from fuzzywuzzy import fuzz
+
+Q = 3
+
+
+def trigramas(nome: str) -> List[Tuple[str, int]]:
+    """Trigramas com o número da ocorrência (multiconjunto vira conjunto)"""
+    ocorrencias: Dict[str, int] = defaultdict(int)
+    grams = []
+    for i in range(len(nome) - Q + 1):
+        gram = nome[i:i + Q]
+        ocorrencias[gram] += 1
+        grams.append((gram, ocorrencias[gram]))
+    return grams
+
+
+class IndiceNomes:
+    """
+    Nomes representantes de grupos, na ordem em que foram inseridos
+
+    buscar(nome) retorna o primeiro representante com fuzz.ratio(nome, rep) > limiar,
+    o mesmo que percorrer todos os representantes em ordem e parar no primeiro.
+    """
+
+    def __init__(self, limiar: int = 90):
+        self.limiar = limiar
+        # fuzz.ratio arredonda 100·r; passar do limiar exige r >= (limiar + 0.5) / 100
+        self.similaridade_minima = (limiar + 0.5) / 100 - 1e-9
+        self.nomes: List[str] = []
+        self.ordem: Dict[str, int] = {}
+        self.por_tamanho: Dict[int, List[int]] = defaultdict(list)
+        self.por_trigrama: Dict[Tuple[str, int], List[int]] = defaultdict(list)
+        self.grams_nomes: List[Set[Tuple[str, int]]] = []
+        self.comparacoes = 0
+
+    def __len__(self):
+        return len(self.nomes)
+
+    def __contains__(self, nome):
+        return nome in self.ordem
+
+    def faixa_tamanho(self, tamanho: int) -> Tuple[int, int]:
+        """Tamanhos de nome que ainda podem passar do limiar"""
+        s = self.similaridade_minima
+        minimo = math.ceil(tamanho * s / (2 - s))
+        maximo = math.floor(tamanho * (2 - s) / s)
+        return minimo, maximo
+
+    def adicionar(self, nome: str):
+        """Registra um novo representante de grupo"""
+        if nome in self.ordem:
+            return
+        posicao = len(self.nomes)
+        self.nomes.append(nome)
+        self.ordem[nome] = posicao
+        self.por_tamanho[len(nome)].append(posicao)
+        grams = set(trigramas(nome))
+        self.grams_nomes.append(grams)
+        for gram in grams:
+            self.por_trigrama[gram].append(posicao)
+
+    def minimo_compartilhados(self, tamanho_a: int, tamanho_b: int) -> int:
+        """Trigramas em comum exigidos de dois nomes que passam do limiar (filtro de contagem)"""
+        # Diferença máxima (inserções + remoções) permitida pelo limiar
+        diferenca = math.floor((1 - self.similaridade_minima) * (tamanho_a + tamanho_b))
+        return max(tamanho_a, tamanho_b) - Q + 1 - Q * diferenca
+
+    def candidatos(self, nome: str) -> Set[int]:
+        """Posições dos representantes que podem passar do limiar"""
+        tamanho = len(nome)
+        minimo, maximo = self.faixa_tamanho(tamanho)
+        # Pior caso entre todos os tamanhos compatíveis
+        compartilhados = min(self.minimo_compartilhados(tamanho, t) for t in range(minimo, maximo + 1))
+
+        if compartilhados <= 0:
+            # Nome curto: filtro de trigramas não garante nada, varre a faixa de tamanho
+            return {pos for t in range(minimo, maximo + 1) for pos in self.por_tamanho.get(t, ())}
+
+        grams = trigramas(nome)
+        # Qualquer nome com >= compartilhados trigramas em comum tem ao menos um
+        # entre estes (len(grams) - compartilhados + 1) mais raros
+        grams.sort(key=lambda g: len(self.por_trigrama.get(g, ())))
+        prefixo = grams[:len(grams) - compartilhados + 1]
+
+        encontrados = set()
+        for gram in prefixo:
+            encontrados.update(self.por_trigrama.get(gram, ()))
+
+        grams_nome = set(grams)
+        return {
+            pos for pos in encontrados
+            if minimo <= len(self.nomes[pos]) <= maximo
+            and len(grams_nome & self.grams_nomes[pos]) >= self.minimo_compartilhados(tamanho, len(self.nomes[pos]))
+        }
+
+    def buscar(self, nome: str) -> Optional[str]:
+        """Primeiro representante (ordem de inserção) com fuzz.ratio > limiar"""
+        for pos in sorted(self.candidatos(nome)):
+            self.comparacoes += 1
+            if fuzz.ratio(nome, self.nomes[pos]) > self.limiar:
+                return self.nomes[pos]
+        return None
@@ -0,0 +1,148 @@
+"""
+Cópia endereçada por conteúdo das planilhas brutas
+
+Os importadores copiavam (shutil.copy2/copytree) as mesmas planilhas do
+OneDrive para data/ a cada execução. SincronizadorArquivos guarda cada
+conteúdo distinto uma única vez em data/objetos/<sha256> e cria no destino um
+hardlink para o objeto (ou uma cópia, se o sistema de arquivos não suportar).
+Um manifesto com tamanho, mtime e hash de cada origem permite pular, sem ler o
+arquivo, tudo o que não mudou desde a última sincronização.
+
+Os destinos compartilham o conteúdo com o objeto: devem ser tratados como
+somente leitura (os scripts de ETL só leem as planilhas).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Optional
+
+PASTA_OBJETOS = Path("data/objetos")
+MANIFESTO = Path("data/cache/manifesto_sincronizacao.json")
+
+TAMANHO_LEITURA = 1024 * 1024
+
+
+def hash_arquivo(caminho) -> str:
+    """SHA-256 do conteúdo, lido em blocos"""
+    digest = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(TAMANHO_LEITURA), b''):
+            digest.update(bloco)
+    return digest.hexdigest()
+
+
+def mesmo_arquivo(a: Path, b: Path) -> bool:
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+
+class SincronizadorArquivos:
+    """
+    Sincroniza arquivos de origem para destinos via armazenamento por hash
+
+    sincronizar(origem, destino) retorna:
+        'inalterado'   - tamanho, mtime e hash iguais aos da última vez e destino em dia
+        'vinculado'    - conteúdo já existia no armazenamento, só o destino foi (re)criado
+        'copiado'      - conteúdo novo, copiado uma vez para o armazenamento
+    """
+
+    def __init__(self, pasta_objetos=PASTA_OBJETOS, manifesto=MANIFESTO):
+        self.pasta_objetos = Path(pasta_objetos)
+        self.arquivo_manifesto = Path(manifesto)
+        self.manifesto: Dict[str, dict] = {}
+        self.estatisticas = {'inalterado': 0, 'vinculado': 0, 'copiado': 0, 'bytes_copiados': 0}
+        self.carregar_manifesto()
+
+    def carregar_manifesto(self):
+        if self.arquivo_manifesto.exists():
+            try:
+                with open(self.arquivo_manifesto, encoding='utf-8') as f:
+                    self.manifesto = json.load(f)
+            except (OSError, ValueError):
+                self.manifesto = {}
+
+    def salvar_manifesto(self):
+        self.arquivo_manifesto.parent.mkdir(parents=True, exist_ok=True)
+        temporario = self.arquivo_manifesto.with_suffix('.tmp')
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self.manifesto, f, ensure_ascii=False, indent=1)
+        os.replace(temporario, self.arquivo_manifesto)
+
+    def caminho_objeto(self, digest: str, sufixo: str) -> Path:
+        return self.pasta_objetos / digest[:2] / f"{digest}{sufixo.lower()}"
+
+    def armazenar(self, origem: Path, digest: str) -> Path:
+        """Copia a origem para o armazenamento (se o conteúdo ainda não estiver lá)"""
+        objeto = self.caminho_objeto(digest, origem.suffix)
+        if not objeto.exists():
+            objeto.parent.mkdir(parents=True, exist_ok=True)
+            temporario = objeto.with_name(objeto.name + '.tmp')
+            shutil.copy2(origem, temporario)
+            os.replace(temporario, objeto)
+            self.estatisticas['bytes_copiados'] += objeto.stat().st_size
+        return objeto
+
+    def vincular(self, objeto: Path, destino: Path):
+        """Hardlink do objeto no destino; cópia quando não for possível"""
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        temporario = destino.with_name(destino.name + '.tmp')
+        if temporario.exists():
+            temporario.unlink()
+        try:
+            os.link(objeto, temporario)
+        except OSError:
+            # Outro volume ou sistema de arquivos sem hardlink
+            shutil.copy2(objeto, temporario)
+        os.replace(temporario, destino)
+
+    def sincronizar(self, origem, destino) -> str:
+        origem, destino = Path(origem), Path(destino)
+        info = origem.stat()
+        chave = str(origem.resolve())
+        registro: Optional[dict] = self.manifesto.get(chave)
+
+        # Tamanho e mtime iguais: reaproveita o hash sem ler o arquivo
+        if registro and registro['tamanho'] == info.st_size and registro['mtime_ns'] == info.st_mtime_ns:
+            digest = registro['sha256']
+        else:
+            digest = hash_arquivo(origem)
+
+        objeto = self.caminho_objeto(digest, origem.suffix)
+        status = 'vinculado' if objeto.exists() else 'copiado'
+        objeto = self.armazenar(origem, digest)
+
+        if destino.exists() and (mesmo_arquivo(objeto, destino) or (
+                registro and registro['sha256'] == digest and registro.get('destino') == str(destino)
+                and destino.stat().st_size == info.st_size)):
+            status = 'inalterado'
+        else:
+            self.vincular(objeto, destino)
+
+        self.manifesto[chave] = {
+            'tamanho': info.st_size,
+            'mtime_ns': info.st_mtime_ns,
+            'sha256': digest,
+            'destino': str(destino),
+        }
+        self.estatisticas[status] += 1
+        return status
+
+    def sincronizar_pasta(self, origem, destino, padrao: str = "*.xlsx") -> Dict[str, int]:
+        """Sincroniza recursivamente os arquivos de uma pasta (substitui copytree)"""
+        origem, destino = Path(origem), Path(destino)
+        resultado = {'inalterado': 0, 'vinculado': 0, 'copiado': 0}
+        for arquivo in origem.rglob(padrao):
+            if arquivo.is_file() and not arquivo.name.startswith('~$'):
+                status = self.sincronizar(arquivo, destino / arquivo.relative_to(origem))
+                resultado[status] += 1
+        return resultado
+
+    def resumo(self) -> str:
+        e = self.estatisticas
+        return (f"{e['copiado']} copiados ({e['bytes_copiados'] / (1024 * 1024):.1f} MB), "
+                f"{e['vinculado']} vinculados, {e['inalterado']} inalterados")
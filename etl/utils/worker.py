@@ -0,0 +1,251 @@
+"""
+Execução dos scripts pelo CLI carne, no processo atual ou no worker
+
+executar_script roda um script como `python script.py args` (mesmo sys.argv,
+pasta do script no sys.path, __name__ == '__main__'), só que dentro do
+processo que chamou. O worker (`carne worker iniciar`) é um processo de longa
+duração que já importou pandas/openpyxl/pyarrow e mantém as bases de
+dados_quentes em memória; `carne --worker <comando>` manda o script e os
+argumentos para ele por uma conexão local (multiprocessing.connection, com
+chave) e recebe a saída enquanto o script roda. Um comando por vez; a pasta
+atual de quem chamou vale para o script.
+
+Os pedidos chegam em pickle, então só o próprio usuário pode falar com o
+worker: no Linux/macOS a conexão é um socket Unix em ~/.carne_facil (pasta
+0700) e, em qualquer sistema, a chave é aleatória e fica em
+~/.carne_facil/worker.chave (0600), gerada no primeiro `worker iniciar`.
+CARNE_WORKER_CHAVE substitui o arquivo; a antiga chave fixa é recusada.
+
+    python carne.py worker iniciar          # em um terminal
+    python carne.py --worker csv-vendas     # em outro (ou CARNE_WORKER=1)
+"""
+
+import io
+import os
+import runpy
+import secrets
+import socket
+import stat
+import sys
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import List, Optional
+
+PASTA_WORKER = Path(os.environ.get('CARNE_WORKER_PASTA', Path.home() / '.carne_facil'))
+ARQUIVO_CHAVE = PASTA_WORKER / 'worker.chave'
+USAR_SOCKET_UNIX = hasattr(socket, 'AF_UNIX') and sys.platform != 'win32'
+ENDERECO = (str(PASTA_WORKER / 'worker.sock') if USAR_SOCKET_UNIX
+            else ('127.0.0.1', int(os.environ.get('CARNE_WORKER_PORTA', '47011'))))
+
+# Chave fixa das primeiras versões: qualquer um na máquina a conhecia
+CHAVES_RECUSADAS = {b'carne_facil'}
+TAMANHO_MINIMO_CHAVE = 16
+
+# Importadas ao iniciar o worker (as ausentes são ignoradas)
+BIBLIOTECAS = ['pandas', 'numpy', 'pyarrow', 'pyarrow.parquet', 'openpyxl', 'sqlalchemy',
+               'unidecode', 'fuzzywuzzy.fuzz']
+
+
+def descrever_endereco() -> str:
+    return ENDERECO if isinstance(ENDERECO, str) else f"{ENDERECO[0]}:{ENDERECO[1]}"
+
+
+def criar_pasta_privada():
+    PASTA_WORKER.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if os.name == 'posix':
+        os.chmod(PASTA_WORKER, 0o700)
+
+
+def carregar_chave(criar: bool = False) -> Optional[bytes]:
+    """
+    Chave do worker: CARNE_WORKER_CHAVE ou o arquivo da pasta do usuário.
+    criar=True gera o arquivo (0600) se não existir; sem chave devolve None.
+    ValueError para chave fixa/curta ou arquivo legível por outros usuários.
+    """
+    ambiente = os.environ.get('CARNE_WORKER_CHAVE')
+    if ambiente:
+        chave = ambiente.encode('utf-8')
+    elif ARQUIVO_CHAVE.exists():
+        if os.name == 'posix' and stat.S_IMODE(ARQUIVO_CHAVE.stat().st_mode) & 0o077:
+            raise ValueError(f"{ARQUIVO_CHAVE} pode ser lido por outros usuários; use chmod 600")
+        chave = ARQUIVO_CHAVE.read_bytes().strip()
+    elif criar:
+        criar_pasta_privada()
+        chave = secrets.token_hex(32).encode('ascii')
+        descritor = os.open(ARQUIVO_CHAVE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(descritor, 'wb') as arquivo:
+            arquivo.write(chave)
+        print(f"🔑 Chave do worker gerada em {ARQUIVO_CHAVE}")
+    else:
+        return None
+
+    if chave in CHAVES_RECUSADAS or len(chave) < TAMANHO_MINIMO_CHAVE:
+        raise ValueError("Chave do worker fixa ou curta demais: apague CARNE_WORKER_CHAVE "
+                         f"para usar a chave aleatória de {ARQUIVO_CHAVE}")
+    return chave
+
+
+def liberar_socket():
+    """Remove o socket de um worker que terminou sem fechá-lo; recusa se houver um rodando"""
+    if not USAR_SOCKET_UNIX or not os.path.exists(ENDERECO):
+        return
+    teste = socket.socket(socket.AF_UNIX)
+    try:
+        teste.connect(ENDERECO)
+    except OSError:
+        os.unlink(ENDERECO)
+    else:
+        raise ValueError(f"Já existe um worker ouvindo em {ENDERECO}")
+    finally:
+        teste.close()
+
+
+def executar_script(caminho, argumentos: List[str]) -> int:
+    """Roda o script como __main__ e devolve o código de saída (SystemExit vira código)"""
+    caminho = Path(caminho)
+    argv_anterior, path_anterior = sys.argv, list(sys.path)
+    sys.argv = [str(caminho)] + list(argumentos)
+    sys.path.insert(0, str(caminho.parent))
+    try:
+        runpy.run_path(str(caminho), run_name='__main__')
+        return 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    finally:
+        sys.argv = argv_anterior
+        sys.path[:] = path_anterior
+
+
+class SaidaConexao(io.TextIOBase):
+    """stdout/stderr do script no worker, enviados ao cliente a cada escrita"""
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+
+    def write(self, texto):
+        if texto:
+            self.conexao.send(('saida', texto))
+        return len(texto)
+
+
+def atender(pedido: dict, conexao) -> int:
+    pasta_anterior = os.getcwd()
+    saida = SaidaConexao(conexao)
+    try:
+        os.chdir(pedido['cwd'])
+        with redirect_stdout(saida), redirect_stderr(saida):
+            try:
+                return executar_script(pedido['caminho'], pedido['argumentos'])
+            except Exception:
+                traceback.print_exc()
+                return 1
+    finally:
+        os.chdir(pasta_anterior)
+
+
+def status() -> str:
+    from . import dados_quentes
+
+    linhas = [f"🔥 Worker pid {os.getpid()} em {descrever_endereco()}"]
+    for caminho, quantidade in dados_quentes.em_memoria().items():
+        linhas.append(f"   📦 {caminho}: {quantidade:,} linhas")
+    linhas.append(f"   Leituras: {dados_quentes.estatisticas['leituras']} | "
+                  f"reaproveitadas: {dados_quentes.estatisticas['acertos']}")
+    return '\n'.join(linhas) + '\n'
+
+
+def iniciar(preaquecer: bool = True):
+    """Importa as bibliotecas, carrega as bases e atende comandos até receber 'parar'"""
+    import importlib
+    from multiprocessing.connection import Listener
+
+    from . import dados_quentes
+
+    # Antes de carregar qualquer coisa: sem chave segura o worker não sobe
+    chave = carregar_chave(criar=True)
+    criar_pasta_privada()
+    liberar_socket()
+
+    inicio = time.perf_counter()
+    for biblioteca in BIBLIOTECAS:
+        try:
+            importlib.import_module(biblioteca)
+        except ImportError:
+            pass
+
+    dados_quentes.manter_em_memoria = True
+    if preaquecer:
+        for base in dados_quentes.BASES_COMPARTILHADAS:
+            if base.exists():
+                dados_quentes.ler_parquet(base)
+    print(f"✅ Bibliotecas e bases carregadas em {time.perf_counter() - inicio:.1f}s")
+
+    with Listener(ENDERECO, authkey=chave) as ouvinte:
+        if USAR_SOCKET_UNIX:
+            os.chmod(ENDERECO, 0o600)
+        print(f"🔥 Worker ouvindo em {descrever_endereco()} (pid {os.getpid()}) - Ctrl+C para parar")
+        while True:
+            try:
+                conexao = ouvinte.accept()
+            except KeyboardInterrupt:
+                break
+            except Exception as e:
+                print(f"⚠️  Conexão recusada: {e}")
+                continue
+            with conexao:
+                try:
+                    pedido = conexao.recv()
+                    if pedido['acao'] == 'parar':
+                        conexao.send(('fim', 0))
+                        break
+                    if pedido['acao'] == 'status':
+                        conexao.send(('saida', status()))
+                        conexao.send(('fim', 0))
+                        continue
+                    print(f"▶️  {Path(pedido['caminho']).name} {' '.join(pedido['argumentos'])}")
+                    inicio = time.perf_counter()
+                    codigo = atender(pedido, conexao)
+                    conexao.send(('fim', codigo))
+                    print(f"   código {codigo} em {time.perf_counter() - inicio:.1f}s")
+                except (EOFError, OSError) as e:
+                    print(f"⚠️  Cliente desconectou: {e}")
+    print("👋 Worker encerrado")
+
+
+def enviar(pedido: dict) -> Optional[int]:
+    """Manda o pedido ao worker e repete a saída dele; None se não houver worker rodando"""
+    from multiprocessing import AuthenticationError
+    from multiprocessing.connection import Client
+
+    try:
+        chave = carregar_chave()
+    except ValueError as e:
+        print(f"⚠️  {e}", file=sys.stderr)
+        return None
+    if chave is None:
+        return None
+    try:
+        conexao = Client(ENDERECO, authkey=chave)
+    except AuthenticationError:
+        print(f"⚠️  O worker em {descrever_endereco()} usa outra chave", file=sys.stderr)
+        return None
+    except OSError:
+        return None
+    with conexao:
+        conexao.send(pedido)
+        while True:
+            tipo, valor = conexao.recv()
+            if tipo == 'fim':
+                return valor
+            sys.stdout.write(valor)
+            sys.stdout.flush()
+
+
+def executar_no_worker(caminho, argumentos: List[str]) -> Optional[int]:
+    return enviar({'acao': 'executar', 'caminho': str(Path(caminho).resolve()),
+                   'argumentos': list(argumentos), 'cwd': os.getcwd()})
@@ -0,0 +1,225 @@
+-- ============================================
+-- SCRIPT: 13_importar_produtos_dioptrias_pagamentos_os.sql
+-- OBJETIVO: Carregar produtos, dioptrias e pagamentos das OS a partir dos CSVs
+--           longos de etl/normalizar_vendas_os.py (lookup da OS por número + loja)
+-- NOTA: Use este script com psql (\copy); rode depois de optica.ordens_servico
+--       e vendas.vendas estarem povoadas. Linhas que o destino recusaria já
+--       ficaram em *_rejeitados.csv.
+-- ============================================
+-- ============================================
+-- ETAPA 1: Tabelas temporárias (mesma ordem de colunas dos CSVs)
+-- ============================================
+CREATE TEMP TABLE IF NOT EXISTS tmp_produtos_os (
+    _os_numero VARCHAR(50),
+    _id_loja_codigo VARCHAR(10),
+    item INTEGER,
+    tipo_produto VARCHAR(100),
+    descricao VARCHAR(300),
+    codigo_produto VARCHAR(100),
+    quantidade INTEGER,
+    valor_unitario DECIMAL(12, 2)
+);
+CREATE TEMP TABLE IF NOT EXISTS tmp_dioptrias_os (
+    _os_numero VARCHAR(50),
+    _id_loja_codigo VARCHAR(10),
+    od_esferico DECIMAL(5, 2),
+    od_cilindrico DECIMAL(5, 2),
+    od_eixo INTEGER,
+    od_adicao DECIMAL(5, 2),
+    od_dnp DECIMAL(5, 2),
+    oe_esferico DECIMAL(5, 2),
+    oe_cilindrico DECIMAL(5, 2),
+    oe_eixo INTEGER,
+    oe_adicao DECIMAL(5, 2),
+    oe_dnp DECIMAL(5, 2),
+    dp_total DECIMAL(5, 2),
+    altura_montagem DECIMAL(5, 2)
+);
+CREATE TEMP TABLE IF NOT EXISTS tmp_pagamentos_os (
+    _os_numero VARCHAR(50),
+    _id_loja_codigo VARCHAR(10),
+    pagamento INTEGER,
+    forma_pagamento VARCHAR(20),
+    forma_original VARCHAR(50),
+    valor DECIMAL(12, 2),
+    parcelas INTEGER
+);
+-- ============================================
+-- ETAPA 2: Importar CSVs (python etl/normalizar_vendas_os.py)
+-- ============================================
+-- \copy tmp_produtos_os FROM 'D:/projetos/carne_facil/povoamento/dados/csv/produtos_os.csv' DELIMITER ',' CSV HEADER;
+-- \copy tmp_dioptrias_os FROM 'D:/projetos/carne_facil/povoamento/dados/csv/dioptrias_os.csv' DELIMITER ',' CSV HEADER;
+-- \copy tmp_pagamentos_os FROM 'D:/projetos/carne_facil/povoamento/dados/csv/pagamentos_os.csv' DELIMITER ',' CSV HEADER;
+-- ============================================
+-- ETAPA 3: optica.produtos_os
+-- ============================================
+-- OS que já têm produtos ficam como estão (script pode ser repetido)
+INSERT INTO optica.produtos_os (
+        os_id,
+        tipo_produto,
+        descricao,
+        codigo_produto,
+        quantidade,
+        valor_unitario
+    )
+SELECT os.id,
+    tp.tipo_produto,
+    tp.descricao,
+    tp.codigo_produto,
+    tp.quantidade,
+    tp.valor_unitario
+FROM tmp_produtos_os tp
+    JOIN core.lojas l ON l.codigo = tp._id_loja_codigo
+    JOIN optica.ordens_servico os ON os.loja_id = l.id
+    AND os.numero_os = tp._os_numero
+WHERE NOT EXISTS (
+        SELECT 1
+        FROM optica.produtos_os p
+        WHERE p.os_id = os.id
+    )
+ORDER BY os.id,
+    tp.item;
+-- ============================================
+-- ETAPA 4: optica.dioptrias (uma linha por OS)
+-- ============================================
+INSERT INTO optica.dioptrias (
+        os_id,
+        od_esferico,
+        od_cilindrico,
+        od_eixo,
+        od_adicao,
+        od_dnp,
+        oe_esferico,
+        oe_cilindrico,
+        oe_eixo,
+        oe_adicao,
+        oe_dnp,
+        dp_total,
+        altura_montagem
+    )
+SELECT os.id,
+    td.od_esferico,
+    td.od_cilindrico,
+    td.od_eixo,
+    td.od_adicao,
+    td.od_dnp,
+    td.oe_esferico,
+    td.oe_cilindrico,
+    td.oe_eixo,
+    td.oe_adicao,
+    td.oe_dnp,
+    td.dp_total,
+    td.altura_montagem
+FROM tmp_dioptrias_os td
+    JOIN core.lojas l ON l.codigo = td._id_loja_codigo
+    JOIN optica.ordens_servico os ON os.loja_id = l.id
+    AND os.numero_os = td._os_numero
+WHERE NOT EXISTS (
+        SELECT 1
+        FROM optica.dioptrias d
+        WHERE d.os_id = os.id
+    );
+-- ============================================
+-- ETAPA 5: vendas.formas_pagamento_venda
+-- ============================================
+-- Venda da OS (optica.ordens_servico.venda_id) ou, sem ela, a venda com o
+-- mesmo número na loja
+INSERT INTO vendas.formas_pagamento_venda (
+        venda_id,
+        forma_pagamento,
+        valor,
+        parcelas
+    )
+SELECT pv.venda_id,
+    pv.forma_pagamento::forma_pagamento_type,
+    pv.valor,
+    pv.parcelas
+FROM (
+        SELECT COALESCE(os.venda_id, v.id) AS venda_id,
+            tpg.forma_pagamento,
+            tpg.valor,
+            tpg.parcelas,
+            tpg.pagamento
+        FROM tmp_pagamentos_os tpg
+            JOIN core.lojas l ON l.codigo = tpg._id_loja_codigo
+            LEFT JOIN optica.ordens_servico os ON os.loja_id = l.id
+            AND os.numero_os = tpg._os_numero
+            LEFT JOIN vendas.vendas v ON v.loja_id = l.id
+            AND v.numero_venda = tpg._os_numero
+    ) pv
+WHERE pv.venda_id IS NOT NULL
+    AND NOT EXISTS (
+        SELECT 1
+        FROM vendas.formas_pagamento_venda f
+        WHERE f.venda_id = pv.venda_id
+    )
+ORDER BY pv.venda_id,
+    pv.pagamento;
+-- ============================================
+-- ETAPA 6: Validação
+-- ============================================
+-- Linhas dos CSVs sem OS/venda correspondente (não carregadas)
+SELECT 'Sem OS/venda no banco' AS tipo,
+    (
+        SELECT COUNT(*)
+        FROM tmp_produtos_os tp
+        WHERE NOT EXISTS (
+                SELECT 1
+                FROM core.lojas l
+                    JOIN optica.ordens_servico os ON os.loja_id = l.id
+                WHERE l.codigo = tp._id_loja_codigo
+                    AND os.numero_os = tp._os_numero
+            )
+    ) AS produtos,
+    (
+        SELECT COUNT(*)
+        FROM tmp_dioptrias_os td
+        WHERE NOT EXISTS (
+                SELECT 1
+                FROM core.lojas l
+                    JOIN optica.ordens_servico os ON os.loja_id = l.id
+                WHERE l.codigo = td._id_loja_codigo
+                    AND os.numero_os = td._os_numero
+            )
+    ) AS dioptrias,
+    (
+        SELECT COUNT(*)
+        FROM tmp_pagamentos_os tpg
+        WHERE NOT EXISTS (
+                SELECT 1
+                FROM core.lojas l
+                    LEFT JOIN optica.ordens_servico os ON os.loja_id = l.id
+                    AND os.numero_os = tpg._os_numero
+                    LEFT JOIN vendas.vendas v ON v.loja_id = l.id
+                    AND v.numero_venda = tpg._os_numero
+                WHERE l.codigo = tpg._id_loja_codigo
+                    AND COALESCE(os.venda_id, v.id) IS NOT NULL
+            )
+    ) AS pagamentos;
+-- Totais carregados
+SELECT 'RESUMO' AS tipo,
+    (
+        SELECT COUNT(*)
+        FROM optica.produtos_os
+    ) AS produtos_os,
+    (
+        SELECT COUNT(*)
+        FROM optica.dioptrias
+    ) AS dioptrias,
+    (
+        SELECT COUNT(*)
+        FROM vendas.formas_pagamento_venda
+    ) AS formas_pagamento_venda,
+    (
+        SELECT SUM(valor)
+        FROM vendas.formas_pagamento_venda
+    ) AS valor_pagamentos;
+-- ============================================
+-- ETAPA 7: Limpar tabelas temporárias
+-- ============================================
+DROP TABLE IF EXISTS tmp_produtos_os;
+DROP TABLE IF EXISTS tmp_dioptrias_os;
+DROP TABLE IF EXISTS tmp_pagamentos_os;
+-- ============================================
+-- FIM DO SCRIPT
+-- ============================================
@@ -24,6 +24,8 @@ CREATE TABLE staging.marketing_origens_vixen (
     -- Código extraído (ex: "04", "15", "138")
     como_conheceu_raw VARCHAR(200),
     -- Valor bruto do CSV
+    canal_codigo VARCHAR(50),
+    -- Código do canal já classificado no CSV (etl/utils/canais.py)
     -- Datas
     data_de_compra TIMESTAMP,
     prev_de_entr TIMESTAMP,
@@ -51,6 +53,7 @@ CREATE INDEX idx_mkt_vixen_como_conheceu_cod ON staging.marketing_origens_vixen(
 COMMENT ON TABLE staging.marketing_origens_vixen IS 'Staging table para dados de origem de clientes do arquivo vendas_os_completo.csv';
 COMMENT ON COLUMN staging.marketing_origens_vixen.como_conheceu_codigo IS 'Código numérico extraído do campo como_conheceu (ex: 04, 15, 138)';
 COMMENT ON COLUMN staging.marketing_origens_vixen.como_conheceu_raw IS 'Valor original do campo como_conheceu do CSV (com códigos numéricos)';
+COMMENT ON COLUMN staging.marketing_origens_vixen.canal_codigo IS 'Código de marketing.canais_aquisicao resolvido no CSV (mesmas regras de marketing.normalizar_como_conheceu)';
 COMMENT ON COLUMN staging.marketing_origens_vixen.canal_normalizado_id IS 'ID do canal após normalização (FK para marketing.canais_aquisicao)';
 COMMENT ON COLUMN staging.marketing_origens_vixen.processado IS 'Flag indicando se o registro já foi processado e normalizado';
 DO $$ BEGIN RAISE NOTICE '';
@@ -64,7 +67,7 @@ RAISE NOTICE 'Use o seguinte comando para importar via DBeaver/pgAdmin:';
 RAISE NOTICE '';
 RAISE NOTICE 'COPY staging.marketing_origens_vixen (';
 RAISE NOTICE '    os_n, loja, data_de_compra, consultor, venda,';
-RAISE NOTICE '    nome, cpf, como_conheceu_raw, prev_de_entr, total';
+RAISE NOTICE '    nome, cpf, como_conheceu_raw, prev_de_entr, total, canal_codigo';
 RAISE NOTICE ') FROM ''d:/projetos/carne_facil/povoamento/dados/csv/vendas_os_completo.csv''';
 RAISE NOTICE 'DELIMITER '',''';
 RAISE NOTICE 'CSV HEADER';
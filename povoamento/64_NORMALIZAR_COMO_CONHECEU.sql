@@ -125,12 +125,20 @@ LIMIT 20;
 DO $$ BEGIN RAISE NOTICE '';
 RAISE NOTICE '=== APLICANDO NORMALIZAÇÃO ===';
 END $$;
+-- Staging criado antes da coluna canal_codigo
+ALTER TABLE staging.marketing_origens_vixen
+ADD COLUMN IF NOT EXISTS canal_codigo VARCHAR(50);
 -- Atualizar campo canal_normalizado_id
+-- O CSV de criar_csv_marketing_correto.py já traz canal_codigo (classificado em
+-- Python por valor distinto); a função só roda para linhas importadas sem ele
 UPDATE staging.marketing_origens_vixen mkt
 SET canal_normalizado_id = c.id,
     processado = true
 FROM marketing.canais_aquisicao c
-WHERE c.codigo = marketing.normalizar_como_conheceu(mkt.como_conheceu_raw)
+WHERE c.codigo = COALESCE(
+        mkt.canal_codigo,
+        marketing.normalizar_como_conheceu(mkt.como_conheceu_raw)
+    )
     AND mkt.processado = false;
 -- ============================================================================
 -- ETAPA 5: VERIFICAR RESULTADO DA NORMALIZAÇÃO
@@ -30,7 +30,7 @@ END $$;
 \ echo '' \ echo '>>> PASSO 2/6: Criando tabela staging...' \ i 63_CRIAR_STAGING_MARKETING_VIXEN.sql -- ============================================================================
 -- PASSO 2.5: IMPORTAR CSV (MANUAL)
 -- ============================================================================
-\ echo '' \ echo '>>> PASSO 2.5/6: IMPORTAÇÃO DE CSV NECESSÁRIA' \ echo 'ATENÇÃO: Execute a importação do CSV manualmente:' \ echo '' \ echo 'Opção 1 - Via COPY (se tiver permissões):' \ echo "COPY staging.marketing_origens_vixen (os_n, loja, data_de_compra, consultor, venda, nome, cpf, como_conheceu_raw, prev_de_entr, total)" \ echo "FROM 'd:/projetos/carne_facil/povoamento/dados/csv/vendas_os_completo.csv'" \ echo "DELIMITER ',' CSV HEADER ENCODING 'UTF8';" \ echo '' \ echo 'Opção 2 - Via DBeaver/pgAdmin:' \ echo '  1. Clique com botão direito em staging.marketing_origens_vixen' \ echo '  2. Escolha "Import Data"' \ echo '  3. Selecione vendas_os_completo.csv' \ echo '  4. Mapeie as colunas corretamente' \ echo '' \ echo 'Pressione ENTER depois de importar o CSV para continuar...' \ prompt 'Pressione ENTER para continuar' _dummy -- Verificar se CSV foi importado
+\ echo '' \ echo '>>> PASSO 2.5/6: IMPORTAÇÃO DE CSV NECESSÁRIA' \ echo 'ATENÇÃO: Execute a importação do CSV manualmente:' \ echo '' \ echo 'Opção 1 - Via COPY (se tiver permissões):' \ echo "COPY staging.marketing_origens_vixen (os_n, loja, data_de_compra, consultor, venda, nome, cpf, como_conheceu_raw, prev_de_entr, total, canal_codigo)" \ echo "FROM 'd:/projetos/carne_facil/povoamento/dados/csv/vendas_os_completo.csv'" \ echo "DELIMITER ',' CSV HEADER ENCODING 'UTF8';" \ echo '' \ echo 'Opção 2 - Via DBeaver/pgAdmin:' \ echo '  1. Clique com botão direito em staging.marketing_origens_vixen' \ echo '  2. Escolha "Import Data"' \ echo '  3. Selecione vendas_os_completo.csv' \ echo '  4. Mapeie as colunas corretamente' \ echo '' \ echo 'Pressione ENTER depois de importar o CSV para continuar...' \ prompt 'Pressione ENTER para continuar' _dummy -- Verificar se CSV foi importado
 DO $$
 DECLARE total_registros INTEGER;
 BEGIN
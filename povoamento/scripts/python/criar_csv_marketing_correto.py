@@ -3,40 +3,23 @@
 Script CORRIGIDO para criar CSV com apenas as 10 colunas da tabela staging
 """
 
+import sys
+from collections import Counter
 import pandas as pd
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from etl.utils.canais import classificar_canais
+from etl.utils.exportacao_csv import TAMANHO_BLOCO, DivisorCSV
+
 # Arquivo de entrada (original do vixen)
 INPUT_FILE = 'dados/csv/vendas_os_completo.csv'
 OUTPUT_FILE = 'dados/csv/marketing_origens_vixen_correto.csv'
 
-def criar_csv_correto():
-    print("=" * 70)
-    print("CRIANDO CSV CORRIGIDO - 10 COLUNAS EXATAS")
-    print("=" * 70)
-    print()
-    
-    # Mapeamento de nomes de lojas para códigos
-    MAPA_LOJAS = {
-        'SUZANO': '042',
-        'RIO PEQUENO': '048',
-        'PERUS': '049',
-        'MAUA': '050',
-        'SAO MATEUS': '051',
-        'SUZANO II': '052'
-    }
-    
-    # Ler arquivo original
-    print(f"📂 Lendo: {INPUT_FILE}")
-    df = pd.read_csv(INPUT_FILE, encoding='utf-8', low_memory=False, dtype={'cpf': str})  # Forçar CPF como string
-    print(f"   Total original: {len(df):,} registros")
-    print()
-    
-    # Criar DataFrame com APENAS as 10 colunas da tabela
-    print("🔄 Selecionando apenas as 10 colunas necessárias...")
-    
+def transformar_bloco(df, mapa_lojas):
+    """Bloco do original -> as 10 colunas da tabela staging (+ canal_codigo)"""
     # Mapear nomes de lojas para códigos
-    df['loja_codigo'] = df['loja'].astype(str).str.strip().map(MAPA_LOJAS)
+    df['loja_codigo'] = df['loja'].astype(str).str.strip().map(mapa_lojas)
     
     # Se não encontrar no mapa, tentar usar direto (caso já seja código)
     df['loja_codigo'] = df['loja_codigo'].fillna(df['loja'])
@@ -58,9 +41,6 @@ def criar_csv_correto():
         'total': pd.to_numeric(df['total'], errors='coerce')
     })
     
-    # Limpar dados
-    print("🧹 Limpando dados...")
-    
     # Garantir limites de caracteres conforme tabela
     df_final['os_n'] = df_final['os_n'].str[:50]
     df_final['loja'] = df_final['loja'].str[:10]
@@ -71,60 +51,129 @@ def criar_csv_correto():
     df_final['consultor'] = df_final['consultor'].str[:100]
     df_final['venda'] = df_final['venda'].str[:50]
     
-    # Filtros básicos
-    antes = len(df_final)
-    df_final = df_final[
-        (df_final['os_n'].notna()) & 
-        (df_final['os_n'] != 'nan') & 
-        (df_final['os_n'] != '') &
-        (df_final['nome'].notna()) & 
-        (df_final['nome'] != 'nan') & 
-        (df_final['nome'] != '')
-    ]
-    print(f"   Removidos {antes - len(df_final):,} registros inválidos")
-    
-    # Remover duplicatas
-    antes = len(df_final)
-    df_final = df_final.drop_duplicates(subset=['os_n', 'nome'], keep='first')
-    print(f"   Removidas {antes - len(df_final):,} duplicatas")
+    # Canal já resolvido (mesmas regras de marketing.normalizar_como_conheceu),
+    # uma classificação por valor distinto em vez de uma chamada por linha no banco
+    df_final['canal_codigo'] = classificar_canais(df_final['como_conheceu_raw'])
+    return df_final
+
+def criar_csv_correto():
+    print("=" * 70)
+    print("CRIANDO CSV CORRIGIDO - 10 COLUNAS EXATAS")
+    print("=" * 70)
+    print()
+    
+    # Mapeamento de nomes de lojas para códigos
+    MAPA_LOJAS = {
+        'SUZANO': '042',
+        'RIO PEQUENO': '048',
+        'PERUS': '049',
+        'MAUA': '050',
+        'SAO MATEUS': '051',
+        'SUZANO II': '052'
+    }
+    
+    # Ler o original em blocos: cada bloco é transformado e gravado na hora
+    print(f"📂 Lendo: {INPUT_FILE} (blocos de {TAMANHO_BLOCO:,} linhas)")
+    print("🔄 Selecionando apenas as 10 colunas necessárias...")
+    print("🧹 Limpando dados...")
+
+    total_original = 0
+    invalidos = 0
+    duplicatas = 0
+    vistos = set()  # (os_n, nome) já gravados: duplicatas entre blocos
+    cpfs = set()
+    por_loja = Counter()
+    por_canal = Counter()
+    por_conheceu = Counter()
+    exemplos = {}
+    colunas = []
+
+    with DivisorCSV(Path(OUTPUT_FILE).parent, limite_bytes=None, modelo=Path(OUTPUT_FILE).name) as divisor:
+        leitor = pd.read_csv(INPUT_FILE, encoding='utf-8', low_memory=False, dtype={'cpf': str},  # Forçar CPF como string
+                             chunksize=TAMANHO_BLOCO)
+        for df in leitor:
+            total_original += len(df)
+            df_final = transformar_bloco(df, MAPA_LOJAS)
+
+            # Filtros básicos
+            antes = len(df_final)
+            df_final = df_final[
+                (df_final['os_n'].notna()) & 
+                (df_final['os_n'] != 'nan') & 
+                (df_final['os_n'] != '') &
+                (df_final['nome'].notna()) & 
+                (df_final['nome'] != 'nan') & 
+                (df_final['nome'] != '')
+            ]
+            invalidos += antes - len(df_final)
+
+            # Remover duplicatas (mantém a primeira, também entre blocos)
+            chaves = list(zip(df_final['os_n'], df_final['nome']))
+            manter = []
+            for chave in chaves:
+                manter.append(chave not in vistos)
+                vistos.add(chave)
+            duplicatas += manter.count(False)
+            df_final = df_final[manter]
+
+            # Estatísticas acumuladas
+            cpfs.update(df_final.loc[df_final['cpf'].str.len() == 11, 'cpf'])
+            por_loja.update(df_final['loja'].value_counts().to_dict())
+            por_canal.update(df_final['canal_codigo'].value_counts().to_dict())
+            por_conheceu.update(df_final.loc[df_final['como_conheceu_raw'] != '', 'como_conheceu_raw'].value_counts().to_dict())
+            if len(exemplos) < 10:
+                amostra = df_final[df_final['como_conheceu_codigo'] != ''][['como_conheceu_codigo', 'como_conheceu_raw', 'canal_codigo']]
+                for linha in amostra.drop_duplicates().itertuples(index=False, name=None):
+                    if len(exemplos) < 10:
+                        exemplos.setdefault(linha, None)
+
+            colunas = list(df_final.columns)
+            divisor.escrever_df(df_final)
+
+    total = divisor.partes[0]['linhas']
+    print(f"   Total original: {total_original:,} registros")
+    print(f"   Removidos {invalidos:,} registros inválidos")
+    print(f"   Removidas {duplicatas:,} duplicatas")
     print()
     
     # Estatísticas
     print("📊 ESTATÍSTICAS FINAIS:")
-    print(f"   Total de registros: {len(df_final):,}")
-    print(f"   CPFs únicos: {df_final[df_final['cpf'].str.len() == 11]['cpf'].nunique():,}")
+    print(f"   Total de registros: {total:,}")
+    print(f"   CPFs únicos: {len(cpfs):,}")
     print()
     
     print("   Por loja:")
-    for loja, count in df_final['loja'].value_counts().items():
+    for loja, count in por_loja.most_common():
         print(f"      Loja {loja}: {count:,}")
     print()
     
+    print("   Por canal:")
+    for canal, count in por_canal.most_common():
+        if count:
+            print(f"      {canal}: {count:,}")
+    print()
+    
     print("   Como_conheceu (top 10):")
-    top_conheceu = df_final[df_final['como_conheceu_raw'] != '']['como_conheceu_raw'].value_counts().head(10)
-    for valor, count in top_conheceu.items():
+    for valor, count in por_conheceu.most_common(10):
         print(f"      {valor}: {count:,}")
     print()
     
-    # Salvar
-    print(f"💾 Salvando: {OUTPUT_FILE}")
-    df_final.to_csv(OUTPUT_FILE, index=False, encoding='utf-8')
-    
+    # Salvo durante a leitura
+    print(f"💾 Salvo: {OUTPUT_FILE}")
     tamanho_mb = Path(OUTPUT_FILE).stat().st_size / (1024 * 1024)
     print(f"   Tamanho: {tamanho_mb:.2f} MB")
     print()
     
     # Mostrar colunas do CSV
     print("📋 COLUNAS DO CSV (na ordem):")
-    for i, col in enumerate(df_final.columns, 1):
+    for i, col in enumerate(colunas, 1):
         print(f"   {i}. {col}")
     print()
     
     # Mostrar exemplo de códigos extraídos
     print("🔍 EXEMPLOS DE CÓDIGOS EXTRAÍDOS:")
-    exemplos = df_final[df_final['como_conheceu_codigo'] != ''][['como_conheceu_codigo', 'como_conheceu_raw']].drop_duplicates().head(10)
-    for _, row in exemplos.iterrows():
-        print(f"   {row['como_conheceu_codigo']:>3} -> {row['como_conheceu_raw']}")
+    for codigo, raw, canal in exemplos:
+        print(f"   {codigo:>3} -> {raw} ({canal})")
     print()
     
     if tamanho_mb > 10:
@@ -1,71 +1,72 @@
 #!/usr/bin/env python3
 """
 Script para dividir CSV CORRETO em partes menores
+
+Lê o CSV linha a linha (memória constante) e corta cada parte no último
+registro que cabe em TAMANHO_MAX_MB, com o cabeçalho repetido em todas.
 """
 
-import pandas as pd
-import os
+import argparse
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from etl.utils.exportacao_csv import MB, dividir_csv
+
 # Configurações
 TAMANHO_MAX_MB = 10
 INPUT_FILE = 'dados/csv/marketing_origens_vixen_correto.csv'
 OUTPUT_DIR = 'dados/csv/marketing_partes'
 
-def dividir_csv_correto():
-    print("📂 Lendo arquivo:", INPUT_FILE)
-    
-    # Criar diretório
-    Path(OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
-    
-    # Ler CSV
-    df = pd.read_csv(INPUT_FILE, encoding='utf-8')
-    
-    total_linhas = len(df)
-    tamanho_bytes = os.path.getsize(INPUT_FILE)
-    tamanho_mb = tamanho_bytes / (1024 * 1024)
-    
-    print(f"📊 Total: {total_linhas:,} registros | {tamanho_mb:.2f} MB")
-    print(f"🎯 Dividindo em partes de até {TAMANHO_MAX_MB} MB...")
+def dividir_csv_correto(entrada=INPUT_FILE, saida=OUTPUT_DIR, tamanho_max_mb=TAMANHO_MAX_MB, comprimir=False):
+    print("📂 Lendo arquivo:", entrada)
+
+    tamanho_mb = Path(entrada).stat().st_size / MB
+    print(f"📊 Tamanho: {tamanho_mb:.2f} MB")
+    print(f"🎯 Dividindo em partes de até {tamanho_max_mb} MB...")
     print()
-    
-    # Calcular linhas por parte
-    linhas_por_mb = total_linhas / tamanho_mb
-    linhas_por_parte = int(linhas_por_mb * TAMANHO_MAX_MB)
-    numero_partes = (total_linhas // linhas_por_parte) + 1
-    
-    for i in range(numero_partes):
-        inicio = i * linhas_por_parte
-        fim = min((i + 1) * linhas_por_parte, total_linhas)
-        
-        df_parte = df.iloc[inicio:fim]
-        
-        output_file = f"{OUTPUT_DIR}/parte_{i+1:02d}_de_{numero_partes:02d}.csv"
-        df_parte.to_csv(output_file, index=False, encoding='utf-8')
-        
-        tamanho_parte_mb = os.path.getsize(output_file) / (1024 * 1024)
-        
-        print(f"✅ Parte {i+1}/{numero_partes}: {len(df_parte):,} registros | {tamanho_parte_mb:.2f} MB")
-    
+
+    # Partes de uma execução anterior (o total de partes pode ter mudado)
+    Path(saida).mkdir(parents=True, exist_ok=True)
+    for antiga in Path(saida).glob('parte_*_de_*.csv*'):
+        antiga.unlink()
+
+    partes = dividir_csv(entrada, saida, limite_bytes=int(tamanho_max_mb * MB), comprimir=comprimir)
+    numero_partes = len(partes)
+    total_linhas = sum(parte['linhas'] for parte in partes)
+
+    for i, parte in enumerate(partes, 1):
+        aviso = " ⚠️ registro maior que o limite" if parte['bytes'] > tamanho_max_mb * MB else ""
+        print(f"✅ Parte {i}/{numero_partes}: {parte['linhas']:,} registros | {parte['tamanho'] / MB:.2f} MB{aviso}")
+
     print()
     print("=" * 70)
     print("🎉 DIVISÃO CONCLUÍDA!")
     print("=" * 70)
     print()
-    print(f"📁 Arquivos em: {OUTPUT_DIR}/")
+    print(f"📁 Arquivos em: {saida}/")
     print()
     print("📋 INSTRUÇÕES PARA IMPORTAR:")
     print()
     print("1. Criar tabela: \\i 63_CRIAR_STAGING_MARKETING_VIXEN.sql")
     print()
     print("2. Importar cada parte no DBeaver (⚠️ APPEND, não truncar):")
-    for i in range(numero_partes):
-        print(f"   {i+1}. parte_{i+1:02d}_de_{numero_partes:02d}.csv")
+    for i, parte in enumerate(partes, 1):
+        print(f"   {i}. {parte['arquivo'].name}")
     print()
     print("3. Validar:")
     print(f"   SELECT COUNT(*) FROM staging.marketing_origens_vixen;")
     print(f"   Esperado: {total_linhas:,}")
     print()
 
+    return partes
+
 if __name__ == '__main__':
-    dividir_csv_correto()
+    parser = argparse.ArgumentParser(description="Divide o CSV de marketing em partes de tamanho máximo")
+    parser.add_argument('entrada', nargs='?', default=INPUT_FILE)
+    parser.add_argument('--saida', default=OUTPUT_DIR)
+    parser.add_argument('--tamanho-mb', type=float, default=TAMANHO_MAX_MB, help="Tamanho máximo de cada parte")
+    parser.add_argument('--gzip', action='store_true', help="Gravar as partes como .csv.gz")
+    args = parser.parse_args()
+
+    dividir_csv_correto(args.entrada, args.saida, args.tamanho_mb, args.gzip)
@@ -6,9 +6,13 @@ e identifica dados 2025 disponíveis
 """
 
 import os
+import sys
 from pathlib import Path
 import glob
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from etl.utils.indice_arquivos import IndiceArquivos
+
 class MapeadorEstruturaReal:
     def __init__(self):
         # Possíveis locais da estrutura real
@@ -70,18 +74,17 @@ class MapeadorEstruturaReal:
             print(f"🔍 Buscando 'lojas' em {drive}...")
             
             try:
-                # Buscar pasta com nome "lojas" ou "LOJAS"
-                for pasta in drive_path.rglob("*"):
-                    if pasta.is_dir():
-                        nome_pasta = pasta.name.upper()
-                        
-                        if nome_pasta in ['LOJAS', 'LOJA']:
-                            pastas_suspeitas.append(pasta)
-                            print(f"   🏪 Encontrada: {pasta}")
-                        
-                        # Limitar busca
-                        if len(pastas_suspeitas) >= 5:
-                            break
+                # Buscar pasta com nome "lojas" ou "LOJAS" (índice reaproveitado entre execuções)
+                indice = IndiceArquivos(drive_path).atualizar()
+                print(f"   📁 {indice.resumo()}")
+                for pasta in indice.pastas():
+                    if pasta.name.upper() in ['LOJAS', 'LOJA']:
+                        pastas_suspeitas.append(pasta)
+                        print(f"   🏪 Encontrada: {pasta}")
+                    
+                    # Limitar busca
+                    if len(pastas_suspeitas) >= 5:
+                        break
                             
             except PermissionError:
                 print(f"   ⚠️ Sem permissão para acessar {drive}")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+VERIFICADOR DE PARIDADE - AGRUPAMENTO POR NOME
+Confere que o IndiceNomes gera os mesmos grupos da busca linear com fuzz.ratio > 90
+"""
+
+import sys
+import time
+import random
+from pathlib import Path
+from collections import defaultdict
+
+from fuzzywuzzy import fuzz
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from etl.utils.similaridade import IndiceNomes
+
+PRIMEIROS = ['MARIA', 'JOSE', 'ANA', 'JOAO', 'ANTONIO', 'FRANCISCO', 'CARLOS', 'PAULO', 'LUCAS',
+             'JULIANA', 'MARCOS', 'PATRICIA', 'ALINE', 'FERNANDA', 'RAFAEL', 'BRUNO', 'LUIZ', 'EDUARDO']
+SOBRENOMES = ['SILVA', 'SANTOS', 'OLIVEIRA', 'SOUZA', 'RODRIGUES', 'FERREIRA', 'ALVES', 'PEREIRA',
+              'LIMA', 'GOMES', 'COSTA', 'RIBEIRO', 'MARTINS', 'CARVALHO', 'DE', 'DA', 'DOS']
+
+
+def gerar_nomes(n, seed=42):
+    """Nomes com repetições e erros de digitação (troca, falta ou sobra de letra)"""
+    rnd = random.Random(seed)
+    base = []
+    for _ in range(max(n // 3, 1)):
+        partes = [rnd.choice(PRIMEIROS)] + [rnd.choice(SOBRENOMES) for _ in range(rnd.randint(0, 4))]
+        base.append(' '.join(partes))
+
+    nomes = []
+    for _ in range(n):
+        nome = list(rnd.choice(base))
+        for _ in range(rnd.choice([0, 0, 1, 1, 2])):
+            pos = rnd.randrange(len(nome))
+            operacao = rnd.choice(['troca', 'falta', 'sobra'])
+            if operacao == 'troca':
+                nome[pos] = rnd.choice('ABCDEFGHIJLMNOPRSTUVZ')
+            elif operacao == 'falta' and len(nome) > 2:
+                del nome[pos]
+            else:
+                nome.insert(pos, rnd.choice('ABCDEFGHIJLMNOPRSTUVZ'))
+        nomes.append(''.join(nome).strip() or 'ANA')
+    return nomes
+
+
+def agrupar_linear(nomes):
+    """Busca linear de referência (como estava em identificar_duplicatas)"""
+    grupos = defaultdict(list)
+    nome_index = {}
+    for i, nome in enumerate(nomes):
+        for nome_existente in nome_index:
+            if fuzz.ratio(nome, nome_existente) > 90:
+                grupos[f"nome_{nome_existente}"].append(i)
+                break
+        else:
+            nome_index[nome] = [i]
+            grupos[f"nome_{nome}"].append(i)
+    return dict(grupos)
+
+
+def agrupar_indice(nomes):
+    grupos = defaultdict(list)
+    indice = IndiceNomes(limiar=90)
+    for i, nome in enumerate(nomes):
+        nome_existente = indice.buscar(nome)
+        if nome_existente is not None:
+            grupos[f"nome_{nome_existente}"].append(i)
+        else:
+            indice.adicionar(nome)
+            grupos[f"nome_{nome}"].append(i)
+    return dict(grupos), indice.comparacoes
+
+
+def verificar(n=3_000):
+    print("🔍 VERIFICAÇÃO DE PARIDADE - AGRUPAMENTO POR NOME")
+    print("=" * 60)
+    nomes = gerar_nomes(n)
+
+    inicio = time.perf_counter()
+    esperado = agrupar_linear(nomes)
+    t_linear = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtido, comparacoes = agrupar_indice(nomes)
+    t_indice = time.perf_counter() - inicio
+
+    print(f"⏱️  Linear: {t_linear:.2f}s | Índice: {t_indice:.2f}s | Ganho: {t_linear / max(t_indice, 1e-9):.1f}x")
+    print(f"🔢 Comparações fuzzy com índice: {comparacoes:,}")
+
+    if esperado != obtido:
+        chaves = set(esperado) ^ set(obtido) | {k for k in set(esperado) & set(obtido) if esperado[k] != obtido[k]}
+        print(f"❌ {len(chaves)} grupos diferentes (ex.: {sorted(chaves)[:3]})")
+        return len(chaves)
+
+    print(f"✅ {len(nomes):,} nomes, {len(obtido):,} grupos idênticos")
+    return 0
+
+
+if __name__ == "__main__":
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 3_000
+    sys.exit(1 if verificar(quantidade) else 0)
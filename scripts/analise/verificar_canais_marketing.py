@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+VERIFICADOR DE PARIDADE - CANAIS DE MARKETING
+Confere que ClassificadorCanais devolve o mesmo código que o CASE de
+marketing.normalizar_como_conheceu, avaliado regra a regra como no plpgsql
+"""
+
+import re
+import sys
+import time
+import random
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from etl.utils.canais import ClassificadorCanais, REGRAS_CANAIS
+
+# ---------------------------------------------------------------------------
+# Função SQL de referência (um LIKE de cada vez, na ordem do CASE)
+# ---------------------------------------------------------------------------
+
+def ref_like(texto, padrao):
+    # Sem [ ] nos padrões, então o fnmatch equivale ao LIKE com % → * e _ → ?
+    return fnmatchcase(texto, padrao.replace('%', '*').replace('_', '?'))
+
+def ref_normalizar_como_conheceu(texto_bruto):
+    if texto_bruto is None or pd.isna(texto_bruto) or str(texto_bruto).strip(' ') == '':
+        return 'NAO_INFORMADO'
+    texto_limpo = str(texto_bruto).strip(' ').upper()
+    texto_limpo = re.sub(r'^[0-9]+\s*-?\s*', '', texto_limpo)
+    for codigo, padroes in REGRAS_CANAIS:
+        if any(ref_like(texto_limpo, padrao) for padrao in padroes):
+            return codigo
+    return 'OUTROS'
+
+# ---------------------------------------------------------------------------
+# Amostra com os valores vistos no vendas_os_completo.csv
+# ---------------------------------------------------------------------------
+
+BASES = ['CLIENTES', 'JA E CLIENTE', 'ORÇAMENTO', 'orcamento', 'INDICAÇÃO', 'INDICACAO DE AMIGO',
+         'AMIGO', 'SAUDE DOS OLHOS', 'ABORDAGEM', 'TELE MARKETING', 'DIVULGADOR', 'REDES SOCIAIS',
+         'facebook', 'INSTAGRAM', 'WHATS', 'ZAP', 'CARTÃO', 'cartao de credito', 'GOOGLE', 'INTERNET',
+         'BUSCA', 'NÃO', 'nao', 'SIM', 'PASSANDO NA RUA', 'PANFLETO', '', '   ', '-', '12']
+
+def gerar_amostra(n, seed=42):
+    rnd = random.Random(seed)
+    valores = []
+    for _ in range(n):
+        base = rnd.choice(BASES + [None])
+        if base is not None and rnd.random() < 0.5:
+            base = f"{rnd.randrange(1, 200):02d}{rnd.choice([' ', ' - ', '-', ''])}{base}"
+        valores.append(base)
+    return pd.Series(valores)
+
+# ---------------------------------------------------------------------------
+# Execução
+# ---------------------------------------------------------------------------
+
+def verificar(n=200_000):
+    print("🔍 VERIFICAÇÃO DE PARIDADE - CANAIS DE MARKETING")
+    print("=" * 60)
+
+    valores = gerar_amostra(n)
+    print(f"📄 Amostra sintética: {n:,} linhas, {valores.nunique():,} valores distintos")
+
+    inicio = time.perf_counter()
+    esperado = valores.map(ref_normalizar_como_conheceu, na_action=None)
+    t_linhas = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtido = ClassificadorCanais().classificar(valores).astype(str)
+    t_distintos = time.perf_counter() - inicio
+
+    print(f"⏱️  Linha a linha: {t_linhas:.2f}s | Por valor distinto: {t_distintos:.2f}s | Ganho: {t_linhas / max(t_distintos, 1e-9):.1f}x")
+
+    diferentes = esperado != obtido
+    if diferentes.any():
+        exemplo = diferentes.idxmax()
+        print(f"❌ {int(diferentes.sum())} diferenças (ex.: {valores[exemplo]!r}: {esperado[exemplo]} x {obtido[exemplo]})")
+    else:
+        print(f"✅ {n:,} valores classificados igual à função SQL")
+        for canal, quantidade in obtido.value_counts().items():
+            print(f"   • {canal}: {quantidade:,}")
+
+    return int(diferentes.sum())
+
+if __name__ == "__main__":
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    sys.exit(1 if verificar(linhas) else 0)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+VERIFICADOR - CONSOLIDADO DA EXTRAÇÃO DE CAIXA
+Roda salvar_dados_consolidados de ponta a ponta em uma pasta temporária e
+confere que o xlsx sai com as abas de transações, resumos e relatório
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from scripts.processamento.extrair_dados_caixa import ExtratorDadosCaixa
+
+ABAS = ['Transacoes', 'Resumos_Mensais', 'Relatorio_Extracao']
+
+
+def verificar():
+    print("🔍 VERIFICAÇÃO - CONSOLIDADO DA EXTRAÇÃO DE CAIXA")
+    print("=" * 60)
+
+    erros = 0
+    with tempfile.TemporaryDirectory() as pasta:
+        extrator = ExtratorDadosCaixa()
+        extrator.pasta_caixa = Path(pasta)
+        extrator.dados_extraidos = [
+            {'loja': 'MAUA', 'data_transacao': '2024-01-02', 'valor': 150.0},
+            {'loja': 'SUZANO', 'data_transacao': '2024-01-05', 'valor': 80.5},
+        ]
+        extrator.resumo_extraido = [{'loja': 'MAUA', 'mes_ano': '2024_01', 'total': 150.0}]
+
+        arquivo = extrator.salvar_dados_consolidados()
+        if not arquivo or not Path(arquivo).exists():
+            print("❌ Consolidado não foi gravado")
+            return 1
+
+        abas = pd.read_excel(arquivo, sheet_name=None)
+        faltando = [aba for aba in ABAS if aba not in abas]
+        if faltando:
+            print(f"❌ Abas faltando: {', '.join(faltando)}")
+            erros += len(faltando)
+        else:
+            relatorio = abas['Relatorio_Extracao'].iloc[0]
+            esperado = {'Total_Transacoes': 2, 'Total_Resumos': 1, 'Lojas_Processadas': 2,
+                        'Periodo_Dados': '2024-01-02 a 2024-01-05'}
+            diferentes = {campo: relatorio[campo] for campo, valor in esperado.items() if relatorio[campo] != valor}
+            if diferentes or len(abas['Transacoes']) != 2:
+                print(f"❌ Relatório de extração diferente do esperado: {diferentes}")
+                erros += 1
+            else:
+                print(f"✅ {Path(arquivo).name}: {', '.join(ABAS)}")
+
+    return erros
+
+
+if __name__ == "__main__":
+    sys.exit(1 if verificar() else 0)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+VERIFICADOR DE PARIDADE - IDs DE CLIENTE
+Confere que chaves_clientes gera a mesma chave que
+SistemaIDCliente.gerar_chave_cliente, que a primeira numeração do registro é a
+mesma da ordem de chegada e que a base embaralhada mantém os IDs
+
+A referência recebe os valores de cada coluna (como chaves_clientes): o
+iterrows da versão antiga troca None por NaT/NaN conforme as outras colunas
+da linha, o que só muda o HASH_ de linhas sem nome e sem CPF
+"""
+
+import sys
+import time
+import random
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from etl.utils.ids_clientes import RegistroIDs, chaves_clientes
+from scripts.criar_sistema_id_cliente import SistemaIDCliente
+
+NOMES = ['MARIA DA SILVA', 'José  Conceição', 'joão.pereira', 'ANA-PAULA SOUZA ', '  ', '...', 'Zé']
+DATAS = [None, '1980-01-01', '01/02/1975', pd.Timestamp('1990-05-17'), pd.NaT]
+
+
+def gerar_base(n, seed=42):
+    rnd = random.Random(seed)
+    nomes, cpfs, datas = [], [], []
+    for _ in range(n):
+        nomes.append(rnd.choice(NOMES + [None]) if rnd.random() < 0.3 else f"CLIENTE {rnd.randrange(n // 3)}")
+        sorteio = rnd.random()
+        if sorteio < 0.4:
+            cpfs.append(f"{rnd.randrange(10**11):011d}")
+        elif sorteio < 0.5:
+            cpf = f"{rnd.randrange(10**11):011d}"
+            cpfs.append(f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}")
+        elif sorteio < 0.6:
+            cpfs.append(rnd.randrange(10**10, 10**11))
+        else:
+            cpfs.append(rnd.choice([None, '', '123', float('nan')]))
+        datas.append(rnd.choice(DATAS))
+    return pd.DataFrame({'nome_completo': nomes, 'cpf': cpfs, 'data_nascimento': datas})
+
+
+def ids_por_ordem_de_chegada(chaves):
+    """Numeração da versão antiga (contador por chave nova)"""
+    mapa = {}
+    return [mapa.setdefault(chave, f"CLI_{len(mapa) + 1:06d}") for chave in chaves]
+
+
+def verificar(n=100_000):
+    print("🔍 VERIFICAÇÃO DE PARIDADE - IDs DE CLIENTE")
+    print("=" * 60)
+
+    base = gerar_base(n)
+    sistema = SistemaIDCliente()
+
+    # Tempo da versão antiga (iterrows + gerar_chave_cliente)
+    inicio = time.perf_counter()
+    for _, cliente in base.iterrows():
+        sistema.gerar_chave_cliente(cliente.get('nome_completo'), cliente.get('cpf'), cliente.get('data_nascimento'))
+    t_linhas = time.perf_counter() - inicio
+
+    esperado = [
+        sistema.gerar_chave_cliente(nome, cpf, data)
+        for nome, cpf, data in zip(base['nome_completo'].tolist(), base['cpf'].tolist(), base['data_nascimento'].tolist())
+    ]
+
+    inicio = time.perf_counter()
+    chaves = chaves_clientes(base['nome_completo'], base['cpf'], base['data_nascimento'])
+    t_colunas = time.perf_counter() - inicio
+    print(f"⏱️  Linha a linha: {t_linhas:.2f}s | Por coluna: {t_colunas:.2f}s | Ganho: {t_linhas / max(t_colunas, 1e-9):.1f}x")
+
+    erros = 0
+    diferentes = pd.Series(esperado) != chaves.reset_index(drop=True)
+    if diferentes.any():
+        exemplo = diferentes.idxmax()
+        print(f"❌ {int(diferentes.sum())} chaves diferentes (ex.: {base.iloc[exemplo].tolist()}: {esperado[exemplo]} x {chaves.iloc[exemplo]})")
+        erros += int(diferentes.sum())
+    else:
+        print(f"✅ {n:,} chaves iguais a gerar_chave_cliente")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo = Path(pasta) / "registro.parquet"
+
+        registro = RegistroIDs(arquivo)
+        ids = registro.atribuir(chaves)
+        registro.salvar()
+        if ids.tolist() != ids_por_ordem_de_chegada(chaves):
+            print("❌ Primeira numeração difere da ordem de chegada")
+            erros += 1
+        else:
+            print(f"✅ Primeira execução: {registro.estatisticas['novos']:,} IDs, mesma numeração da ordem de chegada")
+
+        # Nova execução: base embaralhada + clientes novos
+        extras = gerar_base(n // 10, seed=7)
+        embaralhada = pd.concat([base, extras], ignore_index=True).sample(frac=1, random_state=1)
+        chaves2 = chaves_clientes(embaralhada['nome_completo'], embaralhada['cpf'], embaralhada['data_nascimento'])
+
+        inicio = time.perf_counter()
+        registro2 = RegistroIDs(arquivo)
+        ids2 = registro2.atribuir(chaves2)
+        registro2.salvar()
+        t_registro = time.perf_counter() - inicio
+
+        anteriores = dict(zip(chaves, ids))
+        mudaram = sum(anteriores.get(c, i) != i for c, i in zip(chaves2, ids2))
+        novos = [i for c, i in zip(chaves2, ids2) if c not in anteriores]
+        ultimo = int(ids.str[4:].astype(int).max())
+        if mudaram or (novos and min(int(i[4:]) for i in novos) <= ultimo):
+            print(f"❌ {mudaram} IDs mudaram na base embaralhada")
+            erros += max(mudaram, 1)
+        else:
+            print(f"✅ Base embaralhada: {registro2.estatisticas['existentes']:,} IDs mantidos, "
+                  f"{registro2.estatisticas['novos']:,} novos a partir de CLI_{ultimo + 1:06d} ({t_registro:.2f}s)")
+
+    return erros
+
+
+if __name__ == "__main__":
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    sys.exit(1 if verificar(linhas) else 0)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+VERIFICADOR - NORMALIZADOR DE VENDAS_OS_COMPLETO
+Confere que as tabelas longas respeitam NOT NULL/CHECK de optica.produtos_os,
+optica.dioptrias e vendas.formas_pagamento_venda (o resto vai para
+*_rejeitados) e que as colunas de cada CSV seguem a ordem das tabelas
+temporárias do SQL de carga (COPY ... CSV HEADER casa por posição)
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from etl.normalizar_vendas_os import NormalizadorVendasOS
+
+SQL_CARGA = Path('povoamento/13_importar_produtos_dioptrias_pagamentos_os.sql')
+TABELAS_CARGA = {'produtos_os': 'tmp_produtos_os', 'dioptrias_os': 'tmp_dioptrias_os',
+                 'pagamentos_os': 'tmp_pagamentos_os'}
+
+
+def vendas_exemplo() -> pd.DataFrame:
+    return pd.DataFrame({
+        'os_n': ['1001', '1002', '1003'],
+        '_id_loja_codigo': ['9', '9', '10'],
+        # 1001: produto com descrição e valor, produto sem preço próprio; 1002: só código
+        'cod_trello': ['A1', '385468', None], 'descricao': ['ARMACAO ACETATO', None, None],
+        'valor': ['250,00', '0', None],
+        'cod17': [None, None, None], 'descricao18': ['CR AR BLUE', None, None], 'valor19': [None, None, None],
+        # 1003 só com cilíndrico: sem esférico em OD e OE
+        'esf': ['-1,25', '0,50', None], 'cil': ['-0,50', None, '-0,75'], 'eixo': ['90', None, '180'],
+        'esf2': ['-1,00', None, None], 'cil3': [None, None, '-0,50'], 'eixo4': [None, None, '170'],
+        'pagto_1': ['DN', 'GARANTIA', 'PIX'], 'sinal_1': ['100', '50', '0'],
+        'pagto_2': ['CTC', None, None], 'sinal_2': ['150', None, None],
+    })
+
+
+def violacoes(tabelas) -> list:
+    """Restrições do destino que alguma linha ainda quebra"""
+    produtos, dioptrias, pagamentos = tabelas['produtos_os'], tabelas['dioptrias_os'], tabelas['pagamentos_os']
+    regras = {
+        'produtos_os.descricao NOT NULL': produtos['descricao'].isna(),
+        'produtos_os.valor_unitario >= 0': ~(produtos['valor_unitario'] >= 0),
+        'dioptrias.chk_dioptrias_dados': dioptrias['od_esferico'].isna() & dioptrias['oe_esferico'].isna(),
+        'formas_pagamento_venda.forma_pagamento NOT NULL': pagamentos['forma_pagamento'].isna(),
+        'formas_pagamento_venda.valor > 0': ~(pagamentos['valor'] > 0),
+    }
+    return [f"{regra}: {int(linhas.sum()):,} linhas" for regra, linhas in regras.items() if linhas.any()]
+
+
+def colunas_sql(tabela: str) -> list:
+    bloco = re.search(rf"CREATE TEMP TABLE IF NOT EXISTS {tabela} \((.*?)\);", SQL_CARGA.read_text(), re.S)
+    return [linha.strip().split()[0] for linha in bloco.group(1).strip().splitlines()]
+
+
+def verificar():
+    print("🔍 VERIFICAÇÃO - NORMALIZADOR DE VENDAS_OS_COMPLETO")
+    print("=" * 60)
+
+    erros = 0
+    normalizador = NormalizadorVendasOS()
+    tabelas = normalizador.normalizar(vendas_exemplo())
+    rejeitados = normalizador.separar_rejeitados(tabelas)
+
+    problemas = violacoes(tabelas)
+    esperado = {'produtos_os_rejeitados': 1, 'dioptrias_os_rejeitados': 1, 'pagamentos_os_rejeitados': 2}
+    obtido = {nome: len(linhas) for nome, linhas in rejeitados.items()}
+    if problemas or obtido != esperado:
+        print(f"❌ Exemplo: rejeitados {obtido} (esperado {esperado}) {problemas}")
+        erros += 1
+    else:
+        sem_preco = tabelas['produtos_os'].query("descricao == 'CR AR BLUE'")['valor_unitario'].tolist()
+        if sem_preco != [0.0]:
+            print(f"❌ Produto sem preço próprio deveria ir com valor 0: {sem_preco}")
+            erros += 1
+        else:
+            print(f"✅ Exemplo: {len(tabelas['produtos_os'])} produtos, {len(tabelas['dioptrias_os'])} dioptrias, "
+                  f"{len(tabelas['pagamentos_os'])} pagamentos válidos; rejeitados {obtido}")
+
+    for nome, tabela in TABELAS_CARGA.items():
+        if list(tabelas[nome].columns) != colunas_sql(tabela):
+            print(f"❌ {nome}.csv fora da ordem de {tabela}: {list(tabelas[nome].columns)} x {colunas_sql(tabela)}")
+            erros += 1
+    if not erros:
+        print(f"✅ Colunas dos CSVs na ordem das tabelas temporárias de {SQL_CARGA.name}")
+
+    if normalizador.arquivo.exists():
+        tabelas = normalizador.normalizar()
+        rejeitados = normalizador.separar_rejeitados(tabelas)
+        problemas = violacoes(tabelas)
+        if problemas:
+            print(f"❌ {normalizador.arquivo.name}: {'; '.join(problemas)}")
+            erros += 1
+        else:
+            totais = ', '.join(f"{nome} {len(linhas):,}" for nome, linhas in tabelas.items())
+            print(f"✅ {normalizador.arquivo.name}: {totais} dentro das restrições do destino")
+
+    return erros
+
+
+if __name__ == "__main__":
+    sys.exit(1 if verificar() else 0)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+VERIFICADOR DE PARIDADE - PADRONIZAÇÃO VIXEN
+Confere que a conversão por colunas gera exatamente o mesmo resultado da versão linha a linha
+"""
+
+import re
+import sys
+import time
+import random
+from pathlib import Path
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from etl.padronizar_clientes_vixen import PadronizadorClientesVixen, COLUNAS_PADRONIZADAS
+from etl.utils.canais import ClassificadorCanais
+
+# ---------------------------------------------------------------------------
+# Conversão linha a linha de referência (como estava no padronizador)
+# ---------------------------------------------------------------------------
+
+def ref_limpar_telefone(fone_str):
+    if pd.isna(fone_str):
+        return None
+    fone_limpo = re.sub(r'[^\d]', '', str(fone_str))
+    if len(fone_limpo) >= 10:
+        if len(fone_limpo) == 11:
+            return f"({fone_limpo[:2]}) {fone_limpo[2:7]}-{fone_limpo[7:]}"
+        elif len(fone_limpo) == 10:
+            return f"({fone_limpo[:2]}) {fone_limpo[2:6]}-{fone_limpo[6:]}"
+    return str(fone_str)
+
+def ref_limpar_cep(cep_str):
+    if pd.isna(cep_str):
+        return None
+    cep_limpo = re.sub(r'[^\d]', '', str(cep_str))
+    if len(cep_limpo) >= 5:
+        return cep_limpo[:8]
+    return None
+
+def ref_processar_data_nascimento(data_str):
+    if pd.isna(data_str):
+        return None
+    try:
+        data_str = str(data_str)
+        if ' ' in data_str:
+            data_str = data_str.split(' ')[0]
+        if '-' in data_str:
+            return pd.to_datetime(data_str, format='%Y-%m-%d').strftime('%d/%m/%Y')
+        elif '/' in data_str:
+            return pd.to_datetime(data_str, format='%d/%m/%Y').strftime('%d/%m/%Y')
+        else:
+            return None
+    except Exception:
+        return None
+
+def ref_criar_chave_cliente(row):
+    nome = str(row.get('Nome Completo', '')).strip()
+    fone = str(row.get('Fone', '')).strip()
+    id_vixen = str(row.get('ID', ''))
+    if nome and fone and fone != 'nan':
+        digitos = re.sub(r'[^\d]', '', fone)[:8]
+        chave = f"VIXEN_{nome[:20].replace(' ', '_')}_{digitos}"
+    else:
+        chave = f"VIXEN_ID_{id_vixen}"
+    return chave.upper()
+
+def converter_linha_a_linha(df_vixen, timestamp):
+    classificador = ClassificadorCanais()
+    clientes_padronizados = []
+    for _, row in df_vixen.iterrows():
+        id_vixen_original = row.get('ID')
+        clientes_padronizados.append({
+            'ID_CLIENTE': f"VXN_{id_vixen_original:07d}",
+            'CHAVE_CLIENTE': ref_criar_chave_cliente(row),
+            'METODO_ID': 'VIXEN_ID_ORIGINAL',
+            'nome_completo': str(row.get('Nome Completo', '')).strip(),
+            'cpf': None,
+            'rg': None,
+            'data_nascimento': ref_processar_data_nascimento(row.get('Dt de aniversário')),
+            'celular': ref_limpar_telefone(row.get('Fone')),
+            'email': str(row.get('E-mail', '')).strip() if pd.notna(row.get('E-mail')) else None,
+            'endereco': str(row.get('Endereço', '')).strip(),
+            'cep': ref_limpar_cep(row.get('CEP')),
+            'bairro': str(row.get('Bairro', '')).strip(),
+            'origem_loja': 'VIXEN',
+            'origem_arquivo': 'clientes_completos_vixen.XLSX',
+            'total_registros_mesclados': 1,
+            'data_extracao': timestamp,
+            'id_vixen_original': id_vixen_original,
+            'cidade': str(row.get('Cidade', '')).strip(),
+            'uf': str(row.get('UF', '')).strip(),
+            'sexo': str(row.get('Sexo', '')).strip(),
+            'vendedor': str(row.get('Vendedor', '')).strip(),
+            'conceito': str(row.get('Conceito', '')).strip(),
+            'como_conheceu': str(row.get('Como nos conheceu', '')).strip(),
+            'canal_codigo': classificador.classificar_valor(row.get('Como nos conheceu'))
+        })
+    return pd.DataFrame(clientes_padronizados)
+
+# ---------------------------------------------------------------------------
+# Amostra sintética (quando o export Vixen não está disponível)
+# ---------------------------------------------------------------------------
+
+def gerar_amostra_vixen(n, seed=42):
+    rnd = random.Random(seed)
+
+    def fone():
+        num = ''.join(rnd.choice('0123456789') for _ in range(8))
+        return rnd.choice([f"(11) 9{num[:4]}-{num[4:]}", f"119{num}", f"11{num}", num[:6], None, 11942405279])
+
+    def aniversario():
+        return rnd.choice([
+            pd.Timestamp(1950 + rnd.randrange(60), 1 + rnd.randrange(12), 1 + rnd.randrange(28)),
+            f"{1 + rnd.randrange(28):02d}/{1 + rnd.randrange(12):02d}/19{rnd.randrange(40, 99)}",
+            '1985-02-30', '31/02/1990', '00/00/0000', 'sem data', None
+        ])
+
+    return pd.DataFrame({
+        'ID': [2000000 + i for i in range(n)],
+        'Nome Completo': [rnd.choice(['MARIA DA SILVA', ' João Souza ', 'ANA', None, '']) for _ in range(n)],
+        'Fone': [fone() for _ in range(n)],
+        'E-mail': [rnd.choice(['fulano@mail.com ', '', None, 'x']) for _ in range(n)],
+        'Endereço': [rnd.choice(['RUA A, 10', None]) for _ in range(n)],
+        'CEP': [rnd.choice(['09370-000', '0937', 8670123, None]) for _ in range(n)],
+        'Bairro': [rnd.choice(['CENTRO', None]) for _ in range(n)],
+        'Cidade': [rnd.choice(['MAUÁ', None]) for _ in range(n)],
+        'UF': [rnd.choice(['SP', None]) for _ in range(n)],
+        'Sexo': [rnd.choice(['F', 'M', None]) for _ in range(n)],
+        'Dt de aniversário': [aniversario() for _ in range(n)],
+        'Vendedor': [rnd.choice(['CARLA', None]) for _ in range(n)],
+        'Conceito': [rnd.choice(['A', None]) for _ in range(n)],
+        'Como nos conheceu': [rnd.choice(['INDICAÇÃO', 'INSTAGRAM', '04 CLIENTES', ' não ', 4, None]) for _ in range(n)],
+    })
+
+# ---------------------------------------------------------------------------
+# Execução
+# ---------------------------------------------------------------------------
+
+def verificar(n=20_000):
+    print("🔍 VERIFICAÇÃO DE PARIDADE - PADRONIZAÇÃO VIXEN")
+    print("=" * 60)
+
+    padronizador = PadronizadorClientesVixen()
+    if padronizador.arquivo_vixen.exists():
+        print(f"📄 Usando export real: {padronizador.arquivo_vixen.name}")
+        df_vixen = pd.read_excel(padronizador.arquivo_vixen)
+    else:
+        print(f"📄 Export Vixen não encontrado, usando amostra sintética ({n:,} linhas)")
+        df_vixen = gerar_amostra_vixen(n)
+
+    timestamp = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+
+    inicio = time.perf_counter()
+    esperado = converter_linha_a_linha(df_vixen, timestamp)
+    t_linhas = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtido = padronizador.converter(df_vixen, timestamp)
+    t_colunas = time.perf_counter() - inicio
+
+    print(f"⏱️  Linha a linha: {t_linhas:.2f}s | Por colunas: {t_colunas:.2f}s | Ganho: {t_linhas / max(t_colunas, 1e-9):.1f}x")
+
+    divergencias = 0
+    if list(obtido.columns) != COLUNAS_PADRONIZADAS or list(esperado.columns) != COLUNAS_PADRONIZADAS:
+        print("❌ Ordem das colunas diferente")
+        divergencias += 1
+
+    for coluna in COLUNAS_PADRONIZADAS:
+        a = esperado[coluna].astype(object).where(esperado[coluna].notna(), None)
+        b = obtido[coluna].astype(object).where(obtido[coluna].notna(), None)
+        diferentes = (a.map(repr) != b.map(repr)).sum()
+        if diferentes:
+            divergencias += diferentes
+            exemplo = (a.map(repr) != b.map(repr)).idxmax()
+            print(f"❌ {coluna}: {diferentes} diferenças (ex.: {a[exemplo]!r} x {b[exemplo]!r})")
+
+    if divergencias == 0:
+        print(f"✅ {len(obtido):,} clientes idênticos em {len(COLUNAS_PADRONIZADAS)} colunas")
+
+    return divergencias
+
+if __name__ == "__main__":
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    sys.exit(1 if verificar(linhas) else 0)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+VERIFICADOR - MOTOR DE RECEBÍVEIS DE CARNÊ
+Confere saldos e atraso com datas nos formatos reais dos caixas e exports
+('AAAA-MM-DD HH:MM:SS' e número de série do Excel): carnê com parcelas pagas e restante de entrada, e
+'resta' de OS pago na retirada. Com o vendas_os_completo.csv presente, confere
+também que nenhuma OS com 'resta' fica sem data.
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from etl.recebiveis_carne import MotorRecebiveis
+
+VENDAS_OS = Path('povoamento/dados/csv/vendas_os_completo.csv')
+REFERENCIA = pd.Timestamp('2024-06-15')
+
+
+def motor_exemplo() -> MotorRecebiveis:
+    motor = MotorRecebiveis()
+    motor.carregar_entregas(pd.DataFrame({
+        'loja': ['MAUA'], 'numero_os': ['1001'], 'data': ['2024-01-10 00:00:00'],
+        'valor_total': [600.0], 'numero_parcelas': ['6X'],
+    }))
+    motor.carregar_restantes(pd.DataFrame({'loja': ['MAUA'], 'numero_os': ['1001'], 'valor_restante': [50.0]}))
+    motor.adicionar_recebimentos(pd.DataFrame({
+        'loja': ['MAUA', 'MAUA'], 'numero_os': ['1001', '1001'],
+        'data_recebimento': ['2024-02-10 00:00:00', '2024-03-11 00:00:00'], 'valor_parcela': [100.0, 100.0],
+    }))
+    motor.carregar_resta_os(pd.DataFrame({
+        'loja': ['SUZANO', 'SUZANO'], 'os_n': ['2002', '2003'],
+        'data_de_compra': ['2024-05-01 00:00:00', '45413'],
+        'prev_de_entr': ['2024-05-10 00:00:00', ' '], 'resta': [200.0, 80.0],
+    }))
+    return motor
+
+
+def verificar():
+    print("🔍 VERIFICAÇÃO - MOTOR DE RECEBÍVEIS DE CARNÊ")
+    print("=" * 60)
+
+    erros = 0
+    saldos = motor_exemplo().saldos(REFERENCIA).set_index('numero_os')
+
+    if saldos['data_entrega'].isna().any():
+        print("❌ Datas 'AAAA-MM-DD HH:MM:SS' não convertidas")
+        erros += 1
+
+    esperado = {
+        # 600 em 6x, 2 pagas, 5 vencidas até 15/06 + 50 de restante de entrada,
+        # devido desde a entrega (10/01)
+        '1001': {'saldo': 450.0, 'parcelas_vencidas': 3, 'valor_vencido': 350.0, 'dias_atraso': 157},
+        # 'resta' vence na previsão de entrega, de uma vez
+        '2002': {'saldo': 200.0, 'parcelas_vencidas': 1, 'valor_vencido': 200.0, 'dias_atraso': 36},
+        # Sem previsão: data da OS, em número de série do Excel (01/05/2024)
+        '2003': {'saldo': 80.0, 'parcelas_vencidas': 1, 'valor_vencido': 80.0, 'dias_atraso': 45},
+    }
+    for os, campos in esperado.items():
+        obtido = {campo: saldos.loc[os, campo] for campo in campos}
+        if obtido != campos:
+            print(f"❌ OS {os}: esperado {campos}, obtido {obtido}")
+            erros += 1
+        else:
+            print(f"✅ OS {os}: saldo R$ {campos['saldo']:,.2f}, vencido R$ {campos['valor_vencido']:,.2f}")
+
+    if VENDAS_OS.exists():
+        motor = MotorRecebiveis()
+        motor.carregar_resta_os(pd.read_csv(VENDAS_OS, low_memory=False))
+        sem_data = int(motor.indice['data_entrega'].isna().sum())
+        if sem_data:
+            print(f"❌ {sem_data:,} de {len(motor.indice):,} OS com 'resta' sem data em {VENDAS_OS.name}")
+            erros += 1
+        else:
+            vencido = motor.saldos(REFERENCIA)['valor_vencido'].sum()
+            print(f"✅ {VENDAS_OS.name}: {len(motor.indice):,} OS com data, R$ {vencido:,.2f} vencidos")
+
+    return erros
+
+
+if __name__ == "__main__":
+    sys.exit(1 if verificar() else 0)
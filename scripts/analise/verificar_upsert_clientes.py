@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+VERIFICADOR - UPSERT DE CLIENTES
+Confere em um SQLite temporário que gravar a mesma base duas vezes não
+duplica clientes (com e sem CPF) e que colunas com tipos compactos
+(string[pyarrow], Int64, pd.NA) chegam ao banco como NULL. Confere também o
+mesmo CPF duas vezes no lote (fica o último) e CPF já gravado com outra chave
+ou sem chave (atualiza a linha existente)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from app.models.repositorio import RepositorioClientes, criar_engine, criar_tabelas
+
+
+def base_clientes() -> pd.DataFrame:
+    df = pd.DataFrame({
+        'nome': ['MARIA DA SILVA', 'JOSE PEREIRA', 'ANA SOUZA'],
+        'cpf': ['12345678901', None, None],
+        'telefone': ['11987654321', None, '1140041234'],
+        'email': [None, 'jose@exemplo.com', None],
+        'data_nascimento': [pd.Timestamp('1980-01-01'), pd.NaT, None],
+    })
+    # Como os consolidados lidos com os esquemas compactos
+    return df.astype({'nome': 'string[pyarrow]', 'cpf': 'string[pyarrow]',
+                      'telefone': 'string[pyarrow]', 'email': 'string[pyarrow]'})
+
+
+def verificar():
+    print("🔍 VERIFICAÇÃO - UPSERT DE CLIENTES")
+    print("=" * 60)
+
+    erros = 0
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = criar_engine(f"sqlite:///{Path(pasta) / 'clientes.db'}")
+        criar_tabelas(engine)
+        repositorio = RepositorioClientes(engine)
+        base = base_clientes()
+
+        try:
+            for _ in range(2):
+                repositorio.upsert(base)
+        except Exception as e:
+            print(f"❌ Upsert falhou: {e}")
+            engine.dispose()
+            return 1
+
+        total = repositorio.contar()
+        if total != len(base):
+            print(f"❌ {total} clientes depois de gravar {len(base)} duas vezes")
+            erros += 1
+        else:
+            print(f"✅ Duas execuções, {total} clientes (2 sem CPF)")
+
+        # Atualização pela chave: o telefone novo substitui o anterior
+        alterada = base.copy()
+        alterada.loc[1, 'telefone'] = '11911112222'
+        repositorio.upsert(alterada)
+        with engine.connect() as conexao:
+            telefone = conexao.exec_driver_sql(
+                "SELECT telefone FROM clientes WHERE nome = 'JOSE PEREIRA'").scalar_one()
+        if telefone != '11911112222' or repositorio.contar() != len(base):
+            print(f"❌ Atualização pela chave_cliente não aplicada (telefone {telefone})")
+            erros += 1
+        else:
+            print("✅ Cliente sem CPF atualizado pela chave_cliente")
+
+        # Mesmo CPF em duas lojas no mesmo lote: um único INSERT com os dois registros
+        repositorio.upsert(pd.DataFrame({'nome': ['MARIA DA SILVA', 'MARIA SILVA'],
+                                         'cpf': ['12345678901', '12345678901'],
+                                         'telefone': ['11900000001', '11900000002']}))
+        with engine.connect() as conexao:
+            telefone = conexao.exec_driver_sql(
+                "SELECT telefone FROM clientes WHERE cpf = '12345678901'").scalar_one()
+        if telefone != '11900000002' or repositorio.contar() != len(base):
+            print(f"❌ CPF repetido no lote: telefone {telefone}, {repositorio.contar()} clientes")
+            erros += 1
+        else:
+            print("✅ CPF repetido no lote: fica o último registro")
+
+        # CPF já gravado sem chave (banco anterior à coluna) e com chave de outra regra
+        with engine.begin() as conexao:
+            conexao.exec_driver_sql("INSERT INTO clientes (nome, cpf) VALUES ('PEDRO ALVES', '98765432100')")
+            conexao.exec_driver_sql("INSERT INTO clientes (nome, cpf, chave_cliente) "
+                                    "VALUES ('LUCIA REIS', '55566677788', 'NOME_LUCIA REIS')")
+        try:
+            repositorio.upsert(pd.DataFrame({'nome': ['PEDRO ALVES', 'LUCIA REIS'],
+                                             'cpf': ['98765432100', '55566677788'],
+                                             'email': ['pedro@exemplo.com', 'lucia@exemplo.com']}))
+            with engine.connect() as conexao:
+                linhas = conexao.exec_driver_sql(
+                    "SELECT cpf, chave_cliente, email FROM clientes "
+                    "WHERE cpf IN ('98765432100', '55566677788') ORDER BY cpf").all()
+            esperado = [('55566677788', 'NOME_LUCIA REIS', 'lucia@exemplo.com'),
+                        ('98765432100', 'CPF_98765432100', 'pedro@exemplo.com')]
+            if [tuple(linha) for linha in linhas] != esperado or repositorio.contar() != len(base) + 2:
+                print(f"❌ CPF já gravado com outra chave: {linhas}")
+                erros += 1
+            else:
+                print("✅ CPF já gravado sem chave ou com outra chave: linha existente atualizada")
+        except Exception as e:
+            print(f"❌ CPF já gravado com outra chave: {e}")
+            erros += 1
+        engine.dispose()
+
+    return erros
+
+
+if __name__ == "__main__":
+    sys.exit(1 if verificar() else 0)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Benchmark: normalização vetorizada (etl/utils/normalizar.py) x versões linha a linha
+Compara tempo e confere que os resultados são idênticos às funções antigas
+"""
+
+import re
+import sys
+import time
+import random
+import unicodedata
+from pathlib import Path
+
+import pandas as pd
+from unidecode import unidecode
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils import normalizar
+
+# ---------------------------------------------------------------------------
+# Versões escalares de referência (como estavam nos scripts)
+# ---------------------------------------------------------------------------
+
+def ref_limpar_cpf(cpf):
+    """etapa1 / etapa2"""
+    if pd.isna(cpf):
+        return None
+    cpf_str = re.sub(r'[^\d]', '', str(cpf))
+    if len(cpf_str) == 11 and cpf_str.isdigit():
+        return f"{cpf_str[:3]}.{cpf_str[3:6]}.{cpf_str[6:9]}-{cpf_str[9:]}"
+    return None
+
+def ref_limpar_celular_sp(celular):
+    """etapa1 / consolidacao_por_loja"""
+    if pd.isna(celular) or str(celular).strip() == '':
+        return None
+    cel_str = re.sub(r'[^\d]', '', str(celular))
+    if len(cel_str) < 9:
+        return None
+    if len(cel_str) == 9:
+        cel_str = '11' + cel_str
+    elif len(cel_str) == 10:
+        cel_str = '11' + cel_str
+    elif len(cel_str) == 11 and cel_str.startswith('1'):
+        pass
+    elif len(cel_str) == 11 and not cel_str.startswith('11'):
+        cel_str = '11' + cel_str[2:]
+    elif len(cel_str) == 13 and cel_str.startswith('55'):
+        cel_str = '11' + cel_str[4:]
+    elif len(cel_str) > 11:
+        cel_str = '11' + cel_str[-9:]
+    if len(cel_str) == 11 and cel_str.startswith('11') and cel_str[2] == '9':
+        return f"(11) {cel_str[2:7]}-{cel_str[7:]}"
+    return None
+
+def ref_normalizar_telefone(telefone):
+    """DeduplicadorClientes"""
+    if pd.isna(telefone):
+        return ""
+    tel = re.sub(r'\D', '', str(telefone))
+    if len(tel) > 11 and tel.startswith('55'):
+        tel = tel[2:]
+    if len(tel) == 11 and tel[2] == '9':
+        return tel
+    elif len(tel) == 10:
+        return tel[:2] + '9' + tel[2:]
+    return tel
+
+def ref_formatar_telefone(fone_str):
+    """PadronizadorClientesVixen.limpar_telefone"""
+    if pd.isna(fone_str):
+        return None
+    fone_limpo = re.sub(r'[^\d]', '', str(fone_str))
+    if len(fone_limpo) >= 10:
+        if len(fone_limpo) == 11:
+            return f"({fone_limpo[:2]}) {fone_limpo[2:7]}-{fone_limpo[7:]}"
+        elif len(fone_limpo) == 10:
+            return f"({fone_limpo[:2]}) {fone_limpo[2:6]}-{fone_limpo[6:]}"
+    return str(fone_str)
+
+def ref_limpar_cep(cep_str):
+    """PadronizadorClientesVixen"""
+    if pd.isna(cep_str):
+        return None
+    cep_limpo = re.sub(r'[^\d]', '', str(cep_str))
+    if len(cep_limpo) >= 5:
+        return cep_limpo[:8]
+    return None
+
+def ref_normalizar_email(email):
+    """etapa1"""
+    if pd.isna(email):
+        return None
+    email_str = str(email).lower().strip()
+    if '@' in email_str and '.' in email_str:
+        return email_str
+    return None
+
+def ref_limpar_email(email):
+    """gerar_sqls_povoamento"""
+    if not email or pd.isna(email):
+        return None
+    email_str = str(email).strip()
+    nfkd = unicodedata.normalize('NFD', email_str)
+    email_str = ''.join([c for c in nfkd if not unicodedata.combining(c)])
+    email_str = re.sub(r'[^a-zA-Z0-9@._\-+%]', '', email_str)
+    if email_str and '@' in email_str and len(email_str) <= 100:
+        partes = email_str.split('@')
+        if len(partes) == 2 and '.' in partes[1]:
+            return email_str
+    return None
+
+def ref_normalizar_nome(nome):
+    """etapa1 / etapa2 / consolidacao_por_loja"""
+    if pd.isna(nome):
+        return None
+    nome_str = str(nome).upper().strip()
+    nome_str = re.sub(r'[^\w\s]', '', nome_str)
+    nome_str = re.sub(r'\s+', ' ', nome_str)
+    return nome_str if nome_str else None
+
+def ref_normalizar_nome_comparacao(nome):
+    """DeduplicadorClientes"""
+    if pd.isna(nome):
+        return ""
+    nome = unidecode(str(nome).strip().upper())
+    palavras = [p for p in nome.split() if p not in normalizar.TITULOS]
+    palavras = [p for p in palavras if p not in normalizar.CONECTORES or len(palavras) <= 2]
+    return ' '.join(palavras)
+
+# ---------------------------------------------------------------------------
+# Dados sintéticos
+# ---------------------------------------------------------------------------
+
+NOMES = ['JOÃO', 'MARIA', 'José', 'ana', 'Antônio', 'FRANCISCA', 'Dr. Carlos', 'Sra Lúcia']
+SOBRENOMES = ['da Silva', 'dos Santos', 'OLIVEIRA', 'de Souza', 'Conceição', 'E LIMA', 'Pereira.']
+
+def gerar_amostra(n: int, seed: int = 42) -> pd.DataFrame:
+    rnd = random.Random(seed)
+
+    def cpf():
+        base = ''.join(rnd.choice('0123456789') for _ in range(11))
+        return rnd.choice([base, f"{base[:3]}.{base[3:6]}.{base[6:9]}-{base[9:]}", base[:9], None, 'nan'])
+
+    def telefone():
+        num = '9' + ''.join(rnd.choice('0123456789') for _ in range(8))
+        return rnd.choice([
+            f"(11) {num[:5]}-{num[5:]}", f"11{num}", num, f"5511{num}", f"21{num}",
+            f"11{num[1:]}", f"11 {num[1:5]}-{num[5:]}", '', None, 1198765432.0
+        ])
+
+    def email():
+        return rnd.choice(['Fulano@Mail.com ', 'joão.silva@gmail.com', 'sem-arroba.com', 'a@b@c.com', None, 'x@y'])
+
+    def nome():
+        return rnd.choice([f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)}", f"  {rnd.choice(NOMES)}  ", None, '...'])
+
+    return pd.DataFrame({
+        'cpf': [cpf() for _ in range(n)],
+        'telefone': [telefone() for _ in range(n)],
+        'cep': [rnd.choice(['09370-000', '0937', '08.670-123', None, 9370000]) for _ in range(n)],
+        'email': [email() for _ in range(n)],
+        'nome': [nome() for _ in range(n)],
+    })
+
+# ---------------------------------------------------------------------------
+# Execução
+# ---------------------------------------------------------------------------
+
+CASOS = [
+    # (descrição, coluna, escalar, vetorizada, ajuste do resultado vetorizado)
+    ('limpar_cpf', 'cpf', ref_limpar_cpf, normalizar.limpar_cpf, None),
+    ('limpar_celular_sp', 'telefone', ref_limpar_celular_sp, normalizar.limpar_celular_sp, None),
+    ('normalizar_telefone', 'telefone', ref_normalizar_telefone, normalizar.normalizar_telefone, ''),
+    ('formatar_telefone', 'telefone', ref_formatar_telefone, normalizar.formatar_telefone, None),
+    ('limpar_cep', 'cep', ref_limpar_cep, normalizar.limpar_cep, None),
+    ('normalizar_email', 'email', ref_normalizar_email, normalizar.normalizar_email, None),
+    ('limpar_email', 'email', ref_limpar_email, normalizar.limpar_email, None),
+    ('normalizar_nome', 'nome', ref_normalizar_nome, normalizar.normalizar_nome, None),
+    ('normalizar_nome_comparacao', 'nome', ref_normalizar_nome_comparacao, normalizar.normalizar_nome_comparacao, ''),
+]
+
+def executar(n: int = 100_000):
+    print("=" * 80)
+    print(f"BENCHMARK NORMALIZAÇÃO - {n:,} linhas")
+    print("=" * 80)
+
+    df = gerar_amostra(n)
+    divergencias = 0
+
+    print(f"{'função':<30}{'escalar (s)':>14}{'vetorizada (s)':>16}{'ganho':>10}  paridade")
+    for descricao, coluna, escalar, vetorizada, preencher in CASOS:
+        inicio = time.perf_counter()
+        esperado = df[coluna].map(escalar)
+        t_escalar = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        obtido = vetorizada(df[coluna])
+        t_vetor = time.perf_counter() - inicio
+
+        if preencher is not None:
+            obtido = obtido.fillna(preencher)
+
+        diferentes = (esperado.fillna('<NA>') != obtido.fillna('<NA>')).sum()
+        divergencias += diferentes
+        paridade = '✅' if diferentes == 0 else f'❌ {diferentes} diferenças'
+        print(f"{descricao:<30}{t_escalar:>14.3f}{t_vetor:>16.3f}{t_escalar / max(t_vetor, 1e-9):>9.1f}x  {paridade}")
+
+    inicio = time.perf_counter()
+    validos = normalizar.cpf_valido(df['cpf']).sum()
+    print(f"\n🆔 cpf_valido: {validos:,} CPFs com dígito verificador correto ({time.perf_counter() - inicio:.3f}s)")
+
+    return divergencias
+
+if __name__ == "__main__":
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    sys.exit(1 if executar(linhas) else 0)
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Benchmark do pipeline sobre dados sintéticos (scripts/gerar_dados_sinteticos.py)
+
+Cada etapa roda com a pasta sintética como diretório de trabalho, então os
+scripts leem e gravam nos mesmos caminhos relativos de sempre (data/raw,
+data/processed, povoamento/...) sem tocar nos dados reais. Para cada etapa
+são medidos o tempo (melhor de N repetições) e o pico de memória alocada pelo
+Python (tracemalloc, numa execução à parte para não distorcer o tempo).
+
+Os resultados vão para data/benchmarks/benchmark_<commit>_<data>.json;
+--comparar aponta um resultado anterior e marca as etapas que ficaram mais
+lentas que o limite (código de saída 1 se houver regressão).
+
+Uso:
+    python scripts/benchmark_pipeline.py                          # 10.000 OS
+    python scripts/benchmark_pipeline.py 100000 --etapas etapa1 etapa2
+    python scripts/benchmark_pipeline.py --comparar data/benchmarks/benchmark_abc1234_....json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+RAIZ_REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ_REPO))
+from scripts.gerar_dados_sinteticos import GeradorDadosSinteticos, pasta_padrao
+
+PASTA_RESULTADOS = RAIZ_REPO / "data" / "benchmarks"
+
+# DeduplicadorClientes compara todos os pares: limita a amostra
+LIMITE_DEDUPLICADOR = 200
+# Os extratores por tabela releem a aba inteira a cada dia: poucos arquivos bastam
+LIMITE_ARQUIVOS_TABELAS = 2
+
+LIMITE_REGRESSAO = 1.2
+
+
+# ---------------------------------------------------------------------------
+# Etapas medidas (cada uma retorna a quantidade de registros produzidos)
+# ---------------------------------------------------------------------------
+
+def bench_deduplicador(raiz: Path) -> int:
+    from app.services.deduplicacao import DeduplicadorClientes
+
+    clientes = pd.read_parquet("data/clientes/_consolidado/clientes_unificados.parquet")
+    # Primeiros nomes em ordem alfabética: nomes parecidos (e as duplicatas) ficam na mesma amostra
+    amostra = clientes.sort_values('nome', kind='stable').head(LIMITE_DEDUPLICADOR).reset_index(drop=True)
+    df = amostra.rename(columns={'telefone1': 'telefone'})[['nome', 'cpf', 'telefone']]
+    return len(DeduplicadorClientes().encontrar_duplicatas(df))
+
+
+def bench_extrator_caixa(raiz: Path) -> int:
+    from scripts.processamento.extrair_dados_caixa import ExtratorDadosCaixa
+
+    extrator = ExtratorDadosCaixa()
+    total = 0
+    for pasta_loja in sorted(extrator.pasta_caixa.iterdir()):
+        prefixo = extrator.prefixos_lojas.get(pasta_loja.name)
+        if prefixo is None:
+            continue
+        for arquivo in sorted(pasta_loja.glob("*/*.xlsx")):
+            total += len(extrator.extrair_dados_arquivo(arquivo, pasta_loja.name, prefixo))
+    return total
+
+
+def bench_extratores_tabelas(raiz: Path) -> int:
+    from scripts.processamento.extrator_tabela_VEND import ExtratorTabelaVEND
+    from scripts.processamento.extrator_tabela_REST_ENTR import ExtratorTabelaRESTENTR
+    from scripts.processamento.extrator_tabela_REC_CARN import ExtratorTabelaRECCARN
+    from scripts.processamento.extrator_tabela_ENTR_CARN import ExtratorTabelaENTRCARN
+    from scripts.processamento.extrator_tabela_OS_ENT_DIA import ExtratorTabelaOSENTDIA
+
+    extratores = [
+        (ExtratorTabelaVEND(), 'extrair_vend_dia_especifico'),
+        (ExtratorTabelaRESTENTR(), 'extrair_rest_entr_dia_especifico'),
+        (ExtratorTabelaRECCARN(), 'extrair_rec_carn_dia_especifico'),
+        (ExtratorTabelaENTRCARN(), 'extrair_entr_carn_dia_especifico'),
+        (ExtratorTabelaOSENTDIA(), 'extrair_os_ent_dia_especifico'),
+    ]
+    arquivos = sorted(Path("data/caixa_lojas").glob("*/*/*.xlsx"))[:LIMITE_ARQUIVOS_TABELAS]
+    total = 0
+    for arquivo in arquivos:
+        for extrator, metodo in extratores:
+            extrator.arquivo_exemplo = arquivo
+            for dia in range(1, 32):
+                total += len(getattr(extrator, metodo)(f"{dia:02d}"))
+    return total
+
+
+def bench_etapa1(raiz: Path) -> int:
+    from scripts.etapa1_base_clientes_master import GeradorBaseClientes
+
+    gerador = GeradorBaseClientes()
+    gerador.gerar_base_master()
+    return gerador.estatisticas['clientes_unicos']
+
+
+def bench_etapa2(raiz: Path) -> int:
+    from scripts.etapa2_base_ordens_servico import GeradorBaseOS
+
+    gerador = GeradorBaseOS()
+    gerador.gerar_base_os()
+    return len(gerador.ordens_servico)
+
+
+def bench_padronizar_vixen(raiz: Path) -> int:
+    from etl.padronizar_clientes_vixen import PadronizadorClientesVixen
+
+    padronizador = PadronizadorClientesVixen()
+    df_vixen = pd.read_excel(padronizador.arquivo_vixen)
+    return len(padronizador.converter(df_vixen))
+
+
+def bench_sql_povoamento(raiz: Path) -> int:
+    from scripts import gerar_sqls_povoamento
+
+    gerar_sqls_povoamento.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    gerar_sqls_povoamento.gerar_sql_clientes()
+    gerar_sqls_povoamento.gerar_sql_telefones()
+    gerar_sqls_povoamento.gerar_sql_enderecos()
+    return len(list(gerar_sqls_povoamento.OUTPUT_DIR.glob("*.sql")))
+
+
+def carregar_vendas():
+    return (
+        pd.read_parquet('data/vendas/_com_cliente/lista_dav_com_cliente.parquet'),
+        pd.read_parquet('data/vendas/_com_cliente/os_para_cliente_map.parquet'),
+        pd.read_parquet('data/originais/vendas/conf_dav/_consolidado/conf_dav_itens.parquet'),
+    )
+
+
+def bench_sql_vendas(raiz: Path) -> int:
+    from scripts import gerar_sqls_vendas
+
+    gerar_sqls_vendas.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    lookup = gerar_sqls_vendas.criar_lookup_clientes()
+    vendas, os_map, itens = carregar_vendas()
+    gerar_sqls_vendas.gerar_sql_vendas_vixen(vendas, lookup)
+    gerar_sqls_vendas.gerar_sql_vendas_os(os_map, lookup)
+    gerar_sqls_vendas.gerar_sql_itens_venda(itens, vendas)
+    return len(vendas) + len(os_map) + len(itens)
+
+
+def bench_csv_vendas(raiz: Path) -> int:
+    from scripts import gerar_csvs_vendas
+
+    gerar_csvs_vendas.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    lookup = gerar_csvs_vendas.criar_lookup_clientes()
+    vendas, os_map, itens = carregar_vendas()
+    return (gerar_csvs_vendas.criar_csv_vendas_vixen(vendas, lookup)
+            + gerar_csvs_vendas.criar_csv_vendas_os(os_map, lookup)
+            + gerar_csvs_vendas.criar_csv_itens_venda(itens, vendas))
+
+
+def bench_dashboard(raiz: Path) -> int:
+    # O módulo carrega as bases de data/processed ao ser importado (depende de etapa1/etapa2)
+    sys.modules.pop('scripts.dashboard_sistema_completo', None)
+    from scripts.dashboard_sistema_completo import dashboard
+
+    dashboard.get_resumo_geral()
+    dashboard.get_analise_por_loja()
+    dashboard.get_clientes_top()
+    dashboard.get_os_recentes()
+    return len(dashboard.df_clientes) + len(dashboard.df_os)
+
+
+# Ordem de execução: etapa2 e dashboard usam o que etapa1/etapa2 gravaram em data/processed
+ETAPAS = {
+    'deduplicador_clientes': bench_deduplicador,
+    'extrator_caixa': bench_extrator_caixa,
+    'extratores_tabelas_caixa': bench_extratores_tabelas,
+    'etapa1': bench_etapa1,
+    'etapa2': bench_etapa2,
+    'padronizar_vixen': bench_padronizar_vixen,
+    'sql_povoamento': bench_sql_povoamento,
+    'sql_vendas': bench_sql_vendas,
+    'csv_vendas': bench_csv_vendas,
+    'dashboard_sistema_completo': bench_dashboard,
+}
+
+
+# ---------------------------------------------------------------------------
+# Medição
+# ---------------------------------------------------------------------------
+
+@contextlib.contextmanager
+def na_pasta(pasta: Path):
+    """Diretório de trabalho temporário, sem a saída (print/logging) das etapas"""
+    anterior = Path.cwd()
+    os.chdir(pasta)
+    logging.disable(logging.CRITICAL)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+        os.chdir(anterior)
+
+
+def medir(funcao, raiz: Path, repeticoes: int = 1, memoria: bool = True) -> dict:
+    resultado = {'status': 'ok'}
+    try:
+        tempos = []
+        for _ in range(repeticoes):
+            with na_pasta(raiz):
+                inicio = time.perf_counter()
+                registros = funcao(raiz)
+                tempos.append(time.perf_counter() - inicio)
+        resultado.update({'tempo_s': round(min(tempos), 4), 'registros': int(registros)})
+
+        if memoria:
+            tracemalloc.start()
+            try:
+                with na_pasta(raiz):
+                    funcao(raiz)
+                _, pico = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            resultado['memoria_pico_mb'] = round(pico / (1024 * 1024), 2)
+    except Exception as e:
+        resultado = {'status': 'erro', 'erro': f"{type(e).__name__}: {e}"}
+    return resultado
+
+
+def commit_atual() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ_REPO, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecido'
+
+
+def comparar(atual: dict, anterior: dict, limite: float = LIMITE_REGRESSAO) -> list:
+    """Etapas que ficaram mais lentas que limite × o tempo anterior"""
+    print(f"\n📊 Comparação com {anterior.get('commit')} ({anterior.get('data')})")
+    print(f"{'etapa':<28}{'antes (s)':>11}{'agora (s)':>11}{'razão':>8}")
+    regressoes = []
+    for nome, medida in atual['resultados'].items():
+        antes = anterior.get('resultados', {}).get(nome, {})
+        if medida.get('status') != 'ok' or antes.get('status') != 'ok':
+            continue
+        razao = medida['tempo_s'] / max(antes['tempo_s'], 1e-9)
+        marca = '  ❌' if razao > limite else ''
+        print(f"{nome:<28}{antes['tempo_s']:>11.3f}{medida['tempo_s']:>11.3f}{razao:>7.2f}x{marca}")
+        if razao > limite:
+            regressoes.append(nome)
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline sobre dados sintéticos")
+    parser.add_argument('linhas', nargs='?', type=int, default=10_000, help="quantidade de OS sintéticas")
+    parser.add_argument('--duplicatas', type=float, default=0.1)
+    parser.add_argument('--meses', type=int, default=12)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--etapas', nargs='+', choices=list(ETAPAS), default=list(ETAPAS))
+    parser.add_argument('--repeticoes', type=int, default=1, help="mede o melhor de N execuções")
+    parser.add_argument('--sem-memoria', action='store_true', help="não mede o pico de memória")
+    parser.add_argument('--comparar', type=Path, default=None, help="JSON de um benchmark anterior")
+    parser.add_argument('--limite', type=float, default=LIMITE_REGRESSAO, help="razão de tempo tolerada")
+    args = parser.parse_args()
+
+    raiz = (RAIZ_REPO / pasta_padrao(args.linhas, args.duplicatas, args.meses, args.semente)).resolve()
+    if not (raiz / "sintetico.json").exists():
+        GeradorDadosSinteticos(raiz, args.linhas, args.duplicatas, args.meses, semente=args.semente).gerar()
+    with open(raiz / "sintetico.json", encoding='utf-8') as f:
+        manifesto = json.load(f)
+
+    print("=" * 80)
+    print(f"⏱️  BENCHMARK DO PIPELINE - {args.linhas:,} OS sintéticas ({raiz.name})")
+    print("=" * 80)
+    print(f"{'etapa':<28}{'tempo (s)':>11}{'memória (MB)':>14}{'registros':>12}")
+
+    resultados = {}
+    for nome in args.etapas:
+        medida = medir(ETAPAS[nome], raiz, args.repeticoes, memoria=not args.sem_memoria)
+        resultados[nome] = medida
+        if medida['status'] == 'ok':
+            memoria = f"{medida['memoria_pico_mb']:.1f}" if 'memoria_pico_mb' in medida else '-'
+            print(f"{nome:<28}{medida['tempo_s']:>11.3f}{memoria:>14}{medida['registros']:>12,}")
+        else:
+            print(f"{nome:<28}  ❌ {medida['erro']}")
+
+    relatorio = {
+        'versao': 1,
+        'commit': commit_atual(),
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'maquina': platform.node(),
+        'dados': manifesto['parametros'],
+        'contagens': manifesto['contagens'],
+        'repeticoes': args.repeticoes,
+        'resultados': resultados,
+    }
+    PASTA_RESULTADOS.mkdir(parents=True, exist_ok=True)
+    arquivo = PASTA_RESULTADOS / f"benchmark_{relatorio['commit']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(arquivo, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultados: {arquivo.relative_to(RAIZ_REPO)}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            regressoes = comparar(relatorio, json.load(f), args.limite)
+        if regressoes:
+            print(f"\n⚠️ Regressões acima de {args.limite:.2f}x: {', '.join(regressoes)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
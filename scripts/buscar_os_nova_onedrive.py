@@ -3,11 +3,14 @@
 Script para buscar arquivos OS_NOVA*.xlsm no OneDrive das Óticas Taty Mello
 """
 
-import os
+import sys
 import shutil
 from pathlib import Path
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils.indice_arquivos import IndiceArquivos
+
 def buscar_arquivos_os_nova_onedrive():
     """Busca arquivos OS_NOVA*.xlsm no OneDrive das Óticas"""
     
@@ -44,34 +47,22 @@ def buscar_arquivos_os_nova_onedrive():
     
     print(f"✅ Pasta encontrada: {pasta_lojas}")
     
-    # Buscar recursivamente por arquivos OS_NOVA*.xlsm
-    arquivos_encontrados = []
-    
+    # Índice da árvore (só as pastas alteradas desde a última busca são listadas)
     print(f"\n🔍 Buscando arquivos OS_NOVA*.xlsm...")
     
     try:
-        for root, dirs, files in os.walk(pasta_lojas):
-            nivel = str(root).count(os.sep) - str(pasta_lojas).count(os.sep)
-            print(f"   📁 Pasta (nível {nivel}): {Path(root).name}")
-            
-            for file in files:
-                print(f"      📄 {file}")
-                
-                if file.startswith("OS_NOVA") and file.endswith(".xlsm"):
-                    caminho_completo = Path(root) / file
-                    arquivos_encontrados.append(caminho_completo)
-                    print(f"      ✅ ENCONTRADO: {file}")
-                
-                # Também verificar outros padrões similares
-                elif any(pattern in file.upper() for pattern in ["OS_NOVA", "OS NOVA"]) and file.endswith((".xlsm", ".xlsx")):
-                    caminho_completo = Path(root) / file
-                    arquivos_encontrados.append(caminho_completo)
-                    print(f"      ✅ SIMILAR: {file}")
-                    
+        indice = IndiceArquivos(pasta_lojas).atualizar()
     except Exception as e:
         print(f"❌ Erro ao buscar arquivos: {e}")
         return []
     
+    print(f"   📁 {indice.resumo()}")
+    
+    arquivos_encontrados = []
+    for arquivo in indice.arquivos('OS_NOVA'):
+        arquivos_encontrados.append(arquivo['caminho'])
+        print(f"      ✅ ENCONTRADO: {arquivo['nome']}")
+    
     print(f"\n📊 RESULTADO:")
     print(f"   • Arquivos encontrados: {len(arquivos_encontrados)}")
     
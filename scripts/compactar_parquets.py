@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Regrava os Parquets consolidados nos tipos compactos de etl/utils/esquemas.py
+
+Mostra a memória de cada arquivo antes e depois (em pandas) e regrava o
+arquivo com categorias e inteiros pequenos. --simular só mostra o relatório.
+
+Uso:
+    python scripts/compactar_parquets.py                       # consolidados padrão
+    python scripts/compactar_parquets.py data/x/arquivo.parquet --dataset clientes
+    python scripts/compactar_parquets.py --simular
+"""
+
+import argparse
+import sys
+from glob import glob
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils import esquemas
+
+PADROES = [
+    'data/clientes/_consolidado/*.parquet',
+    'data/vendas/_com_cliente/*.parquet',
+    'data/originais/vendas/conf_dav/_consolidado/*.parquet',
+]
+
+
+def compactar(arquivos, dataset=None, simular=False) -> dict:
+    total_antes = total_depois = 0
+    for arquivo in arquivos:
+        nome_dataset = dataset or esquemas.dataset_do_arquivo(arquivo)
+        if nome_dataset is None:
+            print(f"⏭️  {arquivo}: sem esquema registrado")
+            continue
+        original = pd.read_parquet(arquivo)
+        # Parte de colunas object, como o arquivo chegaria de uma versão antiga
+        antes = original.astype({c: object for c in original.columns
+                                 if isinstance(original[c].dtype, (pd.CategoricalDtype, pd.StringDtype))})
+        compacto = esquemas.aplicar(antes, nome_dataset)
+        print(f"📄 {arquivo}")
+        resultado = esquemas.relatorio(antes, compacto, nome_dataset)
+        esquemas.imprimir_relatorio(resultado)
+        total_antes += resultado['antes']
+        total_depois += resultado['depois']
+        if not simular:
+            esquemas.salvar_parquet(compacto, arquivo, nome_dataset)
+    return {'antes': total_antes, 'depois': total_depois}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compacta os Parquets consolidados")
+    parser.add_argument('arquivos', nargs='*', help="Parquets (padrão: consolidados de clientes e vendas)")
+    parser.add_argument('--dataset', choices=sorted(esquemas.ESQUEMAS), help="Esquema (padrão: pelo nome do arquivo)")
+    parser.add_argument('--simular', action='store_true', help="Só mostra o relatório, sem regravar")
+    args = parser.parse_args()
+
+    arquivos = args.arquivos or sorted(a for padrao in PADROES for a in glob(padrao))
+    print("🗜️  COMPACTAÇÃO DOS CONSOLIDADOS" + (" (simulação)" if args.simular else ""))
+    print("=" * 60)
+    totais = compactar(arquivos, args.dataset, args.simular)
+    if totais['antes']:
+        mb = 1024 * 1024
+        print("=" * 60)
+        print(f"✅ Total em memória: {totais['antes'] / mb:.1f} MB → {totais['depois'] / mb:.1f} MB "
+              f"({1 - totais['depois'] / totais['antes']:.0%} a menos)")
+
+
+if __name__ == "__main__":
+    main()
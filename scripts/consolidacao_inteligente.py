@@ -7,11 +7,14 @@ Mescla informações de múltiplas linhas em registros únicos completos
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from fuzzywuzzy import fuzz
 import re
 from collections import defaultdict
 from datetime import datetime
 import logging
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils.similaridade import IndiceNomes
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -157,7 +160,8 @@ class ConsolidadorInteligente:
         
         grupos = defaultdict(list)
         cpf_index = {}
-        nome_index = defaultdict(list)
+        # Nomes representantes em ordem de inserção, com poda por tamanho e trigramas
+        nome_index = IndiceNomes(limiar=90)
         
         # Indexar por CPF
         for i, registro in enumerate(dados):
@@ -178,19 +182,15 @@ class ConsolidadorInteligente:
             if not registro.get('cpf'):  # Só se não tem CPF
                 nome = registro.get('nome')
                 if nome:
-                    # Buscar nomes similares
-                    encontrou_similar = False
-                    for nome_existente, indices in nome_index.items():
-                        if fuzz.ratio(nome, nome_existente) > 90:
-                            # Nome similar encontrado
-                            grupos[f"nome_{nome_existente}"].append(i)
-                            encontrou_similar = True
-                            break
-                    
-                    if not encontrou_similar:
-                        grupo_id = f"nome_{nome}"
-                        nome_index[nome] = [i]
-                        grupos[grupo_id].append(i)
+                    # Primeiro nome já indexado com fuzz.ratio > 90 (mesmo resultado da busca linear)
+                    nome_existente = nome_index.buscar(nome)
+                    if nome_existente is not None:
+                        grupos[f"nome_{nome_existente}"].append(i)
+                    else:
+                        nome_index.adicionar(nome)
+                        grupos[f"nome_{nome}"].append(i)
+        
+        logger.info(f"Agrupamento por nome: {len(nome_index)} nomes distintos, {nome_index.comparacoes} comparações fuzzy")
         
         # Filtrar grupos com apenas 1 item (não são duplicatas)
         grupos_duplicatas = {k: v for k, v in grupos.items() if len(v) > 1}
@@ -2,6 +2,11 @@
 """
 Sistema de Consolidação Inteligente POR ARQUIVO/LOJA
 Estratégia segura: consolida apenas dentro de cada arquivo/loja
+
+Cada arquivo passa em blocos: os normalizados vão para um CSV temporário com
+a chave de duplicata, e só as linhas com chave repetida voltam à memória para
+mesclar; o consolidado (data/processed/por_arquivo/*_consolidado.csv) e as
+estatísticas são gravados/acumulados bloco a bloco.
 """
 
 import pandas as pd
@@ -9,90 +14,54 @@ import numpy as np
 from pathlib import Path
 from fuzzywuzzy import fuzz
 import re
-from collections import defaultdict
-from datetime import datetime
+import sys
+import tempfile
+from collections import Counter, defaultdict
+from itertools import chain
 import logging
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils import normalizar
+from etl.utils.datas import ConversorDatas
+from etl.utils.exportacao_csv import TAMANHO_BLOCO, exportar_csv
+from etl.utils.planilhas import LeitorPlanilha
+from etl.utils.relatorios import EscritorRelatorio
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+CAMPOS_QUALIDADE = ['nome', 'cpf', 'celular', 'email', 'endereco']
+COLUNAS_UNICOS = ['grupo_tipo', 'total_registros_mesclados', 'total_os']
+
 class ConsolidadorPorLoja:
     def __init__(self):
         self.resultados_por_arquivo = {}
         self.dashboard_data = []
+        # Cache de datas compartilhado entre todos os arquivos
+        self.conversor_datas = ConversorDatas(somente_texto=True)
         
     def limpar_cpf(self, cpf):
         """Limpa e valida CPF"""
-        if pd.isna(cpf):
-            return None
-        cpf_str = re.sub(r'[^\d]', '', str(cpf))
-        if len(cpf_str) == 11 and cpf_str.isdigit():
-            return cpf_str
-        return None
+        return normalizar.escalar(normalizar.limpar_cpf, cpf, formatar=False)
     
     def limpar_celular(self, celular):
         """Limpa e padroniza celular para formato SP"""
-        if pd.isna(celular):
-            return None
-        
-        cel_str = re.sub(r'[^\d]', '', str(celular))
-        
-        # Validar tamanho mínimo
-        if len(cel_str) < 9:
-            return None
-        
-        # Padronizar para SP (11)
-        if len(cel_str) == 9:
-            # Adicionar DDD 11 se só tiver 9 dígitos de celular
-            cel_str = '11' + cel_str
-        elif len(cel_str) == 10:
-            # Adicionar DDD 11 se não tiver
-            cel_str = '11' + cel_str
-        elif len(cel_str) == 11 and cel_str.startswith('1'):
-            # Já tem DDD 11
-            pass
-        elif len(cel_str) == 11 and not cel_str.startswith('11'):
-            # Corrigir DDD para 11 (SP)
-            cel_str = '11' + cel_str[2:]
-        elif len(cel_str) == 13 and cel_str.startswith('55'):
-            # Remover código do país e usar DDD 11
-            cel_str = '11' + cel_str[4:]
-        elif len(cel_str) > 11:
-            # Pegar os últimos 9 dígitos e adicionar DDD 11
-            cel_str = '11' + cel_str[-9:]
-        
-        # Validar se é celular SP válido (11 9xxxx-xxxx)
-        if len(cel_str) == 11 and cel_str.startswith('11') and cel_str[2] == '9':
-            # Formatar: (11) 9xxxx-xxxx
-            return f"(11) {cel_str[2:7]}-{cel_str[7:]}"
-        
-        return None
+        return normalizar.escalar(normalizar.limpar_celular_sp, celular)
     
     def normalizar_nome(self, nome):
         """Normaliza nome para comparação"""
-        if pd.isna(nome):
-            return None
-        nome_str = str(nome).upper().strip()
-        nome_str = re.sub(r'[^\w\s]', '', nome_str)
-        nome_str = re.sub(r'\s+', ' ', nome_str)
-        return nome_str
+        return normalizar.escalar(normalizar.normalizar_nome, nome)
     
     def extrair_data_nascimento(self, data):
         """Extrai e normaliza data de nascimento"""
-        if pd.isna(data):
-            return None
-        try:
-            if isinstance(data, str):
-                # Tentar diferentes formatos
-                for fmt in ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y']:
-                    try:
-                        return datetime.strptime(data.strip(), fmt).date()
-                    except:
-                        continue
-            return None
-        except:
-            return None
+        datas, _ = self.extrair_datas_nascimento([data])
+        return datas.iloc[0]
+    
+    def extrair_datas_nascimento(self, serie):
+        """Extrai a coluna de datas de nascimento; retorna (datas, máscara de inválidas)"""
+        datas, invalidas = self.conversor_datas.converter(serie)
+        return datas.dt.date.astype(object).where(datas.notna(), None), invalidas
     
     def identificar_campos(self, df):
         """Identifica campos relevantes no DataFrame"""
@@ -171,90 +140,75 @@ class ConsolidadorPorLoja:
             'qualidade_dados': {},
             'clientes_multiplas_os': 0,
             'total_os': 0,
+            'datas_invalidas': 0,
             'erros': []
         }
         
         try:
-            # Carregar arquivo
-            engine = 'openpyxl' if arquivo_path.suffix.lower() in ['.xlsx', '.xlsm'] else None
-            excel_file = pd.ExcelFile(arquivo_path, engine=engine)
-            sheets = excel_file.sheet_names
-            
-            # Encontrar sheet principal
-            sheet_principal = None
-            for sheet_name in ['base_clientes_OS', 'base', 'dados']:
-                if sheet_name in sheets:
-                    sheet_principal = sheet_name
-                    break
-            
-            if not sheet_principal and sheets:
-                sheet_principal = sheets[0]
-            
-            if not sheet_principal:
-                resultado['erros'].append("Nenhum sheet encontrado")
-                return resultado
-            
-            df_original = pd.read_excel(arquivo_path, sheet_name=sheet_principal, engine=engine)
-            resultado['registros_originais'] = len(df_original)
-            
-            # Identificar campos
-            campos = self.identificar_campos(df_original)
-            resultado['campos_disponíveis'] = list(campos.keys())
-            
-            if not campos.get('nome') and not campos.get('cpf'):
-                resultado['erros'].append("Campos essenciais não encontrados")
-                return resultado
-            
-            # Extrair e normalizar dados
-            dados_normalizados = []
-            
-            for idx, row in df_original.iterrows():
-                registro = {
-                    'linha_original': idx + 1,
-                    'loja': resultado['loja']
-                }
+            with tempfile.TemporaryDirectory() as pasta_temporaria:
+                normalizados = Path(pasta_temporaria) / 'normalizados.csv'
                 
-                # Extrair campos normalizados
-                for campo_padrao, coluna_original in campos.items():
-                    valor = row[coluna_original] if pd.notna(row[coluna_original]) else None
+                # Abrir arquivo em modo streaming (read_only)
+                with LeitorPlanilha(arquivo_path) as leitor:
+                    if not leitor.sheet:
+                        resultado['erros'].append("Nenhum sheet encontrado")
+                        return resultado
                     
-                    if campo_padrao == 'cpf':
-                        valor = self.limpar_cpf(valor)
-                    elif campo_padrao == 'celular':
-                        valor = self.limpar_celular(valor)
-                    elif campo_padrao == 'nome':
-                        valor = self.normalizar_nome(valor)
-                    elif campo_padrao == 'data_nascimento':
-                        valor = self.extrair_data_nascimento(valor)
-                    elif valor is not None:
-                        valor = str(valor).strip()
+                    # Identificar campos (só o cabeçalho)
+                    campos = self.identificar_campos(pd.DataFrame(columns=leitor.colunas))
+                    resultado['campos_disponíveis'] = list(campos.keys())
                     
-                    registro[campo_padrao] = valor
+                    if not campos.get('nome') and not campos.get('cpf'):
+                        resultado['erros'].append("Campos essenciais não encontrados")
+                        return resultado
+                    
+                    # 1ª passada: cada bloco normalizado vai direto para um CSV temporário;
+                    # em memória fica só a contagem de cada chave de duplicata
+                    contagem_chaves = Counter()
+                    exportar_csv(self.blocos_normalizados(leitor, campos, resultado, contagem_chaves), normalizados)
                 
-                # Só incluir se tiver dados mínimos
-                if registro.get('nome') or registro.get('cpf'):
-                    dados_normalizados.append(registro)
-            
-            # Identificar duplicatas DENTRO do arquivo
-            grupos_duplicatas = self.identificar_duplicatas_seguras(dados_normalizados)
-            
-            # Consolidar grupos
-            registros_consolidados = self.consolidar_grupos(grupos_duplicatas, dados_normalizados)
+                # 2ª passada: só as linhas com chave repetida ficam em memória para mesclar
+                dados_duplicados = []
+                for bloco in self.ler_normalizados(normalizados):
+                    bloco = bloco[(bloco['chave_duplicata'].map(contagem_chaves) > 1).to_numpy()]
+                    bloco = bloco.drop(columns='chave_duplicata')
+                    dados_duplicados.extend(bloco.astype(object).where(bloco.notna(), None).to_dict('records'))
+                
+                # Identificar duplicatas DENTRO do arquivo
+                grupos_duplicatas = self.identificar_duplicatas_seguras(dados_duplicados)
+                
+                # Consolidar grupos; os registros únicos seguem do CSV temporário para a saída
+                registros_mesclados = self.consolidar_grupos(grupos_duplicatas, dados_duplicados)
+                blocos = chain(
+                    [pd.DataFrame(registros_mesclados)] if registros_mesclados else [],
+                    (self.registros_unicos(bloco, contagem_chaves) for bloco in self.ler_normalizados(normalizados)),
+                )
+                colunas = list(dict.fromkeys(
+                    ['linha_original', 'loja', *campos]
+                    + [coluna for registro in registros_mesclados for coluna in registro]
+                    + COLUNAS_UNICOS
+                ))
+                
+                # Salvar dados consolidados do arquivo, acumulando estatísticas e qualidade
+                preenchidos = Counter()
+                
+                def blocos_consolidados():
+                    for bloco in blocos:
+                        resultado['registros_consolidados'] += len(bloco)
+                        resultado['clientes_multiplas_os'] += int((bloco['total_os'] > 1).sum())
+                        resultado['total_os'] += int(bloco['total_os'].sum())
+                        self.contar_preenchidos(bloco, preenchidos)
+                        yield bloco.reindex(columns=colunas)
+                
+                self.salvar_arquivo_consolidado(arquivo_path, blocos_consolidados())
             
             # Calcular qualidade dos dados
-            df_consolidado = pd.DataFrame(registros_consolidados)
-            resultado['qualidade_dados'] = self.calcular_qualidade_dados(df_consolidado)
+            resultado['qualidade_dados'] = self.calcular_qualidade_dados(preenchidos)
             
             # Estatísticas finais
-            resultado['registros_consolidados'] = len(registros_consolidados)
             resultado['duplicatas_encontradas'] = len(grupos_duplicatas)
-            resultado['clientes_multiplas_os'] = len([r for r in registros_consolidados if r.get('total_os', 0) > 1])
-            resultado['total_os'] = sum(r.get('total_os', 0) for r in registros_consolidados)
             resultado['status'] = 'sucesso'
             
-            # Salvar dados consolidados do arquivo
-            self.salvar_arquivo_consolidado(arquivo_path, registros_consolidados)
-            
             logger.info(f"Arquivo {arquivo_path.name} processado: {resultado['registros_originais']} → {resultado['registros_consolidados']} registros")
             
         except Exception as e:
@@ -264,6 +218,76 @@ class ConsolidadorPorLoja:
         
         return resultado
     
+    def blocos_normalizados(self, leitor, campos, resultado, contagem_chaves):
+        """Blocos normalizados da planilha, com a chave de duplicata; soma as chaves em contagem_chaves"""
+        def datas_nascimento(serie):
+            datas, invalidas = self.extrair_datas_nascimento(serie)
+            resultado['datas_invalidas'] += int(invalidas.sum())
+            return datas
+        
+        normalizadores = {
+            'cpf': lambda serie: normalizar.limpar_cpf(serie, formatar=False),
+            'celular': normalizar.limpar_celular_sp,
+            'nome': normalizar.normalizar_nome,
+            'data_nascimento': datas_nascimento,
+        }
+        colunas = ['linha_original', 'loja', *campos, 'chave_duplicata']
+        
+        # Extrair e normalizar dados (coluna a coluna, bloco a bloco)
+        for bloco in leitor.blocos():
+            df_normalizado = pd.DataFrame({
+                'linha_original': bloco.index + 1,
+                'loja': resultado['loja']
+            }, index=bloco.index)
+            
+            for campo_padrao, coluna_original in campos.items():
+                funcao = normalizadores.get(campo_padrao, normalizar.texto_limpo)
+                df_normalizado[campo_padrao] = funcao(bloco[coluna_original])
+            resultado['registros_originais'] += len(bloco)
+            
+            # Só incluir se tiver dados mínimos
+            tem_minimo = pd.Series(False, index=df_normalizado.index)
+            for campo in ['nome', 'cpf']:
+                if campo in df_normalizado.columns:
+                    tem_minimo |= df_normalizado[campo].notna()
+            df_normalizado = df_normalizado[tem_minimo].reindex(columns=colunas)
+            
+            df_normalizado['chave_duplicata'] = self.chaves_duplicatas(df_normalizado)
+            contagem_chaves.update(df_normalizado['chave_duplicata'].value_counts().to_dict())
+            yield df_normalizado
+    
+    def chaves_duplicatas(self, df):
+        """Mesmos critérios de identificar_duplicatas_seguras: CPF, ou nome + data de nascimento sem CPF"""
+        chave = pd.Series(None, index=df.index, dtype=object)
+        tem_cpf = df['cpf'].notna() if 'cpf' in df.columns else pd.Series(False, index=df.index)
+        chave[tem_cpf] = 'cpf_' + df.loc[tem_cpf, 'cpf'].astype(str)
+        if 'nome' in df.columns and 'data_nascimento' in df.columns:
+            nome_data = ~tem_cpf & df['nome'].notna() & df['data_nascimento'].notna()
+            chave[nome_data] = ('nome_data_' + df.loc[nome_data, 'nome'].astype(str)
+                                + '_' + df.loc[nome_data, 'data_nascimento'].astype(str))
+        return chave
+    
+    def ler_normalizados(self, arquivo):
+        """Relê o CSV temporário em blocos, com os tipos da normalização"""
+        if not arquivo.stat().st_size:
+            return  # Planilha sem linhas: nem cabeçalho foi gravado
+        for bloco in pd.read_csv(arquivo, dtype=str, keep_default_na=False, na_values=[''],
+                                 chunksize=TAMANHO_BLOCO):
+            bloco['linha_original'] = bloco['linha_original'].astype(int)
+            if 'data_nascimento' in bloco.columns:
+                datas = pd.to_datetime(bloco['data_nascimento'], format='%Y-%m-%d')
+                bloco['data_nascimento'] = datas.dt.date.astype(object).where(datas.notna(), None)
+            yield bloco
+    
+    def registros_unicos(self, bloco, contagem_chaves):
+        """Linhas cuja chave não se repete no arquivo, como registros 'unico'"""
+        unicos = bloco[(bloco['chave_duplicata'].map(contagem_chaves).fillna(1) <= 1).to_numpy()]
+        unicos = unicos.drop(columns='chave_duplicata')
+        unicos['grupo_tipo'] = 'unico'
+        unicos['total_registros_mesclados'] = 1
+        unicos['total_os'] = unicos['os'].notna().astype(int) if 'os' in unicos.columns else 0
+        return unicos
+    
     def identificar_duplicatas_seguras(self, dados):
         """Identifica duplicatas com critérios seguros"""
         grupos = defaultdict(list)
@@ -371,37 +395,39 @@ class ConsolidadorPorLoja:
         
         return consolidado
     
-    def calcular_qualidade_dados(self, df):
-        """Calcula métricas de qualidade dos dados"""
-        if df.empty:
+    def contar_preenchidos(self, df, preenchidos):
+        """Acumula total de registros e campos preenchidos de um bloco consolidado"""
+        preenchidos['total'] += len(df)
+        for campo in CAMPOS_QUALIDADE:
+            if campo in df.columns:
+                preenchidos[campo] += int(df[campo].notna().sum())
+    
+    def calcular_qualidade_dados(self, preenchidos):
+        """Calcula métricas de qualidade dos dados a partir das contagens acumuladas"""
+        total = preenchidos['total']
+        if not total:
             return {}
         
-        total = len(df)
         qualidade = {}
-        
-        campos_importantes = ['nome', 'cpf', 'celular', 'email', 'endereco']
-        
-        for campo in campos_importantes:
-            if campo in df.columns:
-                preenchidos = df[campo].notna().sum()
+        for campo in CAMPOS_QUALIDADE:
+            if campo in preenchidos:
                 qualidade[campo] = {
-                    'preenchidos': int(preenchidos),
+                    'preenchidos': int(preenchidos[campo]),
                     'total': int(total),
-                    'percentual': round((preenchidos / total) * 100, 1)
+                    'percentual': round((preenchidos[campo] / total) * 100, 1)
                 }
         
         return qualidade
     
-    def salvar_arquivo_consolidado(self, arquivo_original, registros_consolidados):
-        """Salva arquivo consolidado individual"""
+    def salvar_arquivo_consolidado(self, arquivo_original, blocos_consolidados):
+        """Salva arquivo consolidado individual (CSV gravado bloco a bloco)"""
         output_dir = Path("data/processed/por_arquivo")
         output_dir.mkdir(parents=True, exist_ok=True)
         
         nome_base = arquivo_original.stem
-        output_file = output_dir / f"{nome_base}_consolidado.xlsx"
+        output_file = output_dir / f"{nome_base}_consolidado.csv"
         
-        df = pd.DataFrame(registros_consolidados)
-        df.to_excel(output_file, index=False, engine='openpyxl')
+        return exportar_csv(blocos_consolidados, output_file)
     
     def processar_todos_arquivos(self):
         """Processa todos os arquivos individualmente"""
@@ -424,10 +450,10 @@ class ConsolidadorPorLoja:
         dashboard_file = Path("data/processed/dashboard_consolidacao_por_loja.xlsx")
         dashboard_file.parent.mkdir(parents=True, exist_ok=True)
         
-        with pd.ExcelWriter(dashboard_file, engine='openpyxl') as writer:
+        with EscritorRelatorio(dashboard_file) as relatorio:
             # 1. Dashboard principal
             df_dashboard = pd.DataFrame(self.dashboard_data)
-            df_dashboard.to_excel(writer, sheet_name='Dashboard_Principal', index=False)
+            relatorio.escrever(df_dashboard, 'Dashboard_Principal')
             
             # 2. Resumo por loja
             resumo_loja = df_dashboard.groupby('loja').agg({
@@ -437,7 +463,7 @@ class ConsolidadorPorLoja:
                 'duplicatas_encontradas': 'sum',
                 'total_os': 'sum'
             }).rename(columns={'arquivo': 'total_arquivos'})
-            resumo_loja.to_excel(writer, sheet_name='Resumo_Por_Loja')
+            relatorio.escrever(resumo_loja, 'Resumo_Por_Loja', index=True)
             
             # 3. Qualidade de dados consolidada
             qualidade_global = []
@@ -455,7 +481,7 @@ class ConsolidadorPorLoja:
             
             if qualidade_global:
                 df_qualidade = pd.DataFrame(qualidade_global)
-                df_qualidade.to_excel(writer, sheet_name='Qualidade_Dados', index=False)
+                relatorio.escrever(df_qualidade, 'Qualidade_Dados')
             
             # 4. Estatísticas gerais
             total_originais = sum(r['registros_originais'] for r in self.dashboard_data)
@@ -489,7 +515,7 @@ class ConsolidadorPorLoja:
             }
             
             df_stats = pd.DataFrame(estatisticas)
-            df_stats.to_excel(writer, sheet_name='Estatisticas_Gerais', index=False)
+            relatorio.escrever(df_stats, 'Estatisticas_Gerais')
         
         logger.info(f"Dashboard salvo em: {dashboard_file}")
         return dashboard_file
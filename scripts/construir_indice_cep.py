@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Gera data/referencias/ceps_locais.csv (CEPs exatos) para o índice de etl/utils/ceps.py
+
+Junta uma base completa de CEPs, se houver (DNE dos Correios, CEP aberto:
+CSV com cep, bairro, cidade, uf), com os endereços já cadastrados nas OS e na
+base Vixen padronizada. Para cada CEP fica o bairro/cidade mais frequente;
+a base completa tem prioridade sobre os endereços cadastrados.
+
+Uso:
+    python scripts/construir_indice_cep.py
+    python scripts/construir_indice_cep.py --base dados_ceps.csv
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+from unidecode import unidecode
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils import normalizar
+from etl.utils.ceps import ARQUIVOS_CEP, IndiceCEP, cep_numeros
+
+DESTINO = ARQUIVOS_CEP[1]
+VENDAS_OS = Path('povoamento/dados/csv/vendas_os_completo.csv')
+
+
+def enderecos_cadastrados() -> pd.DataFrame:
+    """cep/bairro/cidade/uf dos endereços das OS e da base Vixen padronizada"""
+    partes = []
+    if VENDAS_OS.exists():
+        partes.append(pd.read_csv(VENDAS_OS, usecols=lambda c: c in ('cep', 'bairro'), dtype=str))
+    arquivos_vixen = sorted(Path('data/analise_especial').glob('BASE_CLIENTES_VIXEN_PADRONIZADO_*.parquet'))
+    if arquivos_vixen:
+        partes.append(pd.read_parquet(arquivos_vixen[-1], columns=['cep', 'bairro', 'cidade', 'uf']))
+    return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=['cep', 'bairro', 'cidade', 'uf'])
+
+
+def mais_frequente(df: pd.DataFrame, campo: str) -> pd.Series:
+    """Valor mais frequente do campo por CEP (empate: ordem alfabética)"""
+    contagem = df.dropna(subset=[campo]).groupby(['numero', campo]).size().rename('n').reset_index()
+    contagem = contagem.sort_values(['numero', 'n', campo], ascending=[True, False, True])
+    return contagem.drop_duplicates('numero').set_index('numero')[campo]
+
+
+def consolidar(df: pd.DataFrame) -> pd.DataFrame:
+    """Uma linha por CEP completo com o bairro/cidade/uf mais frequentes"""
+    df = df.reindex(columns=['cep', 'bairro', 'cidade', 'uf'])
+    numeros, completo = cep_numeros(df['cep'])
+    df = df.assign(numero=numeros)[completo]
+    for campo in ['bairro', 'cidade', 'uf']:
+        # Maiúsculas sem acento, como nas faixas que vêm com o projeto
+        df[campo] = normalizar.em_valores_unicos(
+            df[campo], lambda s: normalizar.texto_limpo(s).str.upper().map(unidecode, na_action='ignore'))
+    ceps = pd.DataFrame({campo: mais_frequente(df, campo) for campo in ['bairro', 'cidade', 'uf']})
+    return ceps.rename_axis('numero').reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o arquivo de CEPs exatos do índice local")
+    parser.add_argument('--base', type=Path, help="CSV com cep, bairro, cidade, uf (base completa de CEPs)")
+    args = parser.parse_args()
+
+    print("📮 ÍNDICE LOCAL DE CEP")
+    print("=" * 60)
+    fontes = []
+    if args.base:
+        base = consolidar(pd.read_csv(args.base, dtype=str))
+        print(f"📄 {args.base}: {len(base):,} CEPs")
+        fontes.append(base)
+    cadastrados = consolidar(enderecos_cadastrados())
+    print(f"📄 Endereços cadastrados: {len(cadastrados):,} CEPs")
+    fontes.append(cadastrados)
+
+    ceps = pd.concat(fontes, ignore_index=True).drop_duplicates('numero', keep='first')
+    ceps['cep'] = ceps['numero'].astype(str).str.zfill(8)
+    # Cidade/UF que faltam vêm das faixas que acompanham o projeto
+    faixas = IndiceCEP.carregar(ARQUIVOS_CEP[:1]).consultar(ceps['cep'])
+    for campo in ['cidade', 'uf']:
+        ceps[campo] = ceps[campo].fillna(pd.Series(faixas[campo].to_numpy(), index=ceps.index))
+    ceps = ceps[ceps['uf'].notna()].sort_values('numero')
+
+    saida = pd.DataFrame({'cep_inicio': ceps['cep'], 'cep_fim': ceps['cep'], 'uf': ceps['uf'],
+                          'cidade': ceps['cidade'], 'bairro': ceps['bairro']})
+    DESTINO.parent.mkdir(parents=True, exist_ok=True)
+    saida.to_csv(DESTINO, index=False)
+    print(f"✅ {len(saida):,} CEPs salvos em {DESTINO} "
+          f"({saida['bairro'].notna().sum():,} com bairro)")
+
+
+if __name__ == "__main__":
+    main()
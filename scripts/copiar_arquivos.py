@@ -2,11 +2,14 @@
 Script para copiar arquivos OS_NOVA das lojas para o projeto
 """
 
-import shutil
+import sys
 from pathlib import Path
 import os
 from loguru import logger
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils.sincronizacao import SincronizadorArquivos
+
 def copiar_arquivos_os():
     # Diretórios
     fonte_base = Path(r"D:\OneDrive - Óticas Taty Mello\LOJAS")
@@ -20,6 +23,7 @@ def copiar_arquivos_os():
     
     arquivos_copiados = []
     erros = []
+    sincronizador = SincronizadorArquivos()
     
     # Verificar se diretório fonte existe
     if not fonte_base.exists():
@@ -41,16 +45,20 @@ def copiar_arquivos_os():
                         nome_destino = f"{loja_dir.name}_{arquivo.name}"
                         arquivo_destino = destino / nome_destino
                         
-                        # Copiar arquivo
-                        shutil.copy2(arquivo, arquivo_destino)
+                        # Sincronizar (pula se tamanho+mtime+hash não mudaram)
+                        status = sincronizador.sincronizar(arquivo, arquivo_destino)
                         arquivos_copiados.append({
                             'origem': str(arquivo),
                             'destino': str(arquivo_destino),
                             'loja': loja_dir.name,
-                            'tamanho': arquivo.stat().st_size
+                            'tamanho': arquivo.stat().st_size,
+                            'status': status
                         })
                         
-                        logger.success(f"Copiado: {arquivo.name} -> {nome_destino}")
+                        if status == 'inalterado':
+                            logger.info(f"Inalterado: {arquivo.name}")
+                        else:
+                            logger.success(f"Sincronizado ({status}): {arquivo.name} -> {nome_destino}")
                         
                     except Exception as e:
                         erro = f"Erro ao copiar {arquivo}: {e}"
@@ -59,11 +67,13 @@ def copiar_arquivos_os():
             else:
                 logger.warning(f"Pasta OSs não encontrada em: {loja_dir.name}")
     
+    sincronizador.salvar_manifesto()
+    
     # Relatório final
     logger.info(f"\n{'='*50}")
     logger.info(f"RELATÓRIO DE CÓPIA")
     logger.info(f"{'='*50}")
-    logger.info(f"Arquivos copiados: {len(arquivos_copiados)}")
+    logger.info(f"Arquivos sincronizados: {len(arquivos_copiados)} ({sincronizador.resumo()})")
     logger.info(f"Erros: {len(erros)}")
     
     if arquivos_copiados:
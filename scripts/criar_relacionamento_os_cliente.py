@@ -13,9 +13,12 @@ import logging
 from pathlib import Path
 import glob
 from datetime import datetime
-import openpyxl
 from fuzzywuzzy import fuzz
 import re
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils.planilhas import LeitorPlanilha
 
 # Configurar logging
 logging.basicConfig(
@@ -66,97 +69,112 @@ def encontrar_cliente_id(nome_os, cpf_os, df_clientes):
     
     return None
 
-def processar_arquivo_os(file_path, df_clientes):
-    """Processa um arquivo de OS e relaciona com clientes"""
-    try:
-        # Tentar ler como Excel
-        if file_path.suffix == '.xlsm':
-            wb = openpyxl.load_workbook(file_path, data_only=True)
-            sheet = wb.active
-            data = []
-            headers = []
-            
-            # Ler headers (primeira linha)
-            for cell in sheet[1]:
-                headers.append(cell.value)
-            
-            # Ler dados
-            for row in sheet.iter_rows(min_row=2, values_only=True):
-                data.append(row)
-            
-            df = pd.DataFrame(data, columns=headers)
-        else:
-            df = pd.read_excel(file_path)
-        
-        if df.empty:
-            return pd.DataFrame()
-        
-        # Identificar campos de nome e CPF
-        nome_col = None
-        cpf_col = None
+def preparar_relacionamento(file_path, colunas):
+    """Resolve colunas de nome, CPF e numero da OS, loja e sistema do arquivo"""
+    # Identificar campos de nome e CPF
+    nome_col = None
+    cpf_col = None
+    
+    for col in colunas:
+        col_upper = str(col).upper()
+        if any(term in col_upper for term in ['NOME', 'CLIENTE', 'PACIENTE']):
+            if nome_col is None:
+                nome_col = col
+        if any(term in col_upper for term in ['CPF', 'DOCUMENTO']):
+            if cpf_col is None:
+                cpf_col = col
+    
+    # Detectar loja a partir do nome do arquivo
+    loja = "DESCONHECIDA"
+    file_name = file_path.name.upper()
+    if "MAUA" in file_name or "MESA01" in file_name:
+        loja = "MAUA"
+    elif any(term in file_name for term in ["SAO_MATEUS", "MESA_01", "MESA_02", "OL"]):
+        loja = "SAO_MATEUS"
+    elif "RIO_PEQUENO" in file_name or "PERUS" in file_name:
+        loja = "RIO_PEQUENO"
+    
+    # Identificar sistema
+    sistema = "LANCASTER"
+    if "OTM" in file_name:
+        sistema = "OTM"
+    
+    return {
+        'nome_col': nome_col,
+        'cpf_col': cpf_col,
+        # Colunas candidatas a numero da OS
+        'colunas_os': [col for col in colunas if any(term in str(col).upper() for term in ['OS', 'NUMERO', 'N'])],
+        'loja': loja,
+        'sistema': sistema,
+        'arquivo': file_path.name
+    }
+
+def extrair_relacoes(df, contexto, df_clientes=None):
+    """
+    Relacoes OS-cliente de um bloco de linhas
+    Sem df_clientes o Cliente_ID fica para identificar_relacoes
+    """
+    nome_col = contexto['nome_col']
+    cpf_col = contexto['cpf_col']
+    os_relacionadas = []
+    
+    for idx, row in df.iterrows():
+        # Buscar nmero da OS
+        os_numero = None
+        for col in contexto['colunas_os']:
+            val = row[col]
+            if pd.notna(val) and str(val).strip():
+                try:
+                    os_numero = int(float(str(val)))
+                    break
+                except:
+                    continue
         
-        for col in df.columns:
-            col_upper = str(col).upper()
-            if any(term in col_upper for term in ['NOME', 'CLIENTE', 'PACIENTE']):
-                if nome_col is None:
-                    nome_col = col
-            if any(term in col_upper for term in ['CPF', 'DOCUMENTO']):
-                if cpf_col is None:
-                    cpf_col = col
+        if os_numero is None:
+            continue
         
-        # Detectar loja a partir do nome do arquivo
-        loja = "DESCONHECIDA"
-        file_name = file_path.name.upper()
-        if "MAUA" in file_name or "MESA01" in file_name:
-            loja = "MAUA"
-        elif any(term in file_name for term in ["SAO_MATEUS", "MESA_01", "MESA_02", "OL"]):
-            loja = "SAO_MATEUS"
-        elif "RIO_PEQUENO" in file_name or "PERUS" in file_name:
-            loja = "RIO_PEQUENO"
+        # Extrair nome e CPF
+        nome = row[nome_col] if nome_col else ""
+        cpf = row[cpf_col] if cpf_col else ""
         
-        # Identificar sistema
-        sistema = "LANCASTER"
-        if "OTM" in file_name:
-            sistema = "OTM"
+        # Encontrar Cliente_ID
+        cliente_id = encontrar_cliente_id(nome, cpf, df_clientes) if df_clientes is not None else None
         
-        os_relacionadas = []
+        # Criar registro da relao
+        relacao = {
+            'OS_Numero': os_numero,
+            'Loja': contexto['loja'],
+            'Sistema': contexto['sistema'],
+            'Arquivo_Origem': contexto['arquivo'],
+            'Cliente_ID': cliente_id,
+            'Nome_OS': nome,
+            'CPF_OS': cpf,
+            'Status_Match': 'IDENTIFICADO' if cliente_id else 'NO_IDENTIFICADO'
+        }
         
-        for idx, row in df.iterrows():
-            # Buscar nmero da OS
-            os_numero = None
-            for col in df.columns:
-                if any(term in str(col).upper() for term in ['OS', 'NUMERO', 'N']):
-                    val = row[col]
-                    if pd.notna(val) and str(val).strip():
-                        try:
-                            os_numero = int(float(str(val)))
-                            break
-                        except:
-                            continue
-            
-            if os_numero is None:
-                continue
-            
-            # Extrair nome e CPF
-            nome = row[nome_col] if nome_col else ""
-            cpf = row[cpf_col] if cpf_col else ""
-            
-            # Encontrar Cliente_ID
-            cliente_id = encontrar_cliente_id(nome, cpf, df_clientes)
-            
-            # Criar registro da relao
-            relacao = {
-                'OS_Numero': os_numero,
-                'Loja': loja,
-                'Sistema': sistema,
-                'Arquivo_Origem': file_path.name,
-                'Cliente_ID': cliente_id,
-                'Nome_OS': nome,
-                'CPF_OS': cpf,
-                'Status_Match': 'IDENTIFICADO' if cliente_id else 'NO_IDENTIFICADO'
-            }
+        os_relacionadas.append(relacao)
+    
+    return os_relacionadas
+
+def identificar_relacoes(df_relacoes, df_clientes):
+    """Preenche Cliente_ID das relacoes extraidas sem a base de clientes"""
+    df_relacoes['Cliente_ID'] = [
+        encontrar_cliente_id(nome, cpf, df_clientes)
+        for nome, cpf in zip(df_relacoes['Nome_OS'], df_relacoes['CPF_OS'])
+    ]
+    df_relacoes['Status_Match'] = df_relacoes['Cliente_ID'].map(lambda c: 'IDENTIFICADO' if c else 'NO_IDENTIFICADO')
+    return df_relacoes
+
+def processar_arquivo_os(file_path, df_clientes):
+    """Processa um arquivo de OS e relaciona com clientes"""
+    try:
+        # Ler o sheet ativo em blocos (workbook em modo read_only)
+        with LeitorPlanilha(file_path, usar_sheet_ativo=True) as leitor:
+            contexto = preparar_relacionamento(file_path, leitor.colunas)
             
-            os_relacionadas.append(relacao)
+            os_relacionadas = []
+            for df in leitor.blocos():
+                os_relacionadas.extend(extrair_relacoes(df, contexto, df_clientes))
         
         return pd.DataFrame(os_relacionadas)
         
@@ -164,19 +182,8 @@ def processar_arquivo_os(file_path, df_clientes):
         logging.error(f"Erro ao processar {file_path}: {e}")
         return pd.DataFrame()
 
-def main():
-    print(" SISTEMA DE RELACIONAMENTO OS-CLIENTE")
-    print("=" * 80)
-    print(" Conectando 14,337 OS com clientes nicos")
-    print(" Combinando todos os dados extrados")
-    print("=" * 80)
-    
-    # Diretrios
-    data_dir = Path("data")
-    processed_dir = data_dir / "processed"
-    
-    # 1. Carregar dados de clientes
-    print("\n Carregando dados de clientes...")
+def carregar_clientes(processed_dir):
+    """Carrega a base de clientes com ID (mais recente) normalizada para busca"""
     # Priorizar arquivo com ID_CLIENTE
     clientes_files = list(processed_dir.glob("BASE_CLIENTES_COM_ID_*.xlsx"))
     if not clientes_files:
@@ -184,42 +191,19 @@ def main():
         clientes_files = (list(processed_dir.glob("CLIENTES_UNICOS_*.xlsx")) + 
                          list(processed_dir.glob("CLIENTES_CONSOLIDADO_*.xlsx")))
     if not clientes_files:
-        print(" Arquivo de clientes no encontrado!")
-        return
+        return None
     
     df_clientes = pd.read_excel(clientes_files[-1])  # Mais recente
-    print(f" {len(df_clientes)} clientes nicos carregados")
     
     # Normalizar dados dos clientes para busca
     df_clientes['Nome_normalizado'] = df_clientes['nome_completo'].apply(normalizar_nome)
     df_clientes['CPF_normalizado'] = df_clientes['cpf'].apply(normalizar_cpf)
     # Adicionar coluna Cliente_ID que corresponde ao ID_CLIENTE
     df_clientes['Cliente_ID'] = df_clientes['ID_CLIENTE']
-    
-    # 2. Processar todos os arquivos de OS
-    print("\n Processando arquivos de OS...")
-    raw_dir = data_dir / "raw"
-    all_files = list(raw_dir.glob("*.xlsm")) + list(raw_dir.glob("*.xlsx"))
-    
-    todas_relacoes = []
-    
-    for i, file_path in enumerate(all_files, 1):
-        print(f"[{i:2d}/{len(all_files)}] Processando: {file_path.name}")
-        
-        df_relacoes = processar_arquivo_os(file_path, df_clientes)
-        if not df_relacoes.empty:
-            todas_relacoes.append(df_relacoes)
-            print(f"     {len(df_relacoes)} OS processadas")
-        else:
-            print(f"      Nenhuma OS encontrada")
-    
-    # 3. Combinar todas as relaes
-    if todas_relacoes:
-        df_final = pd.concat(todas_relacoes, ignore_index=True)
-    else:
-        print(" Nenhuma relao encontrada!")
-        return
-    
+    return df_clientes
+
+def salvar_relacionamento(df_final, processed_dir):
+    """Exibe estatisticas e salva o Excel de relacionamento OS-cliente"""
     # 4. Estatsticas
     total_os = len(df_final)
     identificadas = len(df_final[df_final['Cliente_ID'].notna()])
@@ -301,6 +285,54 @@ def main():
     print("=" * 50)
     print(f" {identificadas:,} OS conectadas com clientes")
     print(f" Base pronta para sistema final integrado")
+    
+    return output_file
+
+def main():
+    print(" SISTEMA DE RELACIONAMENTO OS-CLIENTE")
+    print("=" * 80)
+    print(" Conectando 14,337 OS com clientes nicos")
+    print(" Combinando todos os dados extrados")
+    print("=" * 80)
+    
+    # Diretrios
+    data_dir = Path("data")
+    processed_dir = data_dir / "processed"
+    
+    # 1. Carregar dados de clientes
+    print("\n Carregando dados de clientes...")
+    df_clientes = carregar_clientes(processed_dir)
+    if df_clientes is None:
+        print(" Arquivo de clientes no encontrado!")
+        return
+    
+    print(f" {len(df_clientes)} clientes nicos carregados")
+    
+    # 2. Processar todos os arquivos de OS
+    print("\n Processando arquivos de OS...")
+    raw_dir = data_dir / "raw"
+    all_files = list(raw_dir.glob("*.xlsm")) + list(raw_dir.glob("*.xlsx"))
+    
+    todas_relacoes = []
+    
+    for i, file_path in enumerate(all_files, 1):
+        print(f"[{i:2d}/{len(all_files)}] Processando: {file_path.name}")
+        
+        df_relacoes = processar_arquivo_os(file_path, df_clientes)
+        if not df_relacoes.empty:
+            todas_relacoes.append(df_relacoes)
+            print(f"     {len(df_relacoes)} OS processadas")
+        else:
+            print(f"      Nenhuma OS encontrada")
+    
+    # 3. Combinar todas as relaes
+    if todas_relacoes:
+        df_final = pd.concat(todas_relacoes, ignore_index=True)
+    else:
+        print(" Nenhuma relao encontrada!")
+        return
+    
+    salvar_relacionamento(df_final, processed_dir)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
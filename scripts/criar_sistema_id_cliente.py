@@ -10,6 +10,10 @@ import re
 from datetime import datetime
 import logging
 import hashlib
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils.ids_clientes import ARQUIVO_REGISTRO, RegistroIDs, chaves_clientes
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -97,43 +101,31 @@ class SistemaIDCliente:
         # Carregar base
         self.carregar_base_clientes()
         
-        # Processar cada cliente
-        id_contador = 1
-        chaves_processadas = set()
-        
-        for idx, cliente in self.base_clientes.iterrows():
-            # Gerar chave nica
-            chave = self.gerar_chave_cliente(
-                cliente.get('nome_completo'),
-                cliente.get('cpf'),
-                cliente.get('data_nascimento')
-            )
-            
-            # Verificar se j foi processada (duplicado)
-            if chave in chaves_processadas:
-                # Encontrar ID existente
-                id_cliente = self.mapeamento_ids[chave]
-                self.estatisticas['duplicados_resolvidos'] += 1
-            else:
-                # Criar novo ID
-                id_cliente = f"CLI_{id_contador:06d}"
-                self.mapeamento_ids[chave] = id_cliente
-                chaves_processadas.add(chave)
-                id_contador += 1
-            
-            # Adicionar  lista com ID
-            cliente_com_id = dict(cliente)
-            cliente_com_id['ID_CLIENTE'] = id_cliente
-            cliente_com_id['CHAVE_CLIENTE'] = chave
-            cliente_com_id['METODO_ID'] = chave.split('_')[0]
-            
-            self.clientes_com_id.append(cliente_com_id)
-            
-            # Estatsticas
-            if cliente.get('cpf'):
-                self.estatisticas['com_cpf'] += 1
-            else:
-                self.estatisticas['sem_cpf'] += 1
+        # Chaves calculadas por coluna; IDs vindos do registro persistente
+        # (chaves ja vistas mantem o ID, so as novas recebem numero)
+        base = self.base_clientes
+        coluna = lambda nome: base[nome] if nome in base.columns else pd.Series(None, index=base.index, dtype=object)
+        chaves = chaves_clientes(coluna('nome_completo'), coluna('cpf'), coluna('data_nascimento'))
+        
+        registro = RegistroIDs()
+        ids = registro.atribuir(chaves)
+        registro.salvar()
+        
+        self.clientes_com_id = base.assign(
+            ID_CLIENTE=ids.to_numpy(),
+            CHAVE_CLIENTE=chaves.to_numpy(),
+            METODO_ID=chaves.str.split('_', n=1).str[0].to_numpy(),
+        )
+        self.mapeamento_ids = dict(zip(chaves, ids))
+        self.estatisticas['duplicados_resolvidos'] = len(chaves) - len(self.mapeamento_ids)
+        self.estatisticas['ids_existentes'] = registro.estatisticas['existentes']
+        self.estatisticas['ids_novos'] = registro.estatisticas['novos']
+        
+        # Estatisticas
+        cpf = coluna('cpf')
+        com_cpf = int((cpf.notna() & (cpf.astype(str).str.strip() != '')).sum())
+        self.estatisticas['com_cpf'] = com_cpf
+        self.estatisticas['sem_cpf'] = len(base) - com_cpf
         
         self.estatisticas['total_clientes'] = len(self.clientes_com_id)
         
@@ -153,7 +145,7 @@ class SistemaIDCliente:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         output_file = output_dir / f"BASE_CLIENTES_COM_ID_{timestamp}.xlsx"
         
-        df_clientes = pd.DataFrame(self.clientes_com_id)
+        df_clientes = self.clientes_com_id
         
         # Reordenar colunas para colocar ID no incio
         colunas = ['ID_CLIENTE', 'CHAVE_CLIENTE', 'METODO_ID'] + [col for col in df_clientes.columns if col not in ['ID_CLIENTE', 'CHAVE_CLIENTE', 'METODO_ID']]
@@ -193,9 +185,10 @@ class SistemaIDCliente:
         print(f" Com CPF: {self.estatisticas['com_cpf']:,} ({self.estatisticas['com_cpf']/self.estatisticas['total_clientes']*100:.1f}%)")
         print(f" Sem CPF: {self.estatisticas['sem_cpf']:,} ({self.estatisticas['sem_cpf']/self.estatisticas['total_clientes']*100:.1f}%)")
         print(f" Duplicados resolvidos: {self.estatisticas['duplicados_resolvidos']:,}")
+        print(f" IDs do registro: {self.estatisticas['ids_existentes']:,} existentes | {self.estatisticas['ids_novos']:,} novos ({ARQUIVO_REGISTRO})")
         
         # Estatsticas por mtodo
-        df_clientes = pd.DataFrame(self.clientes_com_id)
+        df_clientes = self.clientes_com_id
         metodos = df_clientes['METODO_ID'].value_counts()
         
         print(f"\n MTODOS DE IDENTIFICAO:")
@@ -10,8 +10,13 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 import pandas as pd
 from pathlib import Path
+from typing import Optional
+import sys
 import uvicorn
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from app.services.listagens import LIMITE_MAXIMO, listagens
+
 app = FastAPI(title="Sistema Óticas - Dashboard Completo")
 templates = Jinja2Templates(directory="app/templates")
 
@@ -192,25 +197,29 @@ async def dashboard_home(request: Request):
     })
 
 @app.get("/clientes")
-async def api_clientes():
-    """API para buscar clientes"""
+def api_clientes(limite: int = 100, cursor: Optional[str] = None):
+    """API para buscar clientes (páginas da cópia indexada, como /api/clientes da app)"""
     if dashboard.df_clientes.empty:
         return {"error": "Base de clientes não carregada"}
     
+    pagina = listagens().listar('clientes', limite=min(max(limite, 1), LIMITE_MAXIMO), cursor=cursor)
     return {
         "total": len(dashboard.df_clientes),
-        "clientes": dashboard.df_clientes.head(100).to_dict('records')
+        "clientes": pagina['resultados'],
+        "proximo_cursor": pagina['proximo_cursor']
     }
 
 @app.get("/os")
-async def api_os():
-    """API para buscar OS"""
+def api_os(limite: int = 100, cursor: Optional[str] = None):
+    """API para buscar OS (mais recentes primeiro, páginas da cópia indexada)"""
     if dashboard.df_os.empty:
         return {"error": "Base de OS não carregada"}
     
+    pagina = listagens().listar('os', limite=min(max(limite, 1), LIMITE_MAXIMO), cursor=cursor)
     return {
         "total": len(dashboard.df_os),
-        "os": dashboard.df_os.head(100).to_dict('records')
+        "os": pagina['resultados'],
+        "proximo_cursor": pagina['proximo_cursor']
     }
 
 # Criar template se não existir
@@ -6,10 +6,19 @@ Consolida TODOS os clientes únicos com dados completos
 
 import pandas as pd
 from pathlib import Path
-import re
+import sys
 from datetime import datetime
 import logging
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils import normalizar
+from etl.utils.ceps import IndiceCEP
+from etl.utils.datas import ConversorDatas
+from etl.utils.planilhas import LeitorPlanilha
+from etl.utils.instrumentacao import instrumentacao
+from etl.utils.relatorios import EscritorRelatorio
+from app.services.listagens import Listagens
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -24,80 +33,38 @@ class GeradorBaseClientes:
             'com_cpf': 0,
             'com_celular': 0,
             'com_email': 0,
-            'com_endereco_completo': 0
+            'com_endereco_completo': 0,
+            'datas_invalidas': 0
         }
+        # Cache de datas compartilhado entre todos os arquivos
+        self.conversor_datas = ConversorDatas(somente_texto=True)
     
     def limpar_cpf(self, cpf):
         """Limpa e valida CPF"""
-        if pd.isna(cpf):
-            return None
-        cpf_str = re.sub(r'[^\d]', '', str(cpf))
-        if len(cpf_str) == 11 and cpf_str.isdigit():
-            return f"{cpf_str[:3]}.{cpf_str[3:6]}.{cpf_str[6:9]}-{cpf_str[9:]}"
-        return None
+        return normalizar.escalar(normalizar.limpar_cpf, cpf)
     
     def limpar_celular_sp(self, celular):
         """Limpa e padroniza celular para formato SP"""
-        if pd.isna(celular) or str(celular).strip() == '':
-            return None
-        
-        cel_str = re.sub(r'[^\d]', '', str(celular))
-        
-        if len(cel_str) < 9:
-            return None
-        
-        # Padronizar para SP (11)
-        if len(cel_str) == 9:
-            cel_str = '11' + cel_str
-        elif len(cel_str) == 10:
-            cel_str = '11' + cel_str
-        elif len(cel_str) == 11 and cel_str.startswith('1'):
-            pass
-        elif len(cel_str) == 11 and not cel_str.startswith('11'):
-            cel_str = '11' + cel_str[2:]
-        elif len(cel_str) == 13 and cel_str.startswith('55'):
-            cel_str = '11' + cel_str[4:]
-        elif len(cel_str) > 11:
-            cel_str = '11' + cel_str[-9:]
-        
-        if len(cel_str) == 11 and cel_str.startswith('11') and cel_str[2] == '9':
-            return f"(11) {cel_str[2:7]}-{cel_str[7:]}"
-        
-        return None
+        return normalizar.escalar(normalizar.limpar_celular_sp, celular)
     
     def normalizar_nome(self, nome):
         """Normaliza nome"""
-        if pd.isna(nome):
-            return None
-        nome_str = str(nome).upper().strip()
-        nome_str = re.sub(r'[^\w\s]', '', nome_str)
-        nome_str = re.sub(r'\s+', ' ', nome_str)
-        return nome_str if nome_str else None
+        return normalizar.escalar(normalizar.normalizar_nome, nome)
     
     def normalizar_email(self, email):
         """Normaliza email"""
-        if pd.isna(email):
-            return None
-        email_str = str(email).lower().strip()
-        # Validação básica de email
-        if '@' in email_str and '.' in email_str:
-            return email_str
-        return None
+        return normalizar.escalar(normalizar.normalizar_email, email)
     
     def extrair_data_nascimento(self, data):
         """Extrai data de nascimento"""
-        if pd.isna(data):
-            return None
-        try:
-            if isinstance(data, str):
-                for fmt in ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y']:
-                    try:
-                        return datetime.strptime(data.strip(), fmt).strftime('%d/%m/%Y')
-                    except:
-                        continue
-            return None
-        except:
-            return None
+        datas, _ = self.conversor_datas.formatar([data])
+        return datas.iloc[0]
+    
+    def extrair_datas_nascimento(self, serie):
+        """Extrai a coluna de datas de nascimento (DD/MM/YYYY)"""
+        datas, invalidas = self.conversor_datas.formatar(serie)
+        self.estatisticas['datas_invalidas'] += int(invalidas.sum())
+        return datas
     
     def identificar_campos(self, df):
         """Identifica campos do DataFrame"""
@@ -140,91 +107,97 @@ class GeradorBaseClientes:
         """Processa um arquivo e extrai clientes"""
         logger.info(f"Processando: {arquivo_path.name}")
         
-        try:
-            # Carregar arquivo com tratamento de erro robusto
-            engine = 'openpyxl' if arquivo_path.suffix.lower() in ['.xlsx', '.xlsm'] else None
-            
-            # Primeiro, tentar carregar o arquivo
+        with instrumentacao.etapa('etapa1_arquivo', arquivo_path) as etapa:
             try:
-                excel_file = pd.ExcelFile(arquivo_path, engine=engine)
-            except Exception as e:
-                logger.warning(f"Erro ao carregar {arquivo_path.name}: {e}")
-                return 0
-            
-            # Encontrar sheet principal
-            sheet_principal = None
-            for sheet_name in ['base_clientes_OS', 'base', 'dados']:
-                if sheet_name in excel_file.sheet_names:
-                    sheet_principal = sheet_name
-                    break
-            
-            if not sheet_principal:
-                sheet_principal = excel_file.sheet_names[0]
+                # Abrir arquivo em modo streaming (read_only)
+                try:
+                    leitor = LeitorPlanilha(arquivo_path)
+                except Exception as e:
+                    logger.warning(f"Erro ao carregar {arquivo_path.name}: {e}")
+                    etapa.falhar(e)
+                    return 0
+                
+                with leitor:
+                    contexto = self.preparar_arquivo(arquivo_path, leitor.colunas)
+                    if not contexto:
+                        return 0
+                    
+                    # Extrair clientes bloco a bloco
+                    clientes = []
+                    try:
+                        for bloco in leitor.blocos():
+                            etapa.registrar(entrada=len(bloco))
+                            clientes.extend(self.processar_bloco(bloco, contexto))
+                    except Exception as e:
+                        logger.warning(f"Erro ao ler sheet {leitor.sheet} de {arquivo_path.name}: {e}")
+                        etapa.falhar(e)
+                        return 0
+                
+                etapa.registrar(saida=len(clientes))
+                return self.finalizar_arquivo(contexto, clientes)
             
-            # Tentar ler o DataFrame
-            try:
-                df = pd.read_excel(arquivo_path, sheet_name=sheet_principal, engine=engine)
             except Exception as e:
-                logger.warning(f"Erro ao ler sheet {sheet_principal} de {arquivo_path.name}: {e}")
-                return 0
-            
-            # Identificar campos
-            campos = self.identificar_campos(df)
-            
-            if not campos.get('nome'):
-                logger.warning(f"Campo nome não encontrado em {arquivo_path.name}")
+                logger.error(f"❌ Erro em {arquivo_path.name}: {e}")
+                etapa.falhar(e)
                 return 0
-            
-            # Extrair clientes
-            clientes_arquivo = 0
-            loja = self.identificar_loja_por_arquivo(arquivo_path.name)
-            
-            for idx, row in df.iterrows():
-                cliente = self.extrair_cliente(row, campos, loja, arquivo_path.name)
-                if cliente:
-                    self.clientes_master.append(cliente)
-                    clientes_arquivo += 1
-            
-            self.estatisticas['arquivos_processados'] += 1
-            self.estatisticas['clientes_encontrados'] += clientes_arquivo
-            
-            logger.info(f"✅ {arquivo_path.name}: {clientes_arquivo} clientes extraídos")
-            return clientes_arquivo
-            
-        except Exception as e:
-            logger.error(f"❌ Erro em {arquivo_path.name}: {e}")
-            return 0
     
-    def extrair_cliente(self, row, campos, loja, arquivo):
-        """Extrai dados do cliente de uma linha"""
-        cliente = {
-            'origem_loja': loja,
-            'origem_arquivo': arquivo,
-            'data_extracao': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
-        }
-        
-        # Extrair dados básicos
-        nome = self.normalizar_nome(row.get(campos.get('nome'))) if campos.get('nome') else None
-        if not nome:
-            return None  # Cliente deve ter nome
+    def preparar_arquivo(self, arquivo_path, colunas):
+        """Resolve campos e loja a partir do cabeçalho; None se o arquivo não tem clientes"""
+        campos = self.identificar_campos(pd.DataFrame(columns=colunas))
         
-        cliente['nome_completo'] = nome
-        
-        # Dados pessoais
-        cliente['cpf'] = self.limpar_cpf(row.get(campos.get('cpf'))) if campos.get('cpf') else None
-        cliente['rg'] = str(row.get(campos.get('rg'))).strip() if campos.get('rg') and pd.notna(row.get(campos.get('rg'))) else None
-        cliente['data_nascimento'] = self.extrair_data_nascimento(row.get(campos.get('data_nascimento'))) if campos.get('data_nascimento') else None
+        if not campos.get('nome'):
+            logger.warning(f"Campo nome não encontrado em {arquivo_path.name}")
+            return None
         
-        # Contatos
-        cliente['celular'] = self.limpar_celular_sp(row.get(campos.get('celular'))) if campos.get('celular') else None
-        cliente['email'] = self.normalizar_email(row.get(campos.get('email'))) if campos.get('email') else None
+        return {
+            'campos': campos,
+            'loja': self.identificar_loja_por_arquivo(arquivo_path.name),
+            'arquivo': arquivo_path.name
+        }
+    
+    def processar_bloco(self, bloco, contexto):
+        """Extrai os clientes de um bloco de linhas"""
+        return self.extrair_clientes(bloco, contexto['campos'], contexto['loja'], contexto['arquivo'])
+    
+    def finalizar_arquivo(self, contexto, clientes):
+        """Acumula os clientes extraídos de um arquivo lido por completo"""
+        self.clientes_master.extend(clientes)
+        clientes_arquivo = len(clientes)
         
-        # Endereço
-        cliente['endereco'] = str(row.get(campos.get('endereco'))).strip() if campos.get('endereco') and pd.notna(row.get(campos.get('endereco'))) else None
-        cliente['cep'] = str(row.get(campos.get('cep'))).strip() if campos.get('cep') and pd.notna(row.get(campos.get('cep'))) else None
-        cliente['bairro'] = str(row.get(campos.get('bairro'))).strip() if campos.get('bairro') and pd.notna(row.get(campos.get('bairro'))) else None
+        self.estatisticas['arquivos_processados'] += 1
+        self.estatisticas['clientes_encontrados'] += clientes_arquivo
         
-        return cliente
+        logger.info(f"✅ {contexto['arquivo']}: {clientes_arquivo} clientes extraídos")
+        return clientes_arquivo
+    
+    def extrair_clientes(self, df, campos, loja, arquivo):
+        """Extrai os clientes do DataFrame inteiro de uma vez (colunas vetorizadas)"""
+        def coluna(campo, funcao):
+            if not campos.get(campo):
+                return pd.Series(None, index=df.index, dtype=object)
+            return funcao(df[campos[campo]])
+        
+        clientes = pd.DataFrame({
+            'origem_loja': loja,
+            'origem_arquivo': arquivo,
+            'data_extracao': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+            'nome_completo': coluna('nome', normalizar.normalizar_nome),
+            # Dados pessoais
+            'cpf': coluna('cpf', normalizar.limpar_cpf),
+            'rg': coluna('rg', normalizar.texto_limpo),
+            'data_nascimento': coluna('data_nascimento', self.extrair_datas_nascimento),
+            # Contatos
+            'celular': coluna('celular', normalizar.limpar_celular_sp),
+            'email': coluna('email', normalizar.normalizar_email),
+            # Endereço
+            'endereco': coluna('endereco', normalizar.texto_limpo),
+            'cep': coluna('cep', normalizar.texto_limpo),
+            'bairro': coluna('bairro', normalizar.texto_limpo)
+        }, index=df.index)
+        
+        # Cliente deve ter nome
+        clientes = clientes[clientes['nome_completo'].notna()]
+        return clientes.astype(object).where(clientes.notna(), None).to_dict('records')
     
     def identificar_loja_por_arquivo(self, nome_arquivo):
         """Identifica loja pelo nome do arquivo"""
@@ -340,14 +313,26 @@ class GeradorBaseClientes:
         for arquivo in arquivos:
             self.processar_arquivo(arquivo)
         
+        return self.concluir_base_master()
+    
+    def concluir_base_master(self):
+        """Consolida, salva e exibe a base master a partir dos clientes extraídos"""
         # Consolidar duplicados
-        clientes_consolidados = self.consolidar_clientes_duplicados()
+        with instrumentacao.etapa('etapa1_consolidacao') as etapa:
+            clientes_consolidados = self.consolidar_clientes_duplicados()
+            etapa.registrar(
+                entrada=len(self.clientes_master),
+                saida=len(clientes_consolidados),
+                duplicatas_detectadas=len(self.clientes_master) - len(clientes_consolidados)
+            )
         
         # Calcular estatísticas
         self.calcular_estatisticas_finais(clientes_consolidados)
         
         # Salvar base master
-        output_file = self.salvar_base_master(clientes_consolidados)
+        with instrumentacao.etapa('etapa1_salvar') as etapa:
+            output_file = self.salvar_base_master(clientes_consolidados)
+            etapa.registrar(entrada=len(clientes_consolidados), saida=len(clientes_consolidados))
         
         # Exibir resultados
         self.exibir_resultados(output_file)
@@ -364,11 +349,17 @@ class GeradorBaseClientes:
         # Preparar DataFrame
         df_clientes = pd.DataFrame(clientes_consolidados)
         
+        # Bairro/cidade/UF pelo CEP (índice local, só onde faltam)
+        df_clientes, estatisticas_cep = IndiceCEP.carregar().enriquecer(df_clientes)
+        logger.info(f"CEPs válidos: {estatisticas_cep['ceps_validos']} | completados: "
+                    f"bairro {estatisticas_cep['bairro']}, cidade {estatisticas_cep['cidade']}, "
+                    f"UF {estatisticas_cep['uf']}")
+        
         # Reordenar colunas para melhor visualização
         colunas_ordenadas = [
             'nome_completo', 'cpf', 'rg', 'data_nascimento',
             'celular', 'email',
-            'endereco', 'cep', 'bairro',
+            'endereco', 'cep', 'bairro', 'cidade', 'uf',
             'origem_loja', 'origem_arquivo', 'total_registros_mesclados',
             'data_extracao'
         ]
@@ -378,9 +369,9 @@ class GeradorBaseClientes:
         df_clientes = df_clientes[colunas_existentes]
         
         # Salvar com múltiplas sheets
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+        with EscritorRelatorio(output_file) as relatorio:
             # Base principal
-            df_clientes.to_excel(writer, sheet_name='Base_Clientes_Master', index=False)
+            relatorio.escrever(df_clientes, 'Base_Clientes_Master')
             
             # Estatísticas por loja
             stats_loja = df_clientes.groupby('origem_loja').agg({
@@ -396,7 +387,7 @@ class GeradorBaseClientes:
                 'email': 'com_email',
                 'endereco': 'com_endereco'
             })
-            stats_loja.to_excel(writer, sheet_name='Estatisticas_Por_Loja')
+            relatorio.escrever(stats_loja, 'Estatisticas_Por_Loja', index=True)
             
             # Relatório de qualidade
             qualidade = {
@@ -418,7 +409,10 @@ class GeradorBaseClientes:
             }
             
             df_qualidade = pd.DataFrame(qualidade)
-            df_qualidade.to_excel(writer, sheet_name='Relatorio_Qualidade', index=False)
+            relatorio.escrever(df_qualidade, 'Relatorio_Qualidade')
+        
+        # Cópia indexada para as listagens da API (/api/clientes)
+        Listagens().gravar('clientes', df_clientes, output_file)
         
         logger.info(f"Base master salva em: {output_file}")
         return output_file
@@ -434,6 +428,7 @@ class GeradorBaseClientes:
         print(f"📱 Com celular: {self.estatisticas['com_celular']:,} ({self.estatisticas['com_celular']/self.estatisticas['clientes_unicos']*100:.1f}%)")
         print(f"📧 Com email: {self.estatisticas['com_email']:,} ({self.estatisticas['com_email']/self.estatisticas['clientes_unicos']*100:.1f}%)")
         print(f"🏠 Com endereço completo: {self.estatisticas['com_endereco_completo']:,} ({self.estatisticas['com_endereco_completo']/self.estatisticas['clientes_unicos']*100:.1f}%)")
+        print(f"📅 Datas de nascimento inválidas: {self.estatisticas['datas_invalidas']:,}")
         
         print(f"\n📁 ARQUIVO GERADO:")
         print("=" * 80)
@@ -450,6 +445,7 @@ def main():
     """Função principal"""
     gerador = GeradorBaseClientes()
     output_file = gerador.gerar_base_master()
+    instrumentacao.finalizar()
     return output_file
 
 if __name__ == "__main__":
@@ -7,25 +7,38 @@ Consolida todas as OS relacionando com a Base de Clientes Master
 import pandas as pd
 from pathlib import Path
 import re
+import sys
 from datetime import datetime
 import logging
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils import normalizar
+from etl.utils.datas import ConversorDatas
+from etl.utils.planilhas import LeitorPlanilha
+from etl.utils.instrumentacao import instrumentacao
+from etl.utils.relatorios import EscritorRelatorio
+from app.services.listagens import Listagens
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class GeradorBaseOS:
-    def __init__(self):
+    def __init__(self, adiar_identificacao=False):
         self.ordens_servico = []
         self.base_clientes = None
+        self.adiar_identificacao = adiar_identificacao
         self.estatisticas = {
             'arquivos_processados': 0,
             'os_encontradas': 0,
             'os_com_cliente_identificado': 0,
             'os_com_data_valida': 0,
             'os_com_valor': 0,
-            'lojas_processadas': set()
+            'lojas_processadas': set(),
+            'datas_invalidas': 0
         }
+        # Datas de OS se repetem muito: cache compartilhado entre arquivos
+        self.conversor_datas = ConversorDatas()
     
     def carregar_base_clientes(self):
         """Carrega a base de clientes master"""
@@ -53,38 +66,22 @@ class GeradorBaseOS:
     
     def normalizar_nome(self, nome):
         """Normaliza nome para busca"""
-        if pd.isna(nome):
-            return None
-        nome_str = str(nome).upper().strip()
-        nome_str = re.sub(r'[^\w\s]', '', nome_str)
-        nome_str = re.sub(r'\s+', ' ', nome_str)
-        return nome_str if nome_str else None
+        return normalizar.escalar(normalizar.normalizar_nome, nome)
     
     def limpar_cpf(self, cpf):
         """Limpa CPF para busca"""
-        if pd.isna(cpf):
-            return None
-        cpf_str = re.sub(r'[^\d]', '', str(cpf))
-        if len(cpf_str) == 11 and cpf_str.isdigit():
-            return f"{cpf_str[:3]}.{cpf_str[3:6]}.{cpf_str[6:9]}-{cpf_str[9:]}"
-        return None
+        return normalizar.escalar(normalizar.limpar_cpf, cpf)
     
     def extrair_data_os(self, data):
         """Extrai data da OS"""
-        if pd.isna(data):
-            return None
-        try:
-            if isinstance(data, str):
-                for fmt in ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y']:
-                    try:
-                        return datetime.strptime(data.strip(), fmt).strftime('%d/%m/%Y')
-                    except:
-                        continue
-            elif hasattr(data, 'strftime'):
-                return data.strftime('%d/%m/%Y')
-            return None
-        except:
-            return None
+        datas, _ = self.conversor_datas.formatar([data])
+        return datas.iloc[0]
+    
+    def extrair_datas_os(self, serie):
+        """Extrai a coluna de datas das OS (DD/MM/YYYY)"""
+        datas, invalidas = self.conversor_datas.formatar(serie)
+        self.estatisticas['datas_invalidas'] += int(invalidas.sum())
+        return datas
     
     def extrair_valor(self, valor):
         """Extrai valor monetário"""
@@ -103,10 +100,9 @@ class GeradorBaseOS:
         except:
             return None
     
-    def identificar_cliente(self, nome, cpf):
-        """Identifica cliente na base master"""
+    def identificar_cliente(self, nome_limpo, cpf_limpo):
+        """Identifica cliente na base master (nome e CPF já normalizados)"""
         # Primeiro, tentar por CPF
-        cpf_limpo = self.limpar_cpf(cpf)
         if cpf_limpo and cpf_limpo in self.index_cpf:
             idx = self.index_cpf[cpf_limpo]
             cliente = self.base_clientes.iloc[idx]
@@ -122,7 +118,6 @@ class GeradorBaseOS:
             }
         
         # Senão, tentar por nome exato
-        nome_limpo = self.normalizar_nome(nome)
         if nome_limpo and nome_limpo in self.index_nome:
             idx = self.index_nome[nome_limpo]
             cliente = self.base_clientes.iloc[idx]
@@ -206,78 +201,93 @@ class GeradorBaseOS:
         """Processa arquivo de OS"""
         logger.info(f"Processando OS: {arquivo_path.name}")
         
-        try:
-            # Carregar arquivo
-            engine = 'openpyxl' if arquivo_path.suffix.lower() in ['.xlsx', '.xlsm'] else None
-            
+        with instrumentacao.etapa('etapa2_arquivo', arquivo_path) as etapa:
             try:
-                excel_file = pd.ExcelFile(arquivo_path, engine=engine)
-            except Exception as e:
-                logger.warning(f"Erro ao carregar {arquivo_path.name}: {e}")
-                return 0
-            
-            # Encontrar sheet principal
-            sheet_principal = None
-            for sheet_name in ['base_clientes_OS', 'base', 'dados']:
-                if sheet_name in excel_file.sheet_names:
-                    sheet_principal = sheet_name
-                    break
-            
-            if not sheet_principal:
-                sheet_principal = excel_file.sheet_names[0]
+                # Abrir arquivo em modo streaming (read_only)
+                try:
+                    leitor = LeitorPlanilha(arquivo_path)
+                except Exception as e:
+                    logger.warning(f"Erro ao carregar {arquivo_path.name}: {e}")
+                    etapa.falhar(e)
+                    return 0
+                
+                with leitor:
+                    contexto = self.preparar_arquivo(arquivo_path, leitor.colunas)
+                    if not contexto:
+                        return 0
+                    
+                    ordens = []
+                    try:
+                        for bloco in leitor.blocos():
+                            etapa.registrar(entrada=len(bloco))
+                            ordens.extend(self.processar_bloco(bloco, contexto))
+                    except Exception as e:
+                        logger.warning(f"Erro ao ler {arquivo_path.name}: {e}")
+                        etapa.falhar(e)
+                        return 0
+                
+                etapa.registrar(saida=len(ordens))
+                return self.finalizar_arquivo(contexto, ordens)
             
-            try:
-                df = pd.read_excel(arquivo_path, sheet_name=sheet_principal, engine=engine)
             except Exception as e:
-                logger.warning(f"Erro ao ler {arquivo_path.name}: {e}")
-                return 0
-            
-            # Identificar campos
-            campos = self.identificar_campos_os(df)
-            
-            if not campos.get('nome'):
-                logger.warning(f"Campo nome não encontrado em {arquivo_path.name}")
+                logger.error(f"❌ Erro em {arquivo_path.name}: {e}")
+                etapa.falhar(e)
                 return 0
-            
-            # Identificar loja
-            loja = self.identificar_loja_por_arquivo(arquivo_path.name)
-            self.estatisticas['lojas_processadas'].add(loja)
-            
-            # Processar cada linha
-            os_processadas = 0
-            for idx, row in df.iterrows():
-                os_data = self.extrair_os(row, campos, loja, arquivo_path.name)
-                if os_data:
-                    self.ordens_servico.append(os_data)
-                    os_processadas += 1
-            
-            self.estatisticas['arquivos_processados'] += 1
-            self.estatisticas['os_encontradas'] += os_processadas
-            
-            logger.info(f"✅ {arquivo_path.name}: {os_processadas} OS processadas")
-            return os_processadas
-            
-        except Exception as e:
-            logger.error(f"❌ Erro em {arquivo_path.name}: {e}")
-            return 0
     
-    def extrair_os(self, row, campos, loja, arquivo):
-        """Extrai dados da OS"""
+    def preparar_arquivo(self, arquivo_path, colunas):
+        """Resolve campos e loja a partir do cabeçalho; None se o arquivo não tem OS"""
+        campos = self.identificar_campos_os(pd.DataFrame(columns=colunas))
+        
+        if not campos.get('nome'):
+            logger.warning(f"Campo nome não encontrado em {arquivo_path.name}")
+            return None
+        
+        # Identificar loja
+        loja = self.identificar_loja_por_arquivo(arquivo_path.name)
+        self.estatisticas['lojas_processadas'].add(loja)
+        
+        return {'campos': campos, 'loja': loja, 'arquivo': arquivo_path.name}
+    
+    def processar_bloco(self, df, contexto):
+        """Extrai as OS de um bloco de linhas"""
+        campos = contexto['campos']
+        
+        # Normalizar nome, CPF e data do bloco inteiro de uma vez
+        vazia = pd.Series(None, index=df.index, dtype=object)
+        nomes = normalizar.normalizar_nome(df[campos['nome']])
+        cpfs = normalizar.limpar_cpf(df[campos['cpf']]) if campos.get('cpf') else vazia
+        datas = self.extrair_datas_os(df[campos['data_os']]) if campos.get('data_os') else vazia
+        
+        # Processar cada linha
+        ordens = []
+        for idx, row in df.iterrows():
+            os_data = self.extrair_os(row, campos, contexto['loja'], contexto['arquivo'], nomes[idx], cpfs[idx], datas[idx])
+            if os_data:
+                ordens.append(os_data)
+        return ordens
+    
+    def finalizar_arquivo(self, contexto, ordens):
+        """Acumula as OS extraídas de um arquivo lido por completo"""
+        self.ordens_servico.extend(ordens)
+        os_processadas = len(ordens)
+        
+        self.estatisticas['arquivos_processados'] += 1
+        self.estatisticas['os_encontradas'] += os_processadas
+        
+        logger.info(f"✅ {contexto['arquivo']}: {os_processadas} OS processadas")
+        return os_processadas
+    
+    def extrair_os(self, row, campos, loja, arquivo, nome, cpf, data_os):
+        """Extrai dados da OS (nome, CPF e data já normalizados)"""
         # Dados básicos da OS
-        nome = self.normalizar_nome(row.get(campos.get('nome'))) if campos.get('nome') else None
         if not nome:
             return None
         
-        cpf = row.get(campos.get('cpf')) if campos.get('cpf') else None
         numero_os = str(row.get(campos.get('numero_os'))).strip() if campos.get('numero_os') and pd.notna(row.get(campos.get('numero_os'))) else None
-        data_os = self.extrair_data_os(row.get(campos.get('data_os'))) if campos.get('data_os') else None
         valor = self.extrair_valor(row.get(campos.get('valor'))) if campos.get('valor') else None
         descricao = str(row.get(campos.get('descricao'))).strip() if campos.get('descricao') and pd.notna(row.get(campos.get('descricao'))) else None
         observacao = str(row.get(campos.get('observacao'))).strip() if campos.get('observacao') and pd.notna(row.get(campos.get('observacao'))) else None
         
-        # Identificar cliente
-        cliente_info = self.identificar_cliente(nome, cpf)
-        
         # Preparar dados da OS
         os_data = {
             'numero_os': numero_os,
@@ -288,10 +298,26 @@ class GeradorBaseOS:
             'loja_os': loja,
             'arquivo_origem': arquivo,
             'nome_informado': nome,
-            'cpf_informado': self.limpar_cpf(cpf),
+            'cpf_informado': cpf,
             'data_processamento': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
         }
         
+        # Identificar cliente (na extração unificada é feito depois, com a base pronta)
+        if not self.adiar_identificacao:
+            self.aplicar_cliente(os_data)
+        
+        # Atualizar estatísticas
+        if data_os:
+            self.estatisticas['os_com_data_valida'] += 1
+        if valor:
+            self.estatisticas['os_com_valor'] += 1
+        
+        return os_data
+    
+    def aplicar_cliente(self, os_data):
+        """Identifica o cliente da OS na base master e adiciona seus dados"""
+        cliente_info = self.identificar_cliente(os_data['nome_informado'], os_data['cpf_informado'])
+        
         # Adicionar informações do cliente se identificado
         if cliente_info:
             os_data.update(cliente_info)
@@ -307,14 +333,11 @@ class GeradorBaseOS:
                 'endereco_cliente': None,
                 'loja_origem_cliente': None
             })
-        
-        # Atualizar estatísticas
-        if data_os:
-            self.estatisticas['os_com_data_valida'] += 1
-        if valor:
-            self.estatisticas['os_com_valor'] += 1
-        
-        return os_data
+    
+    def identificar_clientes_pendentes(self):
+        """Identifica os clientes das OS extraídas com adiar_identificacao=True"""
+        for os_data in self.ordens_servico:
+            self.aplicar_cliente(os_data)
     
     def gerar_base_os(self):
         """Gera a base completa de OS"""
@@ -325,7 +348,9 @@ class GeradorBaseOS:
         print("=" * 80)
         
         # Carregar base de clientes
-        self.carregar_base_clientes()
+        with instrumentacao.etapa('etapa2_carregar_clientes') as etapa:
+            self.carregar_base_clientes()
+            etapa.registrar(entrada=len(self.base_clientes))
         
         # Processar todos os arquivos de OS
         arquivos = list(Path("data/raw").glob("OS*.xlsm")) + list(Path("data/raw").glob("OS*.xlsx"))
@@ -334,8 +359,14 @@ class GeradorBaseOS:
         for arquivo in arquivos:
             self.processar_arquivo_os(arquivo)
         
+        return self.concluir_base_os()
+    
+    def concluir_base_os(self):
+        """Salva e exibe a base de OS"""
         # Salvar base de OS
-        output_file = self.salvar_base_os()
+        with instrumentacao.etapa('etapa2_salvar') as etapa:
+            output_file = self.salvar_base_os()
+            etapa.registrar(entrada=len(self.ordens_servico), saida=len(self.ordens_servico))
         
         # Exibir resultados
         self.exibir_resultados(output_file)
@@ -367,17 +398,17 @@ class GeradorBaseOS:
         df_os = df_os[colunas_existentes]
         
         # Salvar com múltiplas sheets
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+        with EscritorRelatorio(output_file) as relatorio:
             # Base principal
-            df_os.to_excel(writer, sheet_name='Base_OS_Completa', index=False)
+            relatorio.escrever(df_os, 'Base_OS_Completa')
             
             # OS com clientes identificados
             df_com_cliente = df_os[df_os['cliente_id'].notna()]
-            df_com_cliente.to_excel(writer, sheet_name='OS_Com_Cliente', index=False)
+            relatorio.escrever(df_com_cliente, 'OS_Com_Cliente')
             
             # OS sem clientes identificados
             df_sem_cliente = df_os[df_os['cliente_id'].isna()]
-            df_sem_cliente.to_excel(writer, sheet_name='OS_Sem_Cliente', index=False)
+            relatorio.escrever(df_sem_cliente, 'OS_Sem_Cliente')
             
             # Estatísticas por loja
             stats_loja = df_os.groupby('loja_os').agg({
@@ -391,7 +422,7 @@ class GeradorBaseOS:
                 'valor_os': 'os_com_valor',
                 'data_os': 'os_com_data'
             })
-            stats_loja.to_excel(writer, sheet_name='Estatisticas_Por_Loja')
+            relatorio.escrever(stats_loja, 'Estatisticas_Por_Loja', index=True)
             
             # Resumo de qualidade
             total_os = len(df_os)
@@ -426,7 +457,10 @@ class GeradorBaseOS:
             }
             
             df_qualidade = pd.DataFrame(qualidade)
-            df_qualidade.to_excel(writer, sheet_name='Relatorio_Qualidade', index=False)
+            relatorio.escrever(df_qualidade, 'Relatorio_Qualidade')
+        
+        # Cópia indexada para as listagens da API (/api/os)
+        Listagens().gravar('os', df_os, output_file)
         
         logger.info(f"Base de OS salva em: {output_file}")
         return output_file
@@ -442,6 +476,7 @@ class GeradorBaseOS:
         print(f"📋 OS encontradas: {total_os:,}")
         print(f"🔗 OS com cliente identificado: {self.estatisticas['os_com_cliente_identificado']:,} ({self.estatisticas['os_com_cliente_identificado']/total_os*100:.1f}%)")
         print(f"📅 OS com data válida: {self.estatisticas['os_com_data_valida']:,} ({self.estatisticas['os_com_data_valida']/total_os*100:.1f}%)")
+        print(f"⚠️  Datas não reconhecidas: {self.estatisticas['datas_invalidas']:,}")
         print(f"💰 OS com valor: {self.estatisticas['os_com_valor']:,} ({self.estatisticas['os_com_valor']/total_os*100:.1f}%)")
         
         print(f"\n📁 ARQUIVO GERADO:")
@@ -460,6 +495,7 @@ def main():
     """Função principal"""
     gerador = GeradorBaseOS()
     output_file = gerador.gerar_base_os()
+    instrumentacao.finalizar()
     return output_file
 
 if __name__ == "__main__":
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+EXTRAÇÃO UNIFICADA DAS PLANILHAS DE OS
+Lê cada OS*.xlsm uma única vez e entrega os blocos de linhas a todos os extratores
+(clientes, OS, dioptrias, vendas e relacionamento OS-cliente)
+
+Uso:
+    python scripts/extracao_unificada.py                      # todos os extratores
+    python scripts/extracao_unificada.py clientes dioptrias   # apenas os escolhidos
+"""
+
+import sys
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils.planilhas import LeitorPlanilha
+from etl.utils.instrumentacao import instrumentacao
+from scripts.etapa1_base_clientes_master import GeradorBaseClientes
+from scripts.etapa2_base_ordens_servico import GeradorBaseOS
+from scripts.extrair_dioptrias import ExtratorDioptrias
+from scripts.extrair_vendas import ExtratorVendas
+from scripts import criar_relacionamento_os_cliente as relacionamento
+
+logger = logging.getLogger(__name__)
+
+
+class ExtratorRelacionamento:
+    """Adapta criar_relacionamento_os_cliente ao protocolo dos extratores"""
+
+    def __init__(self):
+        self.relacoes = []
+
+    def preparar_arquivo(self, arquivo_path, colunas):
+        return relacionamento.preparar_relacionamento(arquivo_path, colunas)
+
+    def processar_bloco(self, bloco, contexto):
+        # Cliente_ID é resolvido no final, com a base de clientes carregada
+        return relacionamento.extrair_relacoes(bloco, contexto)
+
+    def finalizar_arquivo(self, contexto, registros):
+        self.relacoes.extend(registros)
+        return len(registros)
+
+
+def somente_planilhas_os(arquivo):
+    """etapa1/etapa2 só processam as planilhas OS*"""
+    return arquivo.name.startswith('OS')
+
+
+class ExtracaoUnificada:
+    """
+    Cada extrator implementa:
+        preparar_arquivo(arquivo_path, colunas) -> contexto (ou None para ignorar o arquivo)
+        processar_bloco(bloco, contexto) -> lista de registros
+        finalizar_arquivo(contexto, registros) -> quantidade
+    """
+
+    EXTRATORES = {
+        'clientes': lambda: GeradorBaseClientes(),
+        'os': lambda: GeradorBaseOS(adiar_identificacao=True),
+        'dioptrias': lambda: ExtratorDioptrias(),
+        'vendas': lambda: ExtratorVendas(),
+        'relacionamento': lambda: ExtratorRelacionamento(),
+    }
+
+    FILTROS = {
+        'clientes': somente_planilhas_os,
+        'os': somente_planilhas_os,
+    }
+
+    def __init__(self, pasta="data/raw", extratores=None):
+        self.pasta = Path(pasta)
+        nomes = extratores or list(self.EXTRATORES)
+        self.extratores = {nome: self.EXTRATORES[nome]() for nome in nomes}
+        self.estatisticas = {'arquivos_lidos': 0, 'arquivos_com_erro': 0, 'linhas_lidas': 0}
+
+    def listar_arquivos(self):
+        arquivos = list(self.pasta.glob("*.xlsm")) + list(self.pasta.glob("*.xlsx"))
+        # Filtrar arquivos temporários do Excel
+        return [f for f in arquivos if not f.name.startswith('~$')]
+
+    def processar_arquivo(self, arquivo_path):
+        """Lê o arquivo uma vez e alimenta todos os extratores interessados"""
+        logger.info(f"Processando: {arquivo_path.name}")
+
+        with instrumentacao.etapa('extracao_arquivo', arquivo_path) as etapa:
+            try:
+                leitor = LeitorPlanilha(arquivo_path)
+            except Exception as e:
+                logger.warning(f"Erro ao carregar {arquivo_path.name}: {e}")
+                etapa.falhar(e)
+                self.estatisticas['arquivos_com_erro'] += 1
+                return
+
+            with leitor:
+                # Resolução de colunas e loja de cada extrator (só o cabeçalho)
+                ativos = {}
+                for nome, extrator in self.extratores.items():
+                    filtro = self.FILTROS.get(nome)
+                    if filtro and not filtro(arquivo_path):
+                        continue
+                    contexto = extrator.preparar_arquivo(arquivo_path, leitor.colunas)
+                    if contexto:
+                        ativos[nome] = contexto
+
+                if not ativos:
+                    return
+
+                registros = {nome: [] for nome in ativos}
+                try:
+                    for bloco in leitor.blocos():
+                        self.estatisticas['linhas_lidas'] += len(bloco)
+                        etapa.registrar(entrada=len(bloco))
+                        for nome in list(ativos):
+                            try:
+                                registros[nome].extend(self.extratores[nome].processar_bloco(bloco, ativos[nome]))
+                            except Exception as e:
+                                # Falha de um extrator não interrompe os demais
+                                logger.warning(f"Extrator {nome} falhou em {arquivo_path.name}: {e}")
+                                del ativos[nome]
+                except Exception as e:
+                    logger.warning(f"Erro ao ler {arquivo_path.name}: {e}")
+                    etapa.falhar(e)
+                    self.estatisticas['arquivos_com_erro'] += 1
+                    return
+
+            for nome, contexto in ativos.items():
+                etapa.registrar(saida=len(registros[nome]))
+                self.extratores[nome].finalizar_arquivo(contexto, registros[nome])
+            self.estatisticas['arquivos_lidos'] += 1
+
+    def concluir(self):
+        """Gera as saídas de cada extrator (mesmos arquivos dos scripts individuais)"""
+        saidas = {}
+
+        if 'clientes' in self.extratores:
+            saidas['clientes'] = self.extratores['clientes'].concluir_base_master()
+
+        if 'os' in self.extratores:
+            gerador_os = self.extratores['os']
+            try:
+                # Usa a base master recém gerada (ou a mais recente em data/processed)
+                gerador_os.carregar_base_clientes()
+                gerador_os.identificar_clientes_pendentes()
+                saidas['os'] = gerador_os.concluir_base_os()
+            except FileNotFoundError as e:
+                logger.error(f"❌ OS não geradas: {e}")
+
+        if 'dioptrias' in self.extratores:
+            extrator = self.extratores['dioptrias']
+            saidas['dioptrias'] = extrator.salvar_dioptrias()
+            extrator.exibir_resultados(saidas['dioptrias'])
+
+        if 'vendas' in self.extratores:
+            extrator = self.extratores['vendas']
+            saidas['vendas'] = extrator.salvar_vendas()
+            extrator.exibir_resultados(saidas['vendas'])
+
+        if 'relacionamento' in self.extratores:
+            relacoes = self.extratores['relacionamento'].relacoes
+            processed_dir = Path("data/processed")
+            df_clientes = relacionamento.carregar_clientes(processed_dir)
+            if df_clientes is None:
+                logger.error("❌ Relacionamento não gerado: base de clientes com ID não encontrada")
+            elif relacoes:
+                df_final = relacionamento.identificar_relacoes(pd.DataFrame(relacoes), df_clientes)
+                saidas['relacionamento'] = relacionamento.salvar_relacionamento(df_final, processed_dir)
+
+        return saidas
+
+    def executar(self):
+        print("🚀 EXTRAÇÃO UNIFICADA DAS PLANILHAS DE OS")
+        print("=" * 80)
+        print(f"📋 Extratores: {', '.join(self.extratores)}")
+        print("=" * 80)
+
+        arquivos = self.listar_arquivos()
+        logger.info(f"Encontrados {len(arquivos)} arquivos para processar")
+
+        for arquivo in arquivos:
+            self.processar_arquivo(arquivo)
+
+        print(f"\n📁 Arquivos lidos: {self.estatisticas['arquivos_lidos']} (uma leitura por arquivo)")
+        print(f"📄 Linhas lidas: {self.estatisticas['linhas_lidas']:,}")
+        if self.estatisticas['arquivos_com_erro']:
+            print(f"⚠️  Arquivos com erro: {self.estatisticas['arquivos_com_erro']}")
+
+        return self.concluir()
+
+
+def main():
+    escolhidos = [nome for nome in sys.argv[1:] if nome in ExtracaoUnificada.EXTRATORES]
+    desconhecidos = [nome for nome in sys.argv[1:] if nome not in ExtracaoUnificada.EXTRATORES]
+    if desconhecidos:
+        print(f"❌ Extratores desconhecidos: {', '.join(desconhecidos)}")
+        print(f"   Disponíveis: {', '.join(ExtracaoUnificada.EXTRATORES)}")
+        sys.exit(1)
+
+    ExtracaoUnificada(extratores=escolhidos or None).executar()
+    instrumentacao.finalizar()
+
+
+if __name__ == "__main__":
+    main()
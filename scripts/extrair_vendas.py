@@ -6,11 +6,15 @@ Processa TODOS os campos de vendas, produtos, cdigos e pagamentos das OS
 
 import pandas as pd
 from pathlib import Path
+import sys
 import re
 from datetime import datetime
 import logging
 from collections import defaultdict
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils.planilhas import LeitorPlanilha
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -180,66 +184,79 @@ class ExtratorVendas:
         logger.info(f"Processando vendas: {arquivo_path.name}")
         
         try:
-            # Carregar arquivo
-            engine = 'openpyxl' if arquivo_path.suffix.lower() in ['.xlsx', '.xlsm'] else None
-            
+            # Abrir arquivo em modo streaming (read_only)
             try:
-                excel_file = pd.ExcelFile(arquivo_path, engine=engine)
+                leitor = LeitorPlanilha(arquivo_path)
             except Exception as e:
                 logger.warning(f"Erro ao carregar {arquivo_path.name}: {e}")
                 return 0
             
-            # Encontrar sheet principal
-            sheet_principal = None
-            for sheet_name in ['base_clientes_OS', 'base', 'dados']:
-                if sheet_name in excel_file.sheet_names:
-                    sheet_principal = sheet_name
-                    break
-            
-            if not sheet_principal:
-                sheet_principal = excel_file.sheet_names[0]
-            
-            try:
-                df = pd.read_excel(arquivo_path, sheet_name=sheet_principal, engine=engine)
-            except Exception as e:
-                logger.warning(f"Erro ao ler {arquivo_path.name}: {e}")
-                return 0
-            
-            # Mapear campos de vendas
-            mapeamento = self.mapear_campos_vendas(df.columns)
-            
-            # Verificar se tem campos de vendas
-            if not mapeamento['produtos'] and not mapeamento['valores'] and not mapeamento['especiais']:
-                logger.warning(f"Nenhum campo de venda encontrado em {arquivo_path.name}")
-                return 0
-            
-            # Identificar campos bsicos
-            campos_basicos = self.identificar_campos_basicos(df.columns)
-            
-            # Identificar loja
-            loja = self.identificar_loja_por_arquivo(arquivo_path.name)
-            
-            # Processar cada linha
-            os_processadas = 0
-            for idx, row in df.iterrows():
-                os_venda = self.extrair_vendas_linha(
-                    row, mapeamento, campos_basicos, loja, arquivo_path.name, idx + 1
-                )
+            with leitor:
+                contexto = self.preparar_arquivo(arquivo_path, leitor.colunas)
+                if not contexto:
+                    return 0
                 
-                if os_venda:
-                    self.os_com_vendas.append(os_venda)
-                    os_processadas += 1
+                # Processar cada linha, bloco a bloco
+                registros = []
+                try:
+                    for df in leitor.blocos():
+                        registros.extend(self.processar_bloco(df, contexto))
+                except Exception as e:
+                    logger.warning(f"Erro ao ler {arquivo_path.name}: {e}")
+                    return 0
             
-            self.estatisticas['arquivos_processados'] += 1
-            self.estatisticas['total_os'] += os_processadas
-            
-            logger.info(f" {arquivo_path.name}: {os_processadas} OS com vendas | Loja: {loja}")
-            return os_processadas
+            return self.finalizar_arquivo(contexto, registros)
             
         except Exception as e:
             logger.error(f" Erro em {arquivo_path.name}: {e}")
             return 0
     
+    def preparar_arquivo(self, arquivo_path, colunas):
+        """Mapeia campos e loja a partir do cabeçalho; None se o arquivo não tem vendas"""
+        # Mapear campos de vendas
+        mapeamento = self.mapear_campos_vendas(colunas)
+        
+        # Verificar se tem campos de vendas
+        if not mapeamento['produtos'] and not mapeamento['valores'] and not mapeamento['especiais']:
+            logger.warning(f"Nenhum campo de venda encontrado em {arquivo_path.name}")
+            return None
+        
+        # Identificar campos bsicos
+        campos_basicos = self.identificar_campos_basicos(colunas)
+        
+        # Identificar loja
+        loja = self.identificar_loja_por_arquivo(arquivo_path.name)
+        
+        return {
+            'mapeamento': mapeamento,
+            'campos_basicos': campos_basicos,
+            'loja': loja,
+            'arquivo': arquivo_path.name
+        }
+    
+    def processar_bloco(self, df, contexto):
+        """Extrai as OS de um bloco de linhas"""
+        registros = []
+        for idx, row in df.iterrows():
+            os_venda = self.extrair_vendas_linha(
+                row, contexto['mapeamento'], contexto['campos_basicos'], contexto['loja'], contexto['arquivo'], idx + 1
+            )
+            
+            if os_venda:
+                registros.append(os_venda)
+        return registros
+    
+    def finalizar_arquivo(self, contexto, registros):
+        """Acumula as OS extraídas de um arquivo lido por completo"""
+        self.os_com_vendas.extend(registros)
+        os_processadas = len(registros)
+        
+        self.estatisticas['arquivos_processados'] += 1
+        self.estatisticas['total_os'] += os_processadas
+        
+        logger.info(f" {contexto['arquivo']}: {os_processadas} OS com vendas | Loja: {contexto['loja']}")
+        return os_processadas
+    
     def identificar_campos_basicos(self, colunas):
         """Identifica campos bsicos para identificao"""
         campos = {}
@@ -9,15 +9,29 @@ IMPORTANTE:
 - Muito mais rápido que executar 744 SQLs manualmente
 """
 
+import sys
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils.dados_quentes import CLIENTES_UNIFICADOS, ITENS_DAV, OS_PARA_CLIENTE, VENDAS_VIXEN, ler_parquet
+from etl.utils.exportacao_csv import TAMANHO_BLOCO, blocos_df, exportar_csv
+
 # Configurações
 OUTPUT_DIR = Path("povoamento/dados/csv")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# CSVs gravados bloco a bloco; True grava .csv.gz
+COMPRIMIR = '--gzip' in sys.argv
+
+COLUNAS_ITENS = [
+    'item_numero', 'id_produto', 'descricao_produto', 'modelo', 'grupo', 'detalhe',
+    'quantidade', 'valor_unitario', 'valor_total', 'mes_referencia', 'arquivo_origem',
+    '_id_legado_venda', '_id_loja_codigo',
+]
+
 def limpar_string(valor):
     """Remove caracteres problemáticos de strings"""
     if pd.isna(valor) or valor is None:
@@ -97,9 +111,24 @@ def criar_csv_vendas_vixen(df_vendas, clientes_lookup):
         '048': 'Suzano'
     }
     
+    # Gravar em blocos: o DataFrame do CSV existe só para um bloco por vez
+    arquivo_saida = OUTPUT_DIR / "vendas_vixen.csv"
+    resultado = exportar_csv(
+        (montar_vendas_vixen(bloco) for bloco in blocos_df(df_validas)),
+        arquivo_saida, comprimir=COMPRIMIR, encoding='utf-8', na_rep=''
+    )
+    
+    print(f"\n✅ CSV criado: {resultado['arquivo']}")
+    print(f"   Total de registros: {resultado['linhas']:,}")
+    print(f"   Tamanho do arquivo: {resultado['tamanho'] / 1024 / 1024:.2f} MB")
+    
+    return resultado['linhas']
+
+def montar_vendas_vixen(df_validas):
+    """Bloco de vendas Vixen -> colunas do CSV (campos _ auxiliares para lookup)"""
     # Preparar DataFrame para CSV com LOOKUP PLACEHOLDERS
     # Vamos criar com os campos que podem ser importados diretamente
-    vendas_csv = pd.DataFrame({
+    return pd.DataFrame({
         'id_legado': df_validas['id_dav'].fillna(df_validas['nro_dav']).apply(limpar_string),
         'origem': 'VIXEN',
         'tipo': df_validas['origem'].apply(limpar_string),
@@ -127,16 +156,6 @@ def criar_csv_vendas_vixen(df_vendas, clientes_lookup):
         '_id_legado_cliente': df_validas['id_cliente'].astype(str),
         '_id_loja_codigo': df_validas['id_loja'].astype(str).str.strip(),
     })
-    
-    # Salvar CSV
-    arquivo_saida = OUTPUT_DIR / "vendas_vixen.csv"
-    vendas_csv.to_csv(arquivo_saida, index=False, encoding='utf-8', na_rep='')
-    
-    print(f"\n✅ CSV criado: {arquivo_saida}")
-    print(f"   Total de registros: {len(vendas_csv):,}")
-    print(f"   Tamanho do arquivo: {arquivo_saida.stat().st_size / 1024 / 1024:.2f} MB")
-    
-    return len(vendas_csv)
 
 def criar_csv_vendas_os(df_os_map, clientes_lookup):
     """Cria CSV de vendas OS pronto para importação direta"""
@@ -156,28 +175,32 @@ def criar_csv_vendas_os(df_os_map, clientes_lookup):
     
     print(f"Vendas com cliente válido: {len(df_validas):,}")
     
-    # Preparar DataFrame para CSV
-    vendas_csv = pd.DataFrame({
-        'id_legado': df_validas['nro_dav'].astype(str).str.strip(),
-        'origem': 'OS',
-        'tipo': 'ORDEM DE SERVIÇO',
-        'status': 'FINALIZADO',
-        'valor_liquido': 0.00,
-        'data_venda': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        # Campos auxiliares para lookup
-        '_id_legado_cliente': df_validas['id_cliente'].astype(str),
-        '_id_loja_codigo': df_validas['id_loja'].astype(str).str.strip(),
-    })
+    # Gravar em blocos
+    data_venda = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    blocos = (
+        pd.DataFrame({
+            'id_legado': bloco['nro_dav'].astype(str).str.strip(),
+            'origem': 'OS',
+            'tipo': 'ORDEM DE SERVIÇO',
+            'status': 'FINALIZADO',
+            'valor_liquido': 0.00,
+            'data_venda': data_venda,
+            # Campos auxiliares para lookup
+            '_id_legado_cliente': bloco['id_cliente'].astype(str),
+            '_id_loja_codigo': bloco['id_loja'].astype(str).str.strip(),
+        })
+        for bloco in blocos_df(df_validas)
+    )
     
     # Salvar CSV
     arquivo_saida = OUTPUT_DIR / "vendas_os.csv"
-    vendas_csv.to_csv(arquivo_saida, index=False, encoding='utf-8', na_rep='')
+    resultado = exportar_csv(blocos, arquivo_saida, comprimir=COMPRIMIR, encoding='utf-8', na_rep='')
     
-    print(f"\n✅ CSV criado: {arquivo_saida}")
-    print(f"   Total de registros: {len(vendas_csv):,}")
-    print(f"   Tamanho do arquivo: {arquivo_saida.stat().st_size / 1024 / 1024:.2f} MB")
+    print(f"\n✅ CSV criado: {resultado['arquivo']}")
+    print(f"   Total de registros: {resultado['linhas']:,}")
+    print(f"   Tamanho do arquivo: {resultado['tamanho'] / 1024 / 1024:.2f} MB")
     
-    return len(vendas_csv)
+    return resultado['linhas']
 
 def criar_csv_itens_venda(df_itens, df_vendas_vixen):
     """Cria CSV de itens de venda"""
@@ -193,7 +216,21 @@ def criar_csv_itens_venda(df_itens, df_vendas_vixen):
     
     print(f"Vendas no mapa: {len(vendas_map):,}")
     
-    # Preparar dados dos itens
+    # Preparar dados dos itens (gravados a cada TAMANHO_BLOCO itens)
+    arquivo_saida = OUTPUT_DIR / "itens_venda.csv"
+    resultado = exportar_csv(
+        blocos_itens_venda(df_itens, vendas_map),
+        arquivo_saida, comprimir=COMPRIMIR, encoding='utf-8', na_rep=''
+    )
+    
+    print(f"\n✅ CSV criado: {resultado['arquivo']}")
+    print(f"   Total de registros: {resultado['linhas']:,}")
+    print(f"   Tamanho do arquivo: {resultado['tamanho'] / 1024 / 1024:.2f} MB")
+    
+    return resultado['linhas']
+
+def blocos_itens_venda(df_itens, vendas_map):
+    """DataFrames de até TAMANHO_BLOCO itens cuja venda existe no mapa"""
     itens_data = []
     
     for idx, row in df_itens.iterrows():
@@ -231,25 +268,18 @@ def criar_csv_itens_venda(df_itens, df_vendas_vixen):
             '_id_legado_venda': id_legado_venda,
             '_id_loja_codigo': id_loja,
         })
+        
+        if len(itens_data) >= TAMANHO_BLOCO:
+            yield pd.DataFrame(itens_data, columns=COLUNAS_ITENS)
+            itens_data = []
     
-    # Criar DataFrame
-    itens_csv = pd.DataFrame(itens_data)
-    
-    # Salvar CSV
-    arquivo_saida = OUTPUT_DIR / "itens_venda.csv"
-    itens_csv.to_csv(arquivo_saida, index=False, encoding='utf-8', na_rep='')
-    
-    print(f"\n✅ CSV criado: {arquivo_saida}")
-    print(f"   Total de registros: {len(itens_csv):,}")
-    print(f"   Tamanho do arquivo: {arquivo_saida.stat().st_size / 1024 / 1024:.2f} MB")
-    
-    return len(itens_csv)
+    yield pd.DataFrame(itens_data, columns=COLUNAS_ITENS)
 
 def criar_lookup_clientes():
     """Cria lookup de clientes para validação"""
     print("\n=== CRIANDO LOOKUP DE CLIENTES ===")
     
-    df = pd.read_parquet('data/clientes/_consolidado/clientes_unificados.parquet')
+    df = ler_parquet(CLIENTES_UNIFICADOS)
     
     print(f"Total de clientes no lookup: {len(df):,}")
     print(f"  - Vixen: {(df['origem'] == 'VIXEN').sum():,}")
@@ -267,9 +297,9 @@ def main():
     
     # 2. Carregar dados de vendas
     print("\n=== CARREGANDO DADOS DE VENDAS ===")
-    df_vendas_vixen = pd.read_parquet('data/vendas/_com_cliente/lista_dav_com_cliente.parquet')
-    df_os_map = pd.read_parquet('data/vendas/_com_cliente/os_para_cliente_map.parquet')
-    df_itens = pd.read_parquet('data/originais/vendas/conf_dav/_consolidado/conf_dav_itens.parquet')
+    df_vendas_vixen = ler_parquet(VENDAS_VIXEN)
+    df_os_map = ler_parquet(OS_PARA_CLIENTE)
+    df_itens = ler_parquet(ITENS_DAV)
     
     print(f"✓ Vendas Vixen: {len(df_vendas_vixen):,}")
     print(f"✓ Vendas OS: {len(df_os_map):,}")
@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""
+GERADOR DE DADOS SINTÉTICOS
+Monta, numa pasta isolada, uma árvore com o mesmo layout de data/ e povoamento/
+para testar e medir o pipeline em escalas controladas (10 mil a 1 milhão de OS):
+
+    data/raw/OS_NOVA_<LOJA>.xlsx                      sheet base_clientes_OS
+    data/caixa_lojas/<LOJA>/<ano>_<PREF>/<mes>_<aa>.xlsx
+                                                      abas 01..31 (VEND, REST_ENTR,
+                                                      REC_CARN, ENTR_CARN, OS_ENT_DIA)
+                                                      + resumo_cx
+    data/analise_especial/clientes_completos_vixen.XLSX
+    data/clientes/_consolidado/clientes_unificados.parquet
+    data/vendas/_com_cliente/lista_dav_com_cliente.parquet
+    data/vendas/_com_cliente/os_para_cliente_map.parquet
+    data/originais/vendas/conf_dav/_consolidado/conf_dav_itens.parquet
+    gabarito_duplicatas.parquet                       pessoa real de cada registro
+    sintetico.json                                    parâmetros e contagens
+
+A mesma semente gera sempre os mesmos arquivos. taxa_duplicatas é a fração de
+registros (OS e Vixen) que repetem uma pessoa já gerada, com variações de
+grafia, formato de telefone e CPF ausente, como nas planilhas reais.
+
+Uso:
+    python scripts/gerar_dados_sinteticos.py                 # 10.000 OS
+    python scripts/gerar_dados_sinteticos.py 100000 --duplicatas 0.2 --meses 12
+"""
+
+import argparse
+import json
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils.esquemas import salvar_parquet
+
+PASTA_SINTETICO = Path("data/teste/sintetico")
+
+# (nome da loja, prefixo das pastas de caixa, código Vixen)
+LOJAS = [
+    ('MAUA', 'MAU', '042'),
+    ('SUZANO', 'SUZ', '048'),
+    ('SUZANO2', 'SU2', '012'),
+    ('PERUS', 'PER', '009'),
+    ('RIO_PEQUENO', 'RIO', '010'),
+    ('SAO_MATEUS', 'SAM', '011'),
+]
+
+MESES = ['jan', 'fev', 'mar', 'abr', 'mai', 'jun', 'jul', 'ago', 'set', 'out', 'nov', 'dez']
+
+NOMES = ['MARIA', 'JOSE', 'ANA', 'JOAO', 'ANTONIO', 'FRANCISCA', 'CARLOS', 'PAULO', 'LUCIA', 'PEDRO',
+         'ADRIANA', 'MARCOS', 'JULIANA', 'RAFAEL', 'PATRICIA', 'LUIZ', 'ALINE', 'FERNANDO', 'SANDRA', 'BRUNO',
+         'CAMILA', 'RODRIGO', 'VERA', 'EDSON', 'TEREZA', 'GABRIEL', 'BEATRIZ', 'DANIEL', 'ROSANGELA', 'LUCAS']
+SOBRENOMES = ['SILVA', 'SANTOS', 'OLIVEIRA', 'SOUZA', 'RODRIGUES', 'FERREIRA', 'ALVES', 'PEREIRA', 'LIMA',
+              'GOMES', 'COSTA', 'RIBEIRO', 'MARTINS', 'CARVALHO', 'ALMEIDA', 'LOPES', 'SOARES', 'FERNANDES',
+              'VIEIRA', 'BARBOSA', 'ROCHA', 'DIAS', 'NASCIMENTO', 'ANDRADE', 'MOREIRA', 'NUNES', 'MARQUES']
+CONECTORES = ['', '', '', 'DA ', 'DOS ', 'DE ']
+BAIRROS = ['CENTRO', 'JARDIM ZAIRA', 'VILA MAGINI', 'PARQUE SAO RAFAEL', 'JARDIM IGUATEMI', 'VILA YOLANDA',
+           'JARDIM BRASIL', 'PARQUE ESTORIL', 'VILA ALZIRA', 'JARDIM SAO PAULO']
+RUAS = ['RUA DAS FLORES', 'AV BRASIL', 'RUA SAO JOSE', 'RUA DOM PEDRO II', 'AV RAGUEB CHOHFI',
+        'RUA JOSE BONIFACIO', 'AV BARAO DE MAUA', 'RUA SETE DE SETEMBRO']
+CONSULTORES = ['BETH', 'CARLOS', 'MARIA']
+COMO_CONHECEU = ['INDICACAO', 'PASSANDO NA RUA', 'FACEBOOK', 'INSTAGRAM', 'PANFLETO', 'JA E CLIENTE', None]
+PRODUTOS = [('ARMACAO ACETATO', 180.0, 450.0), ('ARMACAO METAL', 150.0, 380.0),
+            ('LENTE VS CR 1.49', 120.0, 260.0), ('LENTE MULTIFOCAL', 380.0, 980.0),
+            ('LENTE ANTIRREFLEXO', 160.0, 420.0), ('OCULOS SOLAR', 120.0, 300.0)]
+FORMAS_PAGAMENTO = ['DN', 'CTD', 'CTC', 'PIX', 'CARNE']
+
+# Colunas da planilha base_clientes_OS, na ordem da planilha das lojas
+COLUNAS_OS = (
+    ['OS N°', 'LOJA', 'DATA DE COMPRA', 'CONSULTOR', 'VENDA', 'ANEXA A', 'NOME:', 'DT NASC', 'CPF', 'RG',
+     'CEP', 'END:', 'Nº', 'BAIRRO', 'COMP', 'TELEFONE:', 'CELULAR:', 'EMAIL:', 'PREV DE ENTR', 'VTA',
+     'COMO CONHECEU', 'PONTE', 'HORIZONTAL', 'DIAG MAIOR', 'VERTICAL']
+    + ['ESF', 'CIL', 'EIXO', 'DNP', 'ALTURA'] * 4
+    + ['ADIÇÃO', 'OBS', 'COD TRELLO']
+    + ['COD', 'DESCRIÇÃO', 'VALOR'] * 5
+    + ['TOTAL', 'PAGTO 1', 'SINAL 1', 'PAGTO 2', 'SINAL 2', 'RESTA', 'ARMAÇÃO COM GARANTIA', 'OBS ARMAÇÃO']
+)
+
+COLUNAS_VIXEN = ['ID', 'Nome Completo', 'Fone', 'E-mail', 'Endereço', 'CEP', 'Bairro', 'Cidade', 'UF',
+                 'Sexo', 'Dt de aniversário', 'Vendedor', 'Conceito', 'Como nos conheceu']
+
+
+def gerar_cpfs(rng: np.random.Generator, n: int) -> np.ndarray:
+    """CPFs com dígitos verificadores válidos (11 dígitos, sem formatação)"""
+    base = rng.integers(0, 10, size=(n, 9))
+    d1 = (base * np.arange(10, 1, -1)).sum(axis=1) * 10 % 11 % 10
+    d2 = (np.column_stack([base, d1]) * np.arange(11, 1, -1)).sum(axis=1) * 10 % 11 % 10
+    digitos = np.column_stack([base, d1, d2]).astype(str)
+    return np.array([''.join(linha) for linha in digitos], dtype=object)
+
+
+def escolher(rng: np.random.Generator, opcoes, n: int) -> np.ndarray:
+    return np.array(opcoes, dtype=object)[rng.integers(0, len(opcoes), n)]
+
+
+def concatenar(*partes) -> np.ndarray:
+    resultado = partes[0].astype(object)
+    for parte in partes[1:]:
+        resultado = resultado + parte
+    return resultado
+
+
+class GeradorDadosSinteticos:
+    def __init__(self, raiz, linhas: int = 10_000, taxa_duplicatas: float = 0.1, meses: int = 12,
+                 ano: int = 2024, clientes_vixen: int = None, semente: int = 42):
+        self.raiz = Path(raiz)
+        self.linhas = linhas
+        self.taxa_duplicatas = taxa_duplicatas
+        self.meses = meses
+        self.ano = ano
+        self.clientes_vixen = clientes_vixen if clientes_vixen is not None else linhas
+        self.semente = semente
+        self.rng = np.random.default_rng(semente)
+        self.contagens = {}
+
+    # ------------------------------------------------------------------
+    # Pessoas
+    # ------------------------------------------------------------------
+
+    def gerar_pessoas(self, n: int) -> pd.DataFrame:
+        """Pessoas distintas com todos os dados preenchidos"""
+        rng = self.rng
+        nomes = concatenar(
+            escolher(rng, NOMES, n), ' ',
+            escolher(rng, CONECTORES, n), escolher(rng, SOBRENOMES, n), ' ',
+            escolher(rng, SOBRENOMES, n))
+        celulares = concatenar(
+            np.full(n, '119', dtype=object),
+            rng.integers(0, 100_000_000, n).astype(str).astype(object))
+        celulares = np.array([c[:3] + c[3:].zfill(8) for c in celulares], dtype=object)
+        nascimento = pd.to_datetime('1940-01-01') + pd.to_timedelta(rng.integers(0, 365 * 65, n), unit='D')
+        return pd.DataFrame({
+            'id_pessoa': np.arange(n),
+            'nome': nomes,
+            'cpf': gerar_cpfs(rng, n),
+            'celular': celulares,
+            'email': [f"{nome.split()[0].lower()}.{i}@email.com" for i, nome in enumerate(nomes)],
+            'nascimento': nascimento,
+            'endereco': concatenar(escolher(rng, RUAS, n), ', ', rng.integers(1, 3000, n).astype(str).astype(object)),
+            'cep': rng.integers(8_000_000, 9_999_999, n).astype(str),
+            'bairro': escolher(rng, BAIRROS, n),
+        })
+
+    def registros_com_duplicatas(self, pessoas: pd.DataFrame, n: int) -> pd.DataFrame:
+        """n registros: os primeiros são pessoas novas, taxa_duplicatas deles repetem pessoas anteriores"""
+        rng = self.rng
+        repetidos = int(round(n * self.taxa_duplicatas))
+        novos = n - repetidos
+        ids = np.concatenate([np.arange(novos), rng.integers(0, max(novos, 1), repetidos)])
+        ids = ids[rng.permutation(n)]
+        registros = pessoas.iloc[ids].reset_index(drop=True)
+        registros['duplicata'] = pd.Series(ids).duplicated().to_numpy()
+        return registros
+
+    def variar(self, registros: pd.DataFrame) -> pd.DataFrame:
+        """Variações de digitação nas repetições: CPF ausente, telefone em outro formato, nome sem sobrenome do meio"""
+        rng = self.rng
+        registros = registros.copy()
+        dup = registros['duplicata'].to_numpy()
+        n = len(registros)
+
+        sem_cpf = dup & (rng.random(n) < 0.4)
+        registros.loc[sem_cpf, 'cpf'] = None
+
+        cel = registros['celular']
+        formatado = '(' + cel.str[:2] + ') ' + cel.str[2:7] + '-' + cel.str[7:]
+        registros['celular'] = np.where(rng.random(n) < 0.5, formatado, cel)
+
+        encurtar = dup & (rng.random(n) < 0.3)
+        partes = registros.loc[encurtar, 'nome'].str.split()
+        registros.loc[encurtar, 'nome'] = partes.str[0] + ' ' + partes.str[-1]
+
+        minusculo = rng.random(n) < 0.1
+        registros.loc[minusculo, 'nome'] = registros.loc[minusculo, 'nome'].str.title()
+        return registros
+
+    # ------------------------------------------------------------------
+    # OS
+    # ------------------------------------------------------------------
+
+    def gerar_os(self, pessoas: pd.DataFrame) -> pd.DataFrame:
+        rng = self.rng
+        n = self.linhas
+        os_df = self.variar(self.registros_com_duplicatas(pessoas, n))
+
+        os_df['loja'] = escolher(rng, [loja for loja, _, _ in LOJAS], n)
+        inicio = pd.Timestamp(self.ano, 1, 1)
+        dias = (inicio + pd.DateOffset(months=self.meses) - inicio).days
+        os_df['data_compra'] = inicio + pd.to_timedelta(rng.integers(0, dias, n), unit='D')
+        os_df = os_df.sort_values(['loja', 'data_compra'], kind='stable').reset_index(drop=True)
+        # Numeração sequencial por loja (4 dígitos, começando em 4000, como no caixa)
+        os_df['os_numero'] = 4000 + os_df.groupby('loja').cumcount()
+
+        itens = rng.integers(1, 4, n)
+        valores = np.zeros((n, 5))
+        descricoes = np.full((n, 5), None, dtype=object)
+        for i in range(5):
+            ativo = itens > i
+            produto = rng.integers(0, len(PRODUTOS), n)
+            minimo = np.array([p[1] for p in PRODUTOS])[produto]
+            maximo = np.array([p[2] for p in PRODUTOS])[produto]
+            valores[:, i] = np.where(ativo, np.round(rng.uniform(minimo, maximo), 0), 0)
+            descricoes[:, i] = np.where(ativo, np.array([p[0] for p in PRODUTOS], dtype=object)[produto], None)
+        os_df['valores'] = list(valores)
+        os_df['descricoes'] = list(descricoes)
+        os_df['total'] = valores.sum(axis=1)
+        os_df['pagamento'] = escolher(rng, FORMAS_PAGAMENTO, n)
+        os_df['sinal'] = np.where(os_df['pagamento'] == 'CARNE', np.round(os_df['total'] * 0.2, 0), os_df['total'])
+        # Parte das vendas à vista fica com restante de entrada para outro dia
+        com_restante = (os_df['pagamento'] != 'CARNE').to_numpy() & (rng.random(n) < 0.2)
+        os_df['restante_entrada'] = np.where(com_restante, np.round(os_df['total'] * 0.5, 0), 0.0)
+        os_df['sinal'] = os_df['sinal'] - os_df['restante_entrada']
+        os_df['parcelas'] = np.where(os_df['pagamento'] == 'CARNE', rng.integers(3, 11, n), 0)
+        os_df['resta'] = os_df['total'] - os_df['sinal'] - os_df['restante_entrada']
+        os_df['entrega'] = os_df['data_compra'] + pd.to_timedelta(rng.integers(3, 15, n), unit='D')
+        os_df['consultor'] = escolher(rng, CONSULTORES, n)
+        os_df['como_conheceu'] = escolher(rng, COMO_CONHECEU, n)
+        return os_df
+
+    def linhas_planilha_os(self, os_df: pd.DataFrame):
+        """Linhas no layout base_clientes_OS (datas misturando texto e datetime, como nas lojas)"""
+        rng = self.rng
+        grau = np.round(np.arange(-6, 6.25, 0.25), 2)
+        for registro in os_df.itertuples(index=False):
+            nascimento = registro.nascimento.strftime('%d/%m/%Y') if rng.random() < 0.7 else registro.nascimento.to_pydatetime()
+            dioptrias = []
+            for _ in range(4):
+                dioptrias += [float(rng.choice(grau)), float(rng.choice(grau[:25])), int(rng.integers(0, 180)),
+                              float(rng.integers(28, 36)), float(rng.integers(16, 24))]
+            produtos = []
+            for descricao, valor in zip(registro.descricoes, registro.valores):
+                produtos += [None, descricao, float(valor) if descricao else None]
+            yield (
+                [int(registro.os_numero), registro.loja, registro.data_compra.to_pydatetime(), registro.consultor,
+                 None, None, registro.nome, nascimento, registro.cpf, None, registro.cep, registro.endereco,
+                 None, registro.bairro, None, None, registro.celular, registro.email,
+                 registro.entrega.to_pydatetime(), None, registro.como_conheceu, 18.0, 52.0, 54.0, 40.0]
+                + dioptrias
+                + [None, None, None]
+                + produtos
+                + [float(registro.total), registro.pagamento, float(registro.sinal), None, None,
+                   float(registro.resta), None, None]
+            )
+
+    def salvar_planilhas_os(self, os_df: pd.DataFrame):
+        import openpyxl
+
+        pasta = self.raiz / "data" / "raw"
+        pasta.mkdir(parents=True, exist_ok=True)
+        for loja, grupo in os_df.groupby('loja', sort=False):
+            wb = openpyxl.Workbook(write_only=True)
+            ws = wb.create_sheet('base_clientes_OS')
+            ws.append(COLUNAS_OS)
+            for linha in self.linhas_planilha_os(grupo):
+                ws.append(linha)
+            wb.save(pasta / f"OS_NOVA_{loja}.xlsx")
+        self.contagens['planilhas_os'] = int(os_df['loja'].nunique())
+
+    # ------------------------------------------------------------------
+    # Caixa
+    # ------------------------------------------------------------------
+
+    def movimentos_caixa(self, os_df: pd.DataFrame) -> dict:
+        """Registros de cada seção do caixa, com loja e data"""
+        rng = self.rng
+        vend = os_df[['loja', 'data_compra', 'os_numero', 'nome', 'pagamento', 'total', 'sinal', 'consultor']]
+        vend = vend.rename(columns={'data_compra': 'data'})
+
+        restantes = os_df[os_df['restante_entrada'] > 0]
+        rest_entr = pd.DataFrame({
+            'loja': restantes['loja'],
+            'data': restantes['data_compra'] + pd.to_timedelta(rng.integers(1, 20, len(restantes)), unit='D'),
+            'os_numero': restantes['os_numero'], 'nome': restantes['nome'],
+            'pagamento': escolher(rng, ['DN', 'PIX', 'CTD'], len(restantes)),
+            'total': restantes['total'], 'sinal': restantes['sinal'], 'restante': restantes['restante_entrada'],
+        })
+
+        carne = os_df[os_df['pagamento'] == 'CARNE']
+        entr_carn = pd.DataFrame({
+            'loja': carne['loja'], 'data': carne['entrega'], 'os_numero': carne['os_numero'],
+            'consultor': carne['consultor'], 'parcelas': carne['parcelas'], 'total': carne['resta'],
+        })
+
+        # Uma linha por parcela paga, mês a mês depois da compra (parte atrasa ou não paga)
+        repeticoes = carne['parcelas'].to_numpy()
+        indice = np.repeat(np.arange(len(carne)), repeticoes)
+        numero = np.concatenate([np.arange(1, p + 1) for p in repeticoes]) if len(carne) else np.array([], int)
+        parcelas = carne.iloc[indice].reset_index(drop=True)
+        datas = (parcelas['data_compra'].dt.to_period('M') + numero).dt.to_timestamp() \
+            + pd.to_timedelta(rng.integers(0, 28, len(parcelas)), unit='D')
+        pagas = rng.random(len(parcelas)) < 0.85
+        rec_carn = pd.DataFrame({
+            'loja': parcelas['loja'], 'data': datas, 'os_numero': parcelas['os_numero'],
+            'nome': parcelas['nome'], 'pagamento': escolher(rng, ['DN', 'PIX', 'CTD'], len(parcelas)),
+            'valor': np.round(parcelas['resta'] / parcelas['parcelas'], 2),
+            'parcela': [f"{p}/{t}" for p, t in zip(numero, parcelas['parcelas'])],
+        })[pagas]
+
+        os_ent_dia = os_df[['loja', 'entrega', 'os_numero', 'consultor', 'pagamento']].rename(columns={'entrega': 'data'})
+
+        fim = pd.Timestamp(self.ano, 1, 1) + pd.DateOffset(months=self.meses)
+        secoes = {'VEND': vend, 'REST_ENTR': rest_entr, 'REC_CARN': rec_carn,
+                  'ENTR_CARN': entr_carn, 'OS_ENT_DIA': os_ent_dia}
+        return {nome: df[df['data'] < fim] for nome, df in secoes.items()}
+
+    def linhas_dia(self, dia: dict) -> list:
+        """Conteúdo de uma aba diária: as cinco seções em sequência, número na coluna C"""
+        linhas = [['Saldo Inicial', None, 0.0], []]
+
+        linhas.append(['Vendas', None, 'Nº Venda', 'Cliente', 'Forma de Pgto', 'Valor Venda', 'Entrada', 'Vendedor'])
+        for r in dia['VEND'].itertuples(index=False):
+            linhas.append([None, None, int(r.os_numero), r.nome, r.pagamento, float(r.total), float(r.sinal), r.consultor])
+        linhas += [[], ['Tipos de Pagtos', None, 'DN', 'CTD', 'CTC', 'PIX'], []]
+
+        linhas.append(['Restante Entrada', None, 'Nº Venda', 'Cliente', 'Forma de Pgto', 'Valor Venda', 'Entrada', 'Restante'])
+        for r in dia['REST_ENTR'].itertuples(index=False):
+            linhas.append([None, None, int(r.os_numero), r.nome, r.pagamento, float(r.total), float(r.sinal), float(r.restante)])
+        linhas.append([])
+
+        linhas.append(['Recebimento de Carnê', None, 'OS', 'Cliente', 'Forma de Pgto', 'Valor Parcela', 'Parcela'])
+        for r in dia['REC_CARN'].itertuples(index=False):
+            linhas.append([None, None, int(r.os_numero), r.nome, r.pagamento, float(r.valor), r.parcela])
+        linhas.append([])
+
+        linhas.append(['Entrega de Carne', None, 'OS', 'Vendedor', 'Entregue', 'Parcelas', 'Valor Total'])
+        for r in dia['ENTR_CARN'].itertuples(index=False):
+            linhas.append([None, None, int(r.os_numero), r.consultor, 'SIM', int(r.parcelas), float(r.total)])
+        linhas.append([])
+
+        linhas.append(['OS Entregue no Dia', None, 'OS', 'Vendedor', 'Carnê'])
+        for r in dia['OS_ENT_DIA'].itertuples(index=False):
+            linhas.append([None, None, int(r.os_numero), r.consultor, 'SIM' if r.pagamento == 'CARNE' else 'NÃO'])
+        linhas += [[], ['Despesas', None, 'Descrição', 'Valor']]
+        return linhas
+
+    def salvar_caixas(self, movimentos: dict):
+        import openpyxl
+
+        vazio = {nome: df.iloc[0:0] for nome, df in movimentos.items()}
+        por_loja_dia = {nome: dict(tuple(df.groupby(['loja', df['data'].dt.normalize()])))
+                        for nome, df in movimentos.items()}
+
+        arquivos = 0
+        for loja, prefixo, _ in LOJAS:
+            for mes in range(self.meses):
+                inicio = pd.Timestamp(self.ano, 1, 1) + pd.DateOffset(months=mes)
+                pasta = self.raiz / "data" / "caixa_lojas" / loja / f"{inicio.year}_{prefixo}"
+                pasta.mkdir(parents=True, exist_ok=True)
+
+                wb = openpyxl.Workbook(write_only=True)
+                resumo = wb.create_sheet('resumo_cx')
+                resumo.append(['Resumo do Caixa', f"{MESES[inicio.month - 1]}/{inicio.year}"])
+                # As planilhas têm sempre 31 abas; dias que não existem no mês ficam vazios
+                for dia in range(1, 32):
+                    ws = wb.create_sheet(f"{dia:02d}")
+                    if dia > inicio.days_in_month:
+                        continue
+                    data = inicio.replace(day=dia)
+                    conteudo = {nome: por_loja_dia[nome].get((loja, data), vazio[nome]) for nome in movimentos}
+                    for linha in self.linhas_dia(conteudo):
+                        ws.append(linha)
+                wb.save(pasta / f"{MESES[inicio.month - 1]}_{inicio.year % 100:02d}.xlsx")
+                arquivos += 1
+
+        self.contagens['planilhas_caixa'] = arquivos
+        for nome, df in movimentos.items():
+            self.contagens[f'caixa_{nome.lower()}'] = len(df)
+
+    # ------------------------------------------------------------------
+    # Vixen
+    # ------------------------------------------------------------------
+
+    def gerar_vixen(self, pessoas: pd.DataFrame) -> pd.DataFrame:
+        rng = self.rng
+        n = self.clientes_vixen
+        clientes = self.variar(self.registros_com_duplicatas(pessoas, n))
+        clientes['id_vixen'] = 2_000_000 + np.arange(n)
+        nascimento = clientes['nascimento']
+        clientes['aniversario'] = np.where(
+            rng.random(n) < 0.5, nascimento.dt.strftime('%Y-%m-%d 00:00:00'), nascimento.dt.strftime('%d/%m/%Y'))
+        return clientes
+
+    def salvar_vixen(self, clientes: pd.DataFrame):
+        import openpyxl
+
+        pasta = self.raiz / "data" / "analise_especial"
+        pasta.mkdir(parents=True, exist_ok=True)
+        rng = self.rng
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet('Clientes')
+        ws.append(COLUNAS_VIXEN)
+        sexo = escolher(rng, ['F', 'M'], len(clientes))
+        vendedor = escolher(rng, CONSULTORES, len(clientes))
+        conheceu = escolher(rng, COMO_CONHECEU, len(clientes))
+        for i, r in enumerate(clientes.itertuples(index=False)):
+            ws.append([int(r.id_vixen), r.nome, r.celular, r.email, r.endereco, r.cep, r.bairro, 'SAO PAULO', 'SP',
+                       sexo[i], r.aniversario, vendedor[i], None, conheceu[i]])
+        wb.save(pasta / "clientes_completos_vixen.XLSX")
+
+    def gerar_vendas_vixen(self, clientes: pd.DataFrame) -> tuple:
+        """DAVs (1 a 3 por cliente) e itens (1 a 3 por DAV)"""
+        rng = self.rng
+        por_cliente = rng.integers(1, 4, len(clientes))
+        dono = np.repeat(np.arange(len(clientes)), por_cliente)
+        n = len(dono)
+        codigos = escolher(rng, [codigo for _, _, codigo in LOJAS], n)
+        inicio = pd.Timestamp(self.ano, 1, 1)
+        dh_dav = inicio + pd.to_timedelta(rng.integers(0, 365 * 24 * 60, n), unit='min')
+        bruto = np.round(rng.uniform(150, 2500, n), 2)
+        desconto = np.round(bruto * rng.choice([0, 0.05, 0.1], n), 2)
+        davs = pd.DataFrame({
+            'id_dav': 500_000 + np.arange(n),
+            'nro_dav': pd.Series(rng.integers(1, 99_999, n)).astype(str).to_numpy(),
+            'id_loja': codigos,
+            'origem': 'DAV', 'status': escolher(rng, ['FINALIZADO', 'ENTREGUE', 'CANCELADO'], n),
+            'descricao': None,
+            'vl_bruto': bruto, 'vl_acrescimo': 0.0, 'vl_desconto': desconto, 'vl_liquido': bruto - desconto,
+            'perc_adiantamento': 20.0, 'vl_adiantamento': np.round((bruto - desconto) * 0.2, 2),
+            'dh_dav': dh_dav, 'dt_prev_entrega': dh_dav + pd.Timedelta(days=7),
+            'dt_entrega': dh_dav + pd.Timedelta(days=9),
+            'id_vendedor': rng.integers(1, 30, n).astype(str), 'vendedor': escolher(rng, CONSULTORES, n),
+            'id_operador': rng.integers(1, 30, n).astype(str), 'operador': escolher(rng, CONSULTORES, n),
+            'id_caixa': rng.integers(1, 10, n).astype(str), 'eh_garantia': rng.random(n) < 0.02,
+            'meios_contato': None, 'mes_ref': dh_dav.strftime('%Y-%m'), 'arquivo': 'lista_dav_sintetico.xlsx',
+            'id_cliente': clientes['id_vixen'].to_numpy()[dono].astype(str),
+        })
+        # nro_dav único por loja
+        davs = davs.drop_duplicates(['id_loja', 'nro_dav']).reset_index(drop=True)
+
+        por_dav = rng.integers(1, 4, len(davs))
+        origem = np.repeat(np.arange(len(davs)), por_dav)
+        produto = rng.integers(0, len(PRODUTOS), len(origem))
+        itens = pd.DataFrame({
+            'id_loja': davs['id_loja'].to_numpy()[origem],
+            'nro_dav': davs['nro_dav'].to_numpy()[origem],
+            'item': np.concatenate([np.arange(1, q + 1) for q in por_dav]),
+            'produto': np.array([p[0] for p in PRODUTOS], dtype=object)[produto],
+            'modelo': None, 'grupo': escolher(rng, ['ARMACAO', 'LENTE', 'SOLAR'], len(origem)), 'detalhe': None,
+            'qtd': rng.integers(1, 3, len(origem)).astype(float),
+            'vl_total': np.round(rng.uniform(80, 900, len(origem)), 2),
+            'mes_ref': davs['mes_ref'].to_numpy()[origem], 'arquivo': 'conf_dav_sintetico.xlsx',
+        })
+        return davs, itens
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+
+    def salvar_consolidados(self, os_df: pd.DataFrame, clientes_vixen: pd.DataFrame,
+                            davs: pd.DataFrame, itens: pd.DataFrame):
+        """Parquets consumidos pelos geradores de SQL/CSV"""
+        # Clientes OS: um por pessoa (id sequencial), como na consolidação
+        os_clientes = os_df.drop_duplicates('id_pessoa').reset_index(drop=True)
+        id_cliente_os = pd.Series(np.arange(1, len(os_clientes) + 1), index=os_clientes['id_pessoa'])
+        unificados = pd.concat([
+            pd.DataFrame({
+                'id_cliente': id_cliente_os.to_numpy().astype(str), 'origem': 'OS',
+                'nome': os_clientes['nome'], 'cpf': os_clientes['cpf'], 'email': os_clientes['email'],
+                'telefone1': os_clientes['celular'], 'telefone2': None,
+            }),
+            pd.DataFrame({
+                'id_cliente': clientes_vixen['id_vixen'].astype(str), 'origem': 'VIXEN',
+                'nome': clientes_vixen['nome'], 'cpf': None, 'email': clientes_vixen['email'],
+                'telefone1': clientes_vixen['celular'], 'telefone2': None,
+            }),
+        ], ignore_index=True)
+
+        codigo_loja = {loja: codigo for loja, _, codigo in LOJAS}
+        os_map = pd.DataFrame({
+            'nro_dav': os_df['os_numero'].astype(str),
+            'id_loja': os_df['loja'].map(codigo_loja),
+            'id_cliente': os_df['id_pessoa'].map(id_cliente_os).to_numpy(),
+        })
+
+        destinos = {
+            "data/clientes/_consolidado/clientes_unificados.parquet": unificados,
+            "data/vendas/_com_cliente/lista_dav_com_cliente.parquet": davs,
+            "data/vendas/_com_cliente/os_para_cliente_map.parquet": os_map,
+            "data/originais/vendas/conf_dav/_consolidado/conf_dav_itens.parquet": itens,
+        }
+        # Gravados nos tipos compactos de etl/utils/esquemas.py, como os consolidados reais
+        for relativo, df in destinos.items():
+            salvar_parquet(df, self.raiz / relativo)
+
+        gabarito = pd.concat([
+            pd.DataFrame({'origem': 'OS', 'loja': os_df['loja'], 'registro': os_df['os_numero'].astype(str),
+                          'id_pessoa': os_df['id_pessoa'], 'duplicata': os_df['duplicata']}),
+            pd.DataFrame({'origem': 'VIXEN', 'loja': None, 'registro': clientes_vixen['id_vixen'].astype(str),
+                          'id_pessoa': clientes_vixen['id_pessoa'], 'duplicata': clientes_vixen['duplicata']}),
+        ], ignore_index=True)
+        gabarito.to_parquet(self.raiz / "gabarito_duplicatas.parquet", index=False)
+
+        self.contagens.update({
+            'clientes_unificados': len(unificados), 'davs': len(davs), 'itens_dav': len(itens),
+        })
+
+    def gerar(self) -> dict:
+        print(f"🧪 Gerando dados sintéticos: {self.linhas:,} OS, {self.clientes_vixen:,} clientes Vixen, "
+              f"{self.taxa_duplicatas:.0%} duplicatas → {self.raiz}")
+        self.raiz.mkdir(parents=True, exist_ok=True)
+
+        pessoas = self.gerar_pessoas(self.linhas + self.clientes_vixen)
+        os_df = self.gerar_os(pessoas.iloc[:self.linhas])
+        # Vixen: pessoas próprias + parte das pessoas das OS (clientes das duas bases)
+        clientes_vixen = self.gerar_vixen(pessoas.iloc[self.linhas // 2:])
+        davs, itens = self.gerar_vendas_vixen(clientes_vixen)
+
+        self.salvar_planilhas_os(os_df)
+        print(f"   ✅ {self.contagens['planilhas_os']} planilhas de OS")
+        self.salvar_caixas(self.movimentos_caixa(os_df))
+        print(f"   ✅ {self.contagens['planilhas_caixa']} planilhas de caixa")
+        self.salvar_vixen(clientes_vixen)
+        self.salvar_consolidados(os_df, clientes_vixen, davs, itens)
+        print(f"   ✅ Vixen: {len(clientes_vixen):,} clientes, {len(davs):,} DAVs")
+
+        self.contagens.update({
+            'os': len(os_df), 'os_duplicatas': int(os_df['duplicata'].sum()),
+            'clientes_vixen': len(clientes_vixen), 'vixen_duplicatas': int(clientes_vixen['duplicata'].sum()),
+        })
+        manifesto = {
+            'parametros': {'linhas': self.linhas, 'taxa_duplicatas': self.taxa_duplicatas, 'meses': self.meses,
+                           'ano': self.ano, 'clientes_vixen': self.clientes_vixen, 'semente': self.semente},
+            'contagens': self.contagens,
+            'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        }
+        with open(self.raiz / "sintetico.json", 'w', encoding='utf-8') as f:
+            json.dump(manifesto, f, ensure_ascii=False, indent=2)
+        return manifesto
+
+
+def pasta_padrao(linhas: int, taxa_duplicatas: float, meses: int, semente: int) -> Path:
+    return PASTA_SINTETICO / f"n{linhas}_d{int(taxa_duplicatas * 100)}_m{meses}_s{semente}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos no layout das planilhas das lojas")
+    parser.add_argument('linhas', nargs='?', type=int, default=10_000, help="quantidade de OS")
+    parser.add_argument('--duplicatas', type=float, default=0.1, help="fração de registros repetidos")
+    parser.add_argument('--meses', type=int, default=12, help="meses de caixa (a partir de janeiro)")
+    parser.add_argument('--ano', type=int, default=2024)
+    parser.add_argument('--vixen', type=int, default=None, help="clientes Vixen (padrão: igual às OS)")
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--saida', default=None, help="pasta de saída")
+    args = parser.parse_args()
+
+    raiz = Path(args.saida) if args.saida else pasta_padrao(args.linhas, args.duplicatas, args.meses, args.semente)
+    gerador = GeradorDadosSinteticos(raiz, args.linhas, args.duplicatas, args.meses, args.ano,
+                                     args.vixen, args.semente)
+    manifesto = gerador.gerar()
+    for nome, valor in manifesto['contagens'].items():
+        print(f"   {nome:22}: {valor:,}")
+
+
+if __name__ == "__main__":
+    main()
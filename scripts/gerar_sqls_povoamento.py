@@ -5,45 +5,18 @@ Lê os arquivos parquet e gera blocos SQL executáveis no Supabase SQL Editor
 import pandas as pd
 from pathlib import Path
 import json
-import unicodedata
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils import normalizar
+from etl.utils.ceps import IndiceCEP
+from etl.utils.dados_quentes import ler_parquet
 
 # Configurações
 BATCH_SIZE = 200  # Linhas por arquivo SQL (reduzido para limites do Supabase)
 OUTPUT_DIR = Path('povoamento/dados')
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-def remover_acentos(texto):
-    """Remove acentos de um texto"""
-    if not texto:
-        return texto
-    # Normaliza para NFD (decomposição canônica) e remove marcas diacríticas
-    nfkd = unicodedata.normalize('NFD', str(texto))
-    return ''.join([c for c in nfkd if not unicodedata.combining(c)])
-
-def limpar_email(email):
-    """Limpa e valida email removendo caracteres inválidos"""
-    if not email or pd.isna(email):
-        return None
-    
-    # Converter para string e remover espaços
-    email_str = str(email).strip()
-    
-    # Remover acentos
-    email_str = remover_acentos(email_str)
-    
-    # Remover caracteres inválidos (manter apenas: letras, números, @, ., _, -, +, %)
-    import re
-    email_str = re.sub(r'[^a-zA-Z0-9@._\-+%]', '', email_str)
-    
-    # Validar formato básico e tamanho
-    if email_str and '@' in email_str and len(email_str) <= 100:
-        # Verificar se tem pelo menos um . depois do @
-        partes = email_str.split('@')
-        if len(partes) == 2 and '.' in partes[1]:
-            return email_str
-    
-    return None
-
 def escapar_sql(valor):
     """Escapa valores para SQL"""
     if pd.isna(valor) or valor == '' or valor == 'nan':
@@ -66,7 +39,7 @@ def gerar_sql_clientes():
         print(f"❌ Arquivo não encontrado: {clientes_file}")
         return
     
-    df = pd.read_parquet(clientes_file)
+    df = ler_parquet(clientes_file)
     print(f"✅ {len(df)} clientes carregados")
     
     # Limpar dados
@@ -79,9 +52,9 @@ def gerar_sql_clientes():
             df[col] = df[col].astype(str).str.replace(r'\D', '', regex=True)
             df.loc[df[col] == '', col] = None
     
-    # Email
+    # Email: limpar e validar a coluna inteira
     if 'email' in df.columns:
-        df.loc[~df['email'].astype(str).str.contains('@', na=False), 'email'] = None
+        df['email'] = normalizar.limpar_email(df['email'])
     
     # Gerar blocos SQL
     total_blocos = (len(df) + BATCH_SIZE - 1) // BATCH_SIZE
@@ -107,12 +80,8 @@ def gerar_sql_clientes():
                 cpf_limpo = str(row['cpf']).strip()
                 cpf = escapar_sql(f"{cpf_limpo[:3]}.{cpf_limpo[3:6]}.{cpf_limpo[6:9]}-{cpf_limpo[9:]}")
             
-            # Email: limpar e validar
-            email = 'NULL'
-            if row.get('email'):
-                email_limpo = limpar_email(row['email'])
-                if email_limpo:
-                    email = escapar_sql(email_limpo)
+            # Email (já limpo)
+            email = escapar_sql(row['email']) if row.get('email') else 'NULL'
             
             id_legado = escapar_sql(str(row['id_cliente']))
             origem = str(row.get('origem', 'VIXEN')).upper()
@@ -143,7 +112,7 @@ def gerar_sql_telefones():
         print(f"❌ Arquivo não encontrado: {clientes_file}")
         return
     
-    df = pd.read_parquet(clientes_file)
+    df = ler_parquet(clientes_file)
     
     # Preparar telefones
     telefones = []
@@ -211,6 +180,66 @@ def gerar_sql_telefones():
     
     print(f"✅ {total_blocos} arquivos SQL de telefones gerados")
 
+def gerar_sql_enderecos():
+    """Gera SQLs de endereços (base Vixen padronizada, completada pelo índice local de CEP)"""
+    print("\n🏠 Gerando SQLs de endereços...")
+
+    arquivos_vixen = sorted(Path('data/analise_especial').glob('BASE_CLIENTES_VIXEN_PADRONIZADO_*.parquet'))
+    clientes_file = Path('data/clientes/_consolidado/clientes_unificados.parquet')
+    if not arquivos_vixen or not clientes_file.exists():
+        print("⚠️  Base Vixen padronizada ou clientes unificados não encontrados - endereços não gerados")
+        return
+
+    df = pd.read_parquet(arquivos_vixen[-1], columns=['id_vixen_original', 'endereco', 'cep', 'bairro', 'cidade', 'uf'])
+    df['id_cliente'] = df['id_vixen_original'].astype('Int64').astype(str)
+    # Só clientes que vão para core.clientes (o endereço referencia o cliente pelo id_legado)
+    ids_clientes = ler_parquet(clientes_file, columns=['id_cliente'])['id_cliente'].astype(str)
+    df = df[df['id_cliente'].isin(set(ids_clientes))]
+
+    indice = IndiceCEP.carregar()
+    df, estatisticas = indice.enriquecer(df)
+    # CEP no formato 00000-000; inválido vira NULL
+    df['cep'] = indice.consultar(df['cep'])['cep'].to_numpy()
+    for col in ['endereco', 'bairro', 'cidade']:
+        df[col] = normalizar.texto_limpo(df[col]).str.upper()
+    df['uf'] = normalizar.texto_limpo(df['uf']).str.upper().where(lambda uf: uf.str.fullmatch('[A-Z]{2}', na=False))
+    df = df[df[['endereco', 'cep']].notna().any(axis=1)].reset_index(drop=True)
+    print(f"✅ {len(df)} endereços preparados (CEP válido: {estatisticas['ceps_validos']}, "
+          f"completados pelo CEP: bairro {estatisticas['bairro']}, cidade {estatisticas['cidade']}, "
+          f"UF {estatisticas['uf']})")
+
+    total_blocos = (len(df) + BATCH_SIZE - 1) // BATCH_SIZE
+
+    for bloco_num in range(total_blocos):
+        inicio = bloco_num * BATCH_SIZE
+        fim = min((bloco_num + 1) * BATCH_SIZE, len(df))
+        df_bloco = df.iloc[inicio:fim]
+
+        sql_lines = [
+            f"-- Bloco {bloco_num + 1}/{total_blocos} - Endereços {inicio + 1} a {fim}",
+            "INSERT INTO core.endereco_cliente (cliente_id, cep, logradouro, bairro, cidade, estado, principal)",
+            "VALUES"
+        ]
+
+        valores = []
+        for row in df_bloco.itertuples(index=False):
+            cliente_id_legado = escapar_sql(row.id_cliente)
+            valores.append(
+                f"  ((SELECT id FROM core.clientes WHERE id_legado = {cliente_id_legado} LIMIT 1), "
+                f"{escapar_sql(row.cep)}, {escapar_sql(row.endereco)}, {escapar_sql(row.bairro)}, "
+                f"{escapar_sql(row.cidade)}, {escapar_sql(row.uf)}, TRUE)"
+            )
+
+        sql_lines.append(',\n'.join(valores) + ';')
+
+        output_file = OUTPUT_DIR / f'enderecos_bloco_{bloco_num + 1:03d}.sql'
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(sql_lines))
+
+        print(f"  ✅ {output_file.name} - {len(df_bloco)} registros")
+
+    print(f"✅ {total_blocos} arquivos SQL de endereços gerados")
+
 def main():
     print("=" * 80)
     print("GERAÇÃO DE SQLs DE POVOAMENTO - SUPABASE")
@@ -221,6 +250,7 @@ def main():
     # Gerar SQLs
     gerar_sql_clientes()
     gerar_sql_telefones()
+    gerar_sql_enderecos()
     
     print("\n" + "=" * 80)
     print("✅ GERAÇÃO CONCLUÍDA!")
@@ -228,7 +258,7 @@ def main():
     print(f"\n📋 PRÓXIMOS PASSOS:")
     print("  1. Execute os arquivos SQL na pasta '{OUTPUT_DIR}' no Supabase SQL Editor")
     print("  2. Comece pelos arquivos de clientes (ordem numérica)")
-    print("  3. Depois execute os arquivos de telefones")
+    print("  3. Depois execute os arquivos de telefones e de endereços")
     print("  4. Valide os dados com as queries em povoamento/06_validacao.sql")
 
 if __name__ == "__main__":
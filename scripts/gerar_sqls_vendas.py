@@ -7,8 +7,12 @@ Data: 2025-10-23
 import pandas as pd
 from pathlib import Path
 import re
+import sys
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils.dados_quentes import CLIENTES_UNIFICADOS, ITENS_DAV, OS_PARA_CLIENTE, VENDAS_VIXEN, ler_parquet
+
 # Configurações
 BATCH_SIZE = 100  # Menor batch para vendas (mais dados por linha)
 OUTPUT_DIR = Path("povoamento/dados/vendas")
@@ -394,7 +398,7 @@ def criar_lookup_clientes():
     # Como os UUIDs são gerados pelo Supabase, vamos usar subqueries
     # ao invés de lookup direto
     
-    df = pd.read_parquet('data/clientes/_consolidado/clientes_unificados.parquet')
+    df = ler_parquet(CLIENTES_UNIFICADOS)
     
     # Criar DataFrame de lookup (será usado apenas para validar)
     lookup_data = []
@@ -420,9 +424,9 @@ def main():
     
     # 2. Carregar dados de vendas
     print("\n=== CARREGANDO DADOS DE VENDAS ===")
-    df_vendas_vixen = pd.read_parquet('data/vendas/_com_cliente/lista_dav_com_cliente.parquet')
-    df_os_map = pd.read_parquet('data/vendas/_com_cliente/os_para_cliente_map.parquet')
-    df_itens = pd.read_parquet('data/originais/vendas/conf_dav/_consolidado/conf_dav_itens.parquet')
+    df_vendas_vixen = ler_parquet(VENDAS_VIXEN)
+    df_os_map = ler_parquet(OS_PARA_CLIENTE)
+    df_itens = ler_parquet(ITENS_DAV)
     
     print(f"✓ Vendas Vixen: {len(df_vendas_vixen):,}")
     print(f"✓ Vendas OS: {len(df_os_map):,}")
@@ -14,13 +14,18 @@ from pathlib import Path
 import openpyxl
 from datetime import datetime
 import re
+import sys
 from typing import Dict, List, Tuple, Optional
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from etl.utils.layout_caixa import CacheLayoutCaixa, loja_do_arquivo
+
 class ExtratorTabelasPadrao:
     def __init__(self):
         self.pasta_caixa = Path("data/caixa_lojas")
         self.arquivo_exemplo = self.pasta_caixa / "MAUA/2024_MAU/abr_24.xlsx"
         self.tabelas_extraidas = []
+        self.layouts = CacheLayoutCaixa()
         
         # Padrões das 5 tabelas
         self.padroes_tabelas = {
@@ -97,48 +102,57 @@ class ExtratorTabelasPadrao:
         inicio_tabela = None
         linha_cabecalho = None
         
-        for i, row in df.iterrows():
-            linha_texto = " ".join([str(cell) for cell in row if pd.notna(cell)])
-            linha_upper = linha_texto.upper()
-            
-            # Verificar se contém as palavras-chave da tabela
-            if tipo_tabela == 'VEND':
-                # Procurar por "Vendas" seguido de valor e cabeçalhos
-                if 'VENDAS' in linha_upper and any(kw.upper() in linha_upper for kw in keywords[1:]):
-                    inicio_tabela = i
-                    linha_cabecalho = linha_texto
-                    break
-                    
-            elif tipo_tabela == 'REST_ENTR':
-                # Procurar especificamente por "Restante Entrada"
-                if 'RESTANTE ENTRADA' in linha_upper:
-                    inicio_tabela = i
-                    linha_cabecalho = linha_texto
-                    break
-                    
-            elif tipo_tabela == 'REC_CARN':
-                # Procurar por "Recebimento de Carnê"
-                if 'RECEBIMENTO DE CARNÊ' in linha_upper or 'RECEBIMENTO DE CARNE' in linha_upper:
-                    inicio_tabela = i
-                    linha_cabecalho = linha_texto
-                    break
-                    
-            elif tipo_tabela == 'ENTR_CARN':
-                # Procurar por "Entrega de Carne" 
-                if 'ENTREGA DE CARNE' in linha_upper and 'CARNÊ' not in linha_upper:
-                    inicio_tabela = i
-                    linha_cabecalho = linha_texto
-                    break
-                    
-            elif tipo_tabela == 'OS_ENT_DIA':
-                # Procurar por "OS Entregue no Dia"
-                if 'OS ENTREGUE NO DIA' in linha_upper:
-                    inicio_tabela = i
-                    linha_cabecalho = linha_texto
-                    break
+        # Layout já aprendido da loja: busca só na coluna da âncora
+        loja = loja_do_arquivo(self.arquivo_exemplo)
+        encontrado = self.layouts.localizar(df, loja, tipo_tabela)
+        if encontrado is not None:
+            inicio_tabela = encontrado[0]
+            linha_cabecalho = " ".join([str(cell) for cell in df.iloc[inicio_tabela] if pd.notna(cell)])
+        else:
+            for i, row in df.iterrows():
+                linha_texto = " ".join([str(cell) for cell in row if pd.notna(cell)])
+                linha_upper = linha_texto.upper()
+                
+                # Verificar se contém as palavras-chave da tabela
+                if tipo_tabela == 'VEND':
+                    # Procurar por "Vendas" seguido de valor e cabeçalhos
+                    if 'VENDAS' in linha_upper and any(kw.upper() in linha_upper for kw in keywords[1:]):
+                        inicio_tabela = i
+                        linha_cabecalho = linha_texto
+                        break
+                
+                elif tipo_tabela == 'REST_ENTR':
+                    # Procurar especificamente por "Restante Entrada"
+                    if 'RESTANTE ENTRADA' in linha_upper:
+                        inicio_tabela = i
+                        linha_cabecalho = linha_texto
+                        break
+                
+                elif tipo_tabela == 'REC_CARN':
+                    # Procurar por "Recebimento de Carnê"
+                    if 'RECEBIMENTO DE CARNÊ' in linha_upper or 'RECEBIMENTO DE CARNE' in linha_upper:
+                        inicio_tabela = i
+                        linha_cabecalho = linha_texto
+                        break
+                
+                elif tipo_tabela == 'ENTR_CARN':
+                    # Procurar por "Entrega de Carne" 
+                    if 'ENTREGA DE CARNE' in linha_upper and 'CARNÊ' not in linha_upper:
+                        inicio_tabela = i
+                        linha_cabecalho = linha_texto
+                        break
+                
+                elif tipo_tabela == 'OS_ENT_DIA':
+                    # Procurar por "OS Entregue no Dia"
+                    if 'OS ENTREGUE NO DIA' in linha_upper:
+                        inicio_tabela = i
+                        linha_cabecalho = linha_texto
+                        break
         
         if inicio_tabela is None:
             return None
+        if encontrado is None:
+            self.layouts.aprender(df, loja, tipo_tabela, inicio_tabela)
         
         # Determinar fim da tabela
         fim_tabela = self.encontrar_fim_tabela(df, inicio_tabela, tipo_tabela)
@@ -160,8 +174,7 @@ class ExtratorTabelasPadrao:
     def encontrar_fim_tabela(self, df: pd.DataFrame, inicio: int, tipo_tabela: str) -> int:
         """Encontra o fim de uma tabela específica"""
         # Estratégia: procurar próxima seção ou fim dos dados
-        for i in range(inicio + 1, len(df)):
-            row = df.iloc[i]
+        for i, row in enumerate(df.iloc[inicio + 1:].itertuples(index=False, name=None), start=inicio + 1):
             linha_texto = " ".join([str(cell) for cell in row if pd.notna(cell)])
             linha_upper = linha_texto.upper()
             
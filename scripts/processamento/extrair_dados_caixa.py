@@ -10,6 +10,10 @@ import openpyxl
 from datetime import datetime, timedelta
 import re
 from typing import Dict, List, Tuple
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from etl.utils.relatorios import EscritorRelatorio
 
 class ExtratorDadosCaixa:
     def __init__(self):
@@ -314,19 +318,19 @@ class ExtratorDadosCaixa:
         arquivo_saida = self.pasta_caixa / f"DADOS_CAIXA_CONSOLIDADOS_{timestamp}.xlsx"
         
         try:
-            with pd.ExcelWriter(arquivo_saida, engine='openpyxl') as writer:
+            with EscritorRelatorio(arquivo_saida) as relatorio:
                 # Transações
                 if self.dados_extraidos:
                     df_transacoes = pd.DataFrame(self.dados_extraidos)
-                    df_transacoes.to_excel(writer, sheet_name='Transacoes', index=False)
+                    relatorio.escrever(df_transacoes, 'Transacoes')
                 
                 # Resumos
                 if self.resumo_extraido:
                     df_resumos = pd.DataFrame(self.resumo_extraido)
-                    df_resumos.to_excel(writer, sheet_name='Resumos_Mensais', index=False)
+                    relatorio.escrever(df_resumos, 'Resumos_Mensais')
                 
                 # Relatório de extração
-                self.criar_relatorio_extracao(writer, timestamp)
+                self.criar_relatorio_extracao(relatorio, timestamp)
             
             print(f"\n💾 Dados salvos: {arquivo_saida}")
             return str(arquivo_saida)
@@ -335,9 +339,9 @@ class ExtratorDadosCaixa:
             print(f"❌ Erro ao salvar: {e}")
             return ""
     
-    def criar_relatorio_extracao(self, writer, timestamp: str):
+    def criar_relatorio_extracao(self, relatorio: EscritorRelatorio, timestamp: str):
         """Cria relatório da extração"""
-        relatorio = {
+        dados = {
             'Data_Extracao': [timestamp],
             'Total_Transacoes': [len(self.dados_extraidos)],
             'Total_Resumos': [len(self.resumo_extraido)],
@@ -345,8 +349,8 @@ class ExtratorDadosCaixa:
             'Periodo_Dados': [f"{min(t['data_transacao'] for t in self.dados_extraidos)} a {max(t['data_transacao'] for t in self.dados_extraidos)}" if self.dados_extraidos else "N/A"]
         }
         
-        df_relatorio = pd.DataFrame(relatorio)
-        df_relatorio.to_excel(writer, sheet_name='Relatorio_Extracao', index=False)
+        df_relatorio = pd.DataFrame(dados)
+        relatorio.escrever(df_relatorio, 'Relatorio_Extracao')
 
 if __name__ == "__main__":
     extrator = ExtratorDadosCaixa()
@@ -9,13 +9,27 @@ from pathlib import Path
 import openpyxl
 from datetime import datetime
 import re
+import sys
 from typing import Dict, List, Optional
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from etl.utils.layout_caixa import CacheLayoutCaixa, loja_do_arquivo
+
+# Rótulos do cabeçalho da seção → campos do registro (leitura por posição)
+CAMPOS_REC_CARN = {
+    'OS': 'numero_os',
+    'Cliente': 'cliente',
+    'Forma de Pgto': 'forma_pagamento',
+    'Valor Parcela': 'valor_parcela'
+}
+CAMPOS_REC_CARN_OPCIONAIS = {'Parcela': 'numero_parcela'}
+
 class ExtratorTabelaRECCARN:
     def __init__(self):
         self.pasta_caixa = Path("data/caixa_lojas")
         self.arquivo_exemplo = self.pasta_caixa / "MAUA/2024_MAU/abr_24.xlsx"
         self.recebimentos_extraidos = []
+        self.layouts = CacheLayoutCaixa()
         
         # Estrutura de colunas esperada para REC_CARN
         self.colunas_rec_carn = [
@@ -49,8 +63,8 @@ class ExtratorTabelaRECCARN:
             df = pd.read_excel(self.arquivo_exemplo, sheet_name=aba, header=None)
             print(f"📏 Dimensões da página: {df.shape[0]} linhas × {df.shape[1]} colunas")
             
-            # Encontrar seção de recebimento de carnê
-            secao_rec_carn = self.identificar_secao_rec_carn(df)
+            # Encontrar seção de recebimento de carnê (layout conhecido da loja ou detecção completa)
+            secao_rec_carn = self.localizar_secao_rec_carn(df)
             
             if not secao_rec_carn:
                 print(f"❌ Seção REC_CARN não encontrada no dia {aba}")
@@ -59,7 +73,10 @@ class ExtratorTabelaRECCARN:
             print(f"✅ Seção REC_CARN encontrada: linhas {secao_rec_carn['inicio']} a {secao_rec_carn['fim']}")
             
             # Extrair dados da seção
-            recebimentos_dia = self.extrair_dados_rec_carn(secao_rec_carn['dados'], aba)
+            if secao_rec_carn['colunas']:
+                recebimentos_dia = self.extrair_dados_rec_carn_posicional(secao_rec_carn['dados'], aba, secao_rec_carn['colunas'])
+            else:
+                recebimentos_dia = self.extrair_dados_rec_carn(secao_rec_carn['dados'], aba)
             
             print(f"📊 Total de recebimentos extraídos: {len(recebimentos_dia)}")
             
@@ -92,6 +109,29 @@ class ExtratorTabelaRECCARN:
         
         return None
     
+    def localizar_secao_rec_carn(self, df: pd.DataFrame) -> Optional[Dict]:
+        """Seção REC_CARN pelo layout já aprendido da loja; detecção completa só se nenhum conferir"""
+        loja = loja_do_arquivo(self.arquivo_exemplo)
+        encontrado = self.layouts.localizar(df, loja, 'REC_CARN')
+        
+        if encontrado is None:
+            secao = self.identificar_secao_rec_carn(df)
+            if not secao:
+                return None
+            layout = self.layouts.aprender(df, loja, 'REC_CARN', secao['inicio'])
+        else:
+            inicio, layout = encontrado
+            fim_secao = self.encontrar_fim_secao_rec_carn(df, inicio)
+            secao = {
+                'inicio': inicio,
+                'fim': fim_secao,
+                'dados': df.iloc[inicio:fim_secao + 1],
+                'cabecalho': " ".join([str(cell) for cell in df.iloc[inicio] if pd.notna(cell)])
+            }
+        
+        secao['colunas'] = layout.colunas(CAMPOS_REC_CARN, CAMPOS_REC_CARN_OPCIONAIS) if layout else None
+        return secao
+    
     def encontrar_fim_secao_rec_carn(self, df: pd.DataFrame, inicio: int) -> int:
         """Encontra o fim da seção de recebimento de carnê"""
         # A seção de recebimento geralmente vai até o final dos dados ou próxima seção
@@ -133,6 +173,46 @@ class ExtratorTabelaRECCARN:
         
         return recebimentos
     
+    def extrair_dados_rec_carn_posicional(self, dados: pd.DataFrame, dia: str, colunas: Dict[str, int]) -> List[Dict]:
+        """Extrai os recebimentos lendo cada campo na coluna do seu rótulo no cabeçalho"""
+        recebimentos = []
+        
+        for celulas in dados.iloc[1:].itertuples(index=False, name=None):
+            numero_os = self.extrair_numero_os([celulas[colunas['numero_os']]])
+            cliente = celulas[colunas['cliente']]
+            
+            if not numero_os or not isinstance(cliente, str) or not cliente.strip():
+                continue
+            
+            forma = celulas[colunas['forma_pagamento']]
+            valor = celulas[colunas['valor_parcela']]
+            parcela = celulas[colunas['numero_parcela']] if 'numero_parcela' in colunas else None
+            parcela = str(parcela).strip() if pd.notna(parcela) else ""
+            posicoes = set(colunas.values())
+            valores = [cell for cell in celulas if pd.notna(cell)]
+            recebimento = {
+                'id_registro': f"REC_CARN_MAU_2024_04_{dia}_{numero_os}",
+                'loja': 'MAUA',
+                'data_recebimento': f"2024-04-{dia}",
+                'dia': dia,
+                'mes_ano': '2024_04',
+                'numero_os': numero_os,
+                'cliente': cliente.strip(),
+                'forma_pagamento': forma.upper().strip() if isinstance(forma, str) else "",
+                'valor_parcela': float(valor) if isinstance(valor, (int, float)) and not pd.isna(valor) else 0.0,
+                'numero_parcela': parcela,
+                'descricao_parcela': parcela,
+                'observacoes': " | ".join(
+                    cell.strip() for posicao, cell in enumerate(celulas)
+                    if posicao not in posicoes and isinstance(cell, str) and cell.strip()
+                ),
+                'linha_bruta': str(valores)
+            }
+            recebimentos.append(recebimento)
+            print(f"   📝 Recebimento extraído: OS {numero_os} - {recebimento['cliente']}")
+        
+        return recebimentos
+    
     def extrair_numero_os(self, valores: List) -> Optional[str]:
         """Extrai número da OS da linha"""
         for val in valores:
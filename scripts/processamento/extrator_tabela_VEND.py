@@ -9,13 +9,27 @@ from pathlib import Path
 import openpyxl
 from datetime import datetime
 import re
+import sys
 from typing import Dict, List, Optional
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from etl.utils.layout_caixa import CacheLayoutCaixa, loja_do_arquivo
+
+# Rótulos do cabeçalho da seção → campos do registro (leitura por posição)
+CAMPOS_VEND = {
+    'Nº Venda': 'numero_venda',
+    'Cliente': 'cliente',
+    'Forma de Pgto': 'forma_pagamento',
+    'Valor Venda': 'valor_venda'
+}
+CAMPOS_VEND_OPCIONAIS = {'Entrada': 'valor_entrada', 'Vendedor': 'vendedor'}
+
 class ExtratorTabelaVEND:
     def __init__(self):
         self.pasta_caixa = Path("data/caixa_lojas")
         self.arquivo_exemplo = self.pasta_caixa / "MAUA/2024_MAU/abr_24.xlsx"
         self.vendas_extraidas = []
+        self.layouts = CacheLayoutCaixa()
         
         # Estrutura de colunas esperada para VEND
         self.colunas_vend = [
@@ -49,8 +63,8 @@ class ExtratorTabelaVEND:
             df = pd.read_excel(self.arquivo_exemplo, sheet_name=aba, header=None)
             print(f"📏 Dimensões da página: {df.shape[0]} linhas × {df.shape[1]} colunas")
             
-            # Encontrar seção de vendas
-            secao_vend = self.identificar_secao_vend(df)
+            # Encontrar seção de vendas (layout conhecido da loja ou detecção completa)
+            secao_vend = self.localizar_secao_vend(df)
             
             if not secao_vend:
                 print(f"❌ Seção VEND não encontrada no dia {aba}")
@@ -59,7 +73,10 @@ class ExtratorTabelaVEND:
             print(f"✅ Seção VEND encontrada: linhas {secao_vend['inicio']} a {secao_vend['fim']}")
             
             # Extrair dados da seção
-            vendas_dia = self.extrair_dados_vend(secao_vend['dados'], aba)
+            if secao_vend['colunas']:
+                vendas_dia = self.extrair_dados_vend_posicional(secao_vend['dados'], aba, secao_vend['colunas'])
+            else:
+                vendas_dia = self.extrair_dados_vend(secao_vend['dados'], aba)
             
             print(f"📊 Total de vendas extraídas: {len(vendas_dia)}")
             
@@ -94,11 +111,33 @@ class ExtratorTabelaVEND:
         
         return None
     
+    def localizar_secao_vend(self, df: pd.DataFrame) -> Optional[Dict]:
+        """Seção de vendas pelo layout já aprendido da loja; detecção completa só se nenhum conferir"""
+        loja = loja_do_arquivo(self.arquivo_exemplo)
+        encontrado = self.layouts.localizar(df, loja, 'VEND')
+        
+        if encontrado is None:
+            secao = self.identificar_secao_vend(df)
+            if not secao:
+                return None
+            layout = self.layouts.aprender(df, loja, 'VEND', secao['inicio'])
+        else:
+            inicio, layout = encontrado
+            fim_secao = self.encontrar_fim_secao_vend(df, inicio)
+            secao = {
+                'inicio': inicio,
+                'fim': fim_secao,
+                'dados': df.iloc[inicio:fim_secao + 1],
+                'cabecalho': " ".join([str(cell) for cell in df.iloc[inicio] if pd.notna(cell)])
+            }
+        
+        secao['colunas'] = layout.colunas(CAMPOS_VEND, CAMPOS_VEND_OPCIONAIS) if layout else None
+        return secao
+    
     def encontrar_fim_secao_vend(self, df: pd.DataFrame, inicio: int) -> int:
         """Encontra o fim da seção de vendas"""
         # A seção de vendas geralmente vai até encontrar "Tipos de Pagto" ou linhas vazias
-        for i in range(inicio + 1, len(df)):
-            row = df.iloc[i]
+        for i, row in enumerate(df.iloc[inicio + 1:].itertuples(index=False, name=None), start=inicio + 1):
             linha_texto = " ".join([str(cell) for cell in row if pd.notna(cell)])
             linha_upper = linha_texto.upper()
             
@@ -148,6 +187,51 @@ class ExtratorTabelaVEND:
         
         return vendas
     
+    def extrair_dados_vend_posicional(self, dados: pd.DataFrame, dia: str, colunas: Dict[str, int]) -> List[Dict]:
+        """Extrai as vendas lendo cada campo na coluna do seu rótulo no cabeçalho"""
+        vendas = []
+        formas_conhecidas = ['DN', 'CTD', 'CTC', 'PIX', 'SS', 'GARANTIA']
+        
+        for celulas in dados.iloc[1:].itertuples(index=False, name=None):
+            numero_venda = self.extrair_numero_venda([celulas[colunas['numero_venda']]])
+            cliente = celulas[colunas['cliente']]
+            forma = celulas[colunas['forma_pagamento']]
+            forma = forma.upper().strip() if isinstance(forma, str) else ""
+            
+            if not numero_venda or not isinstance(cliente, str) or forma not in formas_conhecidas:
+                continue
+            
+            vendedor = celulas[colunas['vendedor']] if 'vendedor' in colunas else None
+            posicoes = set(colunas.values())
+            valores = [cell for cell in celulas if pd.notna(cell)]
+            venda = {
+                'id_registro': f"VEND_MAU_2024_04_{dia}_{numero_venda}",
+                'loja': 'MAUA',
+                'data_venda': f"2024-04-{dia}",
+                'dia': dia,
+                'mes_ano': '2024_04',
+                'numero_venda': numero_venda,
+                'cliente': cliente.strip(),
+                'forma_pagamento': forma,
+                'valor_venda': self.valor_numerico(celulas[colunas['valor_venda']]),
+                'valor_entrada': self.valor_numerico(celulas[colunas['valor_entrada']]) if 'valor_entrada' in colunas else 0.0,
+                'vendedor': vendedor.upper().strip() if isinstance(vendedor, str) else "",
+                'observacoes': " | ".join(
+                    cell.strip() for posicao, cell in enumerate(celulas)
+                    if posicao not in posicoes and isinstance(cell, str) and cell.strip()
+                ),
+                'linha_bruta': str(valores)
+            }
+            vendas.append(venda)
+            print(f"   📝 Venda extraída: {numero_venda} - {venda['cliente']}")
+        
+        return vendas
+    
+    def valor_numerico(self, valor) -> float:
+        if isinstance(valor, (int, float)) and not pd.isna(valor):
+            return float(valor)
+        return 0.0
+    
     def extrair_numero_venda(self, valores: List) -> Optional[str]:
         """Extrai número da venda da linha"""
         for val in valores:
@@ -8,46 +8,40 @@
 ================================================================================
 """
 
-import subprocess
+import argparse
 import sys
 from pathlib import Path
 import time
 
-def executar_script(script_path, descricao):
-    """Executa um script e monitora o resultado"""
-    print(f"\n🔄 {descricao}")
-    print("=" * 80)
-    
-    try:
-        # Usa o Python do ambiente virtual
-        python_exe = Path("D:/projetos/carne_facil/.venv/Scripts/python.exe")
-        if not python_exe.exists():
-            python_exe = sys.executable
-            
-        result = subprocess.run([
-            str(python_exe), script_path
-        ], capture_output=True, text=True, cwd=Path.cwd())
-        
-        if result.returncode == 0:
-            print(f"✅ {descricao} - CONCLUÍDO")
-            if result.stdout:
-                # Mostrar apenas últimas linhas importantes
-                linhas = result.stdout.strip().split('\n')
-                for linha in linhas[-5:]:
-                    if any(key in linha.lower() for key in ['✅', '📊', '💰', '👥', 'processado', 'gerado']):
-                        print(f"   {linha}")
-        else:
-            print(f"❌ {descricao} - ERRO")
-            print(f"   {result.stderr}")
-            return False
-            
-    except Exception as e:
-        print(f"❌ {descricao} - ERRO: {e}")
-        return False
-    
-    return True
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from etl.utils.instrumentacao import instrumentacao
+from etl.utils.orquestrador import EtapaPipeline, Orquestrador
+
+RAW = ["data/raw/*.xlsm", "data/raw/*.xlsx"]
+CLIENTES_COM_ID = "data/processed/BASE_CLIENTES_COM_ID_*.xlsx"
+RELACIONAMENTOS = "data/processed/RELACIONAMENTO_OS_CLIENTE_*.xlsx"
+DIOPTRIAS = "data/processed/DIOPTRIAS_COMPLETAS_*.xlsx"
+VENDAS = "data/processed/VENDAS_COMPLETAS_*.xlsx"
 
-def main():
+# Cada etapa declara o que lê e grava; a ordem e o paralelismo saem daí
+# (dioptrias, vendas e estrutura só leem data/raw e rodam junto com clientes)
+ETAPAS = [
+    EtapaPipeline("estrutura", "scripts.analisar_estrutura_os:main", RAW,
+                  ["data/processed/ANALISE_ESTRUTURA_OS_*.xlsx"], "1. Analisando estrutura das OS"),
+    EtapaPipeline("clientes", "scripts.criar_sistema_id_cliente:main",
+                  ["data/processed/BASE_CLIENTES_MASTER_*.xlsx"],
+                  [CLIENTES_COM_ID, "data/processed/REGISTRO_IDS_CLIENTES.parquet"],
+                  "2. Criando sistema de ID único para clientes"),
+    EtapaPipeline("dioptrias", "scripts.extrair_dioptrias:main", RAW, [DIOPTRIAS], "3. Extraindo dados de dioptrías"),
+    EtapaPipeline("vendas", "scripts.extrair_vendas:main", RAW, [VENDAS], "4. Extraindo dados de vendas"),
+    EtapaPipeline("relacionamentos", "scripts.criar_relacionamento_os_cliente:main", RAW + [CLIENTES_COM_ID],
+                  [RELACIONAMENTOS], "5. Criando relacionamentos OS-Cliente"),
+    EtapaPipeline("dashboard", "scripts.sistema_final_integrado:main",
+                  [CLIENTES_COM_ID, RELACIONAMENTOS, DIOPTRIAS, VENDAS],
+                  ["data/processed/SISTEMA_INTEGRADO_OTICAS_*.xlsx"], "6. Gerando sistema final integrado"),
+]
+
+def main(paralelo=3, forcar=False, confirmar=False):
     print("🚀 RECÁLCULO COMPLETO DO SISTEMA")
     print("=" * 80)
     print("🔄 Processando todos os arquivos da pasta data/raw/")
@@ -70,35 +64,25 @@ def main():
     for arquivo in arquivos:
         print(f"   📄 {arquivo.name}")
     
-    input("\n⏳ Pressione ENTER para iniciar o processamento...")
-    
-    # Pipeline de processamento
-    scripts = [
-        ("scripts/analisar_estrutura_os.py", "1. Analisando estrutura das OS"),
-        ("scripts/criar_sistema_id_cliente.py", "2. Criando sistema de ID único para clientes"),
-        ("scripts/extrair_dioptrias.py", "3. Extraindo dados de dioptrías"),
-        ("scripts/extrair_vendas.py", "4. Extraindo dados de vendas"),
-        ("scripts/criar_relacionamento_os_cliente.py", "5. Criando relacionamentos OS-Cliente"),
-        ("scripts/sistema_final_integrado.py", "6. Gerando sistema final integrado")
-    ]
+    if not confirmar:
+        input("\n⏳ Pressione ENTER para iniciar o processamento...")
+    print()
     
-    sucesso_total = True
+    # Pipeline de processamento (etapas independentes em paralelo, atualizadas são puladas)
     inicio = time.time()
-    
-    for script_path, descricao in scripts:
-        if not executar_script(script_path, descricao):
-            sucesso_total = False
-            break
-        time.sleep(1)  # Pausa entre scripts
+    relatorio = Orquestrador(ETAPAS, paralelo=paralelo, forcar=forcar).executar()
+    sucesso_total = relatorio['sucesso']
     
     fim = time.time()
     tempo_total = fim - inicio
+    instrumentacao.finalizar()
     
     print("\n" + "=" * 80)
     if sucesso_total:
         print("🎉 RECÁLCULO COMPLETO CONCLUÍDO COM SUCESSO!")
         print("=" * 80)
         print(f"⏱️  Tempo total: {tempo_total:.1f} segundos")
+        print(f"📋 Relatório da execução: {relatorio['arquivo']}")
         print(f"📁 Resultados salvos em: data/processed/")
         print(f"📊 Dashboard atualizado automaticamente")
         print(f"🌐 Acesse: http://localhost:8000 e http://localhost:8002")
@@ -106,9 +90,16 @@ def main():
         print("❌ ERRO NO PROCESSAMENTO!")
         print("=" * 80)
         print("   Verifique os logs acima e corrija os problemas.")
+        print(f"   Log completo de cada etapa em: {relatorio['arquivo']}")
     
     print("\n🔄 Para executar novamente:")
-    print("   python recalcular_tudo.py")
+    print("   python scripts/relatorios/recalcular_tudo.py [--forcar] [--paralelo N]")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Recalcula o pipeline completo a partir de data/raw/")
+    parser.add_argument('--paralelo', type=int, default=3, help="Etapas independentes ao mesmo tempo")
+    parser.add_argument('--forcar', action='store_true', help="Refaz também as etapas já atualizadas")
+    parser.add_argument('-y', '--sim', action='store_true', help="Não pedir confirmação")
+    args = parser.parse_args()
+
+    main(args.paralelo, args.forcar, args.sim)
\ No newline at end of file
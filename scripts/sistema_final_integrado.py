@@ -14,9 +14,10 @@ import logging
 from pathlib import Path
 import glob
 from datetime import datetime
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment
-from openpyxl.utils.dataframe import dataframe_to_rows
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from etl.utils.relatorios import EscritorRelatorio
 
 # Configurar logging
 logging.basicConfig(
@@ -24,42 +25,6 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-def aplicar_formatacao_excel(ws, df, titulo=""):
-    """Aplica formatao profissional ao Excel"""
-    # Ttulo
-    if titulo:
-        ws.insert_rows(1)
-        ws['A1'] = titulo
-        ws['A1'].font = Font(bold=True, size=14, color="FFFFFF")
-        ws['A1'].fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        ws['A1'].alignment = Alignment(horizontal="center")
-        ws.merge_cells(f'A1:{chr(64 + len(df.columns))}1')
-    
-    # Headers
-    header_row = 2 if titulo else 1
-    for col, header in enumerate(df.columns, 1):
-        cell = ws.cell(row=header_row, column=col)
-        cell.value = header
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        cell.alignment = Alignment(horizontal="center")
-    
-    # Auto-ajustar largura das colunas
-    for col_num, column in enumerate(ws.columns, 1):
-        max_length = 0
-        column_letter = chr(64 + col_num)  # A=65, B=66, etc.
-        
-        for cell in column:
-            try:
-                if hasattr(cell, 'value') and cell.value:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-            except:
-                pass
-        
-        adjusted_width = min(max(max_length + 2, 10), 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
-
 def criar_dashboard_executivo(df_clientes, df_relacionamentos, df_dioptrias, df_vendas):
     """Cria dashboard executivo com KPIs principais"""
     
@@ -217,46 +182,31 @@ def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_file = processed_dir / f"SISTEMA_INTEGRADO_OTICAS_{timestamp}.xlsx"
     
-    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+    # Titulo, cabecalho, larguras e formatos na mesma passada (sem reabrir o arquivo)
+    with EscritorRelatorio(output_file) as relatorio:
         # 1. Dashboard Executivo
-        df_dashboard.to_excel(writer, sheet_name='Dashboard_Executivo', index=False)
+        relatorio.escrever(df_dashboard, 'Dashboard_Executivo', titulo="DASHBOARD EXECUTIVO - TICAS CARNE FCIL")
         
         # 2. Anlise por Loja
-        df_analise_lojas.to_excel(writer, sheet_name='Analise_Por_Loja', index=False)
+        relatorio.escrever(df_analise_lojas, 'Analise_Por_Loja', titulo="ANLISE DETALHADA POR LOJA")
         
         # 3. Top Clientes
-        df_top_clientes.to_excel(writer, sheet_name='Top_Clientes', index=False)
+        relatorio.escrever(df_top_clientes, 'Top_Clientes', titulo="TOP 50 CLIENTES")
         
         # 4. Base Clientes (sample)
-        df_clientes.head(1000).to_excel(writer, sheet_name='Base_Clientes_Sample', index=False)
+        relatorio.escrever(df_clientes.head(1000), 'Base_Clientes_Sample')
         
         # 5. Relacionamentos (sample)
         if not df_relacionamentos.empty:
-            df_relacionamentos.head(1000).to_excel(writer, sheet_name='Relacionamentos_Sample', index=False)
+            relatorio.escrever(df_relacionamentos.head(1000), 'Relacionamentos_Sample')
         
         # 6. Dioptras (sample)
         if not df_dioptrias.empty:
-            df_dioptrias.head(1000).to_excel(writer, sheet_name='Dioptrias_Sample', index=False)
+            relatorio.escrever(df_dioptrias.head(1000), 'Dioptrias_Sample')
         
         # 7. Vendas (sample)
         if not df_vendas.empty:
-            df_vendas.head(1000).to_excel(writer, sheet_name='Vendas_Sample', index=False)
-    
-    # 4. Aplicar formatao
-    print(" Aplicando formatao profissional...")
-    wb = openpyxl.load_workbook(output_file)
-    
-    # Formatar sheets principais
-    if 'Dashboard_Executivo' in wb.sheetnames:
-        aplicar_formatacao_excel(wb['Dashboard_Executivo'], df_dashboard, "DASHBOARD EXECUTIVO - TICAS CARNE FCIL")
-    
-    if 'Analise_Por_Loja' in wb.sheetnames:
-        aplicar_formatacao_excel(wb['Analise_Por_Loja'], df_analise_lojas, "ANLISE DETALHADA POR LOJA")
-    
-    if 'Top_Clientes' in wb.sheetnames:
-        aplicar_formatacao_excel(wb['Top_Clientes'], df_top_clientes, "TOP 50 CLIENTES")
-    
-    wb.save(output_file)
+            relatorio.escrever(df_vendas.head(1000), 'Vendas_Sample')
     
     # 5. Estatsticas finais
     print(f"\n SISTEMA INTEGRADO CONCLUDO!")